@@ -0,0 +1,272 @@
+"""
+Account Ledger Screen - Ledger of an account or business partner with running balance
+
+Lines are fetched one keyset page at a time while scrolling. The grid keeps at
+most MAX_PAGES pages: pages scrolled far out of view are dropped and fetched
+again from their cursor when the user scrolls back.
+"""
+
+import tkinter as tk
+from tkinter import ttk, messagebox
+from tkcalendar import DateEntry
+from database.financial_year_handler import FinancialYearHandler
+from database.ledger_handler import LedgerHandler
+from ui_config import COLORS, FONTS, SPACING
+
+
+PAGE_SIZE = 200
+MAX_PAGES = 5
+
+# Fraction of the scroll range at which the next / previous page is fetched
+SCROLL_EDGE = 0.05
+
+
+class AccountLedgerReport(tk.Frame):
+    def __init__(self, parent, colors):
+        super().__init__(parent, bg=COLORS['background'])
+        self.colors = colors
+        self.ledger_handler = LedgerHandler()
+        self.fy_handler = FinancialYearHandler()
+
+        # Connect to database
+        if not self.ledger_handler.connect() or not self.fy_handler.connect():
+            messagebox.showerror("Database Error",
+                               "Failed to connect to database.")
+            return
+
+        financial_years = self.fy_handler.get_all_financial_years()
+        self.fy_handler.disconnect()
+
+        # Account dropdown data: display text -> (account_kind, account_id)
+        self.accounts = {
+            f"{account['name']} ({account['code'] or '-'})": (account['account_kind'], account['account_id'])
+            for account in self.ledger_handler.get_ledger_accounts()
+        }
+
+        # Paging state of the loaded window
+        self.query = None
+        self.next_cursor = None
+        self.previous_cursor = None
+        self.row_keys = {}
+        self.loading = False
+
+        # Create UI
+        self.create_widgets()
+
+        if financial_years:
+            self.from_entry.set_date(financial_years[0]['start_date'])
+            self.to_entry.set_date(financial_years[0]['end_date'])
+
+    def create_widgets(self):
+        """Create the ledger UI"""
+        # Header
+        header_frame = tk.Frame(self, bg=self.colors['background'])
+        header_frame.pack(fill=tk.X, padx=SPACING['xl'], pady=(SPACING['lg'], SPACING['md']))
+
+        title_label = tk.Label(header_frame,
+                               text="Account Ledger",
+                               font=FONTS['h1'],
+                               bg=self.colors['background'],
+                               fg=self.colors['text_primary'])
+        title_label.pack(side=tk.LEFT)
+
+        show_btn = tk.Button(header_frame, text="Show")
+        show_btn.config(
+            font=FONTS['button'],
+            bg=self.colors['primary'],
+            fg='white',
+            activebackground=self.colors['primary_hover'],
+            activeforeground='white',
+            cursor='hand2',
+            relief=tk.FLAT,
+            padx=SPACING['lg'],
+            pady=SPACING['md'],
+            command=self.load_ledger
+        )
+        show_btn.pack(side=tk.RIGHT)
+
+        # Date range
+        self.to_entry = DateEntry(header_frame, font=FONTS['body'], date_pattern='yyyy-mm-dd',
+                                  showweeknumbers=False, width=12)
+        self.to_entry.pack(side=tk.RIGHT, padx=SPACING['md'])
+        tk.Label(header_frame, text="To:", font=FONTS['body'],
+                 bg=self.colors['background'], fg=self.colors['text_secondary']).pack(side=tk.RIGHT)
+
+        self.from_entry = DateEntry(header_frame, font=FONTS['body'], date_pattern='yyyy-mm-dd',
+                                    showweeknumbers=False, width=12)
+        self.from_entry.pack(side=tk.RIGHT, padx=SPACING['md'])
+        tk.Label(header_frame, text="From:", font=FONTS['body'],
+                 bg=self.colors['background'], fg=self.colors['text_secondary']).pack(side=tk.RIGHT)
+
+        # Account selection
+        self.account_var = tk.StringVar()
+        account_combo = ttk.Combobox(header_frame,
+                                     textvariable=self.account_var,
+                                     values=list(self.accounts.keys()),
+                                     state='readonly',
+                                     font=FONTS['body'],
+                                     width=32)
+        account_combo.pack(side=tk.RIGHT, padx=SPACING['md'])
+        account_combo.bind('<<ComboboxSelected>>', lambda _e: self.load_ledger())
+
+        tk.Label(header_frame, text="Account:", font=FONTS['body'],
+                 bg=self.colors['background'], fg=self.colors['text_secondary']).pack(side=tk.RIGHT)
+
+        # Opening balance line
+        self.opening_label = tk.Label(self,
+                                      text="",
+                                      font=FONTS['body_bold'],
+                                      bg=self.colors['background'],
+                                      fg=self.colors['text_primary'],
+                                      anchor='w')
+        self.opening_label.pack(fill=tk.X, padx=SPACING['xl'])
+
+        # Ledger grid
+        table_frame = tk.Frame(self, bg=self.colors['border'], relief=tk.SOLID, bd=2)
+        table_frame.pack(fill=tk.BOTH, expand=True, padx=SPACING['xl'], pady=SPACING['md'])
+
+        columns = ('date', 'voucher_no', 'voucher_type', 'narration', 'debit', 'credit', 'balance')
+        self.tree = ttk.Treeview(table_frame, columns=columns, show='headings')
+        for column, text, width in zip(columns,
+                                       ("Date", "Voucher No", "Type", "Narration", "Debit", "Credit", "Balance"),
+                                       (100, 150, 90, 300, 120, 120, 140)):
+            self.tree.heading(column, text=text)
+            self.tree.column(column, width=width,
+                             anchor='e' if column in ('debit', 'credit', 'balance') else 'w')
+
+        self.scrollbar = ttk.Scrollbar(table_frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=self.on_scroll)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        # Totals footer
+        self.totals_label = tk.Label(self,
+                                     text="",
+                                     font=FONTS['body_bold'],
+                                     bg=self.colors['background'],
+                                     fg=self.colors['text_primary'],
+                                     anchor='e')
+        self.totals_label.pack(fill=tk.X, padx=SPACING['xl'], pady=(0, SPACING['lg']))
+
+    def load_ledger(self):
+        """Load the first page and the totals of the selected account and range"""
+        account = self.accounts.get(self.account_var.get())
+        if account is None:
+            return
+
+        date_from = self.from_entry.get_date().isoformat()
+        date_to = self.to_entry.get_date().isoformat()
+        summary = self.ledger_handler.get_ledger_summary(*account, date_from, date_to)
+        if summary is None:
+            messagebox.showerror("Error", "The start date is not inside any financial year.")
+            return
+
+        self.query = (*account, date_from, summary['date_to'])
+        self.tree.delete(*self.tree.get_children())
+        self.row_keys = {}
+
+        self.opening_label.config(
+            text=f"Opening Balance as on {date_from}: {self.format_balance(summary['opening_balance'])}")
+        self.totals_label.config(
+            text=f"Total Dr: {summary['debit_total']:,.2f}    "
+                 f"Total Cr: {summary['credit_total']:,.2f}    "
+                 f"Closing Balance as on {summary['date_to']}: {self.format_balance(summary['closing_balance'])}")
+
+        page = self.ledger_handler.get_ledger_page(*self.query, page_size=PAGE_SIZE)
+        if page is None:
+            messagebox.showerror("Error", "Could not load the ledger.")
+            return
+        self.previous_cursor = page['previous_cursor']
+        self.next_cursor = page['next_cursor']
+        self.insert_rows(page['rows'], tk.END)
+
+    def on_scroll(self, first, last):
+        """Keep the scrollbar in sync and fetch a page when an edge of the window is reached"""
+        self.scrollbar.set(first, last)
+        if self.loading or self.query is None:
+            return
+        if float(last) >= 1 - SCROLL_EDGE and self.next_cursor:
+            self.after_idle(self.load_next_page)
+        elif float(first) <= SCROLL_EDGE and self.previous_cursor:
+            self.after_idle(self.load_previous_page)
+
+    def load_next_page(self):
+        """Append the next page, dropping the oldest page if the window is full"""
+        if self.loading or not self.next_cursor:
+            return
+        self.loading = True
+        try:
+            page = self.ledger_handler.get_ledger_page(*self.query, cursor=self.next_cursor,
+                                                       direction='next', page_size=PAGE_SIZE)
+            if not page or not page['rows']:
+                self.next_cursor = None
+                return
+            self.next_cursor = page['next_cursor']
+            self.insert_rows(page['rows'], tk.END)
+
+            items = self.tree.get_children()
+            if len(items) > PAGE_SIZE * MAX_PAGES:
+                anchor = items[PAGE_SIZE]
+                dropped = items[:PAGE_SIZE]
+                last_dropped = self.row_keys[dropped[-1]]
+                self.remove_rows(dropped)
+                # Balance before the first kept row is the balance after the last dropped one
+                first_kept = self.row_keys[anchor]
+                self.previous_cursor = {'voucher_date': first_kept['voucher_date'],
+                                        'id': first_kept['id'], 'balance': last_dropped['balance']}
+                self.tree.see(anchor)
+        finally:
+            self.loading = False
+
+    def load_previous_page(self):
+        """Prepend the previous page, dropping the newest page if the window is full"""
+        if self.loading or not self.previous_cursor:
+            return
+        self.loading = True
+        try:
+            page = self.ledger_handler.get_ledger_page(*self.query, cursor=self.previous_cursor,
+                                                       direction='previous', page_size=PAGE_SIZE)
+            if not page or not page['rows']:
+                self.previous_cursor = None
+                return
+            anchor = self.tree.get_children()[0]
+            self.previous_cursor = page['previous_cursor']
+            self.insert_rows(page['rows'], 0)
+
+            items = self.tree.get_children()
+            if len(items) > PAGE_SIZE * MAX_PAGES:
+                self.remove_rows(items[-PAGE_SIZE:])
+                last_kept = self.row_keys[self.tree.get_children()[-1]]
+                self.next_cursor = {'voucher_date': last_kept['voucher_date'],
+                                    'id': last_kept['id'], 'balance': last_kept['balance']}
+            self.tree.see(anchor)
+        finally:
+            self.loading = False
+
+    def insert_rows(self, rows, position):
+        """Insert ledger rows at the end (tk.END) or at the top (0) of the grid"""
+        if position == 0:
+            rows = reversed(rows)
+        for row in rows:
+            item = self.tree.insert('', position, values=(
+                row['voucher_date'],
+                row['voucher_no'],
+                row['voucher_type'],
+                row['narration'] or '',
+                f"{row['debit']:,.2f}" if row['debit'] else '',
+                f"{row['credit']:,.2f}" if row['credit'] else '',
+                self.format_balance(row['balance'])
+            ))
+            self.row_keys[item] = {'voucher_date': row['voucher_date'], 'id': row['id'],
+                                   'balance': row['balance']}
+
+    def remove_rows(self, items):
+        """Remove rows from the grid and forget their keys"""
+        self.tree.delete(*items)
+        for item in items:
+            self.row_keys.pop(item, None)
+
+    @staticmethod
+    def format_balance(balance):
+        """Format a signed balance (Debit positive) as Dr / Cr"""
+        return f"{abs(balance):,.2f} {'Dr' if balance >= 0 else 'Cr'}"
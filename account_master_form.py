@@ -5,6 +5,7 @@ Account Master Form - Create and Edit Account Master
 import tkinter as tk
 from tkinter import ttk, messagebox
 from ui_config import COLORS, FONTS, SPACING, LAYOUT
+from utils.money import Money
 
 
 class AccountMasterForm(tk.Frame):
@@ -479,7 +480,7 @@ class AccountMasterForm(tk.Frame):
 
         # Opening Balance
         try:
-            data['opening_balance'] = float(self.form_vars['opening_balance']['var'].get())
+            data['opening_balance'] = Money.of(self.form_vars['opening_balance']['var'].get())
         except ValueError:
             data['opening_balance'] = 0
 
@@ -0,0 +1,243 @@
+"""
+Backup & Restore Screen - Online backups with progress, rolling retention and restore
+Backups and restores run on a worker thread; progress is passed back through a queue
+polled with after(), so the window stays responsive and only the Tk thread touches widgets.
+"""
+
+import queue
+import threading
+import tkinter as tk
+from tkinter import ttk, messagebox
+from database.backup_handler import DEFAULT_KEEP, BackupHandler, available_compressions
+from ui_config import COLORS, FONTS, SPACING
+
+
+# Milliseconds between checks of the worker's progress queue
+POLL_INTERVAL_MS = 100
+
+PHASE_LABELS = {
+    'backup': "Copying database",
+    'compact': "Compacting",
+    'compress': "Compressing",
+    'checksum': "Writing checksum",
+    'verify': "Verifying checksum",
+    'decompress': "Unpacking backup",
+    'restore': "Restoring database"
+}
+
+
+class BackupManagement(tk.Frame):
+    def __init__(self, parent, colors):
+        super().__init__(parent, bg=COLORS['background'])
+        self.colors = colors
+        self.backup_handler = BackupHandler()
+        self.events = queue.Queue()
+        self.worker = None
+        self.buttons = []
+
+        # Create UI
+        self.create_widgets()
+        self.load_backups()
+
+    def create_widgets(self):
+        """Create the backup UI"""
+        # Header
+        header_frame = tk.Frame(self, bg=self.colors['background'])
+        header_frame.pack(fill=tk.X, padx=SPACING['xl'], pady=(SPACING['lg'], SPACING['md']))
+
+        title_label = tk.Label(header_frame,
+                               text="Backup & Restore",
+                               font=FONTS['h1'],
+                               bg=self.colors['background'],
+                               fg=self.colors['text_primary'])
+        title_label.pack(side=tk.LEFT)
+
+        for text, command in (("Restore", self.restore_backup), ("Verify", self.verify_backup),
+                              ("Backup Now", self.create_backup)):
+            button = tk.Button(header_frame, text=text)
+            button.config(
+                font=FONTS['button'],
+                bg=self.colors['primary'],
+                fg='white',
+                activebackground=self.colors['primary_hover'],
+                activeforeground='white',
+                cursor='hand2',
+                relief=tk.FLAT,
+                padx=SPACING['lg'],
+                pady=SPACING['md'],
+                command=command
+            )
+            button.pack(side=tk.RIGHT, padx=(SPACING['md'], 0))
+            self.buttons.append(button)
+
+        # Backup options
+        options_frame = tk.Frame(self, bg=self.colors['background'])
+        options_frame.pack(fill=tk.X, padx=SPACING['xl'], pady=(0, SPACING['md']))
+
+        self.compact_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(options_frame, text="Compact (VACUUM INTO)", variable=self.compact_var,
+                       font=FONTS['body'], bg=self.colors['background'],
+                       fg=self.colors['text_secondary']).pack(side=tk.LEFT)
+
+        tk.Label(options_frame, text="Compression:", font=FONTS['body'],
+                 bg=self.colors['background'], fg=self.colors['text_secondary']).pack(side=tk.LEFT,
+                                                                                     padx=(SPACING['lg'], 0))
+        self.compression_var = tk.StringVar(value='gzip')
+        ttk.Combobox(options_frame,
+                     textvariable=self.compression_var,
+                     values=[name or 'none' for name in available_compressions()],
+                     state='readonly',
+                     font=FONTS['body'],
+                     width=8).pack(side=tk.LEFT, padx=SPACING['sm'])
+
+        tk.Label(options_frame, text="Keep last:", font=FONTS['body'],
+                 bg=self.colors['background'], fg=self.colors['text_secondary']).pack(side=tk.LEFT,
+                                                                                     padx=(SPACING['lg'], 0))
+        self.keep_var = tk.StringVar(value=str(DEFAULT_KEEP))
+        tk.Spinbox(options_frame, from_=1, to=365, textvariable=self.keep_var,
+                   font=FONTS['body'], width=5).pack(side=tk.LEFT, padx=SPACING['sm'])
+
+        # Backup list
+        table_frame = tk.Frame(self, bg=self.colors['border'], relief=tk.SOLID, bd=2)
+        table_frame.pack(fill=tk.BOTH, expand=True, padx=SPACING['xl'], pady=SPACING['md'])
+
+        columns = ('name', 'created', 'size', 'compression')
+        headings = ("Backup File", "Created", "Size (MB)", "Compression")
+        self.tree = ttk.Treeview(table_frame, columns=columns, show='headings', selectmode='browse')
+        for column, text in zip(columns, headings):
+            self.tree.heading(column, text=text)
+            self.tree.column(column, width=360 if column == 'name' else 140,
+                             anchor='e' if column == 'size' else 'w')
+
+        scrollbar = ttk.Scrollbar(table_frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        # Progress
+        progress_frame = tk.Frame(self, bg=self.colors['background'])
+        progress_frame.pack(fill=tk.X, padx=SPACING['xl'], pady=(0, SPACING['lg']))
+
+        self.progress = ttk.Progressbar(progress_frame, mode='determinate', maximum=100)
+        self.progress.pack(fill=tk.X)
+        self.status_label = tk.Label(progress_frame,
+                                     text=f"Backups are saved in {self.backup_handler.backup_dir}",
+                                     font=FONTS['body'],
+                                     bg=self.colors['background'],
+                                     fg=self.colors['text_tertiary'],
+                                     anchor='w')
+        self.status_label.pack(fill=tk.X, pady=(SPACING['sm'], 0))
+
+    def load_backups(self):
+        """Fill the backup list, newest first"""
+        self.tree.delete(*self.tree.get_children())
+        for backup in self.backup_handler.list_backups():
+            self.tree.insert('', tk.END, iid=backup['path'], values=(
+                backup['name'],
+                backup['created'].strftime('%d-%m-%Y %H:%M:%S'),
+                f"{backup['size'] / (1024 * 1024):,.1f}",
+                backup['compression'] or 'none'
+            ))
+
+    def selected_backup(self):
+        """Path of the selected backup, or None after telling the user"""
+        selection = self.tree.selection()
+        if not selection:
+            messagebox.showwarning("No Selection", "Please select a backup.")
+            return None
+        return selection[0]
+
+    # ========================================================================
+    # WORKER THREAD
+    # ========================================================================
+
+    def run_in_background(self, work, title):
+        """
+        Run work(progress) on a worker thread; work returns (success, message, ...)
+        """
+        if self.worker and self.worker.is_alive():
+            messagebox.showinfo(title, "A backup or restore is already running.")
+            return
+
+        def progress(phase, done, total):
+            self.events.put(('progress', phase, done, total))
+
+        def target():
+            try:
+                result = work(progress)
+            except Exception as e:
+                result = (False, f"{title} failed: {e}")
+            self.events.put(('done', title, result[0], result[1]))
+
+        for button in self.buttons:
+            button.config(state=tk.DISABLED)
+        self.progress['value'] = 0
+        self.worker = threading.Thread(target=target, daemon=True)
+        self.worker.start()
+        self.after(POLL_INTERVAL_MS, self.poll_worker)
+
+    def poll_worker(self):
+        """Apply the worker's progress to the widgets (Tk thread only)"""
+        try:
+            while True:
+                event = self.events.get_nowait()
+                if event[0] == 'progress':
+                    _, phase, done, total = event
+                    self.progress['value'] = 100 * done / total if total else 0
+                    self.status_label.config(text=f"{PHASE_LABELS.get(phase, phase)}...",
+                                             fg=self.colors['text_secondary'])
+                else:
+                    _, title, success, message = event
+                    self.finish(title, success, message)
+                    return
+        except queue.Empty:
+            pass
+        if self.winfo_exists():
+            self.after(POLL_INTERVAL_MS, self.poll_worker)
+
+    def finish(self, title, success, message):
+        for button in self.buttons:
+            button.config(state=tk.NORMAL)
+        self.progress['value'] = 100 if success else 0
+        self.status_label.config(text=message, fg=self.colors['success' if success else 'error'])
+        self.load_backups()
+        if success:
+            messagebox.showinfo(title, message)
+        else:
+            messagebox.showerror(title, message)
+
+    # ========================================================================
+    # ACTIONS
+    # ========================================================================
+
+    def create_backup(self):
+        """Take a backup with the chosen options"""
+        try:
+            keep = int(self.keep_var.get())
+        except ValueError:
+            messagebox.showerror("Error", "Enter how many backups to keep.")
+            return
+        compression = None if self.compression_var.get() == 'none' else self.compression_var.get()
+        compact = self.compact_var.get()
+        self.run_in_background(
+            lambda progress: self.backup_handler.create_backup(compact, compression, keep, progress),
+            "Backup")
+
+    def verify_backup(self):
+        """Check the selected backup against its checksum"""
+        backup_path = self.selected_backup()
+        if backup_path:
+            self.run_in_background(lambda progress: self.backup_handler.verify_backup(backup_path), "Verify")
+
+    def restore_backup(self):
+        """Replace the database with the selected backup"""
+        backup_path = self.selected_backup()
+        if not backup_path:
+            return
+        if not messagebox.askyesno(
+                "Confirm Restore",
+                "Replace all current data with this backup?\n\n"
+                "The current data is saved as a backup first."):
+            return
+        self.run_in_background(lambda progress: self.backup_handler.restore_backup(backup_path, progress),
+                               "Restore")
@@ -0,0 +1,46 @@
+"""
+Benchmark - Trading / P&L / Balance Sheet over a generated 1M-line voucher dataset
+
+Usage:
+    python -m benchmarks.bench_financial_statements [line_count]
+"""
+
+import contextlib
+import io
+import sys
+
+from benchmarks.timing import time_call
+from benchmarks.voucher_dataset import build_voucher_dataset
+from database.financial_statement_handler import FinancialStatementHandler
+
+
+def run(line_count=1000000):
+    db_path, fy_ids = build_voucher_dataset(line_count=line_count)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        handler = FinancialStatementHandler(db_path)
+        handler.connect()
+
+    print("\n" + "=" * 70)
+    print(f"FINANCIAL STATEMENTS BENCHMARK ({line_count:,} voucher lines)")
+    print("=" * 70)
+
+    single, statements = time_call(lambda: handler.get_statements(fy_ids[-1]))
+    print(f"One financial year:          {single * 1000:8.1f} ms")
+
+    compare, comparison = time_call(lambda: handler.get_statements(fy_ids))
+    print(f"{len(fy_ids)} years side by side:       {compare * 1000:8.1f} ms")
+
+    for summary in comparison['summary']:
+        print(f"  FY {summary['fy_id']}: gross profit {summary['gross_profit']:>16,.2f}  "
+              f"net profit {summary['net_profit']:>16,.2f}  difference {summary['difference']:,.2f}")
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        handler.disconnect()
+
+    return {'single_year_seconds': single, 'multi_year_seconds': compare,
+            'statements': statements}
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
@@ -0,0 +1,166 @@
+"""
+Benchmark - HSN summary and GSTR-1 export of one month with 500k invoice lines
+
+Builds a throw-away database with one company, registered and unregistered customers
+across states and a month of sales invoices priced by utils.pricing, bulk inserted,
+then times the HSN summary and the streamed GSTR-1 JSON export.
+
+Usage:
+    python -m benchmarks.bench_gstr1 [line_count]
+"""
+
+import contextlib
+import io
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+import database.company_handler as company_module
+import database.item_handler as item_module
+import database.state_handler as state_module
+from benchmarks.timing import time_call
+from benchmarks.voucher_dataset import create_schema
+from database.company_handler import CompanyHandler
+from database.gst_report_handler import GST_STATE_CODES, GstReportHandler
+from database.item_handler import ItemHandler
+from database.sales_invoice_handler import SalesInvoiceHandler
+from database.state_handler import StateHandler
+from utils.pricing import price_lines
+
+
+LINES_PER_INVOICE = 5
+GST_RATES = (0, 5, 12, 18, 28)
+
+
+def build_gst_dataset(line_count=500000, partner_count=3000, item_count=2000, seed=34):
+    """Database with line_count invoice lines in June 2024, returns its path"""
+    rng = random.Random(seed)
+    db_path = os.path.join(tempfile.mkdtemp(), "bench_gstr1.db")
+    for module in (company_module, item_module, state_module):
+        module.DB_PATH = db_path
+
+    create_schema(db_path)
+    with contextlib.redirect_stdout(io.StringIO()):
+        for handler in (CompanyHandler(), StateHandler(), ItemHandler(), SalesInvoiceHandler(db_path)):
+            handler.connect()
+            handler.disconnect()
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("INSERT INTO financial_years (fy_code, display_name, start_date, end_date) "
+                 "VALUES ('FY2425', 'FY 2024-25', '2024-04-01', '2025-03-31')")
+    conn.execute("INSERT INTO companies (company_code, company_name, bill_to_address, ship_to_address, "
+                 "state, city, gst_number, pan_number, logo_path) VALUES "
+                 "('C1', 'Bench Co', '-', '-', 'Maharashtra', 'Pune', '27AAACB1234C1Z5', 'AAACB1234C', '-')")
+    states = list(GST_STATE_CODES)
+    conn.executemany("INSERT INTO states (state_code, state_name) VALUES (?, ?)",
+                     [(code, name.title()) for name, code in GST_STATE_CODES.items()])
+    state_ids = {name: state_id for state_id, name in
+                 conn.execute("SELECT id, LOWER(state_name) FROM states")}
+
+    partners = []
+    for n in range(partner_count):
+        # Most customers are local, a fifth are registered
+        state = 'maharashtra' if rng.random() < 0.7 else rng.choice(states)
+        gst_number = f"{GST_STATE_CODES[state]}AAAPB{n:04d}C1Z{n % 10}" if rng.random() < 0.2 else ''
+        partners.append((f"BP{n:05d}", f"Customer {n}", state_ids[state], gst_number, state != 'maharashtra'))
+    conn.executemany("INSERT INTO business_partners (bp_code, bp_name, state_id, gst_number, account_group_id, "
+                     "book_code_id, account_type_id) VALUES (?, ?, ?, ?, 1, 1, 1)",
+                     [partner[:4] for partner in partners])
+    partner_ids = [row[0] for row in conn.execute("SELECT id FROM business_partners ORDER BY id")]
+
+    items = []
+    for n in range(item_count):
+        items.append((f"ITM{n:05d}", f"Item {n}", f"{8400 + n % 60:04d}{n % 7:02d}", rng.choice(GST_RATES),
+                      rng.choice(('NOS', 'KGS', 'BOX', 'MTR')), rng.randint(100, 500000)))
+    conn.executemany("INSERT INTO items (item_code, item_name, hsn_code, gst_percentage, uom_code, sale_rate_wh1) "
+                     "VALUES (?, ?, ?, ?, ?, ?)", items)
+    item_ids = [row[0] for row in conn.execute("SELECT id FROM items ORDER BY id")]
+
+    invoice_count = line_count // LINES_PER_INVOICE
+    invoice_partner = np.array([rng.randrange(partner_count) for _ in range(invoice_count)])
+    line_item = np.array([rng.randrange(item_count) for _ in range(line_count)])
+    line_invoice = np.arange(line_count) // LINES_PER_INVOICE
+    quantity = np.array([rng.randint(1, 50) for _ in range(line_count)], dtype=np.float64)
+    rate = np.array([items[i][5] for i in line_item], dtype=np.int64)
+    gst = np.array([items[i][3] for i in line_item], dtype=np.float64)
+    inter_state = np.array([partners[p][4] for p in invoice_partner])[line_invoice]
+    amounts = price_lines(quantity, rate, 0, gst, inter_state=inter_state, rate_in_paise=True)
+    tax = amounts['cgst'] + amounts['sgst'] + amounts['igst']
+
+    invoice_totals = {field: np.bincount(line_invoice, weights=amounts[field], minlength=invoice_count)
+                      for field in ('taxable', 'total')}
+    conn.executemany("""
+        INSERT INTO sales_invoices (invoice_no, series, serial_no, company_id, fy_id, invoice_date,
+                                    partner_id, inter_state, taxable_amount, tax_amount, total_amount)
+        VALUES (?, 'SI', ?, 1, 1, ?, ?, ?, ?, ?, ?)
+    """, ((f"SI/FY2425/{n + 1:06d}", n + 1, f"2024-06-{1 + n * 30 // invoice_count:02d}",
+           partner_ids[invoice_partner[n]], int(partners[invoice_partner[n]][4]),
+           int(invoice_totals['taxable'][n]), int(invoice_totals['total'][n] - invoice_totals['taxable'][n]),
+           int(invoice_totals['total'][n])) for n in range(invoice_count)))
+    first_invoice_id = conn.execute("SELECT MIN(id) FROM sales_invoices").fetchone()[0]
+
+    conn.executemany("""
+        INSERT INTO sales_invoice_lines (invoice_id, line_no, item_id, item_code, item_name, hsn_code,
+                                         quantity, rate, gst_percentage, taxable_amount, cgst_amount,
+                                         sgst_amount, igst_amount, tax_amount, line_total, sales_account_id)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 1)
+    """, ((first_invoice_id + int(line_invoice[n]), n % LINES_PER_INVOICE + 1, item_ids[line_item[n]],
+           items[line_item[n]][0], items[line_item[n]][1], items[line_item[n]][2], float(quantity[n]),
+           int(rate[n]), float(gst[n]), int(amounts['taxable'][n]), int(amounts['cgst'][n]),
+           int(amounts['sgst'][n]), int(amounts['igst'][n]), int(tax[n]), int(amounts['total'][n]))
+          for n in range(line_count)))
+    conn.commit()
+    conn.execute("ANALYZE")
+    conn.close()
+    return db_path
+
+
+def run(line_count=500000):
+    started = time.perf_counter()
+    db_path = build_gst_dataset(line_count)
+    build = time.perf_counter() - started
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        handler = GstReportHandler(db_path)
+        handler.connect()
+
+    print("\n" + "=" * 70)
+    print(f"GSTR-1 BENCHMARK ({line_count:,} invoice lines in one month)")
+    print("=" * 70)
+    print(f"Dataset built in:            {build:8.1f} s")
+
+    summary_time, summary = time_call(lambda: handler.get_hsn_summary(1, '2024-06-01', '2024-06-30'), repeat=3)
+    print(f"HSN summary:                 {summary_time:8.2f} s  ({len(summary['rows']):,} rows, "
+          f"taxable {summary['totals']['taxable_amount']:,.2f})")
+
+    export_path = db_path + ".json"
+    with contextlib.redirect_stdout(io.StringIO()):
+        export_time, (success, message, counts) = time_call(
+            lambda: handler.export_gstr1(export_path, 1, 2024, 6), repeat=3)
+        # Memory is measured on a separate run, tracing slows Python down
+        tracemalloc.start()
+        handler.export_gstr1(export_path, 1, 2024, 6)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    assert success, message
+    print(f"GSTR-1 export:               {export_time:8.2f} s  (peak Python memory {peak / 2 ** 20:.1f} MB, "
+          f"file {os.path.getsize(export_path) / 2 ** 20:.1f} MB)")
+    print(f"  {counts['b2b']:,} B2B and {counts['b2cl']:,} B2CL invoices, {counts['b2cs']} B2CS rows, "
+          f"{counts['hsn']} HSN rows")
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        handler.disconnect()
+    os.remove(export_path)
+    os.remove(db_path)
+
+    return {'hsn_seconds': summary_time, 'export_seconds': export_time, 'export_peak_bytes': peak}
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 500000)
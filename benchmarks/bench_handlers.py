@@ -0,0 +1,298 @@
+"""
+Benchmark - Handler operations and report queries on generated databases of several sizes
+
+For each size a database is generated with benchmarks/synthetic_data.py, then every
+master handler is timed through its public methods:
+
+    list       get_all_*() over the whole table
+    get        LOOKUPS get_*_by_id() calls on random ids
+    lookup     LOOKUPS get_*_by_code() calls on random codes (the code search of the forms)
+    code       the next-code generator used by the create forms
+    create     one create_*() call
+    bulk       BULK_CREATES create_*() calls in a row
+
+and the report queries (trial balance cold and cached, financial statements, ledger
+summary and first page of the busiest account). Each timing is the median of REPEAT runs.
+
+Results are written as JSON to benchmarks/results/ and compared with a baseline file;
+a timing is flagged when it is more than the threshold slower than the baseline and
+the difference is above MIN_DELTA_SECONDS (to ignore noise on sub-millisecond timings).
+
+Usage:
+    python -m benchmarks.bench_handlers [small,medium,...] [--baseline PATH] [--threshold 0.25]
+                                        [--save-baseline] [--seed N]
+Exit code 1 when a regression is flagged.
+"""
+
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import sqlite3
+import sys
+from datetime import datetime
+
+from benchmarks.synthetic_data import SIZES, generate_dataset
+from benchmarks.timing import time_call
+from database.account_group_handler import AccountGroupHandler
+from database.account_master_handler import AccountMasterHandler
+from database.business_partner_handler import BusinessPartnerHandler
+from database.city_handler import CityHandler
+from database.financial_statement_handler import FinancialStatementHandler
+from database.item_company_handler import ItemCompanyHandler
+from database.item_group_handler import ItemGroupHandler
+from database.item_handler import ItemHandler
+from database.item_type_handler import ItemTypeHandler
+from database.ledger_handler import LedgerHandler
+from database.state_handler import StateHandler
+from database.trial_balance_handler import TrialBalanceHandler
+from database.uom_handler import UoMHandler
+
+
+REPEAT = 5
+
+# Calls per get / lookup timing
+LOOKUPS = 100
+
+# Calls per bulk create timing
+BULK_CREATES = 200
+
+DEFAULT_THRESHOLD = 0.25
+
+MIN_DELTA_SECONDS = 0.002
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(BENCH_DIR, 'results')
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, 'baseline_handlers.json')
+
+# name -> (handler class, list method, get method, lookup method, table, code column)
+MASTERS = {
+    'account_groups': (AccountGroupHandler, 'get_all_account_groups', 'get_account_group_by_id',
+                       'get_account_group_by_code', 'account_groups', 'ag_code'),
+    'account_master': (AccountMasterHandler, 'get_all_accounts', 'get_account_by_id',
+                       'get_account_by_code', 'account_master', 'account_code'),
+    'business_partners': (BusinessPartnerHandler, 'get_all_business_partners', 'get_business_partner_by_id',
+                          'get_business_partner_by_code', 'business_partners', 'bp_code'),
+    'items': (ItemHandler, 'get_all_items', 'get_item_by_id', 'get_item_by_code', 'items', 'item_code'),
+    'cities': (CityHandler, 'get_all_cities', 'get_city_by_id', 'get_city_by_code', 'cities', 'city_code'),
+    'states': (StateHandler, 'get_all_states', 'get_state_by_id', 'get_state_by_code', 'states', 'state_code'),
+    'uom': (UoMHandler, 'get_all_uoms', 'get_uom_by_id', 'get_uom_by_code', 'uom', 'uom_code'),
+    'item_types': (ItemTypeHandler, 'get_all_item_types', 'get_item_type_by_id', 'get_item_type_by_code',
+                   'item_types', 'type_code'),
+    'item_groups': (ItemGroupHandler, 'get_all_item_groups', 'get_item_group_by_id',
+                    'get_item_group_by_code', 'item_groups', 'item_group_code'),
+    'item_companies': (ItemCompanyHandler, 'get_all_item_companies', 'get_item_company_by_id',
+                       'get_item_company_by_code', 'item_companies', 'company_code'),
+}
+
+
+def _sample(conn, table, column, count, rng):
+    values = [row[0] for row in conn.execute(f"SELECT {column} FROM {table}")]
+    return [rng.choice(values) for _ in range(count)] if values else []
+
+
+def _time(results, name, func, repeat=REPEAT):
+    with contextlib.redirect_stdout(io.StringIO()):
+        seconds, _ = time_call(func, repeat)
+    results[name] = seconds
+    print(f"  {name:<40} {seconds * 1000:10.2f} ms")
+
+
+def bench_masters(conn, results, rng):
+    """list / get / lookup of every master handler"""
+    for name, (handler_class, list_method, get_method, lookup_method, table, code_column) in MASTERS.items():
+        with contextlib.redirect_stdout(io.StringIO()):
+            handler = handler_class()
+            handler.connect()
+        ids = _sample(conn, table, 'id', LOOKUPS, rng)
+        codes = _sample(conn, table, code_column, LOOKUPS, rng)
+        _time(results, f"{name}.list", getattr(handler, list_method))
+        _time(results, f"{name}.get", lambda: [getattr(handler, get_method)(i) for i in ids])
+        _time(results, f"{name}.lookup", lambda: [getattr(handler, lookup_method)(c) for c in codes])
+        with contextlib.redirect_stdout(io.StringIO()):
+            handler.disconnect()
+
+
+def bench_creates(conn, results, rng):
+    """Code generation, create and bulk create of the masters the users add most"""
+    group = conn.execute("""
+        SELECT g.id, t.id FROM account_groups g
+        JOIN account_types t ON t.code = 'D' WHERE g.account_group_type = 'Balance Sheet'
+        ORDER BY g.id LIMIT 1
+    """).fetchone()
+    counter = iter(range(1, 10 ** 6))
+
+    def account():
+        return {'account_name': f"Bench Account {next(counter)}", 'account_group_id': group[0],
+                'book_code_id': 3, 'account_type_id': group[1], 'opening_balance': 100,
+                'balance_type': 'Debit'}
+
+    def partner():
+        return {'bp_name': f"Bench Partner {next(counter)}", 'account_group_id': group[0],
+                'book_code_id': 3, 'account_type_id': group[1], 'opening_balance': 100,
+                'balance_type': 'Debit', 'state_id': 1, 'city_id': 1}
+
+    def item():
+        return {'item_code': f"BENCH{next(counter):07d}", 'item_name': "Bench Item", 'uom_code': 'NOS',
+                'purchase_rate': 10, 'mrp': 15, 'gst_percentage': 18}
+
+    def created(result):
+        if not result[0]:
+            raise RuntimeError(f"Create failed: {result[1]}")
+        return result
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        accounts, partners, items, groups = (AccountMasterHandler(), BusinessPartnerHandler(),
+                                             ItemHandler(), AccountGroupHandler())
+        for handler in (accounts, partners, items, groups):
+            handler.connect()
+
+    _time(results, "account_groups.code", lambda: groups.generate_ag_code("Sundry Debtors", 'Balance Sheet'))
+    _time(results, "account_master.code", lambda: accounts.generate_account_code("Bench", group[0]))
+    _time(results, "business_partners.code", lambda: partners.generate_bp_code("Bench", group[0]))
+    _time(results, "items.code", items.get_next_item_code)
+
+    _time(results, "account_master.create", lambda: created(accounts.create_account(account())))
+    _time(results, "business_partners.create", lambda: created(partners.create_business_partner(partner())))
+    _time(results, "items.create", lambda: created(items.create_item(item())))
+
+    _time(results, "account_master.bulk", lambda: [created(accounts.create_account(account()))
+                                                   for _ in range(BULK_CREATES)], repeat=1)
+    _time(results, "business_partners.bulk", lambda: [created(partners.create_business_partner(partner()))
+                                                      for _ in range(BULK_CREATES)], repeat=1)
+    _time(results, "items.bulk", lambda: [created(items.create_item(item()))
+                                          for _ in range(BULK_CREATES)], repeat=1)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        for handler in (accounts, partners, items, groups):
+            handler.disconnect()
+
+
+def bench_reports(db_path, fy_ids, results):
+    """Trial balance, financial statements and the ledger of the busiest account"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        trial_balance = TrialBalanceHandler(db_path)
+        statements = FinancialStatementHandler(db_path)
+        ledger = LedgerHandler(db_path)
+        for handler in (trial_balance, statements, ledger):
+            handler.connect()
+
+    def cold_trial_balance():
+        TrialBalanceHandler.clear_cache()
+        return trial_balance.get_trial_balance(fy_ids[-1])
+
+    _time(results, "reports.trial_balance", cold_trial_balance)
+    _time(results, "reports.trial_balance_cached", lambda: trial_balance.get_trial_balance(fy_ids[-1]))
+    _time(results, "reports.statements", lambda: statements.get_statements(fy_ids[-1]))
+    _time(results, "reports.statements_all_years", lambda: statements.get_statements(fy_ids))
+
+    conn = sqlite3.connect(db_path)
+    busiest = conn.execute("""
+        SELECT account_kind, account_id, MIN(voucher_date) FROM voucher_lines
+        WHERE fy_id = ? GROUP BY account_kind, account_id ORDER BY COUNT(*) DESC LIMIT 1
+    """, (fy_ids[-1],)).fetchone()
+    conn.close()
+    if busiest:
+        kind, account_id, first_date = busiest
+        _time(results, "reports.ledger_summary", lambda: ledger.get_ledger_summary(kind, account_id, first_date))
+        _time(results, "reports.ledger_page", lambda: ledger.get_ledger_page(kind, account_id, first_date))
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        for handler in (trial_balance, statements, ledger):
+            handler.disconnect()
+
+
+def run_size(size, seed=42, counts=None):
+    """Generate a database of one size and time everything on it, returns {name: seconds}"""
+    dataset = generate_dataset(size if size in SIZES else 'small', seed, **(counts or {}))
+    rng = random.Random(seed)
+    results = {}
+    print(f"\n{size} ({sum(dataset['counts'].values()):,} rows)")
+    conn = sqlite3.connect(dataset['db_path'])
+    try:
+        bench_masters(conn, results, rng)
+    finally:
+        conn.close()
+    bench_reports(dataset['db_path'], dataset['fy_ids'], results)
+    conn = sqlite3.connect(dataset['db_path'])
+    try:
+        bench_creates(conn, results, rng)
+    finally:
+        conn.close()
+    os.remove(dataset['db_path'])
+    return results
+
+
+def compare_results(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Compare {size: {name: seconds}} with a baseline of the same shape
+    Returns list of dicts (size, name, baseline, current, ratio) slower than the threshold
+    """
+    regressions = []
+    for size, timings in results.items():
+        for name, current in timings.items():
+            previous = baseline.get(size, {}).get(name)
+            if previous is None:
+                continue
+            if current > previous * (1 + threshold) and current - previous > MIN_DELTA_SECONDS:
+                regressions.append({'size': size, 'name': name, 'baseline': previous, 'current': current,
+                                    'ratio': current / previous if previous else float('inf')})
+    return regressions
+
+
+def run(sizes=('small',), seed=42, baseline_path=DEFAULT_BASELINE, threshold=DEFAULT_THRESHOLD,
+        save_baseline=False, size_counts=None, results_dir=RESULTS_DIR):
+    """
+    Run the suite, save the results and compare them with the baseline
+    size_counts: {size name: counts} for sizes not in SIZES (or to override their counts)
+    Returns (results document, regressions)
+    """
+    print("\n" + "=" * 70)
+    print(f"HANDLER BENCHMARKS ({', '.join(sizes)})")
+    print("=" * 70)
+
+    document = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'seed': seed,
+        'results': {size: run_size(size, seed, (size_counts or {}).get(size)) for size in sizes}
+    }
+
+    os.makedirs(results_dir, exist_ok=True)
+    result_path = os.path.join(results_dir, f"bench_handlers_{datetime.now():%Y%m%d_%H%M%S}.json")
+    with open(result_path, 'w') as f:
+        json.dump(document, f, indent=2)
+    print(f"\nResults saved to {result_path}")
+
+    regressions = []
+    if save_baseline:
+        with open(baseline_path, 'w') as f:
+            json.dump(document, f, indent=2)
+        print(f"Baseline saved to {baseline_path}")
+    elif os.path.exists(baseline_path):
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+        regressions = compare_results(document['results'], baseline['results'], threshold)
+        print(f"Compared with the baseline of {baseline['created_at']} "
+              f"(threshold {threshold:.0%}): {len(regressions)} regression(s)")
+        for regression in regressions:
+            print(f"  [REGRESSION] {regression['size']} {regression['name']}: "
+                  f"{regression['baseline'] * 1000:.2f} -> {regression['current'] * 1000:.2f} ms "
+                  f"({regression['ratio']:.2f}x)")
+    else:
+        print(f"No baseline at {baseline_path}, run with --save-baseline to store one")
+
+    return document, regressions
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    selected = args.pop(0).split(',') if args and not args[0].startswith('--') else ['small']
+    baseline_file = args[args.index('--baseline') + 1] if '--baseline' in args[:-1] else DEFAULT_BASELINE
+    limit = float(args[args.index('--threshold') + 1]) if '--threshold' in args[:-1] else DEFAULT_THRESHOLD
+    seed_value = int(args[args.index('--seed') + 1]) if '--seed' in args[:-1] else 42
+    _, found = run(selected, seed_value, baseline_file, limit, save_baseline='--save-baseline' in args)
+    sys.exit(1 if found else 0)
@@ -0,0 +1,37 @@
+"""
+Benchmark - Vectorized pricing / GST engine against the pure-Python Decimal reference
+
+Usage:
+    python -m benchmarks.bench_pricing [line_count]
+"""
+
+import sys
+
+from benchmarks.pricing_dataset import random_lines
+from benchmarks.timing import time_call
+from utils.pricing import AMOUNT_FIELDS, price_lines, price_lines_reference
+
+
+def run(line_count=200000):
+    lines = random_lines(line_count)
+
+    print("\n" + "=" * 70)
+    print(f"PRICING ENGINE BENCHMARK ({line_count:,} lines)")
+    print("=" * 70)
+
+    vectorized, amounts = time_call(lambda: price_lines(*lines))
+    print(f"NumPy engine:                {vectorized * 1000:8.1f} ms")
+
+    reference, expected = time_call(lambda: price_lines_reference(*lines), repeat=1)
+    print(f"Python reference:            {reference * 1000:8.1f} ms")
+    print(f"Speed-up:                    {reference / vectorized:8.1f}x")
+
+    mismatches = sum(amounts[field].tolist() != expected[field] for field in AMOUNT_FIELDS)
+    print(f"Fields differing:            {mismatches:8d}")
+
+    return {'vectorized_seconds': vectorized, 'reference_seconds': reference,
+            'mismatched_fields': mismatches}
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
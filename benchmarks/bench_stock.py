@@ -0,0 +1,115 @@
+"""
+Benchmark - Stock posting, stock on hand and the yearly revaluation pass
+
+Builds a throw-away database with item_count items and a year of movements per item
+(an opening receipt, then purchases and sales), posts them through the stock engine,
+reads stock on hand for all items and revalues the whole year.
+
+Usage:
+    python -m benchmarks.bench_stock [item_count] [movements_per_item]
+"""
+
+import contextlib
+import io
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+import database.item_handler as item_module
+from benchmarks.timing import time_call
+from database.item_handler import ItemHandler
+from database.stock_handler import StockHandler
+
+
+POSTING_CHUNK = 20000
+
+
+def build_movements(item_ids, movements_per_item, seed=42):
+    """A year of never-short movements per item, in date order"""
+    rng = random.Random(seed)
+    start = date(2024, 4, 1)
+    movements = []
+    for item_id in item_ids:
+        on_hand = rng.randint(50, 500)
+        movements.append({'item_id': item_id, 'movement_type': 'Opening', 'movement_date': start.isoformat(),
+                          'quantity': on_hand, 'rate': round(rng.uniform(1, 500), 2)})
+        days = sorted(rng.randint(1, 364) for _ in range(movements_per_item - 1))
+        for day in days:
+            movement_date = (start + timedelta(days=day)).isoformat()
+            if on_hand > 10 and rng.random() < 0.6:
+                quantity = rng.randint(1, on_hand // 2)
+                movements.append({'item_id': item_id, 'movement_type': 'Sale',
+                                  'movement_date': movement_date, 'quantity': quantity})
+                on_hand -= quantity
+            else:
+                quantity = rng.randint(10, 200)
+                movements.append({'item_id': item_id, 'movement_type': 'Purchase',
+                                  'movement_date': movement_date, 'quantity': quantity,
+                                  'rate': round(rng.uniform(1, 500), 2)})
+                on_hand += quantity
+    movements.sort(key=lambda movement: movement['movement_date'])
+    return movements
+
+
+def run(item_count=50000, movements_per_item=8):
+    fd, db_path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    item_module.DB_PATH = db_path
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        item_handler = ItemHandler()
+        item_handler.connect()
+        item_handler.disconnect()
+        conn = sqlite3.connect(db_path)
+        conn.executemany("INSERT INTO items (item_code, item_name) VALUES (?, ?)",
+                         [(f"ITM{n:06d}", f"Item {n}") for n in range(item_count)])
+        conn.commit()
+        item_ids = [row[0] for row in conn.execute("SELECT id FROM items")]
+        conn.close()
+
+        handler = StockHandler(db_path)
+        handler.connect()
+
+    movements = build_movements(item_ids, movements_per_item)
+
+    print("\n" + "=" * 70)
+    print(f"STOCK BENCHMARK ({item_count:,} items, {len(movements):,} movements)")
+    print("=" * 70)
+
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for offset in range(0, len(movements), POSTING_CHUNK):
+            success, message, _ = handler.post_movements(movements[offset:offset + POSTING_CHUNK])
+            assert success, message
+    posting = time.perf_counter() - started
+    print(f"Posting:                     {posting:8.2f} s  ({len(movements) / posting:,.0f} movements/s)")
+
+    current, report = time_call(lambda: handler.get_stock_on_hand())
+    print(f"Stock on hand (running):     {current * 1000:8.1f} ms  ({len(report['items']):,} items)")
+
+    past, _ = time_call(lambda: handler.get_stock_on_hand(as_of='2024-09-30'))
+    print(f"Stock on hand (as on date):  {past * 1000:8.1f} ms")
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        revalue, (success, message, stats) = time_call(lambda: handler.revalue('2024-04-01', '2025-03-31'),
+                                                       repeat=1)
+    assert success, message
+    print(f"Revaluing the year:          {revalue:8.2f} s  ({stats['movements'] / revalue:,.0f} movements/s, "
+          f"{stats['changed']} re-costed)")
+    print(f"Stock value: {report['totals']['average_value']:,.2f} weighted average, "
+          f"{report['totals']['fifo_value']:,.2f} FIFO")
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        handler.disconnect()
+    os.remove(db_path)
+
+    return {'posting_seconds': posting, 'on_hand_seconds': current,
+            'as_of_seconds': past, 'revalue_seconds': revalue}
+
+
+if __name__ == "__main__":
+    run(*(int(arg) for arg in sys.argv[1:3]))
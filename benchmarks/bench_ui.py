@@ -0,0 +1,288 @@
+"""
+Benchmark - Rendering of the management screens on generated databases
+
+Each list screen is built on a virtual display (Xvfb) against a database generated with
+benchmarks/synthetic_data.py, exactly as the dashboard builds it, and measured:
+
+    first_row   construction until the first table row widget is created
+    render      construction until every row is created and drawn (update())
+    scroll      median time of one scroll step + redraw, over SCROLL_STEPS positions
+    scroll_max  slowest scroll step
+    peak_mb     peak Python memory allocated while building the screen (tracemalloc, on
+                a separate build so the timings are taken without tracing)
+    rss_mb      growth of the process resident set size while building the screen
+    widgets     number of Tk widgets the screen created
+
+Timings are the median of REPEAT builds; each build is destroyed before the next one.
+Results are written as JSON to benchmarks/results/ and the timings are compared with a
+baseline file the same way as benchmarks/bench_handlers.py.
+
+When DISPLAY is not set, Xvfb is started on XVFB_DISPLAY for the duration of the run.
+
+Usage:
+    python -m benchmarks.bench_ui [small,medium,...] [--screens items,business_partners]
+                                  [--baseline PATH] [--threshold 0.25] [--save-baseline] [--seed N]
+Exit code 1 when a regression is flagged.
+"""
+
+import contextlib
+import importlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+from benchmarks.bench_handlers import BENCH_DIR, DEFAULT_THRESHOLD, RESULTS_DIR, compare_results
+from benchmarks.synthetic_data import SIZES, generate_dataset
+
+
+REPEAT = 3
+
+# Scroll positions visited per build
+SCROLL_STEPS = 20
+
+XVFB_DISPLAY = ':99'
+
+# Seconds to wait for Xvfb to accept connections
+XVFB_TIMEOUT = 10
+
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, 'baseline_ui.json')
+
+# Metrics that are not timings, left out of the baseline comparison
+SIZE_METRICS = ('peak_mb', 'rss_mb', 'widgets')
+
+# name -> (module, screen class)
+SCREENS = {
+    'account_groups': ('account_group_management', 'AccountGroupManagement'),
+    'account_master': ('account_master_management', 'AccountMasterManagement'),
+    'business_partners': ('business_partner_management', 'BusinessPartnerManagement'),
+    'items': ('item_management', 'ItemManagement'),
+    'cities': ('city_management', 'CityManagement'),
+    'states': ('state_management', 'StateManagement'),
+    'uom': ('uom_management', 'UoMManagement'),
+    'item_types': ('item_type_management', 'ItemTypeManagement'),
+    'item_groups': ('item_group_management', 'ItemGroupManagement'),
+    'item_companies': ('item_company_management', 'ItemCompanyManagement'),
+    'financial_years': ('financial_year_management', 'FinancialYearManagement'),
+}
+
+
+def start_display():
+    """
+    Make sure Tk has a display, starting Xvfb when DISPLAY is not set
+    Returns the Xvfb process to stop afterwards (None when a display was already there)
+    """
+    if os.environ.get('DISPLAY'):
+        return None
+    if not shutil.which('Xvfb'):
+        raise RuntimeError("DISPLAY is not set and Xvfb is not installed")
+
+    process = subprocess.Popen(['Xvfb', XVFB_DISPLAY, '-screen', '0', '1600x1000x24', '-nolisten', 'tcp'],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    socket_path = f"/tmp/.X11-unix/X{XVFB_DISPLAY.lstrip(':')}"
+    deadline = time.monotonic() + XVFB_TIMEOUT
+    while not os.path.exists(socket_path):
+        if process.poll() is not None or time.monotonic() > deadline:
+            process.kill()
+            raise RuntimeError(f"Xvfb did not start on {XVFB_DISPLAY}")
+        time.sleep(0.05)
+    os.environ['DISPLAY'] = XVFB_DISPLAY
+    return process
+
+
+def stop_display(process):
+    if process is not None:
+        process.terminate()
+        process.wait(timeout=XVFB_TIMEOUT)
+        os.environ.pop('DISPLAY', None)
+
+
+def _rss_mb():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 / 1024
+
+
+def _descendants(widget):
+    for child in widget.winfo_children():
+        yield child
+        yield from _descendants(child)
+
+
+def _find_canvas(screen):
+    import tkinter as tk
+    return next((w for w in _descendants(screen) if isinstance(w, tk.Canvas)), None)
+
+
+def _build_screen(root, screen_class, colors):
+    """Build and draw one screen the way the dashboard does"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        screen = screen_class(root, colors)
+    screen.pack(fill='both', expand=True)
+    root.update()
+    return screen
+
+
+def _destroy_screen(root, screen):
+    with contextlib.redirect_stdout(io.StringIO()):
+        for handler in (value for value in vars(screen).values() if hasattr(value, 'disconnect')):
+            handler.disconnect()
+    screen.destroy()
+    root.update()
+
+
+def measure_screen(root, screen_class, colors):
+    """
+    Build one screen in root, returns {metric: value} for that build. The timed build
+    runs without tracemalloc; peak_mb comes from a second, traced build.
+    """
+    first_row = []
+    original_create_row = screen_class.create_table_row
+
+    def create_table_row(self, *args, **kwargs):
+        if not first_row:
+            first_row.append(time.perf_counter())
+        return original_create_row(self, *args, **kwargs)
+
+    screen_class.create_table_row = create_table_row
+    rss_before = _rss_mb()
+    try:
+        started = time.perf_counter()
+        screen = _build_screen(root, screen_class, colors)
+        rendered = time.perf_counter()
+    finally:
+        screen_class.create_table_row = original_create_row
+
+    metrics = {
+        'first_row': (first_row[0] if first_row else rendered) - started,
+        'render': rendered - started,
+        'rss_mb': max(_rss_mb() - rss_before, 0.0),
+        'widgets': sum(1 for _ in _descendants(screen)),
+    }
+
+    canvas = _find_canvas(screen)
+    if canvas is not None:
+        steps = []
+        for step in range(1, SCROLL_STEPS + 1):
+            started = time.perf_counter()
+            canvas.yview_moveto(step / SCROLL_STEPS)
+            root.update()
+            steps.append(time.perf_counter() - started)
+        metrics['scroll'] = statistics.median(steps)
+        metrics['scroll_max'] = max(steps)
+    _destroy_screen(root, screen)
+
+    tracemalloc.start()
+    try:
+        screen = _build_screen(root, screen_class, colors)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    metrics['peak_mb'] = peak / 1024 / 1024
+    _destroy_screen(root, screen)
+    return metrics
+
+
+def run_size(size, seed=42, counts=None, screens=None):
+    """Generate a database of one size and build every screen on it, returns {screen.metric: value}"""
+    import tkinter as tk
+    from ui_config import COLORS
+
+    dataset = generate_dataset(size if size in SIZES else 'small', seed, **(counts or {}))
+    print(f"\n{size} ({sum(dataset['counts'].values()):,} rows)")
+
+    root = tk.Tk()
+    root.geometry('1400x900')
+    results = {}
+    try:
+        for name in screens or SCREENS:
+            module_name, class_name = SCREENS[name]
+            screen_class = getattr(importlib.import_module(module_name), class_name)
+            builds = [measure_screen(root, screen_class, COLORS) for _ in range(REPEAT)]
+            for metric in builds[0]:
+                value = statistics.median(build[metric] for build in builds)
+                results[f"{name}.{metric}"] = value
+                if metric in SIZE_METRICS:
+                    print(f"  {name + '.' + metric:<40} {value:10.1f}")
+                else:
+                    print(f"  {name + '.' + metric:<40} {value * 1000:10.2f} ms")
+    finally:
+        root.destroy()
+        os.remove(dataset['db_path'])
+    return results
+
+
+def _timings(results):
+    return {size: {name: value for name, value in metrics.items() if name.rsplit('.', 1)[-1] not in SIZE_METRICS}
+            for size, metrics in results.items()}
+
+
+def run(sizes=('small',), seed=42, baseline_path=DEFAULT_BASELINE, threshold=DEFAULT_THRESHOLD,
+        save_baseline=False, size_counts=None, results_dir=RESULTS_DIR, screens=None):
+    """
+    Run the suite, save the results and compare the timings with the baseline
+    Returns (results document, regressions)
+    """
+    print("\n" + "=" * 70)
+    print(f"UI RENDER BENCHMARKS ({', '.join(sizes)})")
+    print("=" * 70)
+
+    display = start_display()
+    try:
+        document = {
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'display': os.environ.get('DISPLAY'),
+            'seed': seed,
+            'results': {size: run_size(size, seed, (size_counts or {}).get(size), screens) for size in sizes}
+        }
+    finally:
+        stop_display(display)
+
+    os.makedirs(results_dir, exist_ok=True)
+    result_path = os.path.join(results_dir, f"bench_ui_{datetime.now():%Y%m%d_%H%M%S}.json")
+    with open(result_path, 'w') as f:
+        json.dump(document, f, indent=2)
+    print(f"\nResults saved to {result_path}")
+
+    regressions = []
+    if save_baseline:
+        with open(baseline_path, 'w') as f:
+            json.dump(document, f, indent=2)
+        print(f"Baseline saved to {baseline_path}")
+    elif os.path.exists(baseline_path):
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+        regressions = compare_results(_timings(document['results']), _timings(baseline['results']), threshold)
+        print(f"Compared with the baseline of {baseline['created_at']} "
+              f"(threshold {threshold:.0%}): {len(regressions)} regression(s)")
+        for regression in regressions:
+            print(f"  [REGRESSION] {regression['size']} {regression['name']}: "
+                  f"{regression['baseline'] * 1000:.2f} -> {regression['current'] * 1000:.2f} ms "
+                  f"({regression['ratio']:.2f}x)")
+    else:
+        print(f"No baseline at {baseline_path}, run with --save-baseline to store one")
+
+    return document, regressions
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    selected = args.pop(0).split(',') if args and not args[0].startswith('--') else ['small']
+    baseline_file = args[args.index('--baseline') + 1] if '--baseline' in args[:-1] else DEFAULT_BASELINE
+    limit = float(args[args.index('--threshold') + 1]) if '--threshold' in args[:-1] else DEFAULT_THRESHOLD
+    seed_value = int(args[args.index('--seed') + 1]) if '--seed' in args[:-1] else 42
+    only = args[args.index('--screens') + 1].split(',') if '--screens' in args[:-1] else None
+    try:
+        _, found = run(selected, seed_value, baseline_file, limit, save_baseline='--save-baseline' in args,
+                       screens=only)
+    except RuntimeError as e:
+        print(f"\n[ERROR] {e}")
+        sys.exit(1)
+    sys.exit(1 if found else 0)
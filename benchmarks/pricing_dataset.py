@@ -0,0 +1,20 @@
+"""
+Pricing Dataset - Generated invoice line values for the pricing engine benchmark and tests
+
+Generation is deterministic for a given seed.
+"""
+
+import random
+
+
+def random_lines(count, seed=7):
+    """Random line values: quantity, rate, discount%, GST%, inter_state, tax_inclusive"""
+    rng = random.Random(seed)
+    return (
+        [round(rng.uniform(0.001, 500), rng.choice([0, 1, 3])) for _ in range(count)],
+        [round(rng.uniform(0.01, 20000), rng.choice([2, 3])) for _ in range(count)],
+        [rng.choice([0, 2.5, 5, 7.5, 10, 12.75, 33.33]) for _ in range(count)],
+        [rng.choice([0, 0.25, 3, 5, 12, 18, 28]) for _ in range(count)],
+        [rng.random() < 0.3 for _ in range(count)],
+        [rng.random() < 0.3 for _ in range(count)],
+    )
@@ -0,0 +1,395 @@
+"""
+Synthetic Data - Deterministic generator of realistic datasets of any size
+
+Builds a throw-away SQLite database with the application's schema (created by the
+handlers themselves) and fills it with generated masters and vouchers:
+
+    states, cities, account groups, accounts, business partners (with valid GSTINs
+    and opening balances), UoMs, item types, item groups, item companies, items
+    (with rates and GST slabs), financial years, vouchers and voucher lines
+
+The same seed and counts always produce the same rows. Loading is tuned for speed:
+journal and fsync off, exclusive locking, a large page cache, secondary indexes
+dropped during the load and rebuilt afterwards, rows inserted in key order with
+executemany() in chunks of CHUNK_SIZE. The account_balances aggregate is rebuilt
+once at the end.
+
+Usage:
+    python -m benchmarks.synthetic_data [small|medium|large|production] [--out PATH] [--seed N]
+                                        [--partners N] [--items N] [--account-groups N] ...
+"""
+
+import contextlib
+import io
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+import database.account_group_handler as account_group_module
+import database.account_master_handler as account_master_module
+import database.business_partner_handler as business_partner_module
+import database.city_handler as city_module
+import database.financial_year_handler as financial_year_module
+import database.item_company_handler as item_company_module
+import database.item_group_handler as item_group_module
+import database.item_handler as item_module
+import database.item_type_handler as item_type_module
+import database.state_handler as state_module
+import database.static_data_handler as static_data_module
+import database.uom_handler as uom_module
+from benchmarks.voucher_dataset import ACCOUNT_GROUPS
+from database.account_group_handler import AccountGroupHandler
+from database.account_master_handler import AccountMasterHandler
+from database.business_partner_handler import BusinessPartnerHandler
+from database.city_handler import CityHandler
+from database.financial_year_handler import FinancialYearHandler
+from database.item_company_handler import ItemCompanyHandler
+from database.item_group_handler import ItemGroupHandler
+from database.item_handler import ItemHandler
+from database.item_type_handler import ItemTypeHandler
+from database.state_handler import StateHandler
+from database.static_data_handler import StaticDataHandler
+from database.uom_handler import UoMHandler
+from database.voucher_handler import VOUCHER_TYPE_PREFIXES, VoucherHandler, fiscal_period
+
+
+# Row counts per preset size
+SIZES = {
+    'small': {'account_groups': 50, 'accounts': 500, 'partners': 1000, 'items': 2000, 'cities': 100,
+              'item_groups': 50, 'item_companies': 100, 'voucher_lines': 20000, 'years': 2},
+    'medium': {'account_groups': 500, 'accounts': 5000, 'partners': 20000, 'items': 50000, 'cities': 1000,
+               'item_groups': 500, 'item_companies': 1000, 'voucher_lines': 1000000, 'years': 3},
+    'large': {'account_groups': 5000, 'accounts': 20000, 'partners': 100000, 'items': 200000,
+              'cities': 5000, 'item_groups': 2000, 'item_companies': 5000, 'voucher_lines': 10000000,
+              'years': 5},
+    # Masters of 'large' scaled up to one million rows, without vouchers
+    'production': {'account_groups': 5000, 'accounts': 95000, 'partners': 300000, 'items': 580000,
+                   'cities': 10000, 'item_groups': 5000, 'item_companies': 5000, 'voucher_lines': 0,
+                   'years': 5},
+}
+
+CHUNK_SIZE = 50000
+
+FIRST_YEAR = 2022
+
+# created_at / updated_at of every generated row, so the same seed gives the same rows
+CREATED_AT = f"{FIRST_YEAR}-04-01 00:00:00"
+
+# (state code, state name, GST state code)
+STATES = [
+    ('MH', 'Maharashtra', '27'), ('KA', 'Karnataka', '29'), ('DL', 'Delhi', '07'),
+    ('GJ', 'Gujarat', '24'), ('TN', 'Tamil Nadu', '33'), ('UP', 'Uttar Pradesh', '09'),
+    ('WB', 'West Bengal', '19'), ('RJ', 'Rajasthan', '08'), ('TG', 'Telangana', '36'),
+    ('KL', 'Kerala', '32'), ('PB', 'Punjab', '03'), ('HR', 'Haryana', '06'),
+    ('MP', 'Madhya Pradesh', '23'), ('AP', 'Andhra Pradesh', '37'), ('OR', 'Odisha', '21'),
+]
+
+CITY_NAMES = ['Mumbai', 'Pune', 'Nagpur', 'Bengaluru', 'Mysuru', 'New Delhi', 'Ahmedabad', 'Surat',
+              'Chennai', 'Coimbatore', 'Lucknow', 'Kanpur', 'Kolkata', 'Jaipur', 'Hyderabad',
+              'Kochi', 'Ludhiana', 'Gurugram', 'Indore', 'Vijayawada', 'Bhubaneswar', 'Nashik']
+
+PARTNER_PREFIXES = ['Shree', 'Sai', 'New', 'Royal', 'National', 'Modern', 'Bharat', 'Jai', 'Om',
+                    'Sunrise', 'Global', 'Apex', 'Star', 'Laxmi', 'Ganesh', 'Krishna']
+PARTNER_NAMES = ['Patel', 'Shah', 'Mehta', 'Agarwal', 'Gupta', 'Sharma', 'Reddy', 'Iyer', 'Nair',
+                 'Singh', 'Jain', 'Desai', 'Kulkarni', 'Rao', 'Bansal', 'Chopra', 'Kapoor', 'Joshi']
+PARTNER_SUFFIXES = ['Traders', 'Enterprises', 'Agencies', 'Distributors', 'Stores', 'Industries',
+                    'Pharma', 'Marketing', 'Wholesale', 'Sales Corporation', '& Sons', 'Brothers']
+
+ITEM_ADJECTIVES = ['Premium', 'Classic', 'Fresh', 'Organic', 'Super', 'Deluxe', 'Regular', 'Herbal',
+                   'Instant', 'Extra', 'Gold', 'Lite']
+ITEM_NOUNS = ['Basmati Rice', 'Toor Dal', 'Sunflower Oil', 'Tea', 'Coffee', 'Biscuits', 'Soap',
+              'Shampoo', 'Toothpaste', 'Detergent', 'Atta', 'Sugar', 'Salt', 'Ghee', 'Masala',
+              'Noodles', 'Juice', 'Paracetamol Tablets', 'Cough Syrup', 'Notebook', 'Ball Pen']
+PACK_SIZES = ['100 g', '200 g', '500 g', '1 kg', '5 kg', '250 ml', '500 ml', '1 L', '10 Nos', '1 Box']
+
+# (code, name)
+UOMS = [('NOS', 'Numbers'), ('KGS', 'Kilograms'), ('GMS', 'Grams'), ('LTR', 'Litres'),
+        ('MLT', 'Millilitres'), ('BOX', 'Box'), ('PCS', 'Pieces'), ('PAC', 'Packs'), ('DOZ', 'Dozens'),
+        ('MTR', 'Metres'), ('BTL', 'Bottles'), ('STR', 'Strips')]
+ITEM_TYPES = [('FG', 'Finished Goods'), ('RM', 'Raw Material'), ('TR', 'Trading Goods'),
+              ('CN', 'Consumables'), ('SV', 'Services'), ('PK', 'Packing Material')]
+GST_SLABS = [0, 5, 5, 12, 12, 18, 18, 18, 28]
+
+GSTIN_CHARS = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+LETTERS = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+HANDLER_MODULES = (account_group_module, account_master_module, business_partner_module, city_module,
+                   financial_year_module, item_company_module, item_group_module, item_module,
+                   item_type_module, state_module, static_data_module, uom_module)
+
+LOADED_TABLES = ('states', 'cities', 'account_groups', 'account_master', 'business_partners', 'uom',
+                 'item_types', 'item_groups', 'item_companies', 'items', 'financial_years',
+                 'vouchers', 'voucher_lines')
+
+
+def gstin_check_digit(first14):
+    """Check character of a GSTIN (base-36 Luhn variant over the first 14 characters)"""
+    total = 0
+    for position, char in enumerate(first14):
+        product = GSTIN_CHARS.index(char) * (2 if position % 2 else 1)
+        total += product // 36 + product % 36
+    return GSTIN_CHARS[(36 - total % 36) % 36]
+
+
+def make_gstin(rng, gst_state_code):
+    pan = (''.join(rng.choice(LETTERS) for _ in range(3)) + rng.choice('CPFH') + rng.choice(LETTERS)
+           + f"{rng.randrange(10000):04d}" + rng.choice(LETTERS))
+    first14 = f"{gst_state_code}{pan}{rng.randint(1, 9)}Z"
+    return first14 + gstin_check_digit(first14)
+
+
+def create_schema(db_path):
+    """Create every application table by connecting each handler once"""
+    for module in HANDLER_MODULES:
+        module.DB_PATH = db_path
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        for handler in (FinancialYearHandler(), StaticDataHandler(), StateHandler(), CityHandler(),
+                        AccountGroupHandler(), AccountMasterHandler(), BusinessPartnerHandler(),
+                        UoMHandler(), ItemTypeHandler(), ItemGroupHandler(), ItemCompanyHandler(),
+                        ItemHandler(), VoucherHandler(db_path)):
+            handler.connect()
+            handler.disconnect()
+
+
+def _insert_chunks(cursor, sql, rows):
+    """executemany() over a row generator, CHUNK_SIZE rows at a time; returns the row count"""
+    count = 0
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == CHUNK_SIZE:
+            cursor.executemany(sql, chunk)
+            count += len(chunk)
+            chunk = []
+    if chunk:
+        cursor.executemany(sql, chunk)
+        count += len(chunk)
+    return count
+
+
+def _drop_indexes(cursor):
+    """Drop the secondary indexes of the loaded tables, returns their CREATE statements"""
+    placeholders = ', '.join('?' * len(LOADED_TABLES))
+    cursor.execute(f"""
+        SELECT name, sql FROM sqlite_master
+        WHERE type = 'index' AND sql IS NOT NULL AND tbl_name IN ({placeholders})
+    """, LOADED_TABLES)
+    indexes = cursor.fetchall()
+    for name, _ in indexes:
+        cursor.execute(f'DROP INDEX "{name}"')
+    return [sql for _, sql in indexes]
+
+
+def generate_dataset(size='small', seed=42, db_path=None, **counts):
+    """
+    Generate a database; counts override the preset size (keys as in SIZES)
+    Returns dict: db_path, counts (rows per table), fy_ids, seconds
+    """
+    config = dict(SIZES[size], **counts)
+    db_path = db_path or os.path.join(tempfile.mkdtemp(), f"synthetic_{size}.db")
+    rng = random.Random(seed)
+    started = time.perf_counter()
+
+    create_schema(db_path)
+
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute("PRAGMA journal_mode = OFF")
+    cursor.execute("PRAGMA synchronous = OFF")
+    cursor.execute("PRAGMA locking_mode = EXCLUSIVE")
+    cursor.execute("PRAGMA temp_store = MEMORY")
+    cursor.execute("PRAGMA cache_size = -262144")
+    index_sqls = _drop_indexes(cursor)
+    loaded = {}
+
+    # Geography
+    loaded['states'] = _insert_chunks(cursor, """
+        INSERT INTO states (id, state_code, state_name) VALUES (?, ?, ?)
+    """, ((n, code, name) for n, (code, name, _) in enumerate(STATES, 1)))
+    loaded['cities'] = _insert_chunks(cursor, """
+        INSERT INTO cities (id, city_code, city_name) VALUES (?, ?, ?)
+    """, ((n, f"CT{n:05d}", CITY_NAMES[n % len(CITY_NAMES)] + ('' if n <= len(CITY_NAMES) else f" {n}"))
+          for n in range(1, config['cities'] + 1)))
+
+    # Financial years
+    fy_rows = [(n, f"FY{(FIRST_YEAR + n - 1) % 100:02d}{(FIRST_YEAR + n) % 100:02d}",
+                f"Financial Year {FIRST_YEAR + n - 1}-{FIRST_YEAR + n}",
+                f"{FIRST_YEAR + n - 1}-04-01", f"{FIRST_YEAR + n}-03-31")
+               for n in range(1, config['years'] + 1)]
+    loaded['financial_years'] = _insert_chunks(cursor, """
+        INSERT INTO financial_years (id, fy_code, display_name, start_date, end_date) VALUES (?, ?, ?, ?, ?)
+    """, fy_rows)
+
+    # Account groups: the standard groups first, then numbered sub-groups of them
+    cursor.execute("SELECT code, id FROM account_types")
+    type_ids = dict(cursor.fetchall())
+    groups = []
+    for n in range(1, config['account_groups'] + 1):
+        name, group_type, type_code, ag_code = ACCOUNT_GROUPS[(n - 1) % len(ACCOUNT_GROUPS)]
+        if n > len(ACCOUNT_GROUPS):
+            name, ag_code = f"{name} {n}", f"{ag_code}{n:05d}"
+        groups.append((n, name, group_type, ag_code, type_ids[type_code], type_code))
+    loaded['account_groups'] = _insert_chunks(cursor, """
+        INSERT INTO account_groups (id, name, account_group_type, ag_code) VALUES (?, ?, ?, ?)
+    """, (group[:4] for group in groups))
+    ledger_groups = [g for g in groups if g[5] not in ('D', 'C')]
+    party_groups = [g for g in groups if g[5] in ('D', 'C')]
+
+    def opening():
+        amount = rng.randint(0, 50000000) if rng.random() < 0.3 else 0
+        return amount, 'Debit' if rng.random() < 0.5 else 'Credit'
+
+    def accounts():
+        for n in range(1, config['accounts'] + 1):
+            group = ledger_groups[rng.randrange(len(ledger_groups))]
+            amount, balance_type = opening()
+            yield (n, f"{group[1]} Account {n}", group[0], 3, group[4], amount, balance_type, f"AC{n:07d}")
+    loaded['account_master'] = _insert_chunks(cursor, """
+        INSERT INTO account_master (
+            id, account_name, account_group_id, book_code_id, account_type_id,
+            opening_balance, balance_type, account_code
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """, accounts())
+
+    def partners():
+        for n in range(1, config['partners'] + 1):
+            group = party_groups[rng.randrange(len(party_groups))]
+            state_id = rng.randrange(len(STATES)) + 1
+            name = (f"{rng.choice(PARTNER_PREFIXES)} {rng.choice(PARTNER_NAMES)} "
+                    f"{rng.choice(PARTNER_SUFFIXES)}")
+            address = f"{rng.randint(1, 999)}, {rng.choice(PARTNER_NAMES)} Nagar"
+            gstin = make_gstin(rng, STATES[state_id - 1][2]) if rng.random() < 0.8 else None
+            amount, balance_type = opening()
+            yield (n, f"BP{n:07d}", name, address, address, rng.randint(1, config['cities']), state_id,
+                   f"9{rng.randrange(10 ** 9):09d}", gstin, group[0], 3, group[4], amount, balance_type)
+    loaded['business_partners'] = _insert_chunks(cursor, """
+        INSERT INTO business_partners (
+            id, bp_code, bp_name, bill_to_address, ship_to_address, city_id, state_id, mobile,
+            gst_number, account_group_id, book_code_id, account_type_id, opening_balance, balance_type
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, partners())
+
+    # Item masters
+    loaded['uom'] = _insert_chunks(cursor, "INSERT INTO uom (id, uom_code, uom_name) VALUES (?, ?, ?)",
+                                   ((n,) + uom for n, uom in enumerate(UOMS, 1)))
+    loaded['item_types'] = _insert_chunks(cursor, """
+        INSERT INTO item_types (id, type_code, type_name) VALUES (?, ?, ?)
+    """, ((n,) + item_type for n, item_type in enumerate(ITEM_TYPES, 1)))
+    loaded['item_groups'] = _insert_chunks(cursor, """
+        INSERT INTO item_groups (id, item_group_code, item_group_name) VALUES (?, ?, ?)
+    """, ((n, f"IG{n:05d}", f"{ITEM_NOUNS[n % len(ITEM_NOUNS)]} Group {n}")
+          for n in range(1, config['item_groups'] + 1)))
+    company_names = [f"{rng.choice(PARTNER_PREFIXES)} {rng.choice(PARTNER_NAMES)} {suffix} {n}"
+                     for n, suffix in ((n, rng.choice(['Foods', 'Pharma', 'Consumer Products', 'Ltd']))
+                                       for n in range(1, config['item_companies'] + 1))]
+    loaded['item_companies'] = _insert_chunks(cursor, """
+        INSERT INTO item_companies (id, company_code, company_name) VALUES (?, ?, ?)
+    """, ((n, f"IC{n:05d}", name) for n, name in enumerate(company_names, 1)))
+
+    sales_codes = [f"AC{g:07d}" for g in range(1, min(config['accounts'], 50) + 1)]
+
+    def items():
+        for n in range(1, config['items'] + 1):
+            purchase_rate = rng.randint(500, 500000)
+            mrp = purchase_rate * rng.randint(110, 160) // 100
+            yield (n, f"IT{n:07d}", f"EAN{rng.randrange(10 ** 10):010d}",
+                   f"{rng.choice(ITEM_ADJECTIVES)} {rng.choice(ITEM_NOUNS)} {rng.choice(PACK_SIZES)}",
+                   f"IG{rng.randint(1, config['item_groups']):05d}", rng.choice(ITEM_TYPES)[0],
+                   rng.choice(UOMS)[0], rng.choice(company_names), purchase_rate, mrp,
+                   rng.choice(GST_SLABS), f"{rng.randint(1001, 9999)}{rng.randint(10, 99)}",
+                   mrp * 95 // 100, mrp * 90 // 100, rng.choice((0, 0, 2.5, 5)), rng.choice((0, 5, 10)),
+                   rng.choice(sales_codes) if sales_codes else None,
+                   rng.choice(sales_codes) if sales_codes else None)
+    loaded['items'] = _insert_chunks(cursor, """
+        INSERT INTO items (
+            id, item_code, external_code, item_name, item_group_code, item_type_code, uom_code,
+            company_name, purchase_rate, mrp, gst_percentage, hsn_code, sale_rate_wh1, sale_rate_wh2,
+            discount_wh1, discount_wh2, sales_account_code, purchase_account_code
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, items())
+    conn.commit()
+
+    # Vouchers: two to four lines each, balanced, dated across the years
+    voucher_types = [t for t in VOUCHER_TYPE_PREFIXES if t != 'Reversal']
+    voucher_rows, line_rows = [], []
+    voucher_id = 0
+    line_count = 0
+    loaded['vouchers'] = loaded['voucher_lines'] = 0
+    while line_count < config['voucher_lines']:
+        voucher_id += 1
+        fy_id, _, _, fy_start, _ = fy_rows[rng.randrange(len(fy_rows))]
+        month = rng.randrange(12)
+        year = int(fy_start[:4]) + (month + 3) // 12
+        voucher_date = f"{year}-{(month + 3) % 12 + 1:02d}-{rng.randint(1, 28):02d}"
+        period = fiscal_period(voucher_date, fy_start)
+        voucher_type = rng.choice(voucher_types)
+        splits = min(rng.choice((1, 1, 1, 2, 3)), config['voucher_lines'] - line_count - 1) or 1
+        amounts = [rng.randint(100, 10000000) for _ in range(splits)]
+        total = sum(amounts)
+
+        voucher_rows.append((voucher_id, f"{VOUCHER_TYPE_PREFIXES[voucher_type]}/{voucher_id:09d}",
+                             voucher_type, voucher_date, fy_id, total))
+        lines = [(total, 0)] + [(0, amount) for amount in amounts]
+        for line_no, (debit, credit) in enumerate(lines, 1):
+            if config['partners'] and (not config['accounts'] or rng.random() < 0.4):
+                kind, account_id = 'partner', rng.randint(1, config['partners'])
+            else:
+                kind, account_id = 'account', rng.randint(1, config['accounts'])
+            line_rows.append((voucher_id, line_no, kind, account_id, fy_id, period, voucher_date,
+                              debit, credit))
+        line_count += len(lines)
+
+        if len(line_rows) >= CHUNK_SIZE or line_count >= config['voucher_lines']:
+            cursor.executemany("""
+                INSERT INTO vouchers (id, voucher_no, voucher_type, voucher_date, fy_id, total_amount)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, voucher_rows)
+            cursor.executemany("""
+                INSERT INTO voucher_lines (
+                    voucher_id, line_no, account_kind, account_id, fy_id, period, voucher_date, debit, credit
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, line_rows)
+            loaded['vouchers'] += len(voucher_rows)
+            loaded['voucher_lines'] += len(line_rows)
+            voucher_rows, line_rows = [], []
+            conn.commit()
+
+    for table in loaded:
+        columns = {row[1] for row in cursor.execute(f"PRAGMA table_info({table})")}
+        if {'created_at', 'updated_at'} <= columns:
+            cursor.execute(f"UPDATE {table} SET created_at = ?, updated_at = ?", (CREATED_AT, CREATED_AT))
+    conn.commit()
+
+    for sql in index_sqls:
+        cursor.execute(sql)
+    cursor.execute("ANALYZE")
+    conn.commit()
+    conn.close()
+
+    # Aggregate built once, set-based
+    with contextlib.redirect_stdout(io.StringIO()):
+        handler = VoucherHandler(db_path)
+        handler.connect()
+        handler.rebuild_account_balances()
+        handler.disconnect()
+
+    seconds = time.perf_counter() - started
+    print(f"[DATASET] {sum(loaded.values()):,} rows in {seconds:.1f}s: "
+          + ', '.join(f"{table} {count:,}" for table, count in loaded.items() if count))
+    return {'db_path': db_path, 'counts': loaded, 'fy_ids': [row[0] for row in fy_rows],
+            'seconds': seconds}
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    preset = args.pop(0) if args and not args[0].startswith('--') else 'small'
+    options = {args[i][2:].replace('-', '_'): args[i + 1] for i in range(0, len(args) - 1, 2)}
+    out = options.pop('out', None)
+    seed = int(options.pop('seed', 42))
+    result = generate_dataset(preset, seed, out, **{key: int(value) for key, value in options.items()})
+    print(f"Database: {result['db_path']}")
@@ -0,0 +1,17 @@
+"""
+Timing - Shared timing helper for the benchmark scripts
+"""
+
+import statistics
+import time
+
+
+def time_call(func, repeat=5):
+    """Run func `repeat` times, return (median seconds, last result)"""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings), result
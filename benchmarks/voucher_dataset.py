@@ -0,0 +1,167 @@
+"""
+Voucher Dataset - Builds a throw-away SQLite database with generated vouchers for benchmarks
+
+The schema is created by the application's own handlers, then masters, vouchers and
+voucher lines are bulk inserted and the account_balances aggregate is rebuilt once.
+Generation is deterministic for a given seed.
+"""
+
+import contextlib
+import io
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+import database.account_group_handler as account_group_module
+import database.account_master_handler as account_master_module
+import database.business_partner_handler as business_partner_module
+import database.financial_year_handler as financial_year_module
+import database.static_data_handler as static_data_module
+from database.account_group_handler import AccountGroupHandler
+from database.account_master_handler import AccountMasterHandler
+from database.business_partner_handler import BusinessPartnerHandler
+from database.financial_year_handler import FinancialYearHandler
+from database.static_data_handler import StaticDataHandler
+from database.voucher_handler import VoucherHandler, fiscal_period
+
+
+# (group name, account_group_type, account type code, ag_code)
+ACCOUNT_GROUPS = [
+    ('Sales', 'Trading A/C', 'S', 'SA'),
+    ('Purchase', 'Trading A/C', 'P', 'PU'),
+    ('Indirect Expenses', 'P&L Account', 'E', 'IE'),
+    ('Indirect Income', 'P&L Account', 'R', 'II'),
+    ('Current Assets', 'Balance Sheet', 'A', 'CA'),
+    ('Loans', 'Balance Sheet', 'L', 'LO'),
+    ('Sundry Debtors', 'Balance Sheet', 'D', 'SD'),
+    ('Sundry Creditors', 'Balance Sheet', 'C', 'SC'),
+]
+
+CHUNK_SIZE = 50000
+
+
+def create_schema(db_path):
+    """Create every table the reports need by connecting each handler once"""
+    for module in (account_group_module, account_master_module, business_partner_module,
+                   financial_year_module, static_data_module):
+        module.DB_PATH = db_path
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        for handler in (FinancialYearHandler(), StaticDataHandler(), AccountGroupHandler(),
+                        AccountMasterHandler(), BusinessPartnerHandler(), VoucherHandler(db_path)):
+            handler.connect()
+            handler.disconnect()
+
+
+def build_voucher_dataset(line_count=1000000, account_count=2000, partner_count=2000,
+                          years=3, seed=42, db_path=None):
+    """
+    Generate a database with line_count voucher lines (two lines per voucher)
+    spread over `years` financial years starting 2022-04-01
+    Returns (db_path, fy_ids)
+    """
+    db_path = db_path or os.path.join(tempfile.mkdtemp(), "bench_vouchers.db")
+    rng = random.Random(seed)
+    started = time.perf_counter()
+
+    create_schema(db_path)
+
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute("PRAGMA journal_mode = OFF")
+    cursor.execute("PRAGMA synchronous = OFF")
+
+    # Financial years
+    fys = []
+    for offset in range(years):
+        start = f"{2022 + offset}-04-01"
+        end = f"{2023 + offset}-03-31"
+        cursor.execute("""
+            INSERT INTO financial_years (fy_code, display_name, start_date, end_date)
+            VALUES (?, ?, ?, ?)
+        """, (f"FY{22 + offset}{23 + offset}", f"Financial Year {2022 + offset}-{2023 + offset}", start, end))
+        fys.append((cursor.lastrowid, start, 2022 + offset))
+
+    # Account groups mapped to seeded account types
+    cursor.execute("SELECT code, id FROM account_types")
+    type_ids = dict(cursor.fetchall())
+    groups = []
+    for name, group_type, type_code, ag_code in ACCOUNT_GROUPS:
+        cursor.execute("""
+            INSERT INTO account_groups (name, account_group_type, ag_code) VALUES (?, ?, ?)
+        """, (name, group_type, ag_code))
+        groups.append((cursor.lastrowid, type_ids[type_code], type_code))
+
+    # Accounts spread over the non-party groups, partners over debtors/creditors
+    account_groups = [g for g in groups if g[2] not in ('D', 'C')]
+    partner_groups = [g for g in groups if g[2] in ('D', 'C')]
+    cursor.executemany("""
+        INSERT INTO account_master (
+            account_name, account_group_id, book_code_id, account_type_id,
+            opening_balance, balance_type, account_code
+        ) VALUES (?, ?, 3, ?, 0, 'Debit', ?)
+    """, [
+        (f"Account {n}", group[0], group[1], f"AC{n:06d}")
+        for n, group in ((n, account_groups[n % len(account_groups)]) for n in range(1, account_count + 1))
+    ])
+    cursor.executemany("""
+        INSERT INTO business_partners (
+            bp_code, bp_name, account_group_id, book_code_id, account_type_id,
+            opening_balance, balance_type
+        ) VALUES (?, ?, ?, 3, ?, 0, 'Debit')
+    """, [
+        (f"BP{n:06d}", f"Partner {n}", group[0], group[1])
+        for n, group in ((n, partner_groups[n % len(partner_groups)]) for n in range(1, partner_count + 1))
+    ])
+    conn.commit()
+
+    # Vouchers: one debit and one credit line each
+    voucher_count = line_count // 2
+    voucher_id = 0
+    while voucher_id < voucher_count:
+        vouchers = []
+        lines = []
+        for _ in range(min(CHUNK_SIZE, voucher_count - voucher_id)):
+            voucher_id += 1
+            fy_id, fy_start, start_year = fys[rng.randrange(years)]
+            month = rng.randrange(12)
+            voucher_date = (f"{start_year + (month + 3) // 12}-{(month + 3) % 12 + 1:02d}-"
+                            f"{rng.randint(1, 28):02d}")
+            period = fiscal_period(voucher_date, fy_start)
+            amount = rng.randint(100, 1000000)  # paise
+
+            vouchers.append((voucher_id, f"JV/{voucher_id:08d}", voucher_date, fy_id, amount))
+            debit_kind = 'account' if rng.random() < 0.6 else 'partner'
+            credit_kind = 'account' if rng.random() < 0.6 else 'partner'
+            lines.append((voucher_id, 1, debit_kind,
+                          rng.randint(1, account_count if debit_kind == 'account' else partner_count),
+                          fy_id, period, voucher_date, amount, 0))
+            lines.append((voucher_id, 2, credit_kind,
+                          rng.randint(1, account_count if credit_kind == 'account' else partner_count),
+                          fy_id, period, voucher_date, 0, amount))
+
+        cursor.executemany("""
+            INSERT INTO vouchers (id, voucher_no, voucher_type, voucher_date, fy_id, total_amount)
+            VALUES (?, ?, 'Journal', ?, ?, ?)
+        """, vouchers)
+        cursor.executemany("""
+            INSERT INTO voucher_lines (
+                voucher_id, line_no, account_kind, account_id, fy_id, period, voucher_date, debit, credit
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, lines)
+        conn.commit()
+
+    conn.close()
+
+    # Aggregate built once, set-based
+    with contextlib.redirect_stdout(io.StringIO()):
+        handler = VoucherHandler(db_path)
+        handler.connect()
+        handler.rebuild_account_balances()
+        handler.disconnect()
+
+    print(f"[DATASET] {voucher_count * 2:,} voucher lines, {account_count:,} accounts, "
+          f"{partner_count:,} partners, {years} years in {time.perf_counter() - started:.1f}s")
+    return db_path, [fy[0] for fy in fys]
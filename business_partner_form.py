@@ -5,6 +5,7 @@ Business Partner Form - Create and Edit Business Partner
 import tkinter as tk
 from tkinter import ttk, messagebox
 from ui_config import COLORS, FONTS, SPACING, LAYOUT
+from utils.money import Money
 
 
 class BusinessPartnerForm(tk.Frame):
@@ -120,6 +121,11 @@ class BusinessPartnerForm(tk.Frame):
                          placeholder="Enter 10-digit mobile number", row=current_row)
         current_row += 2
 
+        # --- GSTIN (registered customers, reported as B2B in GSTR-1) ---
+        self.create_field(form_container, "GSTIN", "gst_number",
+                         placeholder="Enter 15-character GSTIN", row=current_row)
+        current_row += 2
+
         # --- Account Group (*) ---
         self.account_groups = self.bp_handler.get_active_account_groups()
         account_group_values = [f"{ag['name']} ({ag['ag_code']})" for ag in self.account_groups]
@@ -475,6 +481,11 @@ class BusinessPartnerForm(tk.Frame):
             self.form_vars['mobile']['var'].set(self.bp_data['mobile'])
             self.form_vars['mobile']['widget'].config(fg=self.colors['text_primary'])
 
+        # GSTIN
+        if self.bp_data.get('gst_number'):
+            self.form_vars['gst_number']['var'].set(self.bp_data['gst_number'])
+            self.form_vars['gst_number']['widget'].config(fg=self.colors['text_primary'])
+
         # Account Group
         if 'account_group_id' in self.bp_data:
             for ag in self.account_groups:
@@ -528,6 +539,11 @@ class BusinessPartnerForm(tk.Frame):
                         label_text = field_name.replace('_', ' ').title()
                         errors.append(f"{label_text} is required")
 
+        gst_number = self.form_vars['gst_number']['var'].get().strip()
+        if gst_number and gst_number != self.form_vars['gst_number']['placeholder']:
+            if len(gst_number) != 15 or not gst_number.isalnum():
+                errors.append("GSTIN must be 15 letters and digits")
+
         if errors:
             messagebox.showerror("Validation Error", "\n".join(errors))
             return False
@@ -570,6 +586,11 @@ class BusinessPartnerForm(tk.Frame):
         placeholder = self.form_vars['mobile']['placeholder']
         data['mobile'] = mobile if mobile != placeholder else ''
 
+        # GSTIN
+        gst_number = self.form_vars['gst_number']['var'].get()
+        placeholder = self.form_vars['gst_number']['placeholder']
+        data['gst_number'] = gst_number if gst_number != placeholder else ''
+
         # Account Group (extract ID)
         account_group_display = self.form_vars['account_group']['var'].get()
         for ag in self.account_groups:
@@ -593,7 +614,7 @@ class BusinessPartnerForm(tk.Frame):
 
         # Opening Balance
         try:
-            data['opening_balance'] = float(self.form_vars['opening_balance']['var'].get())
+            data['opening_balance'] = Money.of(self.form_vars['opening_balance']['var'].get())
         except ValueError:
             data['opening_balance'] = 0
 
@@ -3,13 +3,25 @@ Main Dashboard - Navigation Hub
 Displays after successful login
 """
 
+import os
 import tkinter as tk
 from tkinter import ttk, messagebox
 from ui_config import COLORS, FONTS, SPACING, LAYOUT, BUTTON_STYLES, get_hover_handlers
+from maintenance_scheduler import MaintenanceScheduler
+import ui_profiler
+from utils import tracing
+from memory_diagnostics import MemoryDiagnostics
+from lag_monitor import LagMonitor
+from metrics_exporter import METRICS_FILE_ENV, MetricsExporter
 
 
 class Dashboard(tk.Tk):
     def __init__(self, user_data):
+        # Tk callbacks go through the profiler hook (a no-op until profiling is enabled)
+        ui_profiler.install()
+        ui_profiler.enable_from_environment()
+        tracing.enable_from_environment()
+
         super().__init__()
 
         self.user_data = user_data
@@ -32,6 +44,24 @@ class Dashboard(tk.Tk):
         # Create UI
         self.create_widgets()
 
+        # Per-screen memory accounting (off unless APP_MEMORY_DIAGNOSTICS is set)
+        self.memory_diagnostics = MemoryDiagnostics(self, self.content_frame)
+        self.memory_diagnostics.enable_from_environment()
+
+        # Event-loop lag watchdog, shown in the footer
+        self.lag_monitor = LagMonitor(self, self.lag_indicator)
+        self.lag_monitor.start()
+
+        # Prometheus text file for node_exporter, when APP_METRICS_FILE is set
+        self.metrics_exporter = None
+        if os.environ.get(METRICS_FILE_ENV):
+            self.metrics_exporter = MetricsExporter(self, os.environ[METRICS_FILE_ENV], self.lag_monitor)
+            self.metrics_exporter.start()
+
+        # Database maintenance while the window is idle
+        self.maintenance = MaintenanceScheduler(self)
+        self.maintenance.start()
+
     def center_window(self):
         """Center the window on the screen"""
         self.update_idletasks()
@@ -145,10 +175,22 @@ class Dashboard(tk.Tk):
                 'icon': '🛒',
                 'submenus': []
             },
+            {
+                'name': 'Inventory',
+                'icon': '📦',
+                'submenus': [
+                    'Stock Summary'
+                ]
+            },
             {
                 'name': 'Accounting',
                 'icon': '💰',
-                'submenus': []
+                'submenus': [
+                    'Trial Balance',
+                    'Financial Statements',
+                    'Account Ledger',
+                    'GST Returns'
+                ]
             },
             {
                 'name': 'Master Data',
@@ -171,7 +213,9 @@ class Dashboard(tk.Tk):
                 'icon': '⚙️',
                 'submenus': [
                     'Companies',
-                    'Financial Years'
+                    'Financial Years',
+                    'Backup & Restore',
+                    'Profiling'
                 ]
             }
         ]
@@ -364,6 +408,8 @@ class Dashboard(tk.Tk):
 
     def show_submenu_content(self, module_name, submenu_name):
         """Show content for a selected submenu"""
+        self.memory_diagnostics.before_navigation()
+
         # Clear content
         for widget in self.content_frame.winfo_children():
            widget.destroy()
@@ -373,6 +419,22 @@ class Dashboard(tk.Tk):
             self.show_companies_management()
         elif module_name == 'Utilities' and submenu_name == 'Financial Years':
             self.show_financial_years_management()
+        elif module_name == 'Utilities' and submenu_name == 'Backup & Restore':
+            self.show_backup_management()
+        elif module_name == 'Utilities' and submenu_name == 'Profiling':
+            self.show_profiling_settings()
+        elif module_name == 'Sales' and submenu_name == 'Sales Invoice':
+            self.show_sales_invoice_form()
+        elif module_name == 'Inventory' and submenu_name == 'Stock Summary':
+            self.show_stock_summary_report()
+        elif module_name == 'Accounting' and submenu_name == 'Trial Balance':
+            self.show_trial_balance_report()
+        elif module_name == 'Accounting' and submenu_name == 'Financial Statements':
+            self.show_financial_statements_report()
+        elif module_name == 'Accounting' and submenu_name == 'Account Ledger':
+            self.show_account_ledger_report()
+        elif module_name == 'Accounting' and submenu_name == 'GST Returns':
+            self.show_gst_report()
         elif module_name == 'Master Data' and submenu_name == 'Account Group Master':
             self.show_account_group_management()
         elif module_name == 'Master Data' and submenu_name == 'Account Master':
@@ -405,6 +467,8 @@ class Dashboard(tk.Tk):
                                     fg=self.colors['text_tertiary'])
             message_label.pack()
 
+        self.memory_diagnostics.after_navigation(f"{module_name} > {submenu_name}")
+
     def show_companies_management(self):
         """Show companies management screen"""
         try:
@@ -437,6 +501,89 @@ class Dashboard(tk.Tk):
         except Exception as e:
             messagebox.showerror("Error", f"Could not load Financial Years module: {e}")
 
+    def show_backup_management(self):
+        """Show backup and restore screen"""
+        try:
+            from backup_management import BackupManagement
+
+            # Clear content
+            for widget in self.content_frame.winfo_children():
+                widget.destroy()
+
+            # Create backup management widget
+            backup_mgmt = BackupManagement(self.content_frame, self.colors)
+            backup_mgmt.pack(fill=tk.BOTH, expand=True)
+
+        except Exception as e:
+            messagebox.showerror("Error", f"Could not load Backup & Restore module: {e}")
+
+    def show_profiling_settings(self):
+        """Show the profiling, tracing and memory diagnostics switches"""
+        for widget in self.content_frame.winfo_children():
+            widget.destroy()
+
+        center_frame = tk.Frame(self.content_frame, bg=self.colors['background'])
+        center_frame.place(relx=0.5, rely=0.5, anchor=tk.CENTER)
+
+        profiler = ui_profiler.active_profiler()
+        tracer = tracing.active_tracer()
+        if profiler:
+            status = (f"Profiling is ON ({profiler.mode}).\n"
+                      f"Actions slower than {profiler.min_seconds * 1000:.0f} ms are written to\n"
+                      f"{profiler.output_dir}")
+        else:
+            status = "Profiling is OFF."
+        if tracer:
+            status += f"\nTracing is ON, traces are written to\n{tracer.output_dir}"
+        tk.Label(center_frame, text=status, font=FONTS['body_large'], justify=tk.CENTER,
+                 bg=self.colors['background'], fg=self.colors['text_primary']).pack(pady=SPACING['lg'])
+
+        def switch(mode=None):
+            if mode:
+                ui_profiler.enable(mode)
+            else:
+                written = ui_profiler.disable()
+                messagebox.showinfo("Profiling", f"Profiling stopped, {len(written)} profile(s) written.")
+            self.show_profiling_settings()
+
+        buttons = tk.Frame(center_frame, bg=self.colors['background'])
+        buttons.pack()
+        if profiler:
+            tk.Button(buttons, text="Stop Profiling", command=switch,
+                      **BUTTON_STYLES['primary']).pack(side=tk.LEFT, padx=SPACING['sm'])
+        else:
+            tk.Button(buttons, text="Profile Actions (cProfile)", command=lambda: switch('cprofile'),
+                      **BUTTON_STYLES['primary']).pack(side=tk.LEFT, padx=SPACING['sm'])
+            tk.Button(buttons, text="Sample Stacks (flamegraph)", command=lambda: switch('sample'),
+                      **BUTTON_STYLES['secondary']).pack(side=tk.LEFT, padx=SPACING['sm'])
+
+        def switch_tracing():
+            if tracer:
+                written = tracing.disable()
+                messagebox.showinfo("Tracing", f"Tracing stopped, {len(written)} trace(s) written.")
+            else:
+                tracing.enable()
+            self.show_profiling_settings()
+
+        def switch_memory():
+            if self.memory_diagnostics.enabled:
+                self.memory_diagnostics.disable()
+            else:
+                self.memory_diagnostics.enable()
+            self.show_profiling_settings()
+
+        memory_buttons = tk.Frame(center_frame, bg=self.colors['background'])
+        memory_buttons.pack(pady=SPACING['lg'])
+        tk.Button(memory_buttons, text="Stop Tracing" if tracer else "Trace Actions (Chrome trace)",
+                  command=switch_tracing, **BUTTON_STYLES['secondary']).pack(side=tk.LEFT, padx=SPACING['sm'])
+        memory_on = self.memory_diagnostics.enabled
+        tk.Button(memory_buttons, text="Stop Memory Diagnostics" if memory_on else "Start Memory Diagnostics",
+                  command=switch_memory, **BUTTON_STYLES['secondary']).pack(side=tk.LEFT, padx=SPACING['sm'])
+        if memory_on:
+            tk.Button(memory_buttons, text="Memory Report",
+                      command=lambda: messagebox.showinfo("Memory Report", self.memory_diagnostics.report()),
+                      **BUTTON_STYLES['secondary']).pack(side=tk.LEFT, padx=SPACING['sm'])
+
     def show_account_group_management(self):
         """Show account group management screen"""
         try:
@@ -597,6 +744,102 @@ class Dashboard(tk.Tk):
         except Exception as e:
             messagebox.showerror("Error", f"Could not load Business Partner module: {e}")
 
+    def show_sales_invoice_form(self):
+        """Show Sales Invoice entry screen"""
+        try:
+            from sales_invoice_form import SalesInvoiceForm
+
+            # Clear content
+            for widget in self.content_frame.winfo_children():
+                widget.destroy()
+
+            # Create sales invoice widget
+            invoice_form = SalesInvoiceForm(self.content_frame, self.colors)
+            invoice_form.pack(fill=tk.BOTH, expand=True)
+
+        except Exception as e:
+            messagebox.showerror("Error", f"Could not load Sales Invoice module: {e}")
+
+    def show_stock_summary_report(self):
+        """Show stock summary screen"""
+        try:
+            from stock_summary_report import StockSummaryReport
+
+            # Clear content
+            for widget in self.content_frame.winfo_children():
+                widget.destroy()
+
+            # Create stock summary widget
+            stock_report = StockSummaryReport(self.content_frame, self.colors)
+            stock_report.pack(fill=tk.BOTH, expand=True)
+
+        except Exception as e:
+            messagebox.showerror("Error", f"Could not load Stock Summary module: {e}")
+
+    def show_trial_balance_report(self):
+        """Show trial balance report screen"""
+        try:
+            from trial_balance_report import TrialBalanceReport
+
+            # Clear content
+            for widget in self.content_frame.winfo_children():
+                widget.destroy()
+
+            # Create trial balance report widget
+            tb_report = TrialBalanceReport(self.content_frame, self.colors)
+            tb_report.pack(fill=tk.BOTH, expand=True)
+
+        except Exception as e:
+            messagebox.showerror("Error", f"Could not load Trial Balance module: {e}")
+
+    def show_financial_statements_report(self):
+        """Show Trading / P&L / Balance Sheet screen"""
+        try:
+            from financial_statements_report import FinancialStatementsReport
+
+            # Clear content
+            for widget in self.content_frame.winfo_children():
+                widget.destroy()
+
+            # Create financial statements widget
+            fs_report = FinancialStatementsReport(self.content_frame, self.colors)
+            fs_report.pack(fill=tk.BOTH, expand=True)
+
+        except Exception as e:
+            messagebox.showerror("Error", f"Could not load Financial Statements module: {e}")
+
+    def show_account_ledger_report(self):
+        """Show Account Ledger screen"""
+        try:
+            from account_ledger_report import AccountLedgerReport
+
+            # Clear content
+            for widget in self.content_frame.winfo_children():
+                widget.destroy()
+
+            # Create account ledger widget
+            ledger_report = AccountLedgerReport(self.content_frame, self.colors)
+            ledger_report.pack(fill=tk.BOTH, expand=True)
+
+        except Exception as e:
+            messagebox.showerror("Error", f"Could not load Account Ledger module: {e}")
+
+    def show_gst_report(self):
+        """Show HSN summary / GSTR-1 export screen"""
+        try:
+            from gst_report import GstReport
+
+            # Clear content
+            for widget in self.content_frame.winfo_children():
+                widget.destroy()
+
+            # Create GST report widget
+            gst_report = GstReport(self.content_frame, self.colors)
+            gst_report.pack(fill=tk.BOTH, expand=True)
+
+        except Exception as e:
+            messagebox.showerror("Error", f"Could not load GST Returns module: {e}")
+
     def create_footer(self):
         """Create footer"""
         # Separator
@@ -607,6 +850,14 @@ class Dashboard(tk.Tk):
         footer_frame.pack(fill=tk.X, side=tk.BOTTOM)
         footer_frame.pack_propagate(False)
 
+        # UI responsiveness indicator (updated by the lag monitor)
+        self.lag_indicator = tk.Label(footer_frame,
+                                      text="● UI",
+                                      font=FONTS['small'],
+                                      bg=self.colors['surface'],
+                                      fg=self.colors['text_tertiary'])
+        self.lag_indicator.pack(side=tk.RIGHT, padx=SPACING['md'])
+
         footer_label = tk.Label(footer_frame,
                                text="Software By [Company Name]",
                                font=FONTS['small'],
@@ -619,6 +870,10 @@ class Dashboard(tk.Tk):
         result = messagebox.askyesno("Logout",
                                      "Are you sure you want to logout?")
         if result:
+            self.maintenance.stop()
+            self.lag_monitor.stop()
+            if self.metrics_exporter:
+                self.metrics_exporter.stop()
             self.destroy()
             # Reopen login screen
             try:
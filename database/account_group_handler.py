@@ -4,6 +4,8 @@ Account Group Handler - Manages account group CRUD operations using SQLite
 
 import sqlite3
 from database.config import DB_PATH
+from database.tenant_router import tenant_db_path
+from database.voucher_handler import bump_data_version
 
 
 class AccountGroupHandler:
@@ -22,7 +24,8 @@ class AccountGroupHandler:
         """Establish database connection"""
         try:
             import os
-            abs_path = os.path.abspath(DB_PATH)
+            db_path = tenant_db_path(DB_PATH)
+            abs_path = os.path.abspath(db_path)
             print(f"\n{'='*70}")
             print(f"[ACCOUNT_GROUP_HANDLER] Connecting to SQLite database...")
             print(f"[ACCOUNT_GROUP_HANDLER] Database path: {abs_path}")
@@ -31,7 +34,7 @@ class AccountGroupHandler:
                 print(f"[ACCOUNT_GROUP_HANDLER] File size: {os.path.getsize(abs_path)} bytes")
             print(f"{'='*70}\n")
 
-            self.conn = sqlite3.connect(DB_PATH)
+            self.conn = sqlite3.connect(db_path)
             self.conn.row_factory = sqlite3.Row
             self.cursor = self.conn.cursor()
             print(f"Successfully connected to SQLite database")
@@ -272,6 +275,9 @@ class AccountGroupHandler:
             )
 
             self.cursor.execute(query, values)
+
+            # Group names and types appear in cached reports
+            bump_data_version(self.cursor)
             self.conn.commit()
 
             print(f"Account Group ID {account_group_id} updated successfully")
@@ -290,9 +296,13 @@ class AccountGroupHandler:
         try:
             query = "DELETE FROM account_groups WHERE id = ?"
             self.cursor.execute(query, (account_group_id,))
+            deleted = self.cursor.rowcount
+
+            # Cached reports must not keep showing the deleted record
+            bump_data_version(self.cursor)
             self.conn.commit()
 
-            if self.cursor.rowcount > 0:
+            if deleted > 0:
                 print(f"Account Group ID {account_group_id} deleted successfully")
                 return True, "Account Group deleted successfully"
             else:
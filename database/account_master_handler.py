@@ -4,18 +4,25 @@ Account Master Handler - Manages account master CRUD operations using SQLite
 
 import sqlite3
 from database.config import DB_PATH
+from database.money_schema import ensure_money_schema
+from database.partition_router import PartitionRouter
+from database.tenant_router import tenant_db_path
+from database.voucher_handler import apply_opening_balance, bump_data_version
+from utils.money import money_fields, to_paise
 
 
 class AccountMasterHandler:
     def __init__(self):
         self.conn = None
         self.cursor = None
+        self.router = None
 
     def connect(self):
         """Establish database connection"""
         try:
             import os
-            abs_path = os.path.abspath(DB_PATH)
+            db_path = tenant_db_path(DB_PATH)
+            abs_path = os.path.abspath(db_path)
             print(f"\n{'='*70}")
             print(f"[ACCOUNT_MASTER_HANDLER] Connecting to SQLite database...")
             print(f"[ACCOUNT_MASTER_HANDLER] Database path: {abs_path}")
@@ -24,7 +31,7 @@ class AccountMasterHandler:
                 print(f"[ACCOUNT_MASTER_HANDLER] File size: {os.path.getsize(abs_path)} bytes")
             print(f"{'='*70}\n")
 
-            self.conn = sqlite3.connect(DB_PATH)
+            self.conn = sqlite3.connect(db_path)
             self.conn.row_factory = sqlite3.Row
             self.cursor = self.conn.cursor()
             print(f"Successfully connected to SQLite database")
@@ -32,6 +39,10 @@ class AccountMasterHandler:
             # Create table if it doesn't exist
             self._create_table()
 
+            # Opening balances go to the books-start year file when the database is partitioned
+            self.router = PartitionRouter(self.conn, db_path)
+            self.router.install()
+
             return True
         except sqlite3.Error as e:
             print(f"Error connecting to SQLite: {e}")
@@ -47,7 +58,7 @@ class AccountMasterHandler:
                 account_group_id INTEGER NOT NULL,
                 book_code_id INTEGER NOT NULL,
                 account_type_id INTEGER NOT NULL,
-                opening_balance REAL DEFAULT 0,
+                opening_balance INTEGER DEFAULT 0,
                 balance_type TEXT DEFAULT 'Debit' CHECK(balance_type IN ('Credit', 'Debit')),
                 status TEXT DEFAULT 'Active' CHECK(status IN ('Active', 'Inactive')),
                 account_code TEXT NOT NULL UNIQUE,
@@ -60,6 +71,7 @@ class AccountMasterHandler:
             """
             self.cursor.execute(create_table_query)
             self.conn.commit()
+            ensure_money_schema(self.conn)
             print("Account Master table created/verified successfully")
         except sqlite3.Error as e:
             print(f"Error creating account_master table: {e}")
@@ -158,7 +170,7 @@ class AccountMasterHandler:
             print(f"[GET_ALL_ACCOUNTS] Raw rows fetched: {len(rows)}")
 
             # Convert sqlite3.Row objects to dictionaries
-            accounts = [dict(row) for row in rows]
+            accounts = [money_fields(dict(row), ('opening_balance',)) for row in rows]
 
             print(f"[GET_ALL_ACCOUNTS] Returning {len(accounts)} accounts\n")
             return accounts
@@ -198,7 +210,7 @@ class AccountMasterHandler:
             rows = self.cursor.fetchall()
 
             # Convert sqlite3.Row objects to dictionaries
-            accounts = [dict(row) for row in rows]
+            accounts = [money_fields(dict(row), ('opening_balance',)) for row in rows]
 
             print(f"[GET_ACTIVE_ACCOUNTS] Returning {len(accounts)} active accounts\n")
             return accounts
@@ -233,7 +245,7 @@ class AccountMasterHandler:
             """
             self.cursor.execute(query, (account_id,))
             row = self.cursor.fetchone()
-            return dict(row) if row else None
+            return money_fields(dict(row), ('opening_balance',)) if row else None
         except sqlite3.Error as e:
             print(f"Error fetching account: {e}")
             return None
@@ -327,16 +339,20 @@ class AccountMasterHandler:
                 account_data['account_group_id'],
                 account_data['book_code_id'],
                 account_data['account_type_id'],
-                account_data.get('opening_balance', 0),
+                to_paise(account_data.get('opening_balance', 0)),
                 account_data.get('balance_type', 'Debit'),
                 account_data.get('status', 'Active'),
                 account_code
             )
 
             self.cursor.execute(query, values)
-            self.conn.commit()
-
             account_id = self.cursor.lastrowid
+
+            # Keep the balance aggregate's opening row in the same transaction
+            apply_opening_balance(self.cursor, 'account', account_id,
+                                  account_data.get('opening_balance', 0),
+                                  account_data.get('balance_type', 'Debit'))
+            self.conn.commit()
             print(f"Account '{account_data['account_name']}' created with Account code: {account_code}")
             return True, f"Account created successfully (Account Code: {account_code})", account_id
 
@@ -375,13 +391,18 @@ class AccountMasterHandler:
                 account_data['account_group_id'],
                 account_data['book_code_id'],
                 account_data['account_type_id'],
-                account_data.get('opening_balance', 0),
+                to_paise(account_data.get('opening_balance', 0)),
                 account_data.get('balance_type', 'Debit'),
                 account_data.get('status', 'Active'),
                 account_id
             )
 
             self.cursor.execute(query, values)
+
+            # Keep the balance aggregate's opening row in the same transaction
+            apply_opening_balance(self.cursor, 'account', account_id,
+                                  account_data.get('opening_balance', 0),
+                                  account_data.get('balance_type', 'Debit'))
             self.conn.commit()
 
             print(f"Account ID {account_id} updated successfully")
@@ -400,9 +421,13 @@ class AccountMasterHandler:
         try:
             query = "DELETE FROM account_master WHERE id = ?"
             self.cursor.execute(query, (account_id,))
+            deleted = self.cursor.rowcount
+
+            # Cached reports must not keep showing the deleted record
+            bump_data_version(self.cursor)
             self.conn.commit()
 
-            if self.cursor.rowcount > 0:
+            if deleted > 0:
                 print(f"Account ID {account_id} deleted successfully")
                 return True, "Account deleted successfully"
             else:
@@ -0,0 +1,463 @@
+"""
+Backup Handler - Online backup and restore of the SQLite database
+
+Backups are taken with the SQLite online backup API while the application keeps
+running: BACKUP_PAGES pages are copied per step and other connections can read
+and write between steps. When another connection writes to the database, SQLite
+restarts the copy; after MAX_RESTARTS restarts the copy is finished in a single
+step instead, which in WAL mode still does not block writers.
+
+A backup is written as backups/<db name>_<YYYYmmdd_HHMMSS>.db next to the database,
+optionally:
+    - compacted with VACUUM INTO (free pages dropped, indexes rebuilt)
+    - compressed with gzip (.db.gz) or zstd (.db.zst, needs the zstandard package)
+and is followed by a sha256sum-style checksum file (<backup>.sha256). Only the
+newest `keep` backups are kept.
+
+On a database partitioned per financial year (database/partition_router.py) every
+registered year file is copied too, into <backup>.years/ with the same compression,
+from one read snapshot of all the files; the checksum file lists the main copy first
+and then every year copy.
+
+Restore verifies the checksums and the integrity of every file of the backup, saves
+the current database as a backup of its own, then copies the backup into the live
+files with the same paged backup API, so open connections see the restored data.
+Year files the restored main file does not register are removed (they are in the
+safety backup). The process-wide trial balance and financial year caches are dropped
+afterwards: the restored data versions can be lower than the cached ones.
+
+Methods open their own connections, so they can run on a worker thread
+(see backup_management.py). progress(phase, done, total) is called from that thread.
+"""
+
+import gzip
+import hashlib
+import os
+import shutil
+import sqlite3
+from datetime import datetime
+from database.config import DB_PATH
+from database.fy_index import clear_fy_index
+from database.partition_router import (READ_ONLY_MODE, READ_WRITE_MODE, PartitionError, partition_alias,
+                                       registered_partitions)
+from database.tenant_router import tenant_db_path
+from database.trial_balance_handler import TrialBalanceHandler
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+# Pages copied per backup step (1 MB at the default 4 KB page size)
+BACKUP_PAGES = 256
+
+# Pause between steps, lets other connections take the write lock
+STEP_SLEEP_SECONDS = 0.005
+
+# Restarts caused by concurrent writers before the copy is finished in one step
+MAX_RESTARTS = 3
+
+# Rolling backups kept by default
+DEFAULT_KEEP = 7
+
+CHUNK_SIZE = 1024 * 1024
+
+# Compression -> file suffix
+COMPRESSIONS = {None: '', 'gzip': '.gz', 'zstd': '.zst'}
+
+CHECKSUM_SUFFIX = '.sha256'
+
+# Directory next to a backup holding the copies of the financial year files
+YEARS_SUFFIX = '.years'
+
+
+class _CopyRestarted(Exception):
+    """Raised from the progress callback to give up on a paged copy"""
+
+
+def available_compressions():
+    """Compressions usable here: zstd only when zstandard is installed"""
+    return [name for name in COMPRESSIONS if name != 'zstd' or zstandard is not None]
+
+
+def _compression_of(path):
+    return next((name for name, suffix in COMPRESSIONS.items() if suffix and path.endswith(suffix)), None)
+
+
+def _wrap_compressed(raw, mode, compression):
+    """File object over the open binary file raw, compressing on write / decompressing on read"""
+    if compression == 'gzip':
+        return gzip.GzipFile(fileobj=raw, mode=mode + 'b')
+    if compression == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("zstd needs the zstandard package (pip install zstandard)")
+        if mode == 'w':
+            return zstandard.ZstdCompressor().stream_writer(raw, closefd=False)
+        return zstandard.ZstdDecompressor().stream_reader(raw, closefd=False)
+    return None
+
+
+def _transcode(source_path, target_path, compression, compress, progress, phase):
+    """
+    Copy source_path to target_path, compressing or decompressing it
+    Progress is counted in bytes of the file on the uncompressed side when
+    compressing and of the compressed file when decompressing.
+    """
+    total = os.path.getsize(source_path)
+    with open(source_path, 'rb') as raw_in, open(target_path, 'wb') as raw_out:
+        wrapped = _wrap_compressed(raw_out if compress else raw_in, 'w' if compress else 'r', compression)
+        source = raw_in if compress or wrapped is None else wrapped
+        target = raw_out if not compress or wrapped is None else wrapped
+        try:
+            while True:
+                chunk = source.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                target.write(chunk)
+                if progress:
+                    progress(phase, raw_in.tell(), total)
+        finally:
+            if wrapped is not None:
+                wrapped.close()
+
+
+def _years_dir(backup_path):
+    """<backup>.years for backup.db, backup.db.gz or backup.db.zst"""
+    suffix = COMPRESSIONS[_compression_of(backup_path)]
+    return (backup_path[:-len(suffix)] if suffix else backup_path) + YEARS_SUFFIX
+
+
+def _remove_files(path):
+    """Remove a database file with its WAL and shared-memory files"""
+    for file_path in (path, path + '-wal', path + '-shm'):
+        if os.path.exists(file_path):
+            os.remove(file_path)
+
+
+def file_checksum(path):
+    """SHA-256 hex digest of a file"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def online_copy(source_conn, target_conn, progress=None, phase='backup', name='main'):
+    """
+    Copy database name (main or an attached schema) of source_conn into target_conn
+    with the paged backup API, falling back to a single step when concurrent writers
+    keep restarting it
+    """
+    restarts = [0]
+    last_remaining = [None]
+
+    def on_step(status, remaining, total):
+        # A restarted copy starts over, so the step leaves as many pages remaining as before
+        if last_remaining[0] is not None and remaining >= last_remaining[0]:
+            restarts[0] += 1
+            if restarts[0] > MAX_RESTARTS:
+                raise _CopyRestarted()
+        last_remaining[0] = remaining
+        if progress:
+            progress(phase, total - remaining, total)
+
+    try:
+        source_conn.backup(target_conn, pages=BACKUP_PAGES, progress=on_step, name=name,
+                           sleep=STEP_SLEEP_SECONDS)
+    except _CopyRestarted:
+        print(f"[BACKUP] Copy restarted {restarts[0]} times by other writers, finishing in one step")
+        source_conn.backup(target_conn, pages=-1, name=name)
+        if progress:
+            progress(phase, 1, 1)
+
+
+class BackupHandler:
+    def __init__(self, db_path=None, backup_dir=None):
+        self.db_path = db_path or tenant_db_path(DB_PATH)
+        self.backup_dir = backup_dir or os.path.join(
+            os.path.dirname(os.path.abspath(self.db_path)), 'backups')
+        self.stem = os.path.splitext(os.path.basename(self.db_path))[0]
+
+    def _new_backup_path(self, tag=''):
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        path = os.path.join(self.backup_dir, f"{self.stem}_{stamp}{tag}.db")
+        counter = 2
+        while any(os.path.exists(path + suffix) for suffix in COMPRESSIONS.values()):
+            path = os.path.join(self.backup_dir, f"{self.stem}_{stamp}{tag}_{counter}.db")
+            counter += 1
+        return path
+
+    @staticmethod
+    def _quick_check(conn):
+        result = conn.execute("PRAGMA quick_check").fetchone()[0]
+        if result != 'ok':
+            raise sqlite3.DatabaseError(f"Integrity check failed: {result}")
+
+    @staticmethod
+    def _year_files(conn):
+        """
+        (fy_id, path relative to the main file, status) of every year file registered
+        in conn's main database; raises PartitionError if one is missing
+        """
+        main_dir = os.path.dirname(next(row[2] for row in conn.execute("PRAGMA database_list")
+                                        if row[1] == 'main'))
+        files = []
+        for fy_id, partition in registered_partitions(conn).items():
+            if not os.path.exists(partition['path']):
+                raise PartitionError(f"Year file of {partition['fy_code']} not found: {partition['path']}")
+            files.append((fy_id, os.path.relpath(partition['path'], main_dir), partition['status']))
+        return files
+
+    def _manifest(self, backup_path):
+        """[(expected sha256, file path)] from a backup's checksum file, main copy first"""
+        with open(backup_path + CHECKSUM_SUFFIX) as f:
+            entries = [line.split(None, 1) for line in f if line.strip()]
+        return [(checksum, os.path.join(self.backup_dir, name.strip())) for checksum, name in entries]
+
+    def _copy_database(self, source, name, copy_path, final_path, compact, compression, progress):
+        """Copy database name of source to copy_path, check it, then compact and compress it to final_path"""
+        part_path = copy_path + '.part'
+        target = sqlite3.connect(part_path)
+        try:
+            online_copy(source, target, progress, name=name)
+            self._quick_check(target)
+            if compact:
+                if progress:
+                    progress('compact', 0, 1)
+                target.execute("VACUUM INTO ?", (copy_path + '.compact',))
+                if progress:
+                    progress('compact', 1, 1)
+        finally:
+            target.close()
+        if compact:
+            os.replace(copy_path + '.compact', part_path)
+
+        _transcode(part_path, final_path, compression, True, progress, 'compress')
+        os.remove(part_path)
+
+    # ========================================================================
+    # BACKUP
+    # ========================================================================
+
+    def create_backup(self, compact=False, compression='gzip', keep=DEFAULT_KEEP, progress=None, tag=''):
+        """
+        Take an online backup of the database
+        compact: rewrite the copy with VACUUM INTO
+        compression: None, 'gzip' or 'zstd'
+        keep: number of rolling backups kept afterwards (None keeps all)
+        progress(phase, done, total): phases 'backup', 'compact', 'compress', 'checksum'
+        Returns (success: bool, message: str, backup_path: str or None)
+        """
+        if compression not in available_compressions():
+            return False, f"Compression {compression} is not available", None
+
+        os.makedirs(self.backup_dir, exist_ok=True)
+        db_copy = self._new_backup_path(tag)
+        backup_path = db_copy + COMPRESSIONS[compression]
+        years_dir = db_copy + YEARS_SUFFIX
+        copies = [('main', db_copy, backup_path)]
+        try:
+            source = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            try:
+                year_files = self._year_files(source)
+                for fy_id, relative_path, _status in year_files:
+                    source.execute(f"ATTACH DATABASE ? AS {partition_alias(fy_id)}",
+                                   (os.path.join(os.path.dirname(os.path.abspath(self.db_path)), relative_path),))
+                    copy_path = os.path.join(years_dir, relative_path)
+                    copies.append((partition_alias(fy_id), copy_path, copy_path + COMPRESSIONS[compression]))
+                if year_files:
+                    # One read snapshot of every file, so the copies agree with each other
+                    source.execute("BEGIN")
+                    for name, _, _ in copies:
+                        source.execute(f"SELECT COUNT(*) FROM {name}.sqlite_master").fetchone()
+
+                for name, copy_path, final_path in copies:
+                    os.makedirs(os.path.dirname(copy_path), exist_ok=True)
+                    self._copy_database(source, name, copy_path, final_path, compact, compression, progress)
+            finally:
+                source.close()
+
+            if progress:
+                progress('checksum', 0, 1)
+            with open(backup_path + CHECKSUM_SUFFIX, 'w') as f:
+                for _, _, final_path in copies:
+                    f.write(f"{file_checksum(final_path)}  {os.path.relpath(final_path, self.backup_dir)}\n")
+            if progress:
+                progress('checksum', 1, 1)
+
+            removed = self.apply_retention(keep) if keep else 0
+            size_mb = os.path.getsize(backup_path) / (1024 * 1024)
+            message = f"Backup saved: {os.path.basename(backup_path)} ({size_mb:.1f} MB)"
+            if len(copies) > 1:
+                message += f" with {len(copies) - 1} financial year file(s)"
+            if removed:
+                message += f", {removed} old backup(s) removed"
+            print(f"[BACKUP] {message}")
+            return True, message, backup_path
+
+        except (sqlite3.Error, OSError, RuntimeError) as e:
+            print(f"[BACKUP] Error creating backup: {e}")
+            for _, copy_path, final_path in copies:
+                for path in (copy_path + '.part', copy_path + '.compact', final_path):
+                    if os.path.exists(path):
+                        os.remove(path)
+            if os.path.isdir(years_dir):
+                shutil.rmtree(years_dir)
+            return False, f"Backup failed: {e}", None
+
+    # ========================================================================
+    # LIST, VERIFY AND RETENTION
+    # ========================================================================
+
+    def list_backups(self):
+        """
+        Backups of this database, newest first
+        Returns list of dicts: path, name, created (datetime), size, compression
+        """
+        if not os.path.isdir(self.backup_dir):
+            return []
+        backups = []
+        for name in os.listdir(self.backup_dir):
+            if not name.startswith(self.stem + '_'):
+                continue
+            if not any(name.endswith('.db' + suffix) for suffix in COMPRESSIONS.values()):
+                continue
+            path = os.path.join(self.backup_dir, name)
+            stat = os.stat(path)
+            backups.append({
+                'path': path,
+                'name': name,
+                'created': datetime.fromtimestamp(stat.st_mtime),
+                'size': stat.st_size,
+                'compression': _compression_of(path),
+                'mtime_ns': stat.st_mtime_ns
+            })
+        backups.sort(key=lambda backup: (backup['mtime_ns'], backup['name']), reverse=True)
+        return backups
+
+    def verify_backup(self, backup_path):
+        """
+        Compare a backup with its checksum file
+        Returns (success: bool, message: str)
+        """
+        if not os.path.exists(backup_path + CHECKSUM_SUFFIX):
+            return False, "Checksum file missing"
+        manifest = self._manifest(backup_path)
+        for expected, path in manifest:
+            if not os.path.exists(path):
+                return False, f"{os.path.basename(path)} is missing from the backup"
+            if file_checksum(path) != expected:
+                return False, f"Checksum mismatch - {os.path.basename(path)} is damaged"
+        if len(manifest) > 1:
+            return True, f"Checksums verified ({len(manifest)} files)"
+        return True, "Checksum verified"
+
+    def apply_retention(self, keep=DEFAULT_KEEP):
+        """Delete all but the newest `keep` backups, returns the number deleted"""
+        removed = 0
+        for backup in self.list_backups()[keep:]:
+            for path in (backup['path'], backup['path'] + CHECKSUM_SUFFIX):
+                if os.path.exists(path):
+                    os.remove(path)
+            if os.path.isdir(_years_dir(backup['path'])):
+                shutil.rmtree(_years_dir(backup['path']))
+            removed += 1
+        return removed
+
+    # ========================================================================
+    # RESTORE
+    # ========================================================================
+
+    def restore_backup(self, backup_path, progress=None):
+        """
+        Replace the database with a backup; the current data is saved as a backup first
+        progress(phase, done, total): phases 'verify', 'decompress', 'backup' and
+        the create_backup phases of the safety copy, then 'restore'
+        Returns (success: bool, message: str)
+        """
+        if progress:
+            progress('verify', 0, 1)
+        verified, message = self.verify_backup(backup_path)
+        if not verified:
+            return False, message
+
+        restore_dir = os.path.join(self.backup_dir, os.path.basename(backup_path) + '.restore')
+        restore_path = os.path.join(restore_dir, os.path.basename(self.db_path))
+        live_dir = os.path.dirname(os.path.abspath(self.db_path))
+        years_dir = _years_dir(backup_path)
+        try:
+            # Main copy next to its year copies, at the paths its registry expects
+            os.makedirs(restore_dir, exist_ok=True)
+            for index, (_, path) in enumerate(self._manifest(backup_path)):
+                compression = _compression_of(path)
+                if index == 0:
+                    target_path = restore_path
+                else:
+                    relative_path = os.path.relpath(path, years_dir)
+                    target_path = os.path.join(
+                        restore_dir, relative_path[:len(relative_path) - len(COMPRESSIONS[compression])])
+                    os.makedirs(os.path.dirname(target_path), exist_ok=True)
+                _transcode(path, target_path, compression, False, progress, 'decompress')
+
+            restored = sqlite3.connect(restore_path)
+            try:
+                self._quick_check(restored)
+                year_files = self._year_files(restored)
+                for fy_id, relative_path, _status in year_files:
+                    restored.execute(f"ATTACH DATABASE ? AS {partition_alias(fy_id)}",
+                                     (os.path.join(restore_dir, relative_path),))
+                    result = restored.execute(f"PRAGMA {partition_alias(fy_id)}.quick_check").fetchone()[0]
+                    if result != 'ok':
+                        raise sqlite3.DatabaseError(f"Integrity check of {relative_path} failed: {result}")
+
+                live = sqlite3.connect(self.db_path, timeout=30)
+                try:
+                    current_files = {relative_path for _, relative_path, _ in self._year_files(live)}
+                finally:
+                    live.close()
+
+                success, message, _ = self.create_backup(compression='gzip', keep=None,
+                                                         progress=progress, tag='_pre_restore')
+                if not success:
+                    return False, f"Current data could not be saved, restore cancelled ({message})"
+
+                for fy_id, relative_path, status in year_files:
+                    live_path = os.path.join(live_dir, relative_path)
+                    if os.path.exists(live_path):
+                        os.chmod(live_path, READ_WRITE_MODE)
+                    live = sqlite3.connect(live_path, timeout=30)
+                    try:
+                        online_copy(restored, live, progress, 'restore', partition_alias(fy_id))
+                    finally:
+                        live.close()
+                    if status == 'Closed':
+                        os.chmod(live_path, READ_ONLY_MODE)
+
+                live = sqlite3.connect(self.db_path, timeout=30)
+                try:
+                    online_copy(restored, live, progress, 'restore')
+                finally:
+                    live.close()
+            finally:
+                restored.close()
+
+            # Years created after the backup was taken are not registered any more
+            for relative_path in current_files - {relative_path for _, relative_path, _ in year_files}:
+                _remove_files(os.path.join(live_dir, relative_path))
+
+            # Cached reports are keyed by data versions, which went back with the data
+            TrialBalanceHandler.clear_cache()
+            clear_fy_index()
+
+            message = f"Database restored from {os.path.basename(backup_path)}"
+            print(f"[BACKUP] {message}")
+            return True, message
+
+        except (sqlite3.Error, OSError, RuntimeError) as e:
+            print(f"[BACKUP] Error restoring backup: {e}")
+            return False, f"Restore failed: {e}"
+        finally:
+            if os.path.isdir(restore_dir):
+                shutil.rmtree(restore_dir)
@@ -4,18 +4,25 @@ Business Partner Handler - Manages business partner CRUD operations using SQLite
 
 import sqlite3
 from database.config import DB_PATH
+from database.money_schema import ensure_money_schema
+from database.partition_router import PartitionRouter
+from database.tenant_router import tenant_db_path
+from database.voucher_handler import apply_opening_balance, bump_data_version
+from utils.money import money_fields, to_paise
 
 
 class BusinessPartnerHandler:
     def __init__(self):
         self.conn = None
         self.cursor = None
+        self.router = None
 
     def connect(self):
         """Establish database connection"""
         try:
             import os
-            abs_path = os.path.abspath(DB_PATH)
+            db_path = tenant_db_path(DB_PATH)
+            abs_path = os.path.abspath(db_path)
             print(f"\n{'='*70}")
             print(f"[BUSINESS_PARTNER_HANDLER] Connecting to SQLite database...")
             print(f"[BUSINESS_PARTNER_HANDLER] Database path: {abs_path}")
@@ -24,7 +31,7 @@ class BusinessPartnerHandler:
                 print(f"[BUSINESS_PARTNER_HANDLER] File size: {os.path.getsize(abs_path)} bytes")
             print(f"{'='*70}\n")
 
-            self.conn = sqlite3.connect(DB_PATH)
+            self.conn = sqlite3.connect(db_path)
             self.conn.row_factory = sqlite3.Row
             self.cursor = self.conn.cursor()
             print(f"Successfully connected to SQLite database")
@@ -32,6 +39,10 @@ class BusinessPartnerHandler:
             # Create table if it doesn't exist
             self._create_table()
 
+            # Opening balances go to the books-start year file when the database is partitioned
+            self.router = PartitionRouter(self.conn, db_path)
+            self.router.install()
+
             return True
         except sqlite3.Error as e:
             print(f"Error connecting to SQLite: {e}")
@@ -50,10 +61,11 @@ class BusinessPartnerHandler:
                 city_id INTEGER,
                 state_id INTEGER,
                 mobile TEXT,
+                gst_number TEXT,
                 account_group_id INTEGER NOT NULL,
                 book_code_id INTEGER NOT NULL,
                 account_type_id INTEGER NOT NULL,
-                opening_balance REAL DEFAULT 0,
+                opening_balance INTEGER DEFAULT 0,
                 balance_type TEXT DEFAULT 'Debit' CHECK(balance_type IN ('Credit', 'Debit')),
                 status TEXT DEFAULT 'Active' CHECK(status IN ('Active', 'Inactive')),
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
@@ -66,7 +78,14 @@ class BusinessPartnerHandler:
             )
             """
             self.cursor.execute(create_table_query)
+
+            # Databases created before GSTINs were kept lack the column
+            self.cursor.execute("PRAGMA table_info(business_partners)")
+            if 'gst_number' not in [col['name'] for col in self.cursor.fetchall()]:
+                self.cursor.execute("ALTER TABLE business_partners ADD COLUMN gst_number TEXT")
+
             self.conn.commit()
+            ensure_money_schema(self.conn)
             print("Business Partners table created/verified successfully")
         except sqlite3.Error as e:
             print(f"Error creating business_partners table: {e}")
@@ -145,10 +164,11 @@ class BusinessPartnerHandler:
                 bp.bill_to_address,
                 bp.ship_to_address,
                 bp.city_id,
-                c.name as city_name,
+                c.city_name as city_name,
                 bp.state_id,
-                s.name as state_name,
+                s.state_name as state_name,
                 bp.mobile,
+                bp.gst_number,
                 bp.account_group_id,
                 ag.name as account_group_name,
                 bp.book_code_id,
@@ -174,7 +194,7 @@ class BusinessPartnerHandler:
             print(f"[GET_ALL_BUSINESS_PARTNERS] Raw rows fetched: {len(rows)}")
 
             # Convert sqlite3.Row objects to dictionaries
-            partners = [dict(row) for row in rows]
+            partners = [money_fields(dict(row), ('opening_balance',)) for row in rows]
 
             print(f"[GET_ALL_BUSINESS_PARTNERS] Returning {len(partners)} business partners\n")
             return partners
@@ -195,10 +215,11 @@ class BusinessPartnerHandler:
                 bp.bill_to_address,
                 bp.ship_to_address,
                 bp.city_id,
-                c.name as city_name,
+                c.city_name as city_name,
                 bp.state_id,
-                s.name as state_name,
+                s.state_name as state_name,
                 bp.mobile,
+                bp.gst_number,
                 bp.account_group_id,
                 ag.name as account_group_name,
                 bp.book_code_id,
@@ -223,7 +244,7 @@ class BusinessPartnerHandler:
             rows = self.cursor.fetchall()
 
             # Convert sqlite3.Row objects to dictionaries
-            partners = [dict(row) for row in rows]
+            partners = [money_fields(dict(row), ('opening_balance',)) for row in rows]
 
             print(f"[GET_ACTIVE_BUSINESS_PARTNERS] Returning {len(partners)} active business partners\n")
             return partners
@@ -244,10 +265,11 @@ class BusinessPartnerHandler:
                 bp.bill_to_address,
                 bp.ship_to_address,
                 bp.city_id,
-                c.name as city_name,
+                c.city_name as city_name,
                 bp.state_id,
-                s.name as state_name,
+                s.state_name as state_name,
                 bp.mobile,
+                bp.gst_number,
                 bp.account_group_id,
                 ag.name as account_group_name,
                 bp.book_code_id,
@@ -267,7 +289,7 @@ class BusinessPartnerHandler:
             """
             self.cursor.execute(query, (bp_id,))
             row = self.cursor.fetchone()
-            return dict(row) if row else None
+            return money_fields(dict(row), ('opening_balance',)) if row else None
         except sqlite3.Error as e:
             print(f"Error fetching business partner: {e}")
             return None
@@ -382,10 +404,10 @@ class BusinessPartnerHandler:
             query = """
             INSERT INTO business_partners (
                 bp_code, bp_name, bill_to_address, ship_to_address,
-                city_id, state_id, mobile, account_group_id, book_code_id,
+                city_id, state_id, mobile, gst_number, account_group_id, book_code_id,
                 account_type_id, opening_balance, balance_type, status
             ) VALUES (
-                ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?
+                ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?
             )
             """
 
@@ -397,18 +419,23 @@ class BusinessPartnerHandler:
                 bp_data.get('city_id'),
                 bp_data.get('state_id'),
                 bp_data.get('mobile', ''),
+                (bp_data.get('gst_number') or '').strip().upper(),
                 bp_data['account_group_id'],
                 bp_data['book_code_id'],
                 bp_data['account_type_id'],
-                bp_data.get('opening_balance', 0),
+                to_paise(bp_data.get('opening_balance', 0)),
                 bp_data.get('balance_type', 'Debit'),
                 bp_data.get('status', 'Active')
             )
 
             self.cursor.execute(query, values)
-            self.conn.commit()
-
             bp_id = self.cursor.lastrowid
+
+            # Keep the balance aggregate's opening row in the same transaction
+            apply_opening_balance(self.cursor, 'partner', bp_id,
+                                  bp_data.get('opening_balance', 0),
+                                  bp_data.get('balance_type', 'Debit'))
+            self.conn.commit()
             print(f"Business Partner '{bp_data['bp_name']}' created with BP code: {bp_code}")
             return True, f"Business Partner created successfully (BP Code: {bp_code})", bp_id
 
@@ -437,6 +464,7 @@ class BusinessPartnerHandler:
                 city_id = ?,
                 state_id = ?,
                 mobile = ?,
+                gst_number = ?,
                 account_group_id = ?,
                 book_code_id = ?,
                 account_type_id = ?,
@@ -454,16 +482,22 @@ class BusinessPartnerHandler:
                 bp_data.get('city_id'),
                 bp_data.get('state_id'),
                 bp_data.get('mobile', ''),
+                (bp_data.get('gst_number') or '').strip().upper(),
                 bp_data['account_group_id'],
                 bp_data['book_code_id'],
                 bp_data['account_type_id'],
-                bp_data.get('opening_balance', 0),
+                to_paise(bp_data.get('opening_balance', 0)),
                 bp_data.get('balance_type', 'Debit'),
                 bp_data.get('status', 'Active'),
                 bp_id
             )
 
             self.cursor.execute(query, values)
+
+            # Keep the balance aggregate's opening row in the same transaction
+            apply_opening_balance(self.cursor, 'partner', bp_id,
+                                  bp_data.get('opening_balance', 0),
+                                  bp_data.get('balance_type', 'Debit'))
             self.conn.commit()
 
             print(f"Business Partner ID {bp_id} updated successfully")
@@ -482,9 +516,13 @@ class BusinessPartnerHandler:
         try:
             query = "DELETE FROM business_partners WHERE id = ?"
             self.cursor.execute(query, (bp_id,))
+            deleted = self.cursor.rowcount
+
+            # Cached reports must not keep showing the deleted record
+            bump_data_version(self.cursor)
             self.conn.commit()
 
-            if self.cursor.rowcount > 0:
+            if deleted > 0:
                 print(f"Business Partner ID {bp_id} deleted successfully")
                 return True, "Business Partner deleted successfully"
             else:
@@ -0,0 +1,70 @@
+"""
+Close Financial Year
+Carries the balances of a financial year into the next one, transfers the net
+profit into a capital / reserves account and locks the year.
+See database/year_end_handler.py. An interrupted close is resumed by running
+the same command again.
+
+Usage:
+    python database/close_financial_year.py FY2425 --transfer CAP001   # close FY2425 into account CAP001
+    python database/close_financial_year.py FY2425                     # resume an interrupted close
+    python database/close_financial_year.py FY2425 --reopen            # unlock a closed year
+"""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to path to import config
+sys.path.append(str(Path(__file__).parent.parent))
+from database.year_end_handler import YearEndHandler
+
+
+def close_financial_year(fy_code, transfer_code=None, reopen=False, db_path=None):
+    """
+    Close (or reopen) the financial year fy_code
+    transfer_code: account_code of the account receiving the net profit
+    Returns True on success
+    """
+    handler = YearEndHandler(db_path)
+    if not handler.connect():
+        return False
+
+    try:
+        print("=" * 70)
+        print(f"{'REOPENING' if reopen else 'CLOSING'} FINANCIAL YEAR {fy_code}")
+        print("=" * 70)
+
+        handler.cursor.execute("SELECT id FROM financial_years WHERE fy_code = ?", (fy_code,))
+        row = handler.cursor.fetchone()
+        if not row:
+            print(f"[ERROR] Financial year {fy_code} not found")
+            return False
+
+        transfer_account_id = None
+        if transfer_code:
+            handler.cursor.execute("SELECT id FROM account_master WHERE account_code = ?", (transfer_code,))
+            account = handler.cursor.fetchone()
+            if not account:
+                print(f"[ERROR] Account {transfer_code} not found")
+                return False
+            transfer_account_id = account['id']
+
+        if reopen:
+            success, message = handler.reopen_year(row['id'])
+        else:
+            success, message = handler.close_year(row['id'], transfer_account_id)
+        print(f"[{'OK' if success else 'ERROR'}] {message}")
+        return success
+
+    finally:
+        handler.disconnect()
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if not args:
+        print(__doc__)
+        sys.exit(1)
+    transfer = args[args.index('--transfer') + 1] if '--transfer' in args[:-1] else None
+    ok = close_financial_year(args[0], transfer, reopen='--reopen' in args)
+    sys.exit(0 if ok else 1)
@@ -1,50 +1,78 @@
-import mysql.connector
 from mysql.connector import Error
 from database.config import DB_CONFIG
+from database.mysql_pool import get_pool
+
+
+# Rows per executemany() call in create_many / update_many
+BATCH_SIZE = 500
+
+# Rows fetched per round trip by iter_all
+FETCH_SIZE = 1000
 
 
 class EntityHandler:
     """Template handler for any database entity"""
-    
-    def __init__(self):
-        self.connection = None
-        self.cursor = None
+
+    def __init__(self, config=None):
+        self.config = config or DB_CONFIG
+        self.pool = None
 
     def connect(self):
-        """Establish database connection"""
+        """Set up the shared connection pool; each call checks out its own connection"""
         try:
-            self.connection = mysql.connector.connect(**DB_CONFIG)
-            if self.connection.is_connected():
-                self.cursor = self.connection.cursor(dictionary=True)
-                print("Database connected successfully")
-                return True
+            self.pool = get_pool(self.config)
+            print("Database connected successfully")
+            return True
         except Error as e:
             print(f"Connection error: {e}")
             return False
 
     def disconnect(self):
-        """Close database connection"""
-        if self.connection and self.connection.is_connected():
-            if self.cursor:
-                self.cursor.close()
-            self.connection.close()
+        """Release the handler; pooled connections stay open for other handlers"""
+        self.pool = None
 
     def get_all(self, table_name):
         """Get all records"""
         try:
-            query = f"SELECT * FROM {table_name} ORDER BY created_at DESC"
-            self.cursor.execute(query)
-            return self.cursor.fetchall() if self.cursor.rowcount > 0 else []
+            with self.pool.connection() as connection:
+                cursor = connection.cursor(dictionary=True)
+                cursor.execute(f"SELECT * FROM {table_name} ORDER BY created_at DESC")
+                return cursor.fetchall()
         except Error as e:
             print(f"Error fetching data: {e}")
             return []
 
+    def iter_all(self, table_name, fetch_size=FETCH_SIZE):
+        """
+        Stream all records in id order without loading the table into memory
+        Uses an unbuffered cursor, the connection is held until the iteration ends.
+        A consumer that stops early (break, close()) leaves rows unread: they are
+        drained before the connection goes back to the pool.
+        """
+        try:
+            with self.pool.connection() as connection:
+                cursor = connection.cursor(dictionary=True, buffered=False)
+                try:
+                    cursor.execute(f"SELECT * FROM {table_name} ORDER BY id")
+                    while True:
+                        rows = cursor.fetchmany(fetch_size)
+                        if not rows:
+                            break
+                        yield from rows
+                finally:
+                    if connection.unread_result:
+                        connection.consume_results()
+                    cursor.close()
+        except Error as e:
+            print(f"Error streaming data: {e}")
+
     def get_by_id(self, table_name, entity_id):
         """Get single record by ID"""
         try:
-            query = f"SELECT * FROM {table_name} WHERE id = %s"
-            self.cursor.execute(query, (entity_id,))
-            return self.cursor.fetchone()
+            with self.pool.connection() as connection:
+                cursor = connection.cursor(dictionary=True)
+                cursor.execute(f"SELECT * FROM {table_name} WHERE id = %s", (entity_id,))
+                return cursor.fetchone()
         except Error as e:
             print(f"Error fetching record: {e}")
             return None
@@ -55,41 +83,90 @@ class EntityHandler:
             columns = ', '.join(data.keys())
             placeholders = ', '.join(['%s'] * len(data))
             query = f"INSERT INTO {table_name} ({columns}) VALUES ({placeholders})"
-            
-            self.cursor.execute(query, tuple(data.values()))
-            self.connection.commit()
-            
-            return True, "Record created successfully", self.cursor.lastrowid
+
+            with self.pool.connection() as connection:
+                cursor = connection.cursor()
+                cursor.execute(query, tuple(data.values()))
+                connection.commit()
+                return True, "Record created successfully", cursor.lastrowid
         except Error as e:
-            self.connection.rollback()
             return False, f"Error: {str(e)}", None
 
+    def create_many(self, table_name, records, batch_size=BATCH_SIZE):
+        """
+        Create many records in one transaction; all records must have the same keys
+        executemany() sends each batch as a single multi-row INSERT.
+        Returns (success, message, count)
+        """
+        if not records:
+            return True, "No records to create", 0
+        columns = list(records[0].keys())
+        query = (f"INSERT INTO {table_name} ({', '.join(columns)}) "
+                 f"VALUES ({', '.join(['%s'] * len(columns))})")
+        try:
+            with self.pool.connection() as connection:
+                cursor = connection.cursor()
+                for start in range(0, len(records), batch_size):
+                    batch = records[start:start + batch_size]
+                    cursor.executemany(query, [tuple(record[column] for column in columns)
+                                               for record in batch])
+                connection.commit()
+            return True, f"{len(records)} records created successfully", len(records)
+        except (Error, KeyError) as e:
+            return False, f"Error: {str(e)}", 0
+
     def update(self, table_name, entity_id, data):
         """Update existing record"""
         try:
             set_clause = ', '.join([f"{k} = %s" for k in data.keys()])
             query = f"UPDATE {table_name} SET {set_clause} WHERE id = %s"
-            
+
             values = list(data.values()) + [entity_id]
-            self.cursor.execute(query, tuple(values))
-            self.connection.commit()
-            
+            with self.pool.connection() as connection:
+                cursor = connection.cursor()
+                cursor.execute(query, tuple(values))
+                connection.commit()
+
             return True, "Record updated successfully"
         except Error as e:
-            self.connection.rollback()
             return False, f"Error: {str(e)}"
 
+    def update_many(self, table_name, updates, batch_size=BATCH_SIZE):
+        """
+        Update many records in one transaction
+        updates: list of (entity_id, data); records changing the same columns
+        share one executemany() statement
+        Returns (success, message, count)
+        """
+        statements = {}
+        for entity_id, data in updates:
+            columns = tuple(data.keys())
+            statements.setdefault(columns, []).append(tuple(data.values()) + (entity_id,))
+        try:
+            with self.pool.connection() as connection:
+                cursor = connection.cursor()
+                for columns, params in statements.items():
+                    set_clause = ', '.join([f"{k} = %s" for k in columns])
+                    query = f"UPDATE {table_name} SET {set_clause} WHERE id = %s"
+                    for start in range(0, len(params), batch_size):
+                        cursor.executemany(query, params[start:start + batch_size])
+                connection.commit()
+            return True, f"{len(updates)} records updated successfully", len(updates)
+        except Error as e:
+            return False, f"Error: {str(e)}", 0
+
     def delete(self, table_name, entity_id):
         """Delete record"""
         try:
-            query = f"DELETE FROM {table_name} WHERE id = %s"
-            self.cursor.execute(query, (entity_id,))
-            self.connection.commit()
-            
-            if self.cursor.rowcount > 0:
+            with self.pool.connection() as connection:
+                cursor = connection.cursor()
+                cursor.execute(f"DELETE FROM {table_name} WHERE id = %s", (entity_id,))
+                connection.commit()
+                deleted = cursor.rowcount
+
+            if deleted > 0:
                 return True, "Record deleted successfully"
             else:
                 return False, "Record not found"
         except Error as e:
-            self.connection.rollback()
-            return False, f"Error: {str(e)}"
\ No newline at end of file
+            return False, f"Error: {str(e)}"
@@ -0,0 +1,199 @@
+"""
+Financial Statement Handler - Trading Account, Profit & Loss and Balance Sheet
+
+Statements are built from the account_balances aggregate, never from voucher lines:
+    - the statement an account belongs to comes from its account group's
+      account_group_type (Trading A/C, P&L Account, Balance Sheet), falling back to
+      the account type's category (profit_loss / balance_sheet)
+    - the side it is shown on comes from the account type's nature (debit / credit)
+
+Several financial years are computed by the same query: balances are pivoted into
+one amount column per requested year so that years can be compared side by side.
+The sums are exact integer paise; amounts are returned as Money.
+"""
+
+import sqlite3
+from database.config import DB_PATH
+from database.money_schema import ensure_money_schema
+from database.partition_router import PartitionRouter
+from database.tenant_router import tenant_db_path
+from utils.money import Money
+
+
+STATEMENTS = ('trading', 'profit_loss', 'balance_sheet')
+
+# Statement of an account, from its group (ag) and account type (at)
+STATEMENT_CASE = """CASE ag.account_group_type
+               WHEN 'Trading A/C' THEN 'trading'
+               WHEN 'P&L Account' THEN 'profit_loss'
+               WHEN 'Balance Sheet' THEN 'balance_sheet'
+               ELSE CASE WHEN at.category = 'profit_loss' THEN 'profit_loss' ELSE 'balance_sheet' END
+           END"""
+
+# {fy_columns} expands to one "SUM(CASE WHEN fy_id = ? ...) AS fy_<n>" column per year
+STATEMENT_QUERY = """
+WITH bal AS (
+    SELECT account_kind, account_id, fy_id,
+           SUM(opening_balance + debit_total - credit_total) AS closing_balance
+    FROM account_balances
+    WHERE fy_id IN ({fy_placeholders})
+    GROUP BY account_kind, account_id, fy_id
+),
+classified AS (
+    SELECT b.fy_id,
+           b.closing_balance,
+           ag.id AS account_group_id,
+           ag.name AS account_group_name,
+           {statement_case} AS statement,
+           COALESCE(at.nature, 'debit') AS nature
+    FROM bal b
+    LEFT JOIN account_master am ON b.account_kind = 'account' AND am.id = b.account_id
+    LEFT JOIN business_partners bp ON b.account_kind = 'partner' AND bp.id = b.account_id
+    LEFT JOIN account_groups ag ON ag.id = COALESCE(am.account_group_id, bp.account_group_id)
+    LEFT JOIN account_types at ON at.id = COALESCE(am.account_type_id, bp.account_type_id)
+)
+SELECT statement, nature, account_group_id, account_group_name,
+       {fy_columns}
+FROM classified
+GROUP BY statement, nature, account_group_id
+ORDER BY statement, nature, account_group_name
+"""
+
+
+class FinancialStatementHandler:
+    def __init__(self, db_path=None):
+        self.db_path = db_path or tenant_db_path(DB_PATH)
+        self.conn = None
+        self.cursor = None
+        self.router = None
+
+    def connect(self):
+        """Establish database connection"""
+        try:
+            self.conn = sqlite3.connect(self.db_path)
+            self.conn.row_factory = sqlite3.Row
+            self.cursor = self.conn.cursor()
+            print("Successfully connected to SQLite database")
+            ensure_money_schema(self.conn)
+
+            # Financial year files, when the database is partitioned
+            self.router = PartitionRouter(self.conn, self.db_path)
+            self.router.install()
+            return True
+        except sqlite3.Error as e:
+            print(f"Error connecting to SQLite: {e}")
+            return False
+
+    def disconnect(self):
+        """Close database connection"""
+        if self.conn:
+            self.conn.close()
+            print("SQLite connection closed")
+
+    def get_statements(self, fy_ids):
+        """
+        Build Trading Account, Profit & Loss and Balance Sheet for one or more financial years
+        fy_ids: a financial year id or a list of ids (one amount column per year, in that order)
+
+        Returns dict:
+            fy_ids        - the requested years
+            trading / profit_loss / balance_sheet:
+                debit     - lines on the debit side (purchases, expenses, assets)
+                credit    - lines on the credit side (sales, incomes, liabilities)
+                          each line: account_group_id, account_group_name, amounts[per year]
+                debit_total / credit_total - per year
+            summary       - per year: gross_profit, net_profit, total_assets,
+                            total_liabilities (including net profit), difference
+        Amounts are shown in the direction of the side (a debit-side line is Dr positive).
+        Returns None on database errors.
+        """
+        if isinstance(fy_ids, int):
+            fy_ids = [fy_ids]
+        fy_ids = list(fy_ids)
+        if not fy_ids:
+            return None
+        try:
+            self.router.require(fy_ids)
+        except sqlite3.Error as e:
+            print(f"Error attaching financial years: {e}")
+            return None
+
+        fy_columns = ",\n       ".join(
+            f"SUM(CASE WHEN fy_id = ? THEN closing_balance ELSE 0 END) AS fy_{idx}"
+            for idx in range(len(fy_ids))
+        )
+        query = STATEMENT_QUERY.format(
+            statement_case=STATEMENT_CASE,
+            fy_placeholders=', '.join('?' * len(fy_ids)),
+            fy_columns=fy_columns
+        )
+
+        try:
+            self.cursor.execute(query, fy_ids + fy_ids)
+            rows = self.cursor.fetchall()
+        except sqlite3.Error as e:
+            print(f"[STATEMENTS] Error building financial statements: {e}")
+            return None
+
+        year_count = len(fy_ids)
+        statements = {
+            name: {
+                'debit': [],
+                'credit': [],
+                'debit_total': [Money()] * year_count,
+                'credit_total': [Money()] * year_count
+            }
+            for name in STATEMENTS
+        }
+
+        for row in rows:
+            side = 'credit' if row['nature'] == 'credit' else 'debit'
+            sign = -1 if side == 'credit' else 1
+            amounts = [Money(sign * (row[f'fy_{idx}'] or 0)) for idx in range(year_count)]
+
+            statement = statements[row['statement']]
+            statement[side].append({
+                'account_group_id': row['account_group_id'],
+                'account_group_name': row['account_group_name'] or 'Ungrouped',
+                'amounts': amounts
+            })
+            statement[f'{side}_total'] = [
+                total + amount for total, amount in zip(statement[f'{side}_total'], amounts)
+            ]
+
+        summary = []
+        for idx in range(year_count):
+            trading = statements['trading']
+            profit_loss = statements['profit_loss']
+            balance_sheet = statements['balance_sheet']
+
+            gross_profit = trading['credit_total'][idx] - trading['debit_total'][idx]
+            net_profit = gross_profit + profit_loss['credit_total'][idx] - profit_loss['debit_total'][idx]
+            total_assets = balance_sheet['debit_total'][idx]
+            total_liabilities = balance_sheet['credit_total'][idx] + net_profit
+
+            summary.append({
+                'fy_id': fy_ids[idx],
+                'gross_profit': gross_profit,
+                'net_profit': net_profit,
+                'total_assets': total_assets,
+                'total_liabilities': total_liabilities,
+                'difference': total_assets - total_liabilities
+            })
+
+        return dict(statements, fy_ids=fy_ids, summary=summary)
+
+    def get_trading_account(self, fy_ids):
+        """Trading Account only (see get_statements)"""
+        statements = self.get_statements(fy_ids)
+        return statements['trading'] if statements else None
+
+    def get_profit_and_loss(self, fy_ids):
+        """Profit & Loss Account only (see get_statements)"""
+        statements = self.get_statements(fy_ids)
+        return statements['profit_loss'] if statements else None
+
+    def get_balance_sheet(self, fy_ids):
+        """Balance Sheet only (see get_statements)"""
+        statements = self.get_statements(fy_ids)
+        return statements['balance_sheet'] if statements else None
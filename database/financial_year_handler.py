@@ -4,6 +4,17 @@ Financial Year Handler - Manages financial year CRUD operations using SQLite
 
 import sqlite3
 from database.config import DB_PATH
+from database.fy_index import FY_DATA_VERSION
+from database.tenant_router import tenant_db_path
+from database.voucher_handler import bump_data_version
+
+
+def ensure_fy_lock_column(cursor):
+    """Add financial_years.is_locked (set by year-end close) to databases created without it"""
+    cursor.execute("PRAGMA table_info(financial_years)")
+    columns = [col[1] for col in cursor.fetchall()]
+    if columns and 'is_locked' not in columns:
+        cursor.execute("ALTER TABLE financial_years ADD COLUMN is_locked INTEGER DEFAULT 0")
 
 
 class FinancialYearHandler:
@@ -15,7 +26,8 @@ class FinancialYearHandler:
         """Establish database connection"""
         try:
             import os
-            abs_path = os.path.abspath(DB_PATH)
+            db_path = tenant_db_path(DB_PATH)
+            abs_path = os.path.abspath(db_path)
             print(f"\n{'='*70}")
             print(f"[FY_HANDLER] Connecting to SQLite database...")
             print(f"[FY_HANDLER] Database path: {abs_path}")
@@ -24,7 +36,7 @@ class FinancialYearHandler:
                 print(f"[FY_HANDLER] File size: {os.path.getsize(abs_path)} bytes")
             print(f"{'='*70}\n")
 
-            self.conn = sqlite3.connect(DB_PATH)
+            self.conn = sqlite3.connect(db_path)
             self.conn.row_factory = sqlite3.Row
             self.cursor = self.conn.cursor()
             print(f"✓ Successfully connected to SQLite database")
@@ -51,11 +63,18 @@ class FinancialYearHandler:
                 start_date DATE NOT NULL,
                 end_date DATE NOT NULL,
                 status TEXT DEFAULT 'Active' CHECK(status IN ('Active', 'Inactive')),
+                is_locked INTEGER DEFAULT 0,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
             """
             self.cursor.execute(create_table_query)
+            ensure_fy_lock_column(self.cursor)
+            # Overlap checks and date lookups range-scan start_date
+            self.cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_financial_years_dates
+            ON financial_years(start_date, end_date)
+            """)
             self.conn.commit()
             print("Financial years table created/verified successfully")
         except sqlite3.Error as e:
@@ -93,7 +112,7 @@ class FinancialYearHandler:
         """Get all financial years with their details"""
         try:
             query = """
-            SELECT id, fy_code, display_name, start_date, end_date, status, created_at
+            SELECT id, fy_code, display_name, start_date, end_date, status, is_locked, created_at
             FROM financial_years
             ORDER BY start_date DESC
             """
@@ -129,7 +148,7 @@ class FinancialYearHandler:
         """Get a single financial year by ID"""
         try:
             query = """
-            SELECT id, fy_code, display_name, start_date, end_date, status
+            SELECT id, fy_code, display_name, start_date, end_date, status, is_locked
             FROM financial_years
             WHERE id = ?
             """
@@ -152,33 +171,20 @@ class FinancialYearHandler:
             return None
 
     def check_date_overlap(self, start_date, end_date, exclude_id=None):
-        """Check if date range overlaps with existing financial years"""
+        """
+        Check if date range overlaps with existing financial years
+        Two periods overlap when each starts on or before the other ends, so a
+        single range scan of idx_financial_years_dates finds the latest such year.
+        """
         try:
-            if exclude_id:
-                query = """
-                SELECT id, fy_code, display_name
-                FROM financial_years
-                WHERE id != ? AND (
-                    (start_date <= ? AND end_date >= ?) OR
-                    (start_date <= ? AND end_date >= ?) OR
-                    (start_date >= ? AND end_date <= ?)
-                )
-                """
-                self.cursor.execute(query, (exclude_id, start_date, start_date,
-                                           end_date, end_date, start_date, end_date))
-            else:
-                query = """
-                SELECT id, fy_code, display_name
-                FROM financial_years
-                WHERE (
-                    (start_date <= ? AND end_date >= ?) OR
-                    (start_date <= ? AND end_date >= ?) OR
-                    (start_date >= ? AND end_date <= ?)
-                )
-                """
-                self.cursor.execute(query, (start_date, start_date,
-                                           end_date, end_date, start_date, end_date))
-
+            query = """
+            SELECT id, fy_code, display_name
+            FROM financial_years
+            WHERE start_date <= ? AND end_date >= ? AND id IS NOT ?
+            ORDER BY start_date DESC
+            LIMIT 1
+            """
+            self.cursor.execute(query, (end_date, start_date, exclude_id))
             row = self.cursor.fetchone()
             return dict(row) if row else None
         except sqlite3.Error as e:
@@ -221,9 +227,10 @@ class FinancialYearHandler:
             )
 
             self.cursor.execute(query, values)
+            fy_id = self.cursor.lastrowid
+            bump_data_version(self.cursor, FY_DATA_VERSION)
             self.conn.commit()
 
-            fy_id = self.cursor.lastrowid
             print(f"Financial Year '{fy_data['display_name']}' created successfully")
             return True, "Financial Year created successfully", fy_id
 
@@ -243,6 +250,11 @@ class FinancialYearHandler:
             if not existing:
                 return False, "Financial Year not found"
 
+            # A closed year's period is fixed (see database/year_end_handler.py)
+            if existing['is_locked'] and (existing['start_date'], existing['end_date']) != \
+                    (fy_data['start_date'], fy_data['end_date']):
+                return False, f"Financial Year {existing['fy_code']} is locked"
+
             # Check if FY code is being changed and if new code already exists
             if existing['fy_code'] != fy_data['fy_code']:
                 if self.get_financial_year_by_code(fy_data['fy_code']):
@@ -282,6 +294,7 @@ class FinancialYearHandler:
             )
 
             self.cursor.execute(query, values)
+            bump_data_version(self.cursor, FY_DATA_VERSION)
             self.conn.commit()
 
             print(f"Financial Year ID {fy_id} updated successfully")
@@ -298,11 +311,18 @@ class FinancialYearHandler:
         Returns (success: bool, message: str)
         """
         try:
+            existing = self.get_financial_year_by_id(fy_id)
+            if existing and existing['is_locked']:
+                return False, f"Financial Year {existing['fy_code']} is locked"
+
             query = "DELETE FROM financial_years WHERE id = ?"
             self.cursor.execute(query, (fy_id,))
+            deleted = self.cursor.rowcount
+            if deleted:
+                bump_data_version(self.cursor, FY_DATA_VERSION)
             self.conn.commit()
 
-            if self.cursor.rowcount > 0:
+            if deleted > 0:
                 print(f"Financial Year ID {fy_id} deleted successfully")
                 return True, "Financial Year deleted successfully"
             else:
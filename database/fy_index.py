@@ -0,0 +1,126 @@
+"""
+Financial Year Index - Sorted interval index of financial_years for date lookups
+
+Every voucher, invoice and ledger query maps a date to the financial year that
+contains it. Financial years never overlap (FinancialYearHandler refuses it),
+so the years sorted by start_date form a list of disjoint intervals and the
+year of a date is found with one bisect over the start dates:
+
+    starts = ['2023-04-01', '2024-04-01', '2025-04-01']
+    bisect_right(starts, '2024-11-15') - 1  -> 1  (FY2425, if its end_date >= the date)
+
+The index is cached per database file and tagged with the financial-year data
+version (balance_versions row FY_DATA_VERSION), which FinancialYearHandler bumps
+on every create, update and delete. A lookup costs one primary-key read of that
+version plus the bisect; find_many() (VoucherHandler.get_financial_years_for_dates)
+resolves any number of dates against one read of the version.
+"""
+
+import os
+import sqlite3
+from bisect import bisect_right
+
+
+# balance_versions key bumped whenever a financial year is created, changed or deleted
+FY_DATA_VERSION = -1
+
+# {database path: FinancialYearIndex}
+_FY_INDEX_CACHE = {}
+
+# Counters for how indexes were served (cached, rebuilt)
+CACHE_STATS = {'hits': 0, 'misses': 0}
+
+
+class FinancialYearIndex:
+    """Financial years sorted by start_date with bisect lookups"""
+
+    def __init__(self, years, version=0):
+        self.years = sorted(years, key=lambda fy: fy['start_date'])
+        self.starts = [fy['start_date'] for fy in self.years]
+        self.version = version
+
+    def _position(self, on_date):
+        position = bisect_right(self.starts, on_date) - 1
+        if position >= 0 and self.years[position]['end_date'] >= on_date:
+            return position
+        return None
+
+    def find(self, on_date):
+        """Copy of the financial year dict containing on_date, or None"""
+        position = self._position(str(on_date))
+        return None if position is None else dict(self.years[position])
+
+    def find_many(self, dates):
+        """
+        Return {date: financial year dict or None} for an iterable of dates
+        Dates of the same year share one dict.
+        """
+        found = {}
+        copies = {}
+        for on_date in dates:
+            if on_date in found:
+                continue
+            position = self._position(str(on_date))
+            if position is not None and position not in copies:
+                copies[position] = dict(self.years[position])
+            found[on_date] = copies.get(position)
+        return found
+
+    def overlapping(self, start_date, end_date, exclude_id=None):
+        """First financial year whose period overlaps start_date..end_date, or None"""
+        start_date, end_date = str(start_date), str(end_date)
+        # Only years starting on or before end_date can overlap; with disjoint
+        # years the later of them also ends last
+        position = bisect_right(self.starts, end_date) - 1
+        while position >= 0:
+            fy = self.years[position]
+            if fy['end_date'] < start_date:
+                return None
+            if fy['id'] != exclude_id:
+                return dict(fy)
+            position -= 1
+        return None
+
+
+def _cache_key(cursor):
+    """Absolute path of the main database file of cursor's connection"""
+    cursor.execute("PRAGMA database_list")
+    path = next(row[2] for row in cursor.fetchall() if row[1] == 'main')
+    return os.path.abspath(path) if path else id(cursor.connection)
+
+
+def _fy_version(cursor):
+    try:
+        cursor.execute("SELECT version FROM balance_versions WHERE fy_id = ?", (FY_DATA_VERSION,))
+    except sqlite3.OperationalError:
+        # Version table not created yet: no voucher handler has run on this file
+        return None
+    row = cursor.fetchone()
+    return row[0] if row else 0
+
+
+def get_fy_index(cursor, db_path=None):
+    """
+    Return the FinancialYearIndex of the database cursor is connected to,
+    rebuilding it only when the financial years changed since it was cached
+    """
+    key = os.path.abspath(db_path) if db_path else _cache_key(cursor)
+    version = _fy_version(cursor)
+    index = _FY_INDEX_CACHE.get(key)
+    if index is not None and version is not None and index.version == version:
+        CACHE_STATS['hits'] += 1
+        return index
+    CACHE_STATS['misses'] += 1
+
+    # All columns: is_locked is missing until FinancialYearHandler has upgraded the file
+    cursor.execute("SELECT * FROM financial_years")
+    columns = [col[0] for col in cursor.description]
+    index = FinancialYearIndex([dict(zip(columns, row)) for row in cursor.fetchall()], version)
+    if version is not None:
+        _FY_INDEX_CACHE[key] = index
+    return index
+
+
+def clear_fy_index():
+    """Drop every cached index (tests, or after editing financial_years outside the handlers)"""
+    _FY_INDEX_CACHE.clear()
@@ -0,0 +1,434 @@
+"""
+GST Report Handler - HSN-wise outward supply summary and GSTR-1 export using SQLite
+
+Both are built from sales_invoice_lines, whose taxable value and CGST/SGST/IGST are
+stored per line in paise at the time of sale, so a return never re-prices an invoice.
+Grouping is done by SQLite (GROUP BY over the month's invoices, found through the
+(company_id, fy_id, invoice_date) index); Python only sees one row per group:
+    hsn        - per HSN code, unit and GST rate
+    b2b        - per invoice and rate, customers with a GSTIN
+    b2cl       - per invoice and rate, inter-state invoices to unregistered customers
+                 above the B2C Large limit
+    b2cs       - per supply type, place of supply and rate, other unregistered sales
+    nil        - 0% lines per supply type
+    doc_issue  - invoice number range, count and cancellations per series
+Rows are read in batches and the JSON is written section by section as they
+arrive, so memory stays flat however many invoices the month has.
+
+Amounts in the export are rupees with two decimals, dates dd-mm-yyyy and places of
+supply the two-digit GST state codes, as the GST portal's offline tool expects.
+"""
+
+import calendar
+import json
+import sqlite3
+from datetime import date
+from itertools import groupby
+from operator import itemgetter
+from database.config import DB_PATH
+from database.money_schema import ensure_money_schema
+from database.partition_router import PartitionRouter
+from database.tenant_router import tenant_db_path
+from utils.money import Money, money_fields
+
+
+GSTR1_VERSION = 'GST3.0.4'
+
+# Rows fetched per round trip while streaming
+STREAM_BATCH_SIZE = 2000
+
+# Invoice value above which an inter-state sale to an unregistered customer is
+# reported invoice-wise (B2C Large): Rs 1 lakh from August 2024, Rs 2.5 lakh before
+B2CL_LIMIT = 10000000
+B2CL_LIMIT_BEFORE_AUG_2024 = 25000000
+
+# Posted invoices of a return period; the fy_id term lets the date range use the
+# (company_id, fy_id, invoice_date) index
+PERIOD_FILTER = """
+    si.company_id = :company_id AND si.fy_id = :fy_id
+    AND si.invoice_date BETWEEN :date_from AND :date_to
+    AND si.status = 'Posted'
+"""
+
+HSN_MONEY_FIELDS = ('total_value', 'taxable_amount', 'igst_amount', 'cgst_amount', 'sgst_amount')
+
+# State name -> GST state code (place of supply)
+GST_STATE_CODES = {
+    'jammu and kashmir': '01', 'himachal pradesh': '02', 'punjab': '03', 'chandigarh': '04',
+    'uttarakhand': '05', 'haryana': '06', 'delhi': '07', 'rajasthan': '08',
+    'uttar pradesh': '09', 'bihar': '10', 'sikkim': '11', 'arunachal pradesh': '12',
+    'nagaland': '13', 'manipur': '14', 'mizoram': '15', 'tripura': '16',
+    'meghalaya': '17', 'assam': '18', 'west bengal': '19', 'jharkhand': '20',
+    'odisha': '21', 'chhattisgarh': '22', 'madhya pradesh': '23', 'gujarat': '24',
+    'dadra and nagar haveli and daman and diu': '26', 'maharashtra': '27',
+    'karnataka': '29', 'goa': '30', 'lakshadweep': '31', 'kerala': '32',
+    'tamil nadu': '33', 'puducherry': '34', 'andaman and nicobar islands': '35',
+    'telangana': '36', 'andhra pradesh': '37', 'ladakh': '38', 'other territory': '97'
+}
+
+
+def gst_state_code(state_name, fallback=''):
+    """Two-digit GST code of a state name ('' / fallback when unknown)"""
+    return GST_STATE_CODES.get((state_name or '').strip().lower(), fallback)
+
+
+def _rupees(paise):
+    """Paise as a JSON rupee number"""
+    return paise / 100
+
+
+def _portal_date(iso_date):
+    """yyyy-mm-dd -> dd-mm-yyyy"""
+    return f"{iso_date[8:10]}-{iso_date[5:7]}-{iso_date[0:4]}"
+
+
+def _write_array(out, objects):
+    """Write an iterable of JSON-able objects as the elements of an array, returns the count"""
+    count = 0
+    for obj in objects:
+        out.write(',' if count else '')
+        out.write(json.dumps(obj, separators=(',', ':')))
+        count += 1
+    return count
+
+
+class GstReportHandler:
+    def __init__(self, db_path=None):
+        self.db_path = db_path or tenant_db_path(DB_PATH)
+        self.conn = None
+        self.cursor = None
+        self.router = None
+
+    def connect(self):
+        """Establish database connection"""
+        try:
+            self.conn = sqlite3.connect(self.db_path)
+            self.conn.row_factory = sqlite3.Row
+            self.cursor = self.conn.cursor()
+            ensure_money_schema(self.conn)
+            print("Successfully connected to SQLite database")
+
+            # Financial year files, when the database is partitioned
+            self.router = PartitionRouter(self.conn, self.db_path)
+            self.router.install()
+            return True
+        except sqlite3.Error as e:
+            print(f"Error connecting to SQLite: {e}")
+            return False
+
+    def disconnect(self):
+        """Close database connection"""
+        if self.conn:
+            self.conn.close()
+            print("SQLite connection closed")
+
+    # ========================================================================
+    # HELPERS
+    # ========================================================================
+
+    def _stream(self, query, params):
+        """Yield the rows of a query in batches on its own cursor"""
+        cursor = self.conn.execute(query, params)
+        try:
+            while True:
+                rows = cursor.fetchmany(STREAM_BATCH_SIZE)
+                if not rows:
+                    return
+                yield from rows
+        finally:
+            cursor.close()
+
+    def _period(self, company_id, date_from, date_to):
+        """
+        Query parameters of a return period, which must lie inside one financial year
+        Returns dict (company_id, fy_id, date_from, date_to, company_state) or None
+        """
+        self.cursor.execute("""
+            SELECT fy.id AS fy_id, c.state AS company_state
+            FROM financial_years fy, companies c
+            WHERE ? BETWEEN fy.start_date AND fy.end_date
+              AND ? BETWEEN fy.start_date AND fy.end_date
+              AND c.id = ?
+        """, (str(date_from), str(date_to), company_id))
+        row = self.cursor.fetchone()
+        if not row:
+            return None
+        self.router.require([row['fy_id']])
+        return {'company_id': company_id, 'fy_id': row['fy_id'], 'date_from': str(date_from),
+                'date_to': str(date_to), 'company_state': row['company_state']}
+
+    # ========================================================================
+    # HSN SUMMARY
+    # ========================================================================
+
+    def _hsn_rows(self, period):
+        """HSN / unit / rate groups of the period, streamed"""
+        # Lines are first summed per item (a narrow integer sort key), then the few
+        # thousand item rows are grouped by HSN code and the item's unit
+        return self._stream(f"""
+            SELECT COALESCE(NULLIF(g.hsn_code, ''), 'NA') AS hsn_code,
+                   MIN(g.item_name) AS description,
+                   UPPER(COALESCE(NULLIF(i.uom_code, ''), 'OTH')) AS uqc,
+                   g.gst_percentage,
+                   ROUND(SUM(g.quantity), 3) AS quantity,
+                   SUM(g.total_value) AS total_value,
+                   SUM(g.taxable_amount) AS taxable_amount,
+                   SUM(g.igst_amount) AS igst_amount,
+                   SUM(g.cgst_amount) AS cgst_amount,
+                   SUM(g.sgst_amount) AS sgst_amount
+            FROM (
+                SELECT l.item_id, l.hsn_code, l.gst_percentage,
+                       MIN(l.item_name) AS item_name,
+                       SUM(l.quantity) AS quantity,
+                       SUM(l.line_total) AS total_value,
+                       SUM(l.taxable_amount) AS taxable_amount,
+                       SUM(l.igst_amount) AS igst_amount,
+                       SUM(l.cgst_amount) AS cgst_amount,
+                       SUM(l.sgst_amount) AS sgst_amount
+                FROM sales_invoices si
+                JOIN sales_invoice_lines l ON l.invoice_id = si.id
+                WHERE {PERIOD_FILTER}
+                GROUP BY l.item_id, l.hsn_code, l.gst_percentage
+            ) g
+            LEFT JOIN items i ON i.id = g.item_id
+            GROUP BY 1, 3, g.gst_percentage
+            ORDER BY 1, 3, g.gst_percentage
+        """, period)
+
+    def get_hsn_summary(self, company_id, date_from, date_to):
+        """
+        HSN-wise summary of outward supplies of a company between two dates
+        Returns dict with rows (hsn_code, description, uqc, gst_percentage, quantity,
+        total_value, taxable_amount, igst_amount, cgst_amount, sgst_amount) and totals,
+        amounts as Money; None if the dates are not inside one financial year.
+        """
+        try:
+            period = self._period(company_id, date_from, date_to)
+            if not period:
+                return None
+
+            rows = []
+            totals = dict.fromkeys(HSN_MONEY_FIELDS, 0)
+            for row in self._hsn_rows(period):
+                row = dict(row)
+                for field in HSN_MONEY_FIELDS:
+                    totals[field] += row[field]
+                rows.append(money_fields(row, HSN_MONEY_FIELDS))
+
+            return {'rows': rows, 'totals': {field: Money(total) for field, total in totals.items()}}
+        except sqlite3.Error as e:
+            print(f"[GST] Error building HSN summary: {e}")
+            return None
+
+    # ========================================================================
+    # GSTR-1 SECTIONS
+    # ========================================================================
+
+    def _invoice_rate_rows(self, period, where, order):
+        """Taxable rate groups of each matching invoice, streamed in `order`"""
+        return self._stream(f"""
+            SELECT si.id, si.invoice_no, si.invoice_date, si.total_amount,
+                   COALESCE(bp.gst_number, '') AS ctin, s.state_name,
+                   l.gst_percentage AS rate,
+                   SUM(l.taxable_amount) AS taxable_amount,
+                   SUM(l.igst_amount) AS igst_amount,
+                   SUM(l.cgst_amount) AS cgst_amount,
+                   SUM(l.sgst_amount) AS sgst_amount
+            FROM sales_invoices si
+            JOIN sales_invoice_lines l ON l.invoice_id = si.id
+            JOIN business_partners bp ON bp.id = si.partner_id
+            LEFT JOIN states s ON s.id = bp.state_id
+            WHERE {PERIOD_FILTER} AND l.gst_percentage > 0 AND {where}
+            GROUP BY si.id, l.gst_percentage
+            ORDER BY {order}, si.id, l.gst_percentage
+        """, period)
+
+    def _invoices(self, rows, company_pos, with_intra_tax=True):
+        """Fold consecutive rate rows into GSTR-1 invoice objects: (group key row, invoice)"""
+        for _invoice_id, rate_rows in groupby(rows, key=itemgetter('id')):
+            rate_rows = list(rate_rows)
+            first = rate_rows[0]
+            items = []
+            for num, row in enumerate(rate_rows, 1):
+                detail = {'txval': _rupees(row['taxable_amount']), 'rt': row['rate'],
+                          'iamt': _rupees(row['igst_amount'])}
+                if with_intra_tax:
+                    detail['camt'] = _rupees(row['cgst_amount'])
+                    detail['samt'] = _rupees(row['sgst_amount'])
+                detail['csamt'] = 0
+                items.append({'num': num, 'itm_det': detail})
+            invoice = {
+                'inum': first['invoice_no'],
+                'idt': _portal_date(first['invoice_date']),
+                'val': _rupees(first['total_amount']),
+                'pos': gst_state_code(first['state_name'], company_pos)
+            }
+            if with_intra_tax:
+                invoice.update({'rchrg': 'N', 'inv_typ': 'R'})
+            invoice['itms'] = items
+            yield first, invoice
+
+    def _write_grouped(self, out, invoices, key, name):
+        """Write (row, invoice) pairs as [{name: key, "inv": [...]}, ...], returns invoice count"""
+        count = 0
+        for group_index, (group, pairs) in enumerate(groupby(invoices, key=lambda pair: key(pair[0]))):
+            out.write(',' if group_index else '')
+            out.write('{%s:%s,"inv":[' % (json.dumps(name), json.dumps(group)))
+            count += _write_array(out, (invoice for _row, invoice in pairs))
+            out.write(']}')
+        return count
+
+    def _b2cs_rows(self, period, b2cl_limit):
+        """Unregistered sales outside B2C Large, per supply type, place of supply and rate"""
+        return self._stream(f"""
+            SELECT si.inter_state, s.state_name, l.gst_percentage AS rate,
+                   SUM(l.taxable_amount) AS taxable_amount,
+                   SUM(l.igst_amount) AS igst_amount,
+                   SUM(l.cgst_amount) AS cgst_amount,
+                   SUM(l.sgst_amount) AS sgst_amount
+            FROM sales_invoices si
+            JOIN sales_invoice_lines l ON l.invoice_id = si.id
+            JOIN business_partners bp ON bp.id = si.partner_id
+            LEFT JOIN states s ON s.id = bp.state_id
+            WHERE {PERIOD_FILTER} AND l.gst_percentage > 0
+              AND COALESCE(bp.gst_number, '') = ''
+              AND NOT (si.inter_state = 1 AND si.total_amount > :b2cl_limit)
+            GROUP BY si.inter_state, s.state_name, l.gst_percentage
+            ORDER BY si.inter_state, s.state_name, l.gst_percentage
+        """, dict(period, b2cl_limit=b2cl_limit))
+
+    def _nil_rows(self, period):
+        """0% lines per supply type (registered / unregistered, intra / inter-state)"""
+        return self._stream(f"""
+            SELECT COALESCE(bp.gst_number, '') != '' AS registered, si.inter_state,
+                   SUM(l.taxable_amount) AS taxable_amount
+            FROM sales_invoices si
+            JOIN sales_invoice_lines l ON l.invoice_id = si.id
+            JOIN business_partners bp ON bp.id = si.partner_id
+            WHERE {PERIOD_FILTER} AND l.gst_percentage = 0
+            GROUP BY 1, 2
+            ORDER BY 1 DESC, 2
+        """, period)
+
+    def _document_rows(self, period):
+        """Invoice numbers issued per series, cancelled ones included"""
+        return self._stream("""
+            SELECT series, MIN(invoice_no) AS first_no, MAX(invoice_no) AS last_no,
+                   COUNT(*) AS issued, SUM(status = 'Cancelled') AS cancelled
+            FROM sales_invoices
+            WHERE company_id = :company_id AND fy_id = :fy_id
+              AND invoice_date BETWEEN :date_from AND :date_to
+            GROUP BY series
+            ORDER BY series
+        """, period)
+
+    # ========================================================================
+    # GSTR-1 EXPORT
+    # ========================================================================
+
+    def write_gstr1(self, out, company_id, year, month):
+        """
+        Write the GSTR-1 JSON of a company and month to a text file object
+        Returns (success: bool, message: str, counts: dict of section -> entries)
+        """
+        date_from = date(year, month, 1)
+        date_to = date(year, month, calendar.monthrange(year, month)[1])
+        counts = {}
+
+        try:
+            period = self._period(company_id, date_from, date_to)
+            if not period:
+                return False, f"Company not found or no financial year covers {date_from:%B %Y}", counts
+            self.cursor.execute("SELECT gst_number FROM companies WHERE id = ?", (company_id,))
+            gstin = (self.cursor.fetchone()['gst_number'] or '').strip().upper()
+            company_pos = gst_state_code(period['company_state'])
+            b2cl_limit = B2CL_LIMIT if date_from >= date(2024, 8, 1) else B2CL_LIMIT_BEFORE_AUG_2024
+
+            out.write('{"gstin":%s,"fp":"%02d%d","version":"%s","hash":"hash"'
+                      % (json.dumps(gstin), month, year, GSTR1_VERSION))
+
+            out.write(',"b2b":[')
+            counts['b2b'] = self._write_grouped(
+                out,
+                self._invoices(self._invoice_rate_rows(period, "COALESCE(bp.gst_number, '') != ''",
+                                                       "bp.gst_number"), company_pos),
+                key=itemgetter('ctin'), name='ctin')
+
+            out.write('],"b2cl":[')
+            counts['b2cl'] = self._write_grouped(
+                out,
+                self._invoices(self._invoice_rate_rows(
+                    dict(period, b2cl_limit=b2cl_limit),
+                    "COALESCE(bp.gst_number, '') = '' AND si.inter_state = 1 "
+                    "AND si.total_amount > :b2cl_limit", "s.state_name"),
+                    company_pos, with_intra_tax=False),
+                key=lambda row: gst_state_code(row['state_name'], company_pos), name='pos')
+
+            out.write('],"b2cs":[')
+            counts['b2cs'] = _write_array(out, ({
+                'sply_ty': 'INTER' if row['inter_state'] else 'INTRA',
+                'pos': gst_state_code(row['state_name'], company_pos),
+                'typ': 'OE',
+                'txval': _rupees(row['taxable_amount']),
+                'rt': row['rate'],
+                'iamt': _rupees(row['igst_amount']),
+                'camt': _rupees(row['cgst_amount']),
+                'samt': _rupees(row['sgst_amount']),
+                'csamt': 0
+            } for row in self._b2cs_rows(period, b2cl_limit)))
+
+            out.write('],"nil":{"inv":[')
+            counts['nil'] = _write_array(out, ({
+                'sply_ty': ('INTR' if row['inter_state'] else 'INTRA') + ('B2B' if row['registered'] else 'B2C'),
+                'nil_amt': _rupees(row['taxable_amount']),
+                'expt_amt': 0,
+                'ngsup_amt': 0
+            } for row in self._nil_rows(period)))
+
+            out.write(']},"hsn":{"data":[')
+            counts['hsn'] = _write_array(out, ({
+                'num': num,
+                'hsn_sc': row['hsn_code'],
+                'desc': row['description'] or '',
+                'uqc': row['uqc'],
+                'qty': row['quantity'],
+                'rt': row['gst_percentage'],
+                'val': _rupees(row['total_value']),
+                'txval': _rupees(row['taxable_amount']),
+                'iamt': _rupees(row['igst_amount']),
+                'camt': _rupees(row['cgst_amount']),
+                'samt': _rupees(row['sgst_amount']),
+                'csamt': 0
+            } for num, row in enumerate(self._hsn_rows(period), 1)))
+
+            out.write(']},"doc_issue":{"doc_det":[{"doc_num":1,"docs":[')
+            counts['doc_issue'] = _write_array(out, ({
+                'num': num,
+                'from': row['first_no'],
+                'to': row['last_no'],
+                'totnum': row['issued'],
+                'cancel': row['cancelled'],
+                'net_issue': row['issued'] - row['cancelled']
+            } for num, row in enumerate(self._document_rows(period), 1)))
+            out.write(']}]}}')
+
+            message = (f"GSTR-1 for {date_from:%B %Y}: {counts['b2b']} B2B and {counts['b2cl']} B2CL invoices, "
+                       f"{counts['b2cs']} B2CS rows, {counts['hsn']} HSN rows")
+            print(f"[GST] {message}")
+            return True, message, counts
+
+        except sqlite3.Error as e:
+            print(f"[GST] Error exporting GSTR-1: {e}")
+            return False, f"Database error: {str(e)}", counts
+
+    def export_gstr1(self, path, company_id, year, month):
+        """
+        Export the GSTR-1 JSON of a company and month to a file
+        Returns (success: bool, message: str, counts: dict)
+        """
+        try:
+            with open(path, 'w', encoding='utf-8') as out:
+                return self.write_gstr1(out, company_id, year, month)
+        except OSError as e:
+            print(f"[GST] Error writing {path}: {e}")
+            return False, f"Could not write file: {e}", {}
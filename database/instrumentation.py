@@ -0,0 +1,212 @@
+"""
+Instrumentation - Call counters and latency histograms for the database layer
+
+install() turns on two kinds of measurements, both off (and free) until it is called:
+
+    handlers   every public method of the *Handler classes in database/*_handler.py is
+               wrapped to count its calls and record its latency in a Histogram
+               (HANDLER_LATENCY, keyed by (handler class, method))
+    sqlite     sqlite3.connect() returns an InstrumentedConnection whose cursors count
+               statements that failed with SQLITE_BUSY / SQLITE_LOCKED (SQLITE_BUSY),
+               i.e. writers that waited out the whole busy timeout
+
+metrics_exporter.py reads these for the Prometheus text file. While a UI action is
+being traced (utils/tracing.py), handler calls, statements and fetches also become
+trace spans.
+"""
+
+import functools
+import glob
+import importlib
+import inspect
+import os
+import sqlite3
+import threading
+import time
+from utils import tracing
+
+
+# Histogram bucket upper bounds in seconds
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Primary result codes of sqlite3 errors counted as busy
+BUSY_ERROR_CODES = (5, 6)  # SQLITE_BUSY, SQLITE_LOCKED
+
+DATABASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_original_connect = sqlite3.connect
+_lock = threading.Lock()
+
+# (handler class name, method) -> Histogram
+HANDLER_LATENCY = {}
+
+# Statements and commits that failed because the database was busy or locked
+SQLITE_BUSY = {'errors': 0}
+
+
+class Histogram:
+    """Cumulative latency histogram in the Prometheus layout"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds):
+        with _lock:
+            self.count += 1
+            self.sum += seconds
+            for index, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    self.counts[index] += 1
+                    break
+
+    def cumulative(self):
+        """[(upper bound, observations <= bound)], ending with ('+Inf', count)"""
+        total = 0
+        result = []
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            result.append((bound, total))
+        result.append(('+Inf', self.count))
+        return result
+
+
+def _count_busy(error):
+    if ((getattr(error, 'sqlite_errorcode', 0) or 0) & 0xFF) in BUSY_ERROR_CODES or \
+            'database is locked' in str(error):
+        with _lock:
+            SQLITE_BUSY['errors'] += 1
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    def _statement(self, run, sql):
+        tracer = tracing.active_tracer()
+        try:
+            if tracer is None or not tracer.in_action():
+                return run()
+            text = tracing.sql_text(sql)
+            with tracer.span(text[:80], 'sql', {'sql': text}) as args:
+                result = run()
+                if self.rowcount >= 0:
+                    args['rows'] = self.rowcount
+                return result
+        except sqlite3.OperationalError as e:
+            _count_busy(e)
+            raise
+
+    def _fetch(self, name, run):
+        tracer = tracing.active_tracer()
+        if tracer is None or not tracer.in_action():
+            return run()
+        with tracer.span(name, 'fetch') as args:
+            rows = run()
+            args['rows'] = len(rows) if isinstance(rows, list) else int(rows is not None)
+            return rows
+
+    def execute(self, sql, *args, **kwargs):
+        return self._statement(functools.partial(sqlite3.Cursor.execute, self, sql, *args, **kwargs), sql)
+
+    def executemany(self, sql, *args, **kwargs):
+        return self._statement(functools.partial(sqlite3.Cursor.executemany, self, sql, *args, **kwargs), sql)
+
+    def executescript(self, sql, *args, **kwargs):
+        return self._statement(functools.partial(sqlite3.Cursor.executescript, self, sql, *args, **kwargs), sql)
+
+    def fetchone(self):
+        return self._fetch('fetchone', functools.partial(sqlite3.Cursor.fetchone, self))
+
+    def fetchmany(self, *args, **kwargs):
+        return self._fetch('fetchmany', functools.partial(sqlite3.Cursor.fetchmany, self, *args, **kwargs))
+
+    def fetchall(self):
+        return self._fetch('fetchall', functools.partial(sqlite3.Cursor.fetchall, self))
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    # Connection.execute() and friends create their cursor internally, bypassing cursor()
+    def execute(self, *args, **kwargs):
+        return self.cursor().execute(*args, **kwargs)
+
+    def executemany(self, *args, **kwargs):
+        return self.cursor().executemany(*args, **kwargs)
+
+    def executescript(self, *args, **kwargs):
+        return self.cursor().executescript(*args, **kwargs)
+
+    def commit(self):
+        try:
+            return super().commit()
+        except sqlite3.OperationalError as e:
+            _count_busy(e)
+            raise
+
+
+def instrumented_connect(*args, **kwargs):
+    """sqlite3.connect() returning an InstrumentedConnection unless a factory is given"""
+    kwargs.setdefault('factory', InstrumentedConnection)
+    return _original_connect(*args, **kwargs)
+
+
+def timed(handler_name, method):
+    """Wrap a handler method to record its latency in HANDLER_LATENCY"""
+    with _lock:
+        histogram = HANDLER_LATENCY.setdefault((handler_name, method.__name__), Histogram())
+
+    name = f"{handler_name}.{method.__name__}"
+
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            tracer = tracing.active_tracer()
+            if tracer is None or not tracer.in_action():
+                return method(*args, **kwargs)
+            with tracer.span(name, 'handler'):
+                return method(*args, **kwargs)
+        finally:
+            histogram.observe(time.perf_counter() - started)
+
+    wrapper.__instrumented__ = True
+    return wrapper
+
+
+def instrument_class(cls):
+    """Time every public method defined on cls (generators and static/class methods are left alone)"""
+    for name, value in list(vars(cls).items()):
+        if name.startswith('_') or not inspect.isfunction(value) or getattr(value, '__instrumented__', False):
+            continue
+        if inspect.isgeneratorfunction(value):
+            continue
+        setattr(cls, name, timed(cls.__name__, value))
+
+
+def handler_classes():
+    """The *Handler classes of database/*_handler.py (modules whose imports fail are skipped)"""
+    classes = []
+    for path in sorted(glob.glob(os.path.join(DATABASE_DIR, '*_handler.py'))):
+        module_name = f"database.{os.path.splitext(os.path.basename(path))[0]}"
+        try:
+            module = importlib.import_module(module_name)
+        except ImportError as e:
+            print(f"[METRICS] Not instrumenting {module_name}: {e}")
+            continue
+        classes.extend(obj for name, obj in vars(module).items()
+                       if inspect.isclass(obj) and name.endswith('Handler') and obj.__module__ == module_name)
+    return classes
+
+
+def install():
+    """Instrument the handler classes and sqlite3 connections (idempotent)"""
+    sqlite3.connect = instrumented_connect
+    for cls in handler_classes():
+        instrument_class(cls)
+
+
+def uninstall():
+    """Stop counting busy errors on new connections (handler wrappers stay, they only count)"""
+    sqlite3.connect = _original_connect
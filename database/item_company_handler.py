@@ -4,6 +4,7 @@ Item Company Handler - Manages item company (suppliers/manufacturers) CRUD opera
 
 import sqlite3
 from database.config import DB_PATH
+from database.tenant_router import tenant_db_path
 
 
 class ItemCompanyHandler:
@@ -15,7 +16,8 @@ class ItemCompanyHandler:
         """Establish database connection"""
         try:
             import os
-            abs_path = os.path.abspath(DB_PATH)
+            db_path = tenant_db_path(DB_PATH)
+            abs_path = os.path.abspath(db_path)
             print(f"\n{'='*70}")
             print(f"[ITEM_COMPANY_HANDLER] Connecting to SQLite database...")
             print(f"[ITEM_COMPANY_HANDLER] Database path: {abs_path}")
@@ -24,7 +26,7 @@ class ItemCompanyHandler:
                 print(f"[ITEM_COMPANY_HANDLER] File size: {os.path.getsize(abs_path)} bytes")
             print(f"{'='*70}\n")
 
-            self.conn = sqlite3.connect(DB_PATH)
+            self.conn = sqlite3.connect(db_path)
             self.conn.row_factory = sqlite3.Row
             self.cursor = self.conn.cursor()
             print(f"Successfully connected to SQLite database")
@@ -4,6 +4,13 @@ Item Master Handler - Manages item CRUD operations using SQLite
 
 import sqlite3
 from database.config import DB_PATH
+from database.money_schema import ensure_money_schema
+from database.tenant_router import tenant_db_path
+from utils.money import money_fields, to_paise
+
+
+# Item columns holding rupee amounts (stored as paise)
+ITEM_MONEY_FIELDS = ('purchase_rate', 'mrp', 'sale_rate_wh1', 'sale_rate_wh2')
 
 
 class ItemHandler:
@@ -15,7 +22,8 @@ class ItemHandler:
         """Establish database connection"""
         try:
             import os
-            abs_path = os.path.abspath(DB_PATH)
+            db_path = tenant_db_path(DB_PATH)
+            abs_path = os.path.abspath(db_path)
             print(f"\n{'='*70}")
             print(f"[ITEM_HANDLER] Connecting to SQLite database...")
             print(f"[ITEM_HANDLER] Database path: {abs_path}")
@@ -24,7 +32,7 @@ class ItemHandler:
                 print(f"[ITEM_HANDLER] File size: {os.path.getsize(abs_path)} bytes")
             print(f"{'='*70}\n")
 
-            self.conn = sqlite3.connect(DB_PATH)
+            self.conn = sqlite3.connect(db_path)
             self.conn.row_factory = sqlite3.Row
             self.cursor = self.conn.cursor()
             print(f"Successfully connected to SQLite database")
@@ -50,12 +58,12 @@ class ItemHandler:
                 item_type_code TEXT,
                 uom_code TEXT,
                 company_name TEXT,
-                purchase_rate REAL DEFAULT 0.0,
-                mrp REAL DEFAULT 0.0,
+                purchase_rate INTEGER DEFAULT 0,
+                mrp INTEGER DEFAULT 0,
                 gst_percentage REAL DEFAULT 0.0,
                 hsn_code TEXT,
-                sale_rate_wh1 REAL DEFAULT 0.0,
-                sale_rate_wh2 REAL DEFAULT 0.0,
+                sale_rate_wh1 INTEGER DEFAULT 0,
+                sale_rate_wh2 INTEGER DEFAULT 0,
                 discount_wh1 REAL DEFAULT 0.0,
                 discount_wh2 REAL DEFAULT 0.0,
                 sales_account_code TEXT,
@@ -67,6 +75,7 @@ class ItemHandler:
             """
             self.cursor.execute(create_table_query)
             self.conn.commit()
+            ensure_money_schema(self.conn)
             print("Items table created/verified successfully")
         except sqlite3.Error as e:
             print(f"Error creating items table: {e}")
@@ -131,7 +140,7 @@ class ItemHandler:
             print(f"[GET_ALL_ITEMS] Raw rows fetched: {len(rows)}")
 
             # Convert sqlite3.Row objects to dictionaries
-            items = [dict(row) for row in rows]
+            items = [money_fields(dict(row), ITEM_MONEY_FIELDS) for row in rows]
 
             print(f"[GET_ALL_ITEMS] Returning {len(items)} items\n")
             return items
@@ -159,7 +168,7 @@ class ItemHandler:
             rows = self.cursor.fetchall()
 
             # Convert sqlite3.Row objects to dictionaries
-            items = [dict(row) for row in rows]
+            items = [money_fields(dict(row), ITEM_MONEY_FIELDS) for row in rows]
 
             print(f"[GET_ACTIVE_ITEMS] Returning {len(items)} active items\n")
             return items
@@ -183,7 +192,7 @@ class ItemHandler:
             """
             self.cursor.execute(query, (item_id,))
             row = self.cursor.fetchone()
-            return dict(row) if row else None
+            return money_fields(dict(row), ITEM_MONEY_FIELDS) if row else None
         except sqlite3.Error as e:
             print(f"Error fetching item: {e}")
             return None
@@ -235,12 +244,12 @@ class ItemHandler:
                 item_data.get('item_type_code', ''),
                 item_data.get('uom_code', ''),
                 item_data.get('company_name', ''),
-                item_data.get('purchase_rate', 0.0),
-                item_data.get('mrp', 0.0),
+                to_paise(item_data.get('purchase_rate', 0)),
+                to_paise(item_data.get('mrp', 0)),
                 item_data.get('gst_percentage', 0.0),
                 item_data.get('hsn_code', ''),
-                item_data.get('sale_rate_wh1', 0.0),
-                item_data.get('sale_rate_wh2', 0.0),
+                to_paise(item_data.get('sale_rate_wh1', 0)),
+                to_paise(item_data.get('sale_rate_wh2', 0)),
                 item_data.get('discount_wh1', 0.0),
                 item_data.get('discount_wh2', 0.0),
                 item_data.get('sales_account_code', ''),
@@ -303,12 +312,12 @@ class ItemHandler:
                 item_data.get('item_type_code', ''),
                 item_data.get('uom_code', ''),
                 item_data.get('company_name', ''),
-                item_data.get('purchase_rate', 0.0),
-                item_data.get('mrp', 0.0),
+                to_paise(item_data.get('purchase_rate', 0)),
+                to_paise(item_data.get('mrp', 0)),
                 item_data.get('gst_percentage', 0.0),
                 item_data.get('hsn_code', ''),
-                item_data.get('sale_rate_wh1', 0.0),
-                item_data.get('sale_rate_wh2', 0.0),
+                to_paise(item_data.get('sale_rate_wh1', 0)),
+                to_paise(item_data.get('sale_rate_wh2', 0)),
                 item_data.get('discount_wh1', 0.0),
                 item_data.get('discount_wh2', 0.0),
                 item_data.get('sales_account_code', ''),
@@ -4,6 +4,7 @@ Item Type Handler - Manages Item Type CRUD operations using SQLite
 
 import sqlite3
 from database.config import DB_PATH
+from database.tenant_router import tenant_db_path
 
 
 class ItemTypeHandler:
@@ -15,7 +16,8 @@ class ItemTypeHandler:
         """Establish database connection"""
         try:
             import os
-            abs_path = os.path.abspath(DB_PATH)
+            db_path = tenant_db_path(DB_PATH)
+            abs_path = os.path.abspath(db_path)
             print(f"\n{'='*70}")
             print(f"[ITEM_TYPE_HANDLER] Connecting to SQLite database...")
             print(f"[ITEM_TYPE_HANDLER] Database path: {abs_path}")
@@ -24,7 +26,7 @@ class ItemTypeHandler:
                 print(f"[ITEM_TYPE_HANDLER] File size: {os.path.getsize(abs_path)} bytes")
             print(f"{'='*70}\n")
 
-            self.conn = sqlite3.connect(DB_PATH)
+            self.conn = sqlite3.connect(db_path)
             self.conn.row_factory = sqlite3.Row
             self.cursor = self.conn.cursor()
             print(f"Successfully connected to SQLite database")
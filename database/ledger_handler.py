@@ -0,0 +1,290 @@
+"""
+Ledger Handler - Account / business partner ledger with running balance using SQLite
+
+The balance at the start of a date range comes from the account_balances aggregate
+(opening row + full periods before the start month) plus the lines of the start
+month that fall before the start date, so history is never summed line by line.
+
+Ledger lines are keyset-paged on (voucher_date, id) through the
+idx_voucher_lines_account_date index and the running balance of a page is a window
+SUM over that page only, seeded with the balance carried in the paging cursor.
+
+A paging cursor is a dict:
+    voucher_date, id - key of the row the page continues from
+    balance          - running balance after that row (next page)
+                       or before that row (previous page)
+A ledger range never spans financial years: date_to is clamped to the end of the
+financial year containing date_from.
+
+Sums run over integer paise; amounts and balances are returned as Money.
+"""
+
+import sqlite3
+from database.config import DB_PATH
+from database.fy_index import get_fy_index
+from database.money_schema import ensure_money_schema
+from database.partition_router import PartitionRouter
+from database.tenant_router import tenant_db_path
+from database.voucher_handler import fiscal_period
+from utils.money import Money, money_fields
+
+
+DEFAULT_PAGE_SIZE = 200
+
+# {page_filter} / {page_order} select one page of keys, the outer query joins
+# voucher headers and runs the window over that page only
+LEDGER_PAGE_QUERY = """
+SELECT p.id, p.voucher_id, p.voucher_date, v.voucher_no, v.voucher_type,
+       COALESCE(NULLIF(p.narration, ''), v.narration) AS narration,
+       p.debit, p.credit,
+       {balance_base} + SUM(p.debit - p.credit) OVER (
+           ORDER BY p.voucher_date, p.id ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW
+       ) AS balance
+FROM (
+    SELECT id, voucher_id, voucher_date, debit, credit, narration
+    FROM voucher_lines
+    WHERE account_kind = :account_kind AND account_id = :account_id AND fy_id = :fy_id
+      AND {page_filter}
+    ORDER BY {page_order}
+    LIMIT :limit
+) p
+JOIN vouchers v ON v.id = p.voucher_id
+ORDER BY p.voucher_date, p.id
+"""
+
+NEXT_PAGE = {
+    'balance_base': ":balance",
+    'page_filter': "(voucher_date, id) > (:key_date, :key_id) AND voucher_date <= :date_to",
+    'page_order': "voucher_date, id"
+}
+
+# Walks backwards from the cursor; the page's own movement is subtracted so the
+# window can still run forwards
+PREVIOUS_PAGE = {
+    'balance_base': ":balance - SUM(p.debit - p.credit) OVER ()",
+    'page_filter': "(voucher_date, id) < (:key_date, :key_id) AND voucher_date >= :date_from",
+    'page_order': "voucher_date DESC, id DESC"
+}
+
+
+class LedgerHandler:
+    def __init__(self, db_path=None):
+        self.db_path = db_path or tenant_db_path(DB_PATH)
+        self.conn = None
+        self.cursor = None
+        self.router = None
+
+    def connect(self):
+        """Establish database connection"""
+        try:
+            self.conn = sqlite3.connect(self.db_path)
+            self.conn.row_factory = sqlite3.Row
+            self.cursor = self.conn.cursor()
+            print("Successfully connected to SQLite database")
+            ensure_money_schema(self.conn)
+
+            # Financial year files, when the database is partitioned
+            self.router = PartitionRouter(self.conn, self.db_path)
+            self.router.install()
+            return True
+        except sqlite3.Error as e:
+            print(f"Error connecting to SQLite: {e}")
+            return False
+
+    def disconnect(self):
+        """Close database connection"""
+        if self.conn:
+            self.conn.close()
+            print("SQLite connection closed")
+
+    # ========================================================================
+    # HELPERS
+    # ========================================================================
+
+    def get_ledger_accounts(self):
+        """Get all accounts and business partners a ledger can be opened for"""
+        try:
+            query = """
+            SELECT 'account' AS account_kind, id AS account_id,
+                   account_code AS code, account_name AS name
+            FROM account_master
+            UNION ALL
+            SELECT 'partner', id, bp_code, bp_name
+            FROM business_partners
+            ORDER BY name
+            """
+            self.cursor.execute(query)
+            return [dict(row) for row in self.cursor.fetchall()]
+        except sqlite3.Error as e:
+            print(f"Error fetching ledger accounts: {e}")
+            return []
+
+    def _get_financial_year(self, on_date):
+        """Get the financial year whose period contains on_date, with its year file attached"""
+        fy = get_fy_index(self.cursor, self.db_path).find(on_date)
+        if not fy:
+            return None
+        self.router.require([fy['id']])
+        return fy
+
+    def _position(self, account_kind, account_id, fy, on_date, inclusive):
+        """
+        Opening balance and debit/credit totals of the financial year up to on_date, in paise
+        (lines of on_date included only if inclusive)
+        Reads the aggregate for whole periods and voucher lines for the partial month.
+        """
+        on_date = str(on_date)
+        period = fiscal_period(on_date, fy['start_date'])
+
+        self.cursor.execute("""
+            SELECT COALESCE(SUM(opening_balance), 0) AS opening_balance,
+                   COALESCE(SUM(debit_total), 0) AS debit_total,
+                   COALESCE(SUM(credit_total), 0) AS credit_total
+            FROM account_balances
+            WHERE account_kind = ? AND account_id = ? AND fy_id = ? AND period < ?
+        """, (account_kind, account_id, fy['id'], period))
+        position = dict(self.cursor.fetchone())
+
+        # Lines of the current month before (or up to) on_date
+        month_start = max(on_date[:8] + '01', str(fy['start_date']))
+        self.cursor.execute(f"""
+            SELECT COALESCE(SUM(debit), 0) AS debit_total,
+                   COALESCE(SUM(credit), 0) AS credit_total
+            FROM voucher_lines
+            WHERE account_kind = ? AND account_id = ? AND fy_id = ?
+              AND voucher_date >= ? AND voucher_date {'<=' if inclusive else '<'} ?
+        """, (account_kind, account_id, fy['id'], month_start, on_date))
+        partial = self.cursor.fetchone()
+
+        position['debit_total'] += partial['debit_total']
+        position['credit_total'] += partial['credit_total']
+        position['balance'] = position['opening_balance'] + position['debit_total'] - position['credit_total']
+        return position
+
+    def _resolve_range(self, date_from, date_to):
+        """Financial year of date_from and date_to clamped to its end date"""
+        fy = self._get_financial_year(date_from)
+        if not fy:
+            return None, None
+        date_to = min(str(date_to), str(fy['end_date'])) if date_to else str(fy['end_date'])
+        return fy, date_to
+
+    # ========================================================================
+    # LEDGER
+    # ========================================================================
+
+    def get_balance_at(self, account_kind, account_id, on_date, inclusive=False):
+        """
+        Get the signed balance (Debit positive) of an account at on_date
+        inclusive=False -> before the lines of on_date, True -> after them
+        Returns None if on_date is outside every financial year or on database errors.
+        """
+        try:
+            fy = self._get_financial_year(on_date)
+            if not fy:
+                return None
+            return Money(self._position(account_kind, account_id, fy, on_date, inclusive)['balance'])
+        except sqlite3.Error as e:
+            print(f"[LEDGER] Error fetching balance: {e}")
+            return None
+
+    def get_ledger_summary(self, account_kind, account_id, date_from, date_to=None):
+        """
+        Get opening balance, debit/credit totals and closing balance for a date range
+        Both ends come from the aggregate, so the cost does not depend on the range length.
+        Returns dict with fy_id, date_from, date_to, opening_balance, debit_total,
+        credit_total, closing_balance or None.
+        """
+        try:
+            fy, date_to = self._resolve_range(date_from, date_to)
+            if not fy:
+                return None
+
+            start = self._position(account_kind, account_id, fy, date_from, inclusive=False)
+            end = self._position(account_kind, account_id, fy, date_to, inclusive=True)
+            return {
+                'fy_id': fy['id'],
+                'date_from': str(date_from),
+                'date_to': date_to,
+                'opening_balance': Money(start['balance']),
+                'debit_total': Money(end['debit_total'] - start['debit_total']),
+                'credit_total': Money(end['credit_total'] - start['credit_total']),
+                'closing_balance': Money(end['balance'])
+            }
+        except sqlite3.Error as e:
+            print(f"[LEDGER] Error building ledger summary: {e}")
+            return None
+
+    def get_ledger_page(self, account_kind, account_id, date_from, date_to=None,
+                        cursor=None, direction='next', page_size=DEFAULT_PAGE_SIZE):
+        """
+        Get one page of ledger lines with running balance
+        cursor=None starts at date_from (balance taken from the aggregate); otherwise
+        pass the next_cursor / previous_cursor of an earlier page with direction
+        'next' / 'previous'.
+
+        Returns dict:
+            rows             - id, voucher_id, voucher_date, voucher_no, voucher_type,
+                               narration, debit, credit, balance (running, Debit positive)
+            next_cursor      - continue forwards (None at the end of the range)
+            previous_cursor  - continue backwards (None at the start of the range)
+            date_to          - effective end of the range
+        Returns None on database errors.
+        """
+        try:
+            fy, date_to = self._resolve_range(date_from, date_to)
+            if not fy:
+                return None
+
+            if cursor is None:
+                direction = 'next'
+                cursor = {
+                    'voucher_date': str(date_from),
+                    'id': 0,
+                    'balance': Money(self._position(account_kind, account_id, fy, date_from,
+                                                    inclusive=False)['balance'])
+                }
+
+            params = {
+                'account_kind': account_kind,
+                'account_id': account_id,
+                'fy_id': fy['id'],
+                'key_date': cursor['voucher_date'],
+                'key_id': cursor['id'],
+                'balance': cursor['balance'],
+                'date_from': str(date_from),
+                'date_to': date_to,
+                'limit': page_size + 1
+            }
+            query = LEDGER_PAGE_QUERY.format(**(NEXT_PAGE if direction == 'next' else PREVIOUS_PAGE))
+            self.cursor.execute(query, params)
+            rows = [money_fields(dict(row), ('debit', 'credit', 'balance')) for row in self.cursor.fetchall()]
+
+            # The extra row only tells whether the range continues past this page
+            has_more = len(rows) > page_size
+            if direction == 'next':
+                rows = rows[:page_size]
+                has_next, has_previous = has_more, cursor['id'] != 0
+            else:
+                rows = rows[1:] if has_more else rows
+                has_next, has_previous = True, has_more
+
+            next_cursor = previous_cursor = None
+            if rows and has_next:
+                last = rows[-1]
+                next_cursor = {'voucher_date': last['voucher_date'], 'id': last['id'],
+                               'balance': last['balance']}
+            if rows and has_previous:
+                first = rows[0]
+                previous_cursor = {'voucher_date': first['voucher_date'], 'id': first['id'],
+                                   'balance': first['balance'] - first['debit'] + first['credit']}
+
+            return {
+                'rows': rows,
+                'next_cursor': next_cursor,
+                'previous_cursor': previous_cursor,
+                'date_to': date_to
+            }
+        except sqlite3.Error as e:
+            print(f"[LEDGER] Error fetching ledger page: {e}")
+            return None
@@ -0,0 +1,61 @@
+"""
+Maintain Database
+Runs the idle-time maintenance of database/maintenance_handler.py once, or converts
+the database files to auto_vacuum = INCREMENTAL so maintenance can return free pages
+to the file system. The conversion rewrites each file with VACUUM: close the
+application first.
+
+Usage:
+    python database/maintain_database.py                              # run maintenance now
+    python database/maintain_database.py --budget 60                  # with a 60 second budget
+    python database/maintain_database.py --enable-incremental-vacuum  # one-time conversion
+"""
+
+import os
+import sys
+from pathlib import Path
+
+# Add parent directory to path to import config
+sys.path.append(str(Path(__file__).parent.parent))
+from database.maintenance_handler import (DEFAULT_TIME_BUDGET_SECONDS, MaintenanceHandler,
+                                          enable_incremental_vacuum)
+
+
+def maintain_database(time_budget=DEFAULT_TIME_BUDGET_SECONDS, convert=False, db_path=None):
+    """
+    Run maintenance, or convert every database file to incremental vacuum
+    Returns True on success
+    """
+    handler = MaintenanceHandler(db_path)
+
+    print("=" * 70)
+    print("CONVERTING TO INCREMENTAL VACUUM" if convert else "DATABASE MAINTENANCE")
+    print("=" * 70)
+
+    if convert:
+        try:
+            for path in handler.database_files():
+                converted = enable_incremental_vacuum(path)
+                print(f"[OK] {os.path.basename(path)}: "
+                      f"{'converted' if converted else 'already incremental'}")
+        except Exception as e:
+            print(f"[ERROR] Conversion failed: {e}")
+            return False
+        return True
+
+    success, message, reports = handler.run(time_budget)
+    for report in reports:
+        before, after = report['before'], report['after']
+        print(f"  {os.path.basename(report['path'])}: "
+              f"{before['page_count']} -> {after['page_count']} pages, "
+              f"{before['freelist_count']} -> {after['freelist_count']} free, "
+              f"analyzed {', '.join(report['analyzed']) or 'nothing'}")
+    print(f"[{'OK' if success else 'ERROR'}] {message}")
+    return success
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    budget = float(args[args.index('--budget') + 1]) if '--budget' in args[:-1] else DEFAULT_TIME_BUDGET_SECONDS
+    ok = maintain_database(budget, convert='--enable-incremental-vacuum' in args)
+    sys.exit(0 if ok else 1)
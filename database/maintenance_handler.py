@@ -0,0 +1,289 @@
+"""
+Maintenance Handler - Keeps the SQLite files compact and their query plans current
+
+One maintenance run works through every writable database file (the main file
+and the open financial-year files, see database/partition_router.py) until its
+time budget is used up:
+
+    checkpoint         - PRAGMA wal_checkpoint(PASSIVE): copies the WAL back into
+                         the database without waiting for readers or writers
+    analyze            - ANALYZE of each table whose row estimate (max rowid) moved
+                         more than ANALYZE_CHANGE_RATIO away from the estimate at its
+                         last ANALYZE, most changed first; ANALYZE samples at most
+                         ANALYSIS_LIMIT rows per index
+    optimize           - PRAGMA optimize
+    incremental_vacuum - returns free pages to the file system VACUUM_PAGES_PER_STEP
+                         at a time, one short transaction each (only on files
+                         converted to auto_vacuum = INCREMENTAL, see
+                         enable_incremental_vacuum)
+
+Every step checks the deadline and the optional stop event before starting, so a
+run never holds the write lock for long and stops as soon as the user is back
+(see maintenance_scheduler.py). Page count, freelist and step durations before
+and after are printed and recorded in maintenance_runs of the main file.
+"""
+
+import json
+import os
+import sqlite3
+import time
+from database.config import DB_PATH
+from database.partition_router import registered_partitions
+from database.tenant_router import tenant_db_path
+
+
+DEFAULT_TIME_BUDGET_SECONDS = 10
+
+# Maintenance waits at most this long for another connection's lock
+BUSY_TIMEOUT_SECONDS = 2
+
+# Tables are re-analyzed when their row count moved by more than this fraction...
+ANALYZE_CHANGE_RATIO = 0.1
+
+# ...and by at least this many rows
+ANALYZE_MIN_CHANGE = 100
+
+# PRAGMA analysis_limit: rows ANALYZE examines per index, keeps each ANALYZE short
+# enough not to hold the write lock past the foreground writers' busy timeout
+ANALYSIS_LIMIT = 400
+
+# Free pages released per incremental_vacuum transaction
+VACUUM_PAGES_PER_STEP = 256
+
+AUTO_VACUUM_INCREMENTAL = 2
+
+
+def database_stats(conn):
+    """Page count, free pages, page size and WAL size of conn's main file"""
+    path = next(row[2] for row in conn.execute("PRAGMA database_list") if row[1] == 'main')
+    wal_path = path + '-wal'
+    return {
+        'page_count': conn.execute("PRAGMA page_count").fetchone()[0],
+        'freelist_count': conn.execute("PRAGMA freelist_count").fetchone()[0],
+        'page_size': conn.execute("PRAGMA page_size").fetchone()[0],
+        'wal_bytes': os.path.getsize(wal_path) if os.path.exists(wal_path) else 0
+    }
+
+
+def table_marks(conn):
+    """{table: max rowid at its last maintenance ANALYZE} of conn's file"""
+    if not conn.execute("SELECT COUNT(*) FROM sqlite_master WHERE name = 'maintenance_table_marks'").fetchone()[0]:
+        return {}
+    return dict(conn.execute("SELECT table_name, max_rowid FROM maintenance_table_marks"))
+
+
+def mark_analyzed(conn, table, rows):
+    """Remember the row estimate a table was analyzed at"""
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS maintenance_table_marks (
+        table_name TEXT PRIMARY KEY,
+        max_rowid INTEGER NOT NULL,
+        analyzed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """)
+    conn.execute("""
+        INSERT OR REPLACE INTO maintenance_table_marks (table_name, max_rowid) VALUES (?, ?)
+    """, (table, rows))
+
+
+def stale_tables(conn, out_of_time=None):
+    """
+    Tables whose row estimate moved away from the estimate at their last ANALYZE, most
+    changed first. The estimate is MAX(rowid), a single b-tree seek instead of a scan;
+    tables analyzed outside maintenance fall back to the row count in sqlite_stat1.
+    Stops early when out_of_time() returns True.
+    Returns list of (table, rows now, rows at the last ANALYZE or None)
+    """
+    tables = [row[0] for row in conn.execute("""
+        SELECT name FROM sqlite_master
+        WHERE type = 'table' AND name NOT LIKE 'sqlite_%' AND name != 'maintenance_table_marks'
+        ORDER BY name
+    """)]
+    analyzed = {}
+    if conn.execute("SELECT COUNT(*) FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone()[0]:
+        for table, stat in conn.execute("SELECT tbl, stat FROM sqlite_stat1"):
+            analyzed[table] = max(analyzed.get(table, 0), int(stat.split()[0]))
+    analyzed.update(table_marks(conn))
+
+    stale = []
+    for table in tables:
+        if out_of_time is not None and out_of_time():
+            break
+        try:
+            rows = conn.execute(f'SELECT MAX(rowid) FROM "{table}"').fetchone()[0] or 0
+        except sqlite3.OperationalError:
+            continue  # WITHOUT ROWID table
+        before = analyzed.get(table)
+        change = rows - (before or 0)
+        if abs(change) >= max(ANALYZE_MIN_CHANGE, ANALYZE_CHANGE_RATIO * (before or 0)):
+            stale.append((table, rows, before))
+    stale.sort(key=lambda item: abs(item[1] - (item[2] or 0)), reverse=True)
+    return stale
+
+
+def enable_incremental_vacuum(path):
+    """
+    Convert a file to auto_vacuum = INCREMENTAL. Runs a full VACUUM: use it while
+    the application is closed. Returns True if the file was converted.
+    """
+    conn = sqlite3.connect(path, timeout=30)
+    try:
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == AUTO_VACUUM_INCREMENTAL:
+            return False
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.execute("VACUUM")
+        return True
+    finally:
+        conn.close()
+
+
+class MaintenanceHandler:
+    def __init__(self, db_path=None):
+        self.db_path = db_path or tenant_db_path(DB_PATH)
+
+    def _create_tables(self, conn):
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS maintenance_runs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            db_file TEXT NOT NULL,
+            started_at TIMESTAMP NOT NULL,
+            duration_ms INTEGER NOT NULL,
+            page_count_before INTEGER,
+            page_count_after INTEGER,
+            freelist_before INTEGER,
+            freelist_after INTEGER,
+            completed INTEGER NOT NULL DEFAULT 1,
+            steps TEXT
+        )
+        """)
+        conn.commit()
+
+    def database_files(self):
+        """The main file followed by the open financial-year files"""
+        conn = sqlite3.connect(self.db_path, timeout=BUSY_TIMEOUT_SECONDS)
+        try:
+            partitions = registered_partitions(conn)
+        finally:
+            conn.close()
+        return [self.db_path] + [partition['path'] for partition in partitions.values()
+                                 if partition['status'] == 'Open' and os.path.exists(partition['path'])]
+
+    def last_run_at(self):
+        """Unix time of the last maintenance run of the main file, or None"""
+        conn = sqlite3.connect(self.db_path, timeout=BUSY_TIMEOUT_SECONDS)
+        try:
+            self._create_tables(conn)
+            row = conn.execute("""
+                SELECT CAST(strftime('%s', MAX(started_at)) AS INTEGER) FROM maintenance_runs
+            """).fetchone()
+            return row[0]
+        finally:
+            conn.close()
+
+    # ========================================================================
+    # RUN
+    # ========================================================================
+
+    def run(self, time_budget=DEFAULT_TIME_BUDGET_SECONDS, stop_event=None):
+        """
+        Maintain every database file until the time budget is used up or stop_event is set
+        Returns (success: bool, message: str, reports: list of per-file dicts)
+        """
+        deadline = time.monotonic() + time_budget
+        reports = []
+        try:
+            for path in self.database_files():
+                reports.append(self._maintain_file(path, deadline, stop_event))
+                if not reports[-1]['completed']:
+                    break
+            self._log(reports)
+        except sqlite3.Error as e:
+            print(f"[MAINTENANCE] Error: {e}")
+            return False, f"Maintenance failed: {e}", reports
+
+        freed = sum(r['before']['page_count'] - r['after']['page_count'] for r in reports)
+        analyzed = sum(len(r['analyzed']) for r in reports)
+        completed = all(r['completed'] for r in reports)
+        message = (f"Maintenance {'completed' if completed else 'stopped early'}: "
+                   f"{len(reports)} file(s), {analyzed} table(s) analyzed, {freed} page(s) released")
+        print(f"[MAINTENANCE] {message}")
+        return True, message, reports
+
+    def _maintain_file(self, path, deadline, stop_event):
+        def out_of_time():
+            return time.monotonic() >= deadline or (stop_event is not None and stop_event.is_set())
+
+        started = time.monotonic()
+        report = {'path': path, 'started_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+                  'steps': {}, 'analyzed': [], 'completed': False}
+        conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT_SECONDS)
+        try:
+            report['before'] = database_stats(conn)
+            print(f"[MAINTENANCE] {os.path.basename(path)} before: {report['before']}")
+
+            def step(name, work):
+                if out_of_time():
+                    return False
+                step_started = time.monotonic()
+                work()
+                report['steps'][name] = round((time.monotonic() - step_started) * 1000)
+                print(f"[MAINTENANCE]   {name}: {report['steps'][name]} ms")
+                return True
+
+            def checkpoint():
+                if conn.execute("PRAGMA journal_mode").fetchone()[0] == 'wal':
+                    conn.execute("PRAGMA wal_checkpoint(PASSIVE)").fetchall()
+
+            def analyze():
+                conn.execute(f"PRAGMA analysis_limit = {ANALYSIS_LIMIT}")
+                for table, rows, before in stale_tables(conn, out_of_time):
+                    if out_of_time():
+                        break
+                    conn.execute(f'ANALYZE "{table}"')
+                    mark_analyzed(conn, table, rows)
+                    conn.commit()
+                    report['analyzed'].append(table)
+                    print(f"[MAINTENANCE]     ANALYZE {table}: {before} -> {rows} rows")
+
+            def optimize():
+                conn.execute("PRAGMA optimize")
+
+            def incremental_vacuum():
+                if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != AUTO_VACUUM_INCREMENTAL:
+                    return
+                while conn.execute("PRAGMA freelist_count").fetchone()[0] and not out_of_time():
+                    conn.execute(f"PRAGMA incremental_vacuum({VACUUM_PAGES_PER_STEP})").fetchall()
+                    conn.commit()
+
+            report['completed'] = all(step(name, work) for name, work in (
+                ('checkpoint', checkpoint), ('analyze', analyze), ('optimize', optimize),
+                ('incremental_vacuum', incremental_vacuum))) and not out_of_time()
+
+            report['after'] = database_stats(conn)
+            report['duration_ms'] = round((time.monotonic() - started) * 1000)
+            print(f"[MAINTENANCE] {os.path.basename(path)} after: {report['after']} "
+                  f"({report['duration_ms']} ms)")
+            return report
+        finally:
+            conn.close()
+
+    def _log(self, reports):
+        """Record the runs in maintenance_runs of the main file"""
+        conn = sqlite3.connect(self.db_path, timeout=BUSY_TIMEOUT_SECONDS)
+        try:
+            self._create_tables(conn)
+            conn.executemany("""
+                INSERT INTO maintenance_runs (
+                    db_file, started_at, duration_ms, page_count_before, page_count_after,
+                    freelist_before, freelist_after, completed, steps
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, [
+                (os.path.basename(r['path']), r['started_at'], r['duration_ms'],
+                 r['before']['page_count'], r['after']['page_count'],
+                 r['before']['freelist_count'], r['after']['freelist_count'], int(r['completed']),
+                 json.dumps({'durations_ms': r['steps'], 'analyzed': r['analyzed']}))
+                for r in reports
+            ])
+            conn.commit()
+        finally:
+            conn.close()
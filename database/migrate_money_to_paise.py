@@ -0,0 +1,63 @@
+"""
+Migrate Money to Integer Paise
+Rewrites every monetary column still stored as REAL rupees into INTEGER paise,
+one table per transaction, so it can run while the application is open.
+Handlers run the same migration on connect; this script does it up front and
+reports what changed.
+
+Usage:
+    python database/migrate_money_to_paise.py            # migrate financial_data.db
+    python database/migrate_money_to_paise.py --check    # only list tables still on REAL (exit code 1 if any)
+"""
+
+import sqlite3
+import sys
+from pathlib import Path
+
+# Add parent directory to path to import config
+sys.path.append(str(Path(__file__).parent.parent))
+from database.config import DB_PATH
+from database.money_schema import ensure_money_schema, tables_to_migrate
+
+
+def migrate_money_to_paise(check_only=False):
+    """
+    Migrate the money columns of DB_PATH to integer paise unless check_only is set
+    Returns True if every money column is INTEGER at the end
+    """
+    conn = sqlite3.connect(DB_PATH, timeout=30)
+    try:
+        print("=" * 70)
+        print("MONEY COLUMNS -> INTEGER PAISE")
+        print("=" * 70)
+
+        pending = tables_to_migrate(conn)
+        if not pending:
+            print("[OK] All money columns are already stored as integer paise")
+            return True
+
+        print(f"Tables still storing REAL rupees: {', '.join(pending)}")
+        if check_only:
+            return False
+
+        for table, row_count in ensure_money_schema(conn):
+            print(f"[OK] {table}: {row_count} rows")
+
+        remaining = tables_to_migrate(conn)
+        if remaining:
+            print(f"[ERROR] Not migrated: {', '.join(remaining)}")
+            return False
+
+        print("[OK] Migration complete")
+        return True
+
+    except sqlite3.Error as e:
+        print(f"[ERROR] Migration failed: {e}")
+        return False
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    ok = migrate_money_to_paise(check_only='--check' in sys.argv[1:])
+    sys.exit(0 if ok else 1)
@@ -1,140 +1,93 @@
 """
-Migrate financial years data from MySQL to SQLite
-This script will copy all financial year records from MySQL to SQLite
+Migrate MySQL to SQLite
+Copies users, companies, financial years and all master tables from the MySQL
+database of database/config.py into the SQLite database, in chunks, and verifies
+row counts and checksums afterwards. See database/migration_handler.py.
+
+An interrupted migration resumes where it stopped when the command is run again;
+tables already verified are skipped.
+
+Usage:
+    python database/migrate_mysql_to_sqlite.py                          # migrate all tables
+    python database/migrate_mysql_to_sqlite.py --tables users,companies # only these tables
+    python database/migrate_mysql_to_sqlite.py --restart                # copy everything again
+    python database/migrate_mysql_to_sqlite.py --fixture dump.db        # read a SQLite fixture dump instead of MySQL
 """
 
-import sqlite3
-import mysql.connector
-from config import DB_PATH, DB_CONFIG
-
-
-def migrate_financial_years():
-    """Migrate financial years from MySQL to SQLite"""
-
-    mysql_conn = None
-    sqlite_conn = None
+import sys
+from pathlib import Path
+
+# Add parent directory to path to import config
+sys.path.append(str(Path(__file__).parent.parent))
+from database.config import DB_PATH
+from database.migration_handler import MIGRATION_TABLES, MigrationHandler, MySQLSource, SQLiteSource
+
+
+def create_target_tables():
+    """Create the SQLite tables by connecting their handlers once"""
+    from database.voucher_handler import VoucherHandler
+    from database.auth_handler import AuthHandler
+    from database.financial_year_handler import FinancialYearHandler
+    from database.state_handler import StateHandler
+    from database.city_handler import CityHandler
+    from database.static_data_handler import StaticDataHandler
+    from database.account_group_handler import AccountGroupHandler
+    from database.account_master_handler import AccountMasterHandler
+    from database.business_partner_handler import BusinessPartnerHandler
+    from database.uom_handler import UoMHandler
+    from database.item_type_handler import ItemTypeHandler
+    from database.item_group_handler import ItemGroupHandler
+    from database.item_company_handler import ItemCompanyHandler
+    from database.item_handler import ItemHandler
+
+    for handler_class in (VoucherHandler, AuthHandler, FinancialYearHandler, StateHandler, CityHandler,
+                          StaticDataHandler, AccountGroupHandler, AccountMasterHandler,
+                          BusinessPartnerHandler, UoMHandler, ItemTypeHandler, ItemGroupHandler,
+                          ItemCompanyHandler, ItemHandler):
+        handler = handler_class()
+        if handler.connect():
+            handler.disconnect()
+
+
+def migrate_mysql_to_sqlite(tables=MIGRATION_TABLES, restart=False, fixture=None, db_path=None):
+    """
+    Migrate the tables and print a summary
+    fixture: path of a SQLite file read instead of the MySQL server
+    Returns True when every table was copied and verified
+    """
+    print("=" * 70)
+    print("MIGRATION: MySQL -> SQLite")
+    print("=" * 70)
+    print(f"Source: {fixture or 'MySQL server (database/config.py)'}")
+    print(f"Target: {db_path or DB_PATH}")
+
+    if db_path is None:
+        create_target_tables()
+
+    handler = MigrationHandler(SQLiteSource(fixture) if fixture else MySQLSource(), db_path)
+    if not handler.connect():
+        print("[ERROR] Could not connect to the source database")
+        return False
 
     try:
-        # Connect to MySQL
-        print("Connecting to MySQL...")
-        mysql_conn = mysql.connector.connect(**DB_CONFIG)
-        mysql_cursor = mysql_conn.cursor(dictionary=True)
-        print("✓ Connected to MySQL")
-
-        # Connect to SQLite
-        print("Connecting to SQLite...")
-        sqlite_conn = sqlite3.connect(DB_PATH)
-        sqlite_cursor = sqlite_conn.cursor()
-        print(f"✓ Connected to SQLite at: {DB_PATH}")
-
-        # Create SQLite table if it doesn't exist
-        print("\nCreating SQLite table...")
-        create_table_query = """
-        CREATE TABLE IF NOT EXISTS financial_years (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            fy_code TEXT NOT NULL UNIQUE,
-            display_name TEXT NOT NULL,
-            start_date DATE NOT NULL,
-            end_date DATE NOT NULL,
-            status TEXT DEFAULT 'Active' CHECK(status IN ('Active', 'Inactive')),
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-        """
-        sqlite_cursor.execute(create_table_query)
-        sqlite_conn.commit()
-        print("✓ SQLite table created/verified")
-
-        # Fetch data from MySQL
-        print("\nFetching data from MySQL...")
-        mysql_cursor.execute("""
-            SELECT id, fy_code, display_name, start_date, end_date, status, created_at
-            FROM financial_years
-            ORDER BY id
-        """)
-        mysql_rows = mysql_cursor.fetchall()
-        print(f"✓ Found {len(mysql_rows)} records in MySQL")
-
-        if not mysql_rows:
-            print("\n⚠ No data to migrate from MySQL")
-            return
-
-        # Insert into SQLite
-        print("\nMigrating data to SQLite...")
-        migrated_count = 0
-        skipped_count = 0
-
-        for row in mysql_rows:
-            try:
-                # Check if record already exists in SQLite
-                sqlite_cursor.execute("SELECT id FROM financial_years WHERE fy_code = ?",
-                                     (row['fy_code'],))
-                exists = sqlite_cursor.fetchone()
-
-                if exists:
-                    print(f"  ⊘ Skipping {row['fy_code']} - already exists in SQLite")
-                    skipped_count += 1
-                    continue
-
-                # Insert into SQLite
-                sqlite_cursor.execute("""
-                    INSERT INTO financial_years
-                    (fy_code, display_name, start_date, end_date, status, created_at)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                """, (
-                    row['fy_code'],
-                    row['display_name'],
-                    row['start_date'],
-                    row['end_date'],
-                    row['status'],
-                    row['created_at']
-                ))
-
-                print(f"  ✓ Migrated: {row['fy_code']} - {row['display_name']}")
-                migrated_count += 1
-
-            except sqlite3.Error as e:
-                print(f"  ✗ Error migrating {row['fy_code']}: {e}")
-
-        sqlite_conn.commit()
-
-        # Summary
-        print("\n" + "=" * 60)
-        print("MIGRATION COMPLETE")
-        print("=" * 60)
-        print(f"Total records in MySQL: {len(mysql_rows)}")
-        print(f"Successfully migrated: {migrated_count}")
-        print(f"Skipped (already exist): {skipped_count}")
-        print(f"SQLite database location: {DB_PATH}")
-
-        # Verify SQLite data
-        sqlite_cursor.execute("SELECT COUNT(*) FROM financial_years")
-        total_sqlite = sqlite_cursor.fetchone()[0]
-        print(f"Total records now in SQLite: {total_sqlite}")
-
-    except mysql.connector.Error as e:
-        print(f"✗ MySQL Error: {e}")
-        print("\nNote: If MySQL table doesn't exist, that's okay!")
-        print("You can create new financial years directly in the application.")
-
-    except sqlite3.Error as e:
-        print(f"✗ SQLite Error: {e}")
-
+        success, message, results = handler.migrate(tables, restart)
     finally:
-        # Clean up connections
-        if mysql_conn and mysql_conn.is_connected():
-            mysql_cursor.close()
-            mysql_conn.close()
-            print("\n✓ MySQL connection closed")
+        handler.disconnect()
 
-        if sqlite_conn:
-            sqlite_conn.close()
-            print("✓ SQLite connection closed")
+    print("\n" + "=" * 70)
+    print(f"{'Table':<22} {'Status':<10} {'Rows':>10}  Details")
+    print("-" * 70)
+    for result in results:
+        print(f"{result['table']:<22} {result['status']:<10} {result['rows_copied']:>10}  "
+              f"{result.get('message', '')}")
+    print("=" * 70)
+    print(f"[{'OK' if success else 'ERROR'}] {message}")
+    return success
 
 
 if __name__ == "__main__":
-    print("=" * 60)
-    print("FINANCIAL YEARS MIGRATION: MySQL → SQLite")
-    print("=" * 60)
-    print()
-    migrate_financial_years()
+    args = sys.argv[1:]
+    selected = args[args.index('--tables') + 1].split(',') if '--tables' in args[:-1] else MIGRATION_TABLES
+    fixture_path = args[args.index('--fixture') + 1] if '--fixture' in args[:-1] else None
+    ok = migrate_mysql_to_sqlite(selected, restart='--restart' in args, fixture=fixture_path)
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,441 @@
+"""
+Migration Handler - Bulk, resumable copy of the MySQL tables into SQLite
+
+Each table in MIGRATION_TABLES (parents before children) is copied in key order:
+    - the source rows are streamed with one query per run (an unbuffered, server-side
+      cursor on MySQL) and fetched CHUNK_SIZE rows at a time
+    - every chunk is written with executemany() as INSERT ... ON CONFLICT(key) DO UPDATE,
+      in one transaction together with its checkpoint in migration_checkpoints, so an
+      interrupted run resumes after the last committed key and re-running is harmless
+    - only columns present on both sides are copied; dates become ISO text, money
+      columns (database/money_schema.py) are converted from rupees to paise and NULLs
+      in NOT NULL target columns take the column default
+    - at the end the row count and a checksum of both tables are compared; a table is
+      only marked Verified when they match
+
+The source is any object with the interface of SQLiteSource: MySQLSource for the
+MySQL server of database/config.py, SQLiteSource for a fixture dump loaded into a
+SQLite file.
+"""
+
+import hashlib
+import sqlite3
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from database.config import DB_PATH, DB_CONFIG
+from database.fy_index import FY_DATA_VERSION
+from database.money_schema import MONEY_COLUMNS
+from database.voucher_handler import MASTER_DATA_VERSION, VoucherHandler, bump_data_version
+from utils.money import to_paise
+
+
+# Tables copied, parents before the tables referencing them
+MIGRATION_TABLES = (
+    'companies', 'users', 'financial_years', 'states', 'cities', 'book_codes', 'account_types',
+    'account_groups', 'account_master', 'business_partners', 'uom', 'item_types', 'item_groups',
+    'item_companies', 'items',
+)
+
+# Rows fetched from the source and written per transaction
+CHUNK_SIZE = 5000
+
+# Tables whose rows feed the opening balances of account_balances
+BALANCE_TABLES = ('financial_years', 'account_master', 'business_partners')
+
+
+class SQLiteSource:
+    """Migration source reading a SQLite file, e.g. a fixture dump of the MySQL tables"""
+
+    placeholder = '?'
+    quote = '"'
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = None
+
+    def connect(self):
+        self.conn = sqlite3.connect(self.path)
+
+    def disconnect(self):
+        if self.conn:
+            self.conn.close()
+            self.conn = None
+
+    def has_table(self, table):
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name = ?", (table,))
+        return cursor.fetchone()[0] > 0
+
+    def _cursor(self):
+        return self.conn.cursor()
+
+    def columns(self, table):
+        cursor = self._cursor()
+        cursor.execute(f"SELECT * FROM {self.quote}{table}{self.quote} WHERE 1 = 0")
+        names = [column[0] for column in cursor.description]
+        cursor.fetchall()
+        cursor.close()
+        return names
+
+    def count(self, table):
+        cursor = self._cursor()
+        cursor.execute(f"SELECT COUNT(*) FROM {self.quote}{table}{self.quote}")
+        count = cursor.fetchone()[0]
+        cursor.close()
+        return count
+
+    def stream(self, table, columns, key, after=None, chunk_size=CHUNK_SIZE):
+        """Yield lists of row tuples in key order, starting after the key value `after`"""
+        q = self.quote
+        column_list = ', '.join(f"{q}{column}{q}" for column in columns)
+        query = f"SELECT {column_list} FROM {q}{table}{q}"
+        params = ()
+        if after is not None:
+            query += f" WHERE {q}{key}{q} > {self.placeholder}"
+            params = (after,)
+        cursor = self._cursor()
+        try:
+            cursor.execute(query + f" ORDER BY {q}{key}{q}", params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield [tuple(row) for row in rows]
+        finally:
+            cursor.close()
+
+
+class MySQLSource(SQLiteSource):
+    """Migration source reading the MySQL server, rows streamed with unbuffered cursors"""
+
+    placeholder = '%s'
+    quote = '`'
+
+    def __init__(self, config=None):
+        super().__init__(None)
+        self.config = config or DB_CONFIG
+
+    def connect(self):
+        import mysql.connector
+        self.conn = mysql.connector.connect(**self.config)
+
+    def has_table(self, table):
+        cursor = self._cursor()
+        cursor.execute("""
+            SELECT COUNT(*) FROM information_schema.tables
+            WHERE table_schema = DATABASE() AND table_name = %s
+        """, (table,))
+        found = cursor.fetchone()[0] > 0
+        cursor.close()
+        return found
+
+    def _cursor(self):
+        # Unbuffered: rows stay on the server until fetched
+        return self.conn.cursor(buffered=False)
+
+
+def _target_columns(conn, table):
+    """Columns of a target table: [(name, declared type, notnull, default SQL, pk)]"""
+    return [(row[1], row[2].upper(), row[3], row[4], row[5])
+            for row in conn.execute(f'PRAGMA table_info("{table}")')]
+
+
+def _default_value(default_sql, declared_type, started_at):
+    """Python value of a column default, used for NULLs in NOT NULL columns"""
+    if default_sql is None:
+        return 0 if any(t in declared_type for t in ('INT', 'REAL', 'NUM')) else ''
+    text = default_sql.strip()
+    if text.upper() in ('CURRENT_TIMESTAMP', 'CURRENT_DATE', 'CURRENT_TIME'):
+        return {'CURRENT_TIMESTAMP': started_at, 'CURRENT_DATE': started_at[:10],
+                'CURRENT_TIME': started_at[11:]}[text.upper()]
+    if text[:1] in ("'", '"'):
+        return text[1:-1].replace(text[0] * 2, text[0])
+    try:
+        return int(text)
+    except ValueError:
+        try:
+            return float(text)
+        except ValueError:
+            return text
+
+
+def _to_sqlite(value):
+    """Convert a source value to what the SQLite target stores"""
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    if isinstance(value, (date, time)):
+        return value.isoformat()
+    if isinstance(value, timedelta):
+        return str(value)
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, (bytearray, memoryview)):
+        return bytes(value)
+    return value
+
+
+def _canonical(value):
+    """Text form of a value for checksums, independent of SQLite type affinity"""
+    if value is None:
+        return '\x00'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if isinstance(value, bytes):
+        return value.hex()
+    return str(value)
+
+
+def _update_checksum(digest, rows):
+    for row in rows:
+        digest.update('\x1f'.join(_canonical(value) for value in row).encode('utf-8'))
+        digest.update(b'\x1e')
+
+
+class MigrationHandler:
+    def __init__(self, source, db_path=None, chunk_size=CHUNK_SIZE):
+        self.source = source
+        self.db_path = db_path or DB_PATH
+        self.chunk_size = chunk_size
+        self.conn = None
+        self.started_at = None
+
+    def connect(self):
+        """Open the source and the SQLite target"""
+        try:
+            self.source.connect()
+            self.conn = sqlite3.connect(self.db_path, timeout=30)
+            self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS migration_checkpoints (
+                table_name TEXT PRIMARY KEY,
+                key_column TEXT NOT NULL,
+                last_key,
+                rows_copied INTEGER NOT NULL DEFAULT 0,
+                status TEXT NOT NULL DEFAULT 'Copying'
+                    CHECK(status IN ('Copying', 'Copied', 'Verified', 'Mismatch')),
+                source_rows INTEGER,
+                target_rows INTEGER,
+                checksum TEXT,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            """)
+            self.conn.commit()
+            return True
+        except Exception as e:
+            print(f"[MIGRATION] Connection error: {e}")
+            self.disconnect()
+            return False
+
+    def disconnect(self):
+        self.source.disconnect()
+        if self.conn:
+            self.conn.close()
+            self.conn = None
+
+    def get_checkpoint(self, table):
+        row = self.conn.execute("""
+            SELECT key_column, last_key, rows_copied, status, source_rows, target_rows, checksum
+            FROM migration_checkpoints WHERE table_name = ?
+        """, (table,)).fetchone()
+        if not row:
+            return None
+        return dict(zip(('key_column', 'last_key', 'rows_copied', 'status', 'source_rows',
+                         'target_rows', 'checksum'), row))
+
+    # ========================================================================
+    # COPY
+    # ========================================================================
+
+    def _plan(self, table):
+        """
+        Columns copied for a table and how each is converted
+        Returns (key, columns, converters) or None when the table cannot be copied
+        """
+        target = _target_columns(self.conn, table)
+        keys = [name for name, _, _, _, pk in target if pk]
+        if len(keys) != 1:
+            return None
+        source_columns = set(self.source.columns(table))
+        if keys[0] not in source_columns:
+            return None
+
+        columns, converters = [], []
+        money = MONEY_COLUMNS.get(table, ())
+        for name, declared_type, notnull, default_sql, _ in target:
+            if name not in source_columns:
+                continue
+            columns.append(name)
+            fill = _default_value(default_sql, declared_type, self.started_at) if notnull else None
+            is_money = name in money and declared_type == 'INTEGER'
+
+            def convert(value, fill=fill, is_money=is_money):
+                if value is None:
+                    return fill
+                return to_paise(value) if is_money else _to_sqlite(value)
+            converters.append(convert)
+        return keys[0], columns, converters
+
+    def _converted(self, rows, converters):
+        return [tuple(convert(value) for convert, value in zip(converters, row)) for row in rows]
+
+    def migrate_table(self, table, restart=False):
+        """
+        Copy one table, resuming from its checkpoint unless restart is set
+        Returns dict: table, status, rows_copied, message
+        """
+        result = {'table': table, 'status': 'Skipped', 'rows_copied': 0}
+        if not self.source.has_table(table):
+            result['message'] = "not in the source"
+            return result
+        if not _target_columns(self.conn, table):
+            result['message'] = "not in the SQLite database"
+            return result
+        plan = self._plan(table)
+        if plan is None:
+            result['message'] = "no single-column primary key on both sides"
+            return result
+        key, columns, converters = plan
+
+        checkpoint = None if restart else self.get_checkpoint(table)
+        if checkpoint and checkpoint['status'] == 'Verified':
+            result.update(status='Verified', rows_copied=checkpoint['rows_copied'],
+                          message="already migrated")
+            return result
+        after = checkpoint['last_key'] if checkpoint and checkpoint['status'] == 'Copying' else None
+        copied = checkpoint['rows_copied'] if after is not None else 0
+
+        column_list = ', '.join(f'"{column}"' for column in columns)
+        updates = ', '.join(f'"{column}" = excluded."{column}"' for column in columns if column != key)
+        upsert = f"""
+            INSERT INTO "{table}" ({column_list}) VALUES ({', '.join('?' * len(columns))})
+            ON CONFLICT("{key}") DO {'UPDATE SET ' + updates if updates else 'NOTHING'}
+        """
+        key_index = columns.index(key)
+
+        if after is not None:
+            print(f"[MIGRATION] {table}: resuming after {key} {after} ({copied} rows copied)")
+        for rows in self.source.stream(table, columns, key, after, self.chunk_size):
+            rows = self._converted(rows, converters)
+            try:
+                self.conn.executemany(upsert, rows)
+                copied += len(rows)
+                self._save_checkpoint(table, key, rows[-1][key_index], copied, 'Copying')
+                self.conn.commit()
+            except sqlite3.Error:
+                self.conn.rollback()
+                raise
+        self._save_checkpoint(table, key, None, copied, 'Copied')
+        self.conn.commit()
+        print(f"[MIGRATION] {table}: {copied} rows copied")
+        result.update(status='Copied', rows_copied=copied)
+        return result
+
+    def _save_checkpoint(self, table, key, last_key, rows_copied, status, source_rows=None,
+                         target_rows=None, checksum=None):
+        self.conn.execute("""
+            INSERT INTO migration_checkpoints (
+                table_name, key_column, last_key, rows_copied, status,
+                source_rows, target_rows, checksum, updated_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT(table_name) DO UPDATE SET
+                key_column = excluded.key_column, last_key = excluded.last_key,
+                rows_copied = excluded.rows_copied, status = excluded.status,
+                source_rows = excluded.source_rows, target_rows = excluded.target_rows,
+                checksum = excluded.checksum, updated_at = CURRENT_TIMESTAMP
+        """, (table, key, last_key, rows_copied, status, source_rows, target_rows, checksum))
+
+    # ========================================================================
+    # VERIFY
+    # ========================================================================
+
+    def verify_table(self, table):
+        """
+        Compare row count and checksum of the converted source rows and the target table
+        Returns (verified: bool, message: str)
+        """
+        key, columns, converters = self._plan(table)
+        source_digest, target_digest = hashlib.sha256(), hashlib.sha256()
+        source_rows = 0
+        for rows in self.source.stream(table, columns, key, None, self.chunk_size):
+            _update_checksum(source_digest, self._converted(rows, converters))
+            source_rows += len(rows)
+
+        column_list = ', '.join(f'"{column}"' for column in columns)
+        cursor = self.conn.execute(f'SELECT {column_list} FROM "{table}" ORDER BY "{key}"')
+        target_rows = 0
+        while True:
+            rows = cursor.fetchmany(self.chunk_size)
+            if not rows:
+                break
+            _update_checksum(target_digest, rows)
+            target_rows += len(rows)
+
+        verified = source_rows == target_rows and source_digest.digest() == target_digest.digest()
+        checkpoint = self.get_checkpoint(table)
+        self._save_checkpoint(table, key, None, checkpoint['rows_copied'] if checkpoint else 0,
+                              'Verified' if verified else 'Mismatch', source_rows, target_rows,
+                              source_digest.hexdigest())
+        self.conn.commit()
+        if verified:
+            return True, f"{target_rows} rows, checksum {source_digest.hexdigest()[:12]}"
+        if source_rows != target_rows:
+            return False, f"row count mismatch: {source_rows} in the source, {target_rows} in SQLite"
+        return False, "checksum mismatch"
+
+    # ========================================================================
+    # MIGRATE
+    # ========================================================================
+
+    def migrate(self, tables=MIGRATION_TABLES, restart=False):
+        """
+        Copy and verify the tables, then refresh the balance aggregate
+        Returns (success: bool, message: str, results: list of per-table dicts)
+        """
+        self.started_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        results = []
+        try:
+            for table in tables:
+                result = self.migrate_table(table, restart)
+                if result['status'] == 'Copied':
+                    verified, result['message'] = self.verify_table(table)
+                    result['status'] = 'Verified' if verified else 'Mismatch'
+                print(f"[MIGRATION] {table}: {result['status']} - {result.get('message', '')}")
+                results.append(result)
+
+            copied = [r['table'] for r in results if r['status'] in ('Verified', 'Mismatch')]
+            if copied:
+                self._refresh_derived_data(copied)
+        except (sqlite3.Error, ValueError) as e:
+            print(f"[MIGRATION] Error: {e}")
+            return False, f"Migration failed: {e}", results
+        except Exception as e:
+            # Errors raised by the source driver (mysql.connector.Error)
+            print(f"[MIGRATION] Source error: {e}")
+            return False, f"Migration failed: {e}", results
+
+        mismatched = [r['table'] for r in results if r['status'] == 'Mismatch']
+        migrated = sum(1 for r in results if r['status'] == 'Verified')
+        if mismatched:
+            return False, f"Verification failed for {', '.join(mismatched)}", results
+        return True, f"{migrated} table(s) migrated and verified", results
+
+    def _refresh_derived_data(self, tables):
+        """Invalidate caches and rebuild account_balances after masters were copied"""
+        cursor = self.conn.cursor()
+        bump_data_version(cursor, MASTER_DATA_VERSION)
+        if 'financial_years' in tables:
+            bump_data_version(cursor, FY_DATA_VERSION)
+        self.conn.commit()
+
+        row = cursor.execute("""
+            SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name = 'account_balances'
+        """).fetchone()
+        if row[0] and any(table in BALANCE_TABLES for table in tables):
+            voucher_handler = VoucherHandler(self.db_path)
+            if voucher_handler.connect():
+                try:
+                    success, message = voucher_handler.rebuild_account_balances()
+                    print(f"[MIGRATION] Balances: {message}")
+                finally:
+                    voucher_handler.disconnect()
@@ -0,0 +1,127 @@
+"""
+Money Schema - Registry of monetary columns and the REAL -> INTEGER paise migration
+
+Monetary columns are stored as INTEGER paise (see utils/money.py). Databases created
+before that hold REAL rupees; ensure_money_schema() rewrites those tables in place:
+    - one table per transaction (BEGIN IMMEDIATE), so other connections only wait
+      for the table currently being rewritten and the app can stay open
+    - the table is copied into a new table declared with INTEGER money columns
+      (rupees x 100, rounded half away from zero), then swapped in by rename;
+      indexes and the AUTOINCREMENT sequence are recreated
+    - row counts are verified before the swap is committed
+It is idempotent: tables whose money columns are already INTEGER are skipped, so
+every handler that reads or writes money calls it on connect.
+"""
+
+import re
+import sqlite3
+
+
+# table -> monetary columns (rupee amounts, stored as paise)
+MONEY_COLUMNS = {
+    'account_master': ('opening_balance',),
+    'business_partners': ('opening_balance',),
+    'items': ('purchase_rate', 'mrp', 'sale_rate_wh1', 'sale_rate_wh2'),
+    'vouchers': ('total_amount',),
+    'voucher_lines': ('debit', 'credit'),
+    'account_balances': ('opening_balance', 'debit_total', 'credit_total'),
+    'sales_invoices': ('taxable_amount', 'tax_amount', 'total_amount'),
+    'sales_invoice_lines': ('rate', 'taxable_amount', 'cgst_amount', 'sgst_amount',
+                            'igst_amount', 'tax_amount', 'line_total'),
+}
+
+
+def tables_to_migrate(conn):
+    """Tables that exist and still declare a money column as something other than INTEGER"""
+    placeholders = ', '.join('?' * len(MONEY_COLUMNS))
+    rows = conn.execute(f"""
+        SELECT m.name, p.name, p.type
+        FROM sqlite_master m, pragma_table_info(m.name) p
+        WHERE m.type = 'table' AND m.name IN ({placeholders})
+    """, list(MONEY_COLUMNS)).fetchall()
+
+    pending = []
+    for table, column, declared_type in rows:
+        if column in MONEY_COLUMNS[table] and declared_type.upper() != 'INTEGER' and table not in pending:
+            pending.append(table)
+    return pending
+
+
+def _integer_money_sql(create_sql, table, new_table, columns):
+    """Rewrite a CREATE TABLE statement: new name, money columns declared INTEGER"""
+    sql = re.sub(r'^\s*CREATE\s+TABLE\s+(IF\s+NOT\s+EXISTS\s+)?["`\[]?' + re.escape(table) + r'["`\]]?',
+                 f'CREATE TABLE {new_table}', create_sql, count=1, flags=re.IGNORECASE)
+    for column in columns:
+        sql = re.sub(r'\b(' + re.escape(column) + r')\s+REAL\b(\s+DEFAULT\s+)?(0\.0+)?',
+                     lambda m: f"{m.group(1)} INTEGER" + (f"{m.group(2)}0" if m.group(2) else ''),
+                     sql, flags=re.IGNORECASE)
+    return sql
+
+
+def migrate_table(conn, table):
+    """Rewrite one table with INTEGER paise money columns, in its own transaction"""
+    columns = MONEY_COLUMNS[table]
+    new_table = f"{table}__paise"
+
+    conn.commit()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        create_sql = conn.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone()[0]
+        index_sqls = [row[0] for row in conn.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL",
+            (table,))]
+        all_columns = [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+        sequence = None
+        if conn.execute("SELECT COUNT(*) FROM sqlite_master WHERE name = 'sqlite_sequence'").fetchone()[0]:
+            row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = ?", (table,)).fetchone()
+            sequence = row[0] if row else None
+
+        conn.execute(f"DROP TABLE IF EXISTS {new_table}")
+        conn.execute(_integer_money_sql(create_sql, table, new_table, columns))
+
+        # Snap float noise before rounding (16.2 * 100 = 1619.9999999999998)
+        select_list = ', '.join(
+            f"CAST(ROUND(ROUND({column} * 100, 6)) AS INTEGER)" if column in columns else column
+            for column in all_columns
+        )
+        conn.execute(f"INSERT INTO {new_table} ({', '.join(all_columns)}) SELECT {select_list} FROM {table}")
+
+        old_count = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        new_count = conn.execute(f"SELECT COUNT(*) FROM {new_table}").fetchone()[0]
+        if old_count != new_count:
+            raise sqlite3.DatabaseError(f"{table}: copied {new_count} of {old_count} rows")
+
+        conn.execute(f"DROP TABLE {table}")
+        conn.execute(f"ALTER TABLE {new_table} RENAME TO {table}")
+        for index_sql in index_sqls:
+            conn.execute(index_sql)
+        if sequence is not None:
+            conn.execute("UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = ?", (sequence, table))
+
+        # Cached reports were built from rupee values
+        if conn.execute("SELECT COUNT(*) FROM sqlite_master WHERE name = 'balance_versions'").fetchone()[0]:
+            conn.execute("UPDATE balance_versions SET version = version + 1")
+            conn.execute("""
+                INSERT INTO balance_versions (fy_id, version) VALUES (0, 1)
+                ON CONFLICT(fy_id) DO UPDATE SET version = version + 1
+            """)
+
+        conn.commit()
+        return old_count
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+
+
+def ensure_money_schema(conn):
+    """
+    Migrate every table that still stores money as REAL rupees
+    Returns list of (table, row_count) migrated; empty when the schema is current.
+    """
+    migrated = []
+    for table in tables_to_migrate(conn):
+        row_count = migrate_table(conn, table)
+        print(f"[MONEY] Migrated {table} to integer paise ({row_count} rows)")
+        migrated.append((table, row_count))
+    return migrated
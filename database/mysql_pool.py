@@ -0,0 +1,120 @@
+"""
+MySQL Pool - Shared, health-checked connections for the MySQL handlers
+
+Handlers check out a connection per call and return it right after:
+
+    with mysql_connection() as connection:
+        cursor = connection.cursor(dictionary=True)
+        ...
+
+The pool is a mysql.connector.pooling.MySQLConnectionPool (POOL_SIZE connections,
+created once per configuration) with two additions:
+    - health check: a connection idle for more than HEALTH_CHECK_SECONDS is pinged
+      on checkout and reconnected if the server dropped it (wait_timeout, restarts)
+    - idle eviction: the session of a connection idle for more than MAX_IDLE_SECONDS
+      is closed on checkout and replaced by a fresh one, so long-idle sessions (and
+      their server-side state) are never reused
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from mysql.connector import Error, PoolError, pooling
+from database.config import DB_CONFIG
+
+
+POOL_NAME = 'login_system_pool'
+
+POOL_SIZE = 5
+
+# Seconds a checkout waits for a connection when all are in use
+CHECKOUT_TIMEOUT_SECONDS = 10
+
+# Idle time after which a connection is pinged before use
+HEALTH_CHECK_SECONDS = 30
+
+# Idle time after which a connection's session is replaced
+MAX_IDLE_SECONDS = 300
+
+
+class MySQLPool:
+    def __init__(self, config=None, pool_size=POOL_SIZE, name=POOL_NAME):
+        self.pool = pooling.MySQLConnectionPool(pool_name=name, pool_size=pool_size,
+                                                pool_reset_session=True, **(config or DB_CONFIG))
+        # id of the underlying connection -> time it was returned to the pool
+        self.idle_since = {}
+        self.lock = threading.Lock()
+        # Counters read by metrics_exporter.py
+        self.stats = {'checkouts': 0, 'checkout_wait_seconds': 0.0, 'exhausted': 0,
+                      'health_checks': 0, 'reconnects': 0, 'in_use': 0}
+
+    def _checkout(self):
+        """Take a connection from the pool, waiting up to CHECKOUT_TIMEOUT_SECONDS"""
+        started = time.monotonic()
+        deadline = started + CHECKOUT_TIMEOUT_SECONDS
+        while True:
+            try:
+                connection = self.pool.get_connection()
+                with self.lock:
+                    self.stats['checkouts'] += 1
+                    self.stats['checkout_wait_seconds'] += time.monotonic() - started
+                    self.stats['in_use'] += 1
+                return connection
+            except PoolError:
+                with self.lock:
+                    self.stats['exhausted'] += 1
+                if time.monotonic() >= deadline:
+                    raise
+                time.sleep(0.05)
+
+    @contextmanager
+    def connection(self):
+        """Check out a healthy connection for the duration of a with block"""
+        connection = self._checkout()
+        key = id(connection._cnx)
+        with self.lock:
+            idle = time.monotonic() - self.idle_since.pop(key, time.monotonic())
+            if idle > MAX_IDLE_SECONDS:
+                self.stats['reconnects'] += 1
+            elif idle > HEALTH_CHECK_SECONDS:
+                self.stats['health_checks'] += 1
+        try:
+            if idle > MAX_IDLE_SECONDS:
+                connection.reconnect(attempts=2, delay=0)
+            elif idle > HEALTH_CHECK_SECONDS:
+                connection.ping(reconnect=True, attempts=2, delay=0)
+            yield connection
+        finally:
+            try:
+                if connection.in_transaction:
+                    connection.rollback()
+            except Error as e:
+                # The server may be gone; the pool resets the session on return
+                print(f"[MYSQL POOL] Rollback on return failed: {e}")
+            finally:
+                with self.lock:
+                    self.idle_since[key] = time.monotonic()
+                    self.stats['in_use'] -= 1
+                connection.close()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(config=None):
+    """The shared pool for a connection configuration (DB_CONFIG by default)"""
+    config = config or DB_CONFIG
+    key = tuple(sorted((k, str(v)) for k, v in config.items()))
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = MySQLPool(config, name=f"{POOL_NAME}_{len(_pools) + 1}")
+        return _pools[key]
+
+
+@contextmanager
+def mysql_connection(config=None):
+    """Check out a connection from the shared pool"""
+    with get_pool(config).connection() as connection:
+        yield connection
+
@@ -0,0 +1,108 @@
+"""
+Partition Financial Years
+Moves the vouchers, balances and sales invoices of every financial year out of
+financial_data.db into one file per year (financial_data_FY2425.db, ...), and
+closes, reopens or compacts a year file. See database/partition_router.py.
+Run it while the application is closed: open connections keep reading the main
+file only until they reconnect.
+
+Usage:
+    python database/partition_financial_years.py                  # move every year into its file
+    python database/partition_financial_years.py --vacuum         # ... and reclaim the space in the main file
+    python database/partition_financial_years.py --status         # list the year files
+    python database/partition_financial_years.py --close FY2324   # make a year read-only
+    python database/partition_financial_years.py --reopen FY2324  # make a closed year writable again
+    python database/partition_financial_years.py --compact FY2324 # vacuum a closed year file
+"""
+
+import os
+import sqlite3
+import sys
+from pathlib import Path
+
+# Add parent directory to path to import config
+sys.path.append(str(Path(__file__).parent.parent))
+from database.config import DB_PATH
+from database.partition_router import PartitionRouter, registered_partitions
+
+
+def _financial_years(conn):
+    return conn.execute("SELECT id, fy_code FROM financial_years ORDER BY start_date").fetchall()
+
+
+def partition_financial_years(db_path=DB_PATH, vacuum=False):
+    """
+    Move the rows of every financial year into its own file
+    Returns True if every year was moved
+    """
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        print("=" * 70)
+        print("PARTITIONING TRANSACTIONS BY FINANCIAL YEAR")
+        print("=" * 70)
+
+        router = PartitionRouter(conn, db_path)
+        for fy_id, fy_code in _financial_years(conn):
+            moved = router.migrate_year(fy_id)
+            print(f"[OK] {fy_code}: " + ", ".join(f"{table} {rows}" for table, rows in moved.items()))
+
+        if vacuum:
+            conn.execute("VACUUM main")
+            print("[OK] Main file vacuumed")
+
+        print("[OK] Partitioning complete")
+        return True
+
+    except sqlite3.Error as e:
+        print(f"[ERROR] Partitioning failed: {e}")
+        return False
+    finally:
+        conn.close()
+
+
+def print_status(db_path=DB_PATH):
+    """List the year files with their status and size"""
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        partitions = registered_partitions(conn)
+        if not partitions:
+            print("Database is not partitioned")
+            return True
+
+        print(f"{'Year':<10} {'Status':<8} {'Size (KB)':>12}  File")
+        print("-" * 70)
+        for partition in partitions.values():
+            size = os.path.getsize(partition['path']) / 1024 if os.path.exists(partition['path']) else 0
+            print(f"{partition['fy_code']:<10} {partition['status']:<8} {size:>12,.0f}  {partition['path']}")
+        return True
+    finally:
+        conn.close()
+
+
+def change_year(action, fy_code, db_path=DB_PATH):
+    """Run close_year / reopen_year / compact_year for fy_code, returns True on success"""
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        fy_id = next((fy_id for fy_id, code in _financial_years(conn) if code == fy_code), None)
+        if fy_id is None:
+            print(f"[ERROR] Financial year {fy_code} not found")
+            return False
+
+        router = PartitionRouter(conn, db_path)
+        router.install()
+        success, message = getattr(router, f"{action}_year")(fy_id)
+        print(f"[{'OK' if success else 'ERROR'}] {message}")
+        return success
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if '--status' in args:
+        ok = print_status()
+    elif any(flag in args for flag in ('--close', '--reopen', '--compact')) and len(args) == 2:
+        ok = change_year(args[0].lstrip('-'), args[1])
+    else:
+        ok = partition_financial_years(vacuum='--vacuum' in args)
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,559 @@
+"""
+Partition Router - One SQLite file per financial year for the transactional tables
+
+Master data (accounts, partners, items, financial years, stock) stays in the main
+database file. Once a database is partitioned, the rows of each financial year of
+the tables in PARTITIONED_TABLES live in their own file next to it:
+    financial_data.db           - masters, balance_versions, fy_partitions
+    financial_data_FY2425.db    - vouchers, voucher_lines, account_balances,
+                                  invoice_series, sales_invoices, sales_invoice_lines
+The fy_partitions registry in the main file lists the year files and whether
+they are Open or Closed. A database without registered partitions is not
+partitioned and the router leaves its connection untouched.
+
+Routing on a connection:
+    - reads: the year files are ATTACHed as fy_<fy_id> and every partitioned
+      table is shadowed by a TEMP VIEW of the same name, a UNION ALL over the
+      main table and the attached year tables. Temp names resolve first, so the
+      existing read queries run unchanged, and SQLite pushes their WHERE terms
+      (fy_id, dates, ids) into each branch, where the year file's own indexes apply.
+    - writes: go to the qualified table of the year (write_schema()), creating
+      the year file on the first write of a new financial year.
+SQLite attaches at most 10 files per connection; the books-start year and the
+latest years are attached on connect and require() swaps others in on demand.
+
+Ids stay unique across files: a new year file starts its AUTOINCREMENT sequences
+at fy_id x ID_BLOCK, rows moved from the main file keep their ids.
+
+Closed years are attached read-only and their file is made read-only on disk;
+writes into them raise PartitionError (an sqlite3.Error, so handlers report it
+like any other database error). compact_year() vacuums a closed year file.
+
+The main file runs in WAL mode, where a transaction spanning attached files is
+atomic per file only. A document and its voucher always go to the same year
+file; stock movements and balance_versions are written to the main file.
+"""
+
+import os
+import re
+import sqlite3
+import stat
+from urllib.parse import quote
+
+
+# Tables whose rows belong to one financial year, in parent -> child order
+PARTITIONED_TABLES = ('vouchers', 'voucher_lines', 'account_balances',
+                      'invoice_series', 'sales_invoices', 'sales_invoice_lines')
+
+# Tables without an fy_id column, routed through their parent's rows
+PARENT_KEYS = {'sales_invoice_lines': ('invoice_id', 'sales_invoices')}
+
+# Ids of a new year file start at fy_id x ID_BLOCK
+ID_BLOCK = 10 ** 9
+
+# Year files attached at once (SQLite's default limit is 10 attached files)
+MAX_ATTACHED_YEARS = 8
+
+READ_ONLY_MODE = stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH
+READ_WRITE_MODE = READ_ONLY_MODE | stat.S_IWUSR
+
+
+class PartitionError(sqlite3.DatabaseError):
+    """A financial year file is closed, missing or cannot be attached"""
+
+
+def partition_alias(fy_id):
+    """Schema name a financial year file is attached under"""
+    return f"fy_{int(fy_id)}"
+
+
+def partition_path(db_path, fy_code):
+    """Year file of fy_code next to the main database: <stem>_<fy_code>.db"""
+    stem, ext = os.path.splitext(os.path.abspath(db_path))
+    return f"{stem}_{fy_code}{ext or '.db'}"
+
+
+def create_registry(conn):
+    """Create the fy_partitions registry in the main file if it doesn't exist"""
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS main.fy_partitions (
+        fy_id INTEGER PRIMARY KEY,
+        path TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'Open' CHECK(status IN ('Open', 'Closed')),
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        closed_at TIMESTAMP,
+        FOREIGN KEY (fy_id) REFERENCES financial_years(id)
+    )
+    """)
+
+
+def registered_partitions(conn):
+    """
+    Registered year files: {fy_id: {'fy_code', 'path', 'status', 'start_date'}}
+    Empty when the database is not partitioned. Paths are stored relative to the
+    main file, so the set of files can be moved together.
+    """
+    row = conn.execute("""
+        SELECT COUNT(*) FROM main.sqlite_master WHERE type = 'table' AND name = 'fy_partitions'
+    """).fetchone()
+    if row[0] == 0:
+        return {}
+
+    main_dir = os.path.dirname(_main_file(conn))
+    rows = conn.execute("""
+        SELECT p.fy_id, p.path, p.status, fy.fy_code, fy.start_date
+        FROM main.fy_partitions p
+        LEFT JOIN main.financial_years fy ON fy.id = p.fy_id
+        ORDER BY fy.start_date, p.fy_id
+    """).fetchall()
+    return {
+        fy_id: {'fy_code': fy_code, 'path': os.path.join(main_dir, path),
+                'status': status, 'start_date': start_date}
+        for fy_id, path, status, fy_code, start_date in rows
+    }
+
+
+def attached_schemas(conn):
+    """Schema name -> file of every database attached to conn"""
+    return {name: path for _seq, name, path in conn.execute("PRAGMA database_list")}
+
+
+def write_schema(cursor, fy_id):
+    """
+    Schema that rows of fy_id are written to on a connection without a router
+    (e.g. master handlers writing opening balances): 'main' when the database is
+    not partitioned, else the year file, which must already be attached.
+    Raises PartitionError if the year is closed or its file is not attached.
+    """
+    partitions = registered_partitions(cursor.connection)
+    if not partitions:
+        return 'main'
+    partition = partitions.get(fy_id)
+    if partition is None:
+        raise PartitionError(f"Financial year {fy_id} has no partition file yet")
+    if partition['status'] == 'Closed':
+        raise PartitionError(f"Financial year {partition['fy_code']} is closed")
+
+    alias = partition_alias(fy_id)
+    if alias not in attached_schemas(cursor.connection):
+        raise PartitionError(f"Financial year {partition['fy_code']} is not attached")
+    return alias
+
+
+def _main_file(conn):
+    return attached_schemas(conn).get('main') or ''
+
+
+def _table_columns(conn, schema, table):
+    """[(name, declared type, default)] of schema.table, empty if it doesn't exist"""
+    return [(row[1], row[2], row[4]) for row in conn.execute(f"PRAGMA {schema}.table_info({table})")]
+
+
+def _qualified_sql(create_sql, schema):
+    """CREATE TABLE / INDEX statement of the main file rewritten to create the object in schema"""
+    return re.sub(r'^\s*CREATE\s+(TABLE|(?:UNIQUE\s+)?INDEX)\s+(?:IF\s+NOT\s+EXISTS\s+)?',
+                  lambda m: f"CREATE {m.group(1).upper()} IF NOT EXISTS {schema}.",
+                  create_sql, count=1, flags=re.IGNORECASE)
+
+
+class PartitionRouter:
+    def __init__(self, conn, db_path):
+        self.conn = conn
+        self.db_path = db_path
+        self.partitions = {}
+        # Attached fy_ids, least recently used first
+        self.attached = []
+
+    @property
+    def enabled(self):
+        return bool(self.partitions)
+
+    # ========================================================================
+    # ATTACH AND VIEWS
+    # ========================================================================
+
+    def install(self):
+        """
+        Attach the books-start year and the latest years and route reads through
+        the temp views. Does nothing on a database that is not partitioned.
+        Returns True if the connection is partitioned
+        """
+        self.partitions = registered_partitions(self.conn)
+        if not self.partitions:
+            return False
+
+        fy_ids = list(self.partitions)
+        default = fy_ids[:1] + fy_ids[1:][-(MAX_ATTACHED_YEARS - 1):]
+        for fy_id in default:
+            self._attach(fy_id)
+        self._build_views()
+        return True
+
+    def _attach(self, fy_id):
+        """ATTACH the file of fy_id (read-only when the year is closed)"""
+        partition = self.partitions[fy_id]
+        alias = partition_alias(fy_id)
+        if not os.path.exists(partition['path']):
+            raise PartitionError(f"Partition file of {partition['fy_code']} not found: {partition['path']}")
+
+        if partition['status'] == 'Closed':
+            target = f"file:{quote(os.path.abspath(partition['path']))}?mode=ro"
+        else:
+            target = partition['path']
+        self.conn.execute("ATTACH DATABASE ? AS " + alias, (target,))
+
+        attached_file = attached_schemas(self.conn).get(alias)
+        if not attached_file or os.path.abspath(attached_file) != os.path.abspath(partition['path']):
+            # SQLite built without URI filenames opened "file:..." as a plain name
+            self.conn.execute(f"DETACH DATABASE {alias}")
+            raise PartitionError(f"Cannot attach {partition['path']} read-only")
+
+        if partition['status'] == 'Open':
+            self._sync_columns(alias)
+        self.attached.append(fy_id)
+
+    def _detach(self, fy_id):
+        self.conn.execute(f"DETACH DATABASE {partition_alias(fy_id)}")
+        self.attached.remove(fy_id)
+
+    def _sync_columns(self, alias):
+        """Add columns added to the main tables after the year file was created"""
+        for table in PARTITIONED_TABLES:
+            present = {name for name, _type, _default in _table_columns(self.conn, alias, table)}
+            if not present:
+                continue
+            for name, declared_type, default in _table_columns(self.conn, 'main', table):
+                if name not in present:
+                    default_sql = f" DEFAULT {default}" if default is not None else ''
+                    self.conn.execute(f"ALTER TABLE {alias}.{table} ADD COLUMN {name} {declared_type}{default_sql}")
+
+    def _build_views(self):
+        """(Re)create one temp view per partitioned table over main and the attached years"""
+        for table in PARTITIONED_TABLES:
+            self.conn.execute(f"DROP VIEW IF EXISTS temp.{table}")
+            columns = [name for name, _type, _default in _table_columns(self.conn, 'main', table)]
+            if not columns:
+                continue
+
+            branches = [f"SELECT {', '.join(columns)} FROM main.{table}"]
+            for fy_id in sorted(self.attached):
+                alias = partition_alias(fy_id)
+                present = {name for name, _type, _default in _table_columns(self.conn, alias, table)}
+                if not present:
+                    continue
+                select = ', '.join(name if name in present else f"NULL AS {name}" for name in columns)
+                branches.append(f"SELECT {select} FROM {alias}.{table}")
+
+            self.conn.execute(f"CREATE TEMP VIEW {table} AS " + "\nUNION ALL\n".join(branches))
+
+    def require(self, fy_ids):
+        """
+        Make sure the files of fy_ids are attached, detaching the least recently
+        used other years when the attach limit is reached
+        Raises PartitionError if that is not possible inside the current transaction
+        """
+        fy_ids = [fy_id for fy_id in dict.fromkeys(fy_ids) if fy_id is not None]
+        if not self.enabled:
+            return
+        if any(fy_id not in self.partitions for fy_id in fy_ids):
+            # Another connection may have created a new year file
+            self.partitions = registered_partitions(self.conn)
+
+        missing = [fy_id for fy_id in fy_ids if fy_id in self.partitions and fy_id not in self.attached]
+        for fy_id in fy_ids:
+            if fy_id in self.attached:
+                self.attached.remove(fy_id)
+                self.attached.append(fy_id)
+        if not missing:
+            return
+
+        if len(missing) + len([fy_id for fy_id in self.attached if fy_id in fy_ids]) > MAX_ATTACHED_YEARS:
+            raise PartitionError(f"A query can span at most {MAX_ATTACHED_YEARS} financial years")
+        if self.conn.in_transaction:
+            raise PartitionError("Financial year files cannot be attached inside a transaction")
+
+        while len(self.attached) + len(missing) > MAX_ATTACHED_YEARS:
+            self._detach(next(fy_id for fy_id in self.attached if fy_id not in fy_ids))
+        for fy_id in missing:
+            self._attach(fy_id)
+        self._build_views()
+
+    def require_all(self):
+        """Attach every year file (for checks that read all years at once)"""
+        self.require(list(self.partitions))
+
+    def open_schemas(self):
+        """
+        Yield the schema of every open year file, attaching each in turn
+        The caller must commit before asking for the next one.
+        """
+        for fy_id, partition in list(self.partitions.items()):
+            if partition['status'] == 'Open':
+                self.require([fy_id])
+                yield partition_alias(fy_id)
+
+    # ========================================================================
+    # WRITES
+    # ========================================================================
+
+    def write_schema(self, fy_id):
+        """
+        Schema that rows of fy_id are written to: 'main' when the database is not
+        partitioned, else the attached year file (created on the first write of a
+        new financial year). Call it before the write transaction starts.
+        Raises PartitionError if the year is closed
+        """
+        self.partitions = registered_partitions(self.conn)
+        if not self.partitions:
+            return 'main'
+
+        if fy_id not in self.partitions:
+            self.create_partition(fy_id)
+        partition = self.partitions[fy_id]
+        if partition['status'] == 'Closed':
+            raise PartitionError(f"Financial year {partition['fy_code']} is closed")
+
+        self.require([fy_id])
+        return partition_alias(fy_id)
+
+    def create_partition(self, fy_id):
+        """
+        Create, register and attach the file of fy_id with the schema of the main
+        tables (a no-op if it is registered). Starts the id sequences of the file at
+        fy_id x ID_BLOCK. Returns the schema name
+        """
+        alias = partition_alias(fy_id)
+        create_registry(self.conn)
+        self.partitions = registered_partitions(self.conn)
+        if fy_id in self.partitions:
+            self.require([fy_id])
+            return alias
+
+        fy = self.conn.execute("SELECT fy_code FROM main.financial_years WHERE id = ?", (fy_id,)).fetchone()
+        if not fy:
+            raise PartitionError(f"Financial year {fy_id} not found")
+        if self.conn.in_transaction:
+            raise PartitionError("Financial year files cannot be created inside a transaction")
+
+        path = partition_path(self._main_path(), fy[0])
+        while len(self.attached) >= MAX_ATTACHED_YEARS:
+            self._detach(self.attached[0])
+        self.conn.execute("ATTACH DATABASE ? AS " + alias, (path,))
+
+        journal_mode = self.conn.execute("PRAGMA main.journal_mode").fetchone()[0]
+        if journal_mode.lower() == 'wal':
+            self.conn.execute(f"PRAGMA {alias}.journal_mode = WAL")
+
+        for table in PARTITIONED_TABLES:
+            objects = self.conn.execute("""
+                SELECT type, name, sql FROM main.sqlite_master
+                WHERE tbl_name = ? AND sql IS NOT NULL
+                ORDER BY type = 'index'
+            """, (table,)).fetchall()
+            for object_type, _name, sql in objects:
+                self.conn.execute(_qualified_sql(sql, alias))
+                if object_type == 'table' and 'AUTOINCREMENT' in sql.upper():
+                    main_seq = self.conn.execute("SELECT seq FROM main.sqlite_sequence WHERE name = ?",
+                                                 (table,)).fetchone()
+                    self.conn.execute(f"""
+                        INSERT INTO {alias}.sqlite_sequence (name, seq)
+                        SELECT ?, ? WHERE NOT EXISTS (SELECT 1 FROM {alias}.sqlite_sequence WHERE name = ?)
+                    """, (table, max(fy_id * ID_BLOCK, main_seq[0] if main_seq else 0), table))
+
+        self.conn.execute("INSERT INTO main.fy_partitions (fy_id, path) VALUES (?, ?)",
+                          (fy_id, os.path.basename(path)))
+        self.conn.commit()
+
+        self.partitions = registered_partitions(self.conn)
+        self.attached.append(fy_id)
+        self._build_views()
+        print(f"[PARTITION] Created {os.path.basename(path)}")
+        return alias
+
+    def _main_path(self):
+        return _main_file(self.conn) or self.db_path
+
+    # ========================================================================
+    # MIGRATION
+    # ========================================================================
+
+    def migrate_year(self, fy_id):
+        """
+        Move the rows of fy_id still in the main file into its year file
+        Rows are copied and committed first, counted, then deleted from the main
+        file in a second transaction: an interrupted run leaves rows in both files
+        (never in neither) and running it again completes the move.
+        Returns {table: rows moved}
+        """
+        alias = self.create_partition(fy_id)
+        if self.partitions[fy_id]['status'] == 'Closed':
+            raise PartitionError(f"Financial year {self.partitions[fy_id]['fy_code']} is closed")
+
+        tables = [table for table in PARTITIONED_TABLES if _table_columns(self.conn, 'main', table)]
+        moved = {}
+        for table in tables:
+            where, params = self._year_filter(table, fy_id)
+            columns = ', '.join(name for name, _type, _default in _table_columns(self.conn, 'main', table))
+            self.conn.execute(f"""
+                INSERT OR REPLACE INTO {alias}.{table} ({columns})
+                SELECT {columns} FROM main.{table} WHERE {where}
+            """, params)
+            moved[table] = self.conn.execute(f"SELECT COUNT(*) FROM main.{table} WHERE {where}",
+                                             params).fetchone()[0]
+        self.conn.commit()
+
+        for table in tables:
+            where, params = self._year_filter(table, fy_id)
+            copied = self.conn.execute(f"""
+                SELECT COUNT(*) FROM main.{table} m
+                WHERE {where}
+                  AND EXISTS (SELECT 1 FROM {alias}.{table} p WHERE {self._key_match(table)})
+            """, params).fetchone()[0]
+            if copied != moved[table]:
+                raise PartitionError(f"{table}: {moved[table]} rows of FY {fy_id} but {copied} copied")
+
+        for table in reversed(tables):
+            where, params = self._year_filter(table, fy_id)
+            self.conn.execute(f"DELETE FROM main.{table} WHERE {where}", params)
+        self.conn.commit()
+
+        self._build_views()
+        return moved
+
+    @staticmethod
+    def _year_filter(table, fy_id):
+        """WHERE clause selecting the rows of fy_id in a main table"""
+        if table in PARENT_KEYS:
+            key, parent = PARENT_KEYS[table]
+            return f"{key} IN (SELECT id FROM main.{parent} WHERE fy_id = ?)", (fy_id,)
+        return "fy_id = ?", (fy_id,)
+
+    def _key_match(self, table):
+        """Join condition between a main row m and its copy p"""
+        keys = [row[1] for row in self.conn.execute(f"PRAGMA main.table_info({table})") if row[5]]
+        return ' AND '.join(f"p.{key} = m.{key}" for key in keys)
+
+    # ========================================================================
+    # CLOSE, REOPEN AND COMPACT
+    # ========================================================================
+
+    def _set_status(self, fy_id, status):
+        self.conn.execute("""
+            UPDATE main.fy_partitions
+            SET status = ?, closed_at = CASE WHEN ? = 'Closed' THEN CURRENT_TIMESTAMP END
+            WHERE fy_id = ?
+        """, (status, status, fy_id))
+        self.conn.commit()
+        self.partitions = registered_partitions(self.conn)
+
+    def _release(self, fy_id):
+        """Detach fy_id for work on its file through a separate connection"""
+        if self.conn.in_transaction:
+            raise PartitionError("Financial year files cannot be detached inside a transaction")
+        was_attached = fy_id in self.attached
+        if was_attached:
+            self._detach(fy_id)
+            self._build_views()
+        return was_attached
+
+    def _reattach(self, fy_id, was_attached):
+        if was_attached:
+            self._attach(fy_id)
+            self._build_views()
+
+    def close_year(self, fy_id):
+        """
+        Make a financial year read-only: the file leaves WAL mode (a read-only WAL
+        file cannot be opened), becomes read-only on disk and is attached read-only
+        Returns (success: bool, message: str)
+        """
+        try:
+            self.partitions = registered_partitions(self.conn)
+            partition = self.partitions.get(fy_id)
+            if not partition:
+                return False, "Financial year is not partitioned"
+            if partition['status'] == 'Closed':
+                return False, f"Financial year {partition['fy_code']} is already closed"
+
+            was_attached = self._release(fy_id)
+            year_conn = sqlite3.connect(partition['path'])
+            try:
+                mode = year_conn.execute("PRAGMA journal_mode = DELETE").fetchone()[0]
+            finally:
+                year_conn.close()
+            if mode.lower() != 'delete':
+                self._reattach(fy_id, was_attached)
+                return False, f"Financial year {partition['fy_code']} is in use by another connection"
+
+            self._set_status(fy_id, 'Closed')
+            os.chmod(partition['path'], READ_ONLY_MODE)
+            self._reattach(fy_id, was_attached)
+
+            print(f"[PARTITION] {partition['fy_code']} closed")
+            return True, f"Financial year {partition['fy_code']} closed"
+
+        except (sqlite3.Error, OSError) as e:
+            print(f"Error closing financial year: {e}")
+            return False, f"Database error: {str(e)}"
+
+    def reopen_year(self, fy_id):
+        """
+        Make a closed financial year writable again
+        Returns (success: bool, message: str)
+        """
+        try:
+            self.partitions = registered_partitions(self.conn)
+            partition = self.partitions.get(fy_id)
+            if not partition:
+                return False, "Financial year is not partitioned"
+            if partition['status'] == 'Open':
+                return False, f"Financial year {partition['fy_code']} is already open"
+
+            was_attached = self._release(fy_id)
+            os.chmod(partition['path'], READ_WRITE_MODE)
+            self._set_status(fy_id, 'Open')
+            self._reattach(fy_id, was_attached)
+
+            print(f"[PARTITION] {partition['fy_code']} reopened")
+            return True, f"Financial year {partition['fy_code']} reopened"
+
+        except (sqlite3.Error, OSError) as e:
+            print(f"Error reopening financial year: {e}")
+            return False, f"Database error: {str(e)}"
+
+    def compact_year(self, fy_id):
+        """
+        VACUUM and ANALYZE the file of a closed financial year
+        Returns (success: bool, message: str)
+        """
+        try:
+            self.partitions = registered_partitions(self.conn)
+            partition = self.partitions.get(fy_id)
+            if not partition:
+                return False, "Financial year is not partitioned"
+            if partition['status'] != 'Closed':
+                return False, f"Close financial year {partition['fy_code']} before compacting it"
+
+            was_attached = self._release(fy_id)
+            size_before = os.path.getsize(partition['path'])
+            os.chmod(partition['path'], READ_WRITE_MODE)
+            try:
+                year_conn = sqlite3.connect(partition['path'])
+                try:
+                    year_conn.execute("VACUUM")
+                    year_conn.execute("ANALYZE")
+                finally:
+                    year_conn.close()
+            finally:
+                os.chmod(partition['path'], READ_ONLY_MODE)
+            size_after = os.path.getsize(partition['path'])
+            self._reattach(fy_id, was_attached)
+
+            message = (f"Financial year {partition['fy_code']} compacted "
+                       f"({size_before / 1024:,.0f} KB -> {size_after / 1024:,.0f} KB)")
+            print(f"[PARTITION] {message}")
+            return True, message
+
+        except (sqlite3.Error, OSError) as e:
+            print(f"Error compacting financial year: {e}")
+            return False, f"Database error: {str(e)}"
@@ -0,0 +1,81 @@
+"""
+Rebuild / Verify Account Balances
+Recomputes the account_balances aggregate from voucher_lines and the master opening
+balances, and reports any drift between the stored and recomputed figures.
+
+Usage:
+    python database/rebuild_account_balances.py            # verify, rebuild, verify again
+    python database/rebuild_account_balances.py --verify   # only report drift (exit code 1 if found)
+"""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to path to import config
+sys.path.append(str(Path(__file__).parent.parent))
+from database.voucher_handler import VoucherHandler
+
+
+def print_drift(drift):
+    """Print drift rows in a table"""
+    print(f"{'Kind':<8} {'Account':>8} {'FY':>4} {'Per':>4} "
+          f"{'Opening (stored/expected)':>28} {'Debit (stored/expected)':>28} {'Credit (stored/expected)':>28}")
+    print("-" * 114)
+    for row in drift:
+        print(f"{row['account_kind']:<8} {row['account_id']:>8} {row['fy_id']:>4} {row['period']:>4} "
+              f"{str(row['stored_opening']) + ' / ' + str(row['expected_opening']):>28} "
+              f"{str(row['stored_debit']) + ' / ' + str(row['expected_debit']):>28} "
+              f"{str(row['stored_credit']) + ' / ' + str(row['expected_credit']):>28}")
+
+
+def rebuild_account_balances(verify_only=False):
+    """
+    Verify the balance aggregate and rebuild it unless verify_only is set
+    Returns True if the aggregate is consistent at the end
+    """
+    handler = VoucherHandler()
+    if not handler.connect():
+        return False
+
+    try:
+        print("=" * 70)
+        print("VERIFYING ACCOUNT BALANCES")
+        print("=" * 70)
+
+        drift = handler.find_balance_drift()
+        if drift is None:
+            return False
+
+        if not drift:
+            print("[OK] No drift found - account_balances matches voucher_lines")
+            return True
+
+        print(f"[WARN] {len(drift)} drifted balance rows found:\n")
+        print_drift(drift)
+
+        if verify_only:
+            return False
+
+        print("\n" + "=" * 70)
+        print("REBUILDING ACCOUNT BALANCES")
+        print("=" * 70)
+        success, message = handler.rebuild_account_balances()
+        print(message)
+        if not success:
+            return False
+
+        drift = handler.find_balance_drift()
+        if drift:
+            print(f"[ERROR] {len(drift)} rows still drifted after rebuild")
+            return False
+
+        print("[OK] Account balances verified after rebuild")
+        return True
+
+    finally:
+        handler.disconnect()
+
+
+if __name__ == "__main__":
+    ok = rebuild_account_balances(verify_only='--verify' in sys.argv[1:])
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,504 @@
+"""
+Sales Invoice Handler - Sales invoices over business partners and items using SQLite
+
+Saving an invoice is one short write transaction:
+    - the invoice number is taken from invoice_series, an atomic counter per
+      company, financial year and series (UPSERT ... RETURNING)
+    - the invoice header and lines are inserted
+    - the sales voucher (Dr customer, Cr sales accounts, Cr output tax account)
+      is staged through the voucher engine on the same connection
+    - items kept in stock are issued through the stock ledger on the same
+      connection; the invoice is refused when stock is short
+Line amounts and the CGST/SGST/IGST split are computed for the whole invoice at
+once by utils.pricing from the integer paise rates of the item master, and are
+stored and returned as exact paise (Money). Supply is inter-state (IGST) when the
+company's state differs from the customer's.
+Everything that only reads (items, accounts, financial year, amounts) is done
+before the transaction starts, so the write lock is held for a few statements only.
+
+The connection runs in WAL mode with a busy timeout and takes the write lock up
+front (BEGIN IMMEDIATE), so several counters can save concurrently: readers never
+block, writers queue instead of failing, and because the counter moves inside the
+invoice transaction, numbers stay gapless.
+
+On a database partitioned per financial year the invoice, its counter and its
+voucher are written to the year's file (database/partition_router.py).
+"""
+
+import sqlite3
+from datetime import date
+from database.config import DB_PATH
+from database.money_schema import ensure_money_schema
+from database.partition_router import PartitionRouter
+from database.stock_handler import StockHandler
+from database.tenant_router import tenant_db_path
+from database.voucher_handler import VoucherHandler
+from utils.money import Money, money_fields, to_paise
+from utils.pricing import price_lines as compute_line_amounts
+
+
+DEFAULT_SERIES = 'SI'
+
+# Seconds a writer waits for another counter's transaction before giving up
+BUSY_TIMEOUT_SECONDS = 30
+
+# Invoice and line columns holding rupee amounts (stored as paise)
+INVOICE_MONEY_FIELDS = ('taxable_amount', 'tax_amount', 'total_amount')
+LINE_MONEY_FIELDS = ('rate', 'taxable_amount', 'cgst_amount', 'sgst_amount',
+                     'igst_amount', 'tax_amount', 'line_total')
+
+# Item columns holding the rate and discount of each price list
+PRICE_LISTS = {
+    'WH1': ('sale_rate_wh1', 'discount_wh1'),
+    'WH2': ('sale_rate_wh2', 'discount_wh2')
+}
+
+
+class SalesInvoiceHandler:
+    def __init__(self, db_path=None):
+        self.db_path = db_path or tenant_db_path(DB_PATH)
+        self.conn = None
+        self.cursor = None
+        self.voucher_handler = None
+        self.stock_handler = None
+        self.router = None
+
+    def connect(self):
+        """Establish database connection"""
+        try:
+            self.conn = sqlite3.connect(self.db_path, timeout=BUSY_TIMEOUT_SECONDS)
+            self.conn.row_factory = sqlite3.Row
+            self.cursor = self.conn.cursor()
+            self.cursor.execute("PRAGMA journal_mode = WAL")
+            self.cursor.execute("PRAGMA synchronous = NORMAL")
+            print("Successfully connected to SQLite database")
+
+            # Vouchers are staged on this connection, inside the invoice transaction
+            self.router = PartitionRouter(self.conn, self.db_path)
+            self.voucher_handler = VoucherHandler(self.db_path)
+            self.voucher_handler.attach(self.conn, self.router)
+
+            # Create tables if they don't exist
+            self._create_tables()
+
+            # Stock issues are staged inside the invoice transaction as well
+            self.stock_handler = StockHandler(self.db_path)
+            self.stock_handler.attach(self.conn)
+
+            # Financial year files, when the database is partitioned
+            self.router.install()
+
+            return True
+        except sqlite3.Error as e:
+            print(f"Error connecting to SQLite: {e}")
+            return False
+
+    def _create_tables(self):
+        """Create invoice_series, sales_invoices and sales_invoice_lines tables if they don't exist"""
+        try:
+            self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS invoice_series (
+                company_id INTEGER NOT NULL,
+                fy_id INTEGER NOT NULL,
+                series TEXT NOT NULL,
+                last_number INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (company_id, fy_id, series)
+            ) WITHOUT ROWID
+            """)
+
+            self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS sales_invoices (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                invoice_no TEXT NOT NULL,
+                series TEXT NOT NULL,
+                serial_no INTEGER NOT NULL,
+                company_id INTEGER NOT NULL,
+                fy_id INTEGER NOT NULL,
+                invoice_date DATE NOT NULL,
+                partner_id INTEGER NOT NULL,
+                price_list TEXT DEFAULT 'WH1',
+                inter_state INTEGER DEFAULT 0,
+                tax_account_id INTEGER,
+                taxable_amount INTEGER DEFAULT 0,
+                tax_amount INTEGER DEFAULT 0,
+                total_amount INTEGER DEFAULT 0,
+                narration TEXT,
+                voucher_id INTEGER,
+                status TEXT DEFAULT 'Posted' CHECK(status IN ('Posted', 'Cancelled')),
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE (company_id, fy_id, series, serial_no),
+                FOREIGN KEY (company_id) REFERENCES companies(id),
+                FOREIGN KEY (fy_id) REFERENCES financial_years(id),
+                FOREIGN KEY (partner_id) REFERENCES business_partners(id),
+                FOREIGN KEY (tax_account_id) REFERENCES account_master(id),
+                FOREIGN KEY (voucher_id) REFERENCES vouchers(id)
+            )
+            """)
+
+            # Item code, name, HSN and GST% are copied so the invoice does not
+            # change when the item master does
+            self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS sales_invoice_lines (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                invoice_id INTEGER NOT NULL,
+                line_no INTEGER NOT NULL,
+                item_id INTEGER NOT NULL,
+                item_code TEXT,
+                item_name TEXT,
+                hsn_code TEXT,
+                quantity REAL NOT NULL,
+                rate INTEGER NOT NULL,
+                discount_percentage REAL DEFAULT 0,
+                gst_percentage REAL DEFAULT 0,
+                taxable_amount INTEGER DEFAULT 0,
+                cgst_amount INTEGER DEFAULT 0,
+                sgst_amount INTEGER DEFAULT 0,
+                igst_amount INTEGER DEFAULT 0,
+                tax_amount INTEGER DEFAULT 0,
+                line_total INTEGER DEFAULT 0,
+                sales_account_id INTEGER NOT NULL,
+                FOREIGN KEY (invoice_id) REFERENCES sales_invoices(id),
+                FOREIGN KEY (item_id) REFERENCES items(id),
+                FOREIGN KEY (sales_account_id) REFERENCES account_master(id)
+            )
+            """)
+
+            self.cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_sales_invoice_lines_invoice
+            ON sales_invoice_lines (invoice_id)
+            """)
+            self.cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_sales_invoices_fy_date
+            ON sales_invoices (company_id, fy_id, invoice_date)
+            """)
+
+            self.conn.commit()
+            ensure_money_schema(self.conn)
+            print("Sales invoice tables created/verified successfully")
+        except sqlite3.Error as e:
+            print(f"Error creating sales invoice tables: {e}")
+
+    def disconnect(self):
+        """Close database connection"""
+        if self.conn:
+            self.conn.close()
+            print("SQLite connection closed")
+
+    # ========================================================================
+    # HELPERS
+    # ========================================================================
+
+    def _next_serial_no(self, company_id, fy_id, series, schema='main'):
+        """Take the next number of a series (inside the caller's write transaction)"""
+        self.cursor.execute(f"""
+            INSERT INTO {schema}.invoice_series (company_id, fy_id, series, last_number)
+            VALUES (?, ?, ?, 1)
+            ON CONFLICT(company_id, fy_id, series) DO UPDATE SET last_number = last_number + 1
+            RETURNING last_number
+        """, (company_id, fy_id, series))
+        return self.cursor.fetchone()[0]
+
+    def _get_items(self, item_ids):
+        """Get the items used by an invoice in one query: item_id -> item dict"""
+        placeholders = ', '.join('?' * len(item_ids))
+        self.cursor.execute(f"""
+            SELECT i.id, i.item_code, i.item_name, i.hsn_code, i.gst_percentage,
+                   i.sale_rate_wh1, i.sale_rate_wh2, i.discount_wh1, i.discount_wh2,
+                   i.status, am.id AS sales_account_id
+            FROM items i
+            LEFT JOIN account_master am ON am.account_code = i.sales_account_code
+            WHERE i.id IN ({placeholders})
+        """, list(item_ids))
+        return {row['id']: dict(row) for row in self.cursor.fetchall()}
+
+    def is_inter_state(self, company_id, partner_id):
+        """True if the company and the customer are in different states (IGST applies)"""
+        try:
+            self.cursor.execute("""
+                SELECT c.state AS company_state, s.state_name AS partner_state
+                FROM companies c, business_partners bp
+                LEFT JOIN states s ON s.id = bp.state_id
+                WHERE c.id = ? AND bp.id = ?
+            """, (company_id, partner_id))
+            row = self.cursor.fetchone()
+        except sqlite3.Error as e:
+            print(f"Error resolving place of supply: {e}")
+            return False
+
+        if not row or not row['company_state'] or not row['partner_state']:
+            return False
+        return row['company_state'].strip().lower() != row['partner_state'].strip().lower()
+
+    def price_lines(self, lines, price_list='WH1', default_sales_account_id=None, inter_state=False):
+        """
+        Fill rate, discount, GST% and HSN of invoice lines from the item master and compute amounts
+        lines: list of dicts with item_id, quantity, optional rate (rupees) / discount_percentage overrides
+        Returns (success: bool, message: str, priced_lines: list) with amounts as Money
+        """
+        if not lines:
+            return False, "An invoice needs at least one line", []
+        if price_list not in PRICE_LISTS:
+            return False, f"Unknown price list '{price_list}'", []
+
+        items = self._get_items({line.get('item_id') for line in lines})
+        rate_column, discount_column = PRICE_LISTS[price_list]
+
+        priced = []
+        for idx, line in enumerate(lines, 1):
+            item = items.get(line.get('item_id'))
+            if not item:
+                return False, f"Line {idx}: item not found", []
+            if item['status'] != 'Active':
+                return False, f"Line {idx}: item '{item['item_code']}' is inactive", []
+
+            quantity = line.get('quantity') or 0
+            if quantity <= 0:
+                return False, f"Line {idx}: quantity must be greater than zero", []
+
+            sales_account_id = item['sales_account_id'] or default_sales_account_id
+            if not sales_account_id:
+                return False, f"Line {idx}: item '{item['item_code']}' has no sales account", []
+
+            try:
+                rate = to_paise(line['rate']) if line.get('rate') is not None else (item[rate_column] or 0)
+            except ValueError:
+                return False, f"Line {idx}: rate must be a number", []
+
+            priced.append({
+                'item_id': item['id'],
+                'item_code': item['item_code'],
+                'item_name': item['item_name'],
+                'hsn_code': item['hsn_code'],
+                'quantity': quantity,
+                'rate': rate,
+                'discount_percentage': line['discount_percentage']
+                if line.get('discount_percentage') is not None else (item[discount_column] or 0),
+                'gst_percentage': item['gst_percentage'] or 0,
+                'sales_account_id': sales_account_id
+            })
+
+        # Amounts for all lines in one vectorized pass
+        amounts = compute_line_amounts(
+            [line['quantity'] for line in priced],
+            [line['rate'] for line in priced],
+            [line['discount_percentage'] for line in priced],
+            [line['gst_percentage'] for line in priced],
+            inter_state=inter_state,
+            rate_in_paise=True
+        )
+        columns = {
+            'taxable_amount': amounts['taxable'],
+            'cgst_amount': amounts['cgst'],
+            'sgst_amount': amounts['sgst'],
+            'igst_amount': amounts['igst'],
+            'tax_amount': amounts['cgst'] + amounts['sgst'] + amounts['igst'],
+            'line_total': amounts['total']
+        }
+        for idx, line in enumerate(priced):
+            line['rate'] = Money(line['rate'])
+            for column, values in columns.items():
+                line[column] = Money(values[idx])
+
+        return True, "Valid", priced
+
+    @staticmethod
+    def _voucher_lines(invoice, priced_lines):
+        """Dr customer with the invoice total, Cr each sales account and the output tax account"""
+        sales_totals = {}
+        for line in priced_lines:
+            sales_totals[line['sales_account_id']] = \
+                sales_totals.get(line['sales_account_id'], 0) + line['taxable_amount']
+
+        voucher_lines = [{'account_kind': 'partner', 'account_id': invoice['partner_id'],
+                          'debit': invoice['total_amount'], 'narration': invoice['invoice_no']}]
+        voucher_lines += [
+            {'account_kind': 'account', 'account_id': account_id, 'credit': amount}
+            for account_id, amount in sales_totals.items() if amount > 0
+        ]
+        if invoice['tax_amount'] > 0:
+            voucher_lines.append({'account_kind': 'account', 'account_id': invoice['tax_account_id'],
+                                  'credit': invoice['tax_amount']})
+        return voucher_lines
+
+    # ========================================================================
+    # SAVE
+    # ========================================================================
+
+    def create_invoice(self, invoice_data, lines):
+        """
+        Save a sales invoice and post its voucher in one transaction
+        invoice_data: company_id, partner_id, optional invoice_date, series, price_list,
+                      inter_state (derived from company / customer state when omitted),
+                      tax_account_id (required when any line carries GST),
+                      sales_account_id (used for items without a sales account), narration
+        lines: list of dicts with item_id, quantity, optional rate / discount_percentage
+        Returns (success: bool, message: str, invoice_id: int or None)
+        """
+        try:
+            if not invoice_data.get('company_id'):
+                return False, "Company is required", None
+            if not invoice_data.get('partner_id'):
+                return False, "Customer is required", None
+
+            invoice_date = str(invoice_data.get('invoice_date') or date.today().isoformat())
+            fy = self.voucher_handler.get_financial_year_for_date(invoice_date)
+            if not fy:
+                return False, f"No financial year covers the date {invoice_date}", None
+            if fy.get('is_locked'):
+                return False, f"Financial year {fy['fy_code']} is locked", None
+
+            inter_state = invoice_data.get('inter_state')
+            if inter_state is None:
+                inter_state = self.is_inter_state(invoice_data['company_id'], invoice_data['partner_id'])
+
+            price_list = invoice_data.get('price_list') or 'WH1'
+            success, message, priced_lines = self.price_lines(
+                lines, price_list, invoice_data.get('sales_account_id'), bool(inter_state))
+            if not success:
+                return False, message, None
+
+            taxable_amount = sum((line['taxable_amount'] for line in priced_lines), Money())
+            tax_amount = sum((line['tax_amount'] for line in priced_lines), Money())
+            if tax_amount > 0 and not invoice_data.get('tax_account_id'):
+                return False, "Output tax account is required for taxable items", None
+
+            series = invoice_data.get('series') or DEFAULT_SERIES
+            invoice = {
+                'company_id': invoice_data['company_id'],
+                'fy_id': fy['id'],
+                'series': series,
+                'invoice_date': invoice_date,
+                'partner_id': invoice_data['partner_id'],
+                'price_list': price_list,
+                'inter_state': int(bool(inter_state)),
+                'tax_account_id': invoice_data.get('tax_account_id'),
+                'taxable_amount': taxable_amount,
+                'tax_amount': tax_amount,
+                'total_amount': taxable_amount + tax_amount,
+                'narration': invoice_data.get('narration', '')
+            }
+
+            # Write lock taken up front: no upgrade deadlocks between counters
+            self.conn.commit()
+            schema = self.router.write_schema(fy['id'])
+            self.cursor.execute("BEGIN IMMEDIATE")
+
+            invoice['serial_no'] = self._next_serial_no(invoice['company_id'], fy['id'], series, schema)
+            invoice['invoice_no'] = f"{series}/{fy['fy_code']}/{invoice['serial_no']:05d}"
+
+            self.cursor.execute(f"""
+                INSERT INTO {schema}.sales_invoices (
+                    invoice_no, series, serial_no, company_id, fy_id, invoice_date, partner_id,
+                    price_list, inter_state, tax_account_id, taxable_amount, tax_amount, total_amount,
+                    narration
+                ) VALUES (
+                    :invoice_no, :series, :serial_no, :company_id, :fy_id, :invoice_date, :partner_id,
+                    :price_list, :inter_state, :tax_account_id, :taxable_amount, :tax_amount, :total_amount, :narration
+                )
+            """, invoice)
+            invoice_id = self.cursor.lastrowid
+
+            self.cursor.executemany(f"""
+                INSERT INTO {schema}.sales_invoice_lines (
+                    invoice_id, line_no, item_id, item_code, item_name, hsn_code, quantity, rate,
+                    discount_percentage, gst_percentage, taxable_amount, cgst_amount, sgst_amount,
+                    igst_amount, tax_amount, line_total, sales_account_id
+                ) VALUES (
+                    ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?
+                )
+            """, [
+                (invoice_id, idx, line['item_id'], line['item_code'], line['item_name'],
+                 line['hsn_code'], line['quantity'], line['rate'], line['discount_percentage'],
+                 line['gst_percentage'], line['taxable_amount'], line['cgst_amount'],
+                 line['sgst_amount'], line['igst_amount'], line['tax_amount'],
+                 line['line_total'], line['sales_account_id'])
+                for idx, line in enumerate(priced_lines, 1)
+            ])
+
+            success, message, voucher_id = self.voucher_handler.stage_voucher({
+                'voucher_type': 'Sales',
+                'voucher_date': invoice_date,
+                'company_id': invoice['company_id'],
+                'narration': invoice['narration'] or f"Sales Invoice {invoice['invoice_no']}"
+            }, self._voucher_lines(invoice, priced_lines))
+            if not success:
+                self.conn.rollback()
+                return False, message, None
+
+            # Only items already in the stock ledger move stock (not services)
+            tracked = self.stock_handler.get_tracked_item_ids({line['item_id'] for line in priced_lines})
+            stock_movements = [{
+                'item_id': line['item_id'],
+                'movement_date': invoice_date,
+                'movement_type': 'Sale',
+                'quantity': line['quantity'],
+                'document_type': 'Sales Invoice',
+                'document_id': invoice_id,
+                'narration': invoice['invoice_no']
+            } for line in priced_lines if line['item_id'] in tracked]
+            if stock_movements:
+                success, message, _movement_ids = self.stock_handler.stage_movements(stock_movements)
+                if not success:
+                    self.conn.rollback()
+                    return False, message, None
+
+            self.cursor.execute(f"UPDATE {schema}.sales_invoices SET voucher_id = ? WHERE id = ?",
+                                (voucher_id, invoice_id))
+            self.conn.commit()
+
+            print(f"Sales Invoice '{invoice['invoice_no']}' saved successfully")
+            return True, f"Sales Invoice saved successfully (Invoice No: {invoice['invoice_no']})", invoice_id
+
+        except sqlite3.Error as e:
+            print(f"Error saving sales invoice: {e}")
+            self.conn.rollback()
+            return False, f"Database error: {str(e)}", None
+
+    # ========================================================================
+    # READ OPERATIONS
+    # ========================================================================
+
+    def get_invoice_by_id(self, invoice_id):
+        """Get a single invoice with its lines"""
+        try:
+            self.cursor.execute("""
+                SELECT si.*, bp.bp_name AS partner_name
+                FROM sales_invoices si
+                LEFT JOIN business_partners bp ON bp.id = si.partner_id
+                WHERE si.id = ?
+            """, (invoice_id,))
+            row = self.cursor.fetchone()
+            if not row:
+                return None
+
+            invoice = money_fields(dict(row), INVOICE_MONEY_FIELDS)
+            self.cursor.execute("""
+                SELECT * FROM sales_invoice_lines
+                WHERE invoice_id = ?
+                ORDER BY line_no
+            """, (invoice_id,))
+            invoice['lines'] = [money_fields(dict(line), LINE_MONEY_FIELDS)
+                                for line in self.cursor.fetchall()]
+            return invoice
+        except sqlite3.Error as e:
+            print(f"Error fetching sales invoice: {e}")
+            return None
+
+    def get_invoices(self, company_id, fy_id, limit=100):
+        """Get the latest invoices of a company and financial year"""
+        try:
+            self.router.require([fy_id])
+            self.cursor.execute("""
+                SELECT si.id, si.invoice_no, si.invoice_date, bp.bp_name AS partner_name,
+                       si.taxable_amount, si.tax_amount, si.total_amount, si.status
+                FROM sales_invoices si
+                LEFT JOIN business_partners bp ON bp.id = si.partner_id
+                WHERE si.company_id = ? AND si.fy_id = ?
+                ORDER BY si.invoice_date DESC, si.id DESC
+                LIMIT ?
+            """, (company_id, fy_id, limit))
+            return [money_fields(dict(row), INVOICE_MONEY_FIELDS) for row in self.cursor.fetchall()]
+        except sqlite3.Error as e:
+            print(f"Error fetching sales invoices: {e}")
+            return []
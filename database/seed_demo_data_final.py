@@ -6,6 +6,7 @@ import sqlite3
 import sys
 sys.path.insert(0, '.')
 from database.config import DB_PATH
+from database.money_schema import ensure_money_schema
 
 
 def seed_business_partners():
@@ -13,6 +14,8 @@ def seed_business_partners():
     try:
         conn = sqlite3.connect(DB_PATH)
         cursor = conn.cursor()
+        # Amounts below are rupees; the tables must already hold paise
+        ensure_money_schema(conn)
 
         # Check if data already exists
         cursor.execute("SELECT COUNT(*) FROM business_partners")
@@ -86,7 +89,7 @@ def seed_business_partners():
                 bp_code, bp_name, bill_to_address, ship_to_address,
                 city_id, state_id, mobile, account_group_id, book_code_id, account_type_id,
                 opening_balance, balance_type, status
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CAST(ROUND(? * 100) AS INTEGER), ?, ?)
         """, partners)
 
         conn.commit()
@@ -108,6 +111,8 @@ def seed_account_master():
     try:
         conn = sqlite3.connect(DB_PATH)
         cursor = conn.cursor()
+        # Amounts below are rupees; the tables must already hold paise
+        ensure_money_schema(conn)
 
         # Check if data already exists
         cursor.execute("SELECT COUNT(*) FROM account_master")
@@ -179,7 +184,7 @@ def seed_account_master():
             INSERT INTO account_master (
                 account_name, account_group_id, book_code_id, account_type_id,
                 opening_balance, balance_type, status, account_code
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ) VALUES (?, ?, ?, ?, CAST(ROUND(? * 100) AS INTEGER), ?, ?, ?)
         """, accounts)
 
         conn.commit()
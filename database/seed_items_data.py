@@ -5,6 +5,10 @@ Run this once to add sample items to the database
 
 import sqlite3
 import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from database.money_schema import ensure_money_schema
 
 def seed_items_data():
     """Add sample items to the items table"""
@@ -15,6 +19,8 @@ def seed_items_data():
     try:
         conn = sqlite3.connect(db_path)
         cursor = conn.cursor()
+        # Rates below are rupees; the items table must already hold paise
+        ensure_money_schema(conn)
 
         # Sample items data
         items = [
@@ -336,7 +342,8 @@ def seed_items_data():
             uom_code, company_name, purchase_rate, mrp, gst_percentage, hsn_code,
             sale_rate_wh1, sale_rate_wh2, discount_wh1, discount_wh2,
             sales_account_code, purchase_account_code, status
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, CAST(ROUND(? * 100) AS INTEGER), CAST(ROUND(? * 100) AS INTEGER),
+                  ?, ?, CAST(ROUND(? * 100) AS INTEGER), CAST(ROUND(? * 100) AS INTEGER), ?, ?, ?, ?, ?)
         """
 
         inserted_count = 0
@@ -0,0 +1,80 @@
+"""
+Split Companies
+Gives every company its own database file (companies/financial_data_<code>.db)
+copied from the shared financial_data.db, then removes the moved books from the
+shared file, which keeps users, companies and the masters. See
+database/tenant_router.py. Run it while the application is closed.
+
+Records without a company (journals, opening stock, purchases and the master
+opening balances) go to the default company: the one given with --default, else
+the first company created.
+
+Usage:
+    python database/split_companies.py                    # split every company
+    python database/split_companies.py --company C1       # split one company
+    python database/split_companies.py --default C1       # company keeping unassigned records
+    python database/split_companies.py --keep-shared      # leave the shared file's books as they are
+"""
+
+import sqlite3
+import sys
+from pathlib import Path
+
+# Add parent directory to path to import config
+sys.path.append(str(Path(__file__).parent.parent))
+from database.config import DB_PATH
+from database.tenant_router import TenantRouter
+
+
+def _option(args, name):
+    return args[args.index(name) + 1] if name in args and args.index(name) + 1 < len(args) else None
+
+
+def split_companies(db_path=DB_PATH, company_code=None, default_code=None, prune=True):
+    """
+    Split the companies of db_path into their own files
+    Returns True if every company was split
+    """
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        companies = conn.execute("SELECT id, company_code FROM companies ORDER BY id").fetchall()
+    except sqlite3.Error as e:
+        print(f"[ERROR] Cannot read companies: {e}")
+        return False
+    finally:
+        conn.close()
+
+    codes = {code: company_id for company_id, code in companies}
+    if not companies or (company_code and company_code not in codes) or (default_code and default_code not in codes):
+        print("[ERROR] Company not found")
+        return False
+    default_company_id = codes[default_code] if default_code else companies[0][0]
+
+    print("=" * 70)
+    print("SPLITTING COMPANIES INTO THEIR OWN FILES")
+    print("=" * 70)
+
+    router = TenantRouter(db_path)
+    ok = True
+    for company_id, code in companies:
+        if company_code and code != company_code:
+            continue
+        if company_id in router.get_tenants():
+            print(f"[SKIP] {code}: already has its own file")
+            continue
+
+        success, message, _path = router.split_company(company_id, default_company_id)
+        print(f"[{'OK' if success else 'ERROR'}] {message}")
+        if success and prune:
+            success, message = router.prune_company(company_id, default_company_id)
+            print(f"[{'OK' if success else 'ERROR'}] Shared file: {message}")
+        ok = ok and success
+
+    return ok
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    ok = split_companies(company_code=_option(args, '--company'), default_code=_option(args, '--default'),
+                         prune='--keep-shared' not in args)
+    sys.exit(0 if ok else 1)
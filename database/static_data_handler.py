@@ -4,6 +4,7 @@ Static Data Handler - Manages static reference data (Book Codes, Account Types)
 
 import sqlite3
 from database.config import DB_PATH
+from database.tenant_router import tenant_db_path
 
 
 class StaticDataHandler:
@@ -14,7 +15,7 @@ class StaticDataHandler:
     def connect(self):
         """Establish database connection"""
         try:
-            self.conn = sqlite3.connect(DB_PATH)
+            self.conn = sqlite3.connect(tenant_db_path(DB_PATH))
             self.conn.row_factory = sqlite3.Row
             self.cursor = self.conn.cursor()
             print("[OK] StaticDataHandler connected to SQLite database")
@@ -0,0 +1,691 @@
+"""
+Stock Handler - Stock ledger and inventory valuation for the Item Master using SQLite
+
+Every receipt or issue of an item is a row in stock_movements. Posting a movement
+updates the item's running position in the same transaction, so stock on hand is
+never summed from history:
+    stock_balances     - one row per item: quantity on hand, value at weighted
+                         average and value at FIFO
+    stock_fifo_layers  - received quantities not issued yet, oldest first
+Each movement also stores its cost under both methods and the item's position
+after it, which is what the stock ledger shows.
+
+Weighted average: an issue costs value x issued / on hand (the whole value when the
+item is emptied). FIFO: an issue consumes the oldest layers. Quantities are integer
+thousandths of a unit and values integer paise, so both methods are exact.
+
+Stock never goes negative: an issue larger than the quantity on hand is rejected.
+Items enter the stock ledger with their first receipt (opening stock, purchase or
+adjustment); sales of items that were never received (services) do not move stock.
+
+A movement dated before the item's latest movement is applied as posted and flags
+the item (stock_balances.revalue_from); revalue() then recomputes costs and
+positions from that date in one streaming pass over the movements.
+"""
+
+import sqlite3
+from collections import deque
+from datetime import date
+from decimal import Decimal, ROUND_HALF_UP
+from database.config import DB_PATH
+from database.tenant_router import tenant_db_path
+from utils.money import Money, money_fields, to_paise
+from utils.pricing import QUANTITY_SCALE
+
+
+RECEIPT_TYPES = ('Opening', 'Purchase')
+ISSUE_TYPES = ('Sale',)
+MOVEMENT_TYPES = RECEIPT_TYPES + ISSUE_TYPES + ('Adjustment',)
+
+VALUATION_METHODS = ('average', 'fifo')
+
+# Movements re-costed per commit by the revaluation job
+REVALUE_BATCH_SIZE = 5000
+
+MOVEMENT_MONEY_FIELDS = ('rate', 'average_cost', 'fifo_cost', 'average_value', 'fifo_value')
+
+
+def to_quantity(value):
+    """Convert a quantity in units to integer thousandths (half away from zero)"""
+    return int((Decimal(str(value)) * QUANTITY_SCALE).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def from_quantity(quantity):
+    """Convert integer thousandths back to units"""
+    return quantity / QUANTITY_SCALE
+
+
+def _divide_round(numerator, denominator):
+    """Integer division rounding half away from zero (denominator > 0)"""
+    quotient = (2 * abs(numerator) + denominator) // (2 * denominator)
+    return quotient if numerator >= 0 else -quotient
+
+
+class StockPosition:
+    """
+    Quantity, values and FIFO layers of one item, applied one movement at a time
+    A layer is [quantity, value, layer_id, movement_id, layer_date]; the sum of the
+    layers is always the quantity and FIFO value on hand.
+    """
+
+    __slots__ = ('quantity', 'average_value', 'fifo_value', 'layers')
+
+    def __init__(self, quantity=0, average_value=0, fifo_value=0, layers=()):
+        self.quantity = quantity
+        self.average_value = average_value
+        self.fifo_value = fifo_value
+        self.layers = deque(layers)
+
+    def average_rate(self):
+        """Current weighted average rate in paise per unit"""
+        if self.quantity <= 0:
+            return 0
+        return _divide_round(self.average_value * QUANTITY_SCALE, self.quantity)
+
+    def receive(self, quantity, rate, movement_id=None, movement_date=None):
+        """Add quantity at rate (paise per unit), returns the value received"""
+        value = _divide_round(quantity * rate, QUANTITY_SCALE)
+        self.quantity += quantity
+        self.average_value += value
+        self.fifo_value += value
+        self.layers.append([quantity, value, None, movement_id, movement_date])
+        return value
+
+    def issue(self, quantity):
+        """
+        Take quantity out of stock
+        Returns (average_cost, fifo_cost), or None if less than quantity is on hand.
+        """
+        if quantity > self.quantity:
+            return None
+
+        if quantity == self.quantity:
+            average_cost = self.average_value
+        else:
+            average_cost = _divide_round(self.average_value * quantity, self.quantity)
+
+        fifo_cost = 0
+        remaining = quantity
+        while remaining:
+            layer = self.layers[0]
+            if layer[0] <= remaining:
+                fifo_cost += layer[1]
+                remaining -= layer[0]
+                self.layers.popleft()
+            else:
+                part = _divide_round(layer[1] * remaining, layer[0])
+                layer[0] -= remaining
+                layer[1] -= part
+                fifo_cost += part
+                remaining = 0
+
+        self.quantity -= quantity
+        self.average_value -= average_cost
+        self.fifo_value -= fifo_cost
+        return average_cost, fifo_cost
+
+
+class StockHandler:
+    def __init__(self, db_path=None):
+        self.db_path = db_path or tenant_db_path(DB_PATH)
+        self.conn = None
+        self.cursor = None
+
+    def connect(self):
+        """Establish database connection"""
+        try:
+            self.conn = sqlite3.connect(self.db_path)
+            self.conn.row_factory = sqlite3.Row
+            self.cursor = self.conn.cursor()
+            print("Successfully connected to SQLite database")
+
+            # Create tables if they don't exist
+            self._create_tables()
+
+            return True
+        except sqlite3.Error as e:
+            print(f"Error connecting to SQLite: {e}")
+            return False
+
+    def attach(self, conn):
+        """
+        Work on a connection owned by another handler, so stock movements can be
+        staged inside that handler's transaction. Creates the stock tables if needed.
+        """
+        self.conn = conn
+        self.cursor = conn.cursor()
+        self._create_tables()
+
+    def _create_tables(self):
+        """Create stock_movements, stock_balances and stock_fifo_layers tables if they don't exist"""
+        try:
+            # quantity columns are thousandths of a unit, money columns paise;
+            # quantity and costs are signed (+ receipt, - issue)
+            self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS stock_movements (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                item_id INTEGER NOT NULL,
+                movement_date DATE NOT NULL,
+                movement_type TEXT NOT NULL
+                    CHECK(movement_type IN ('Opening', 'Purchase', 'Sale', 'Adjustment')),
+                document_type TEXT,
+                document_id INTEGER,
+                quantity INTEGER NOT NULL,
+                rate INTEGER DEFAULT 0,
+                average_cost INTEGER DEFAULT 0,
+                fifo_cost INTEGER DEFAULT 0,
+                balance_quantity INTEGER NOT NULL,
+                average_value INTEGER NOT NULL,
+                fifo_value INTEGER NOT NULL,
+                narration TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (item_id) REFERENCES items(id)
+            )
+            """)
+
+            self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS stock_balances (
+                item_id INTEGER PRIMARY KEY,
+                quantity INTEGER NOT NULL DEFAULT 0,
+                average_value INTEGER NOT NULL DEFAULT 0,
+                fifo_value INTEGER NOT NULL DEFAULT 0,
+                last_movement_date DATE,
+                revalue_from DATE,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (item_id) REFERENCES items(id)
+            )
+            """)
+
+            self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS stock_fifo_layers (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                item_id INTEGER NOT NULL,
+                movement_id INTEGER NOT NULL,
+                layer_date DATE NOT NULL,
+                quantity INTEGER NOT NULL,
+                value INTEGER NOT NULL,
+                FOREIGN KEY (item_id) REFERENCES items(id),
+                FOREIGN KEY (movement_id) REFERENCES stock_movements(id)
+            )
+            """)
+
+            # Stock ledger, as-of positions and the revaluation pass walk one
+            # item's movements in (movement_date, id) order
+            self.cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_stock_movements_item_date
+            ON stock_movements (item_id, movement_date, id)
+            """)
+            self.cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_stock_movements_document
+            ON stock_movements (document_type, document_id)
+            """)
+            self.cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_stock_fifo_layers_item
+            ON stock_fifo_layers (item_id, layer_date, movement_id)
+            """)
+
+            self.conn.commit()
+            print("Stock tables created/verified successfully")
+        except sqlite3.Error as e:
+            print(f"Error creating stock tables: {e}")
+
+    def disconnect(self):
+        """Close database connection"""
+        if self.conn:
+            self.conn.close()
+            print("SQLite connection closed")
+
+    # ========================================================================
+    # HELPERS
+    # ========================================================================
+
+    def _load_position(self, item_id):
+        """
+        Current position of an item with its FIFO layers
+        Returns (item dict, StockPosition) or (None, None) if the item does not exist
+        """
+        self.cursor.execute("""
+            SELECT i.id, i.item_code, sb.quantity, sb.average_value, sb.fifo_value,
+                   sb.last_movement_date, sb.revalue_from
+            FROM items i
+            LEFT JOIN stock_balances sb ON sb.item_id = i.id
+            WHERE i.id = ?
+        """, (item_id,))
+        row = self.cursor.fetchone()
+        if not row:
+            return None, None
+
+        self.cursor.execute("""
+            SELECT quantity, value, id, movement_id, layer_date
+            FROM stock_fifo_layers
+            WHERE item_id = ?
+            ORDER BY layer_date, movement_id
+        """, (item_id,))
+        layers = [list(layer) for layer in self.cursor.fetchall()]
+        position = StockPosition(row['quantity'] or 0, row['average_value'] or 0,
+                                 row['fifo_value'] or 0, layers)
+        return dict(row), position
+
+    def _position_before(self, item_id, date_from):
+        """
+        Position of an item before date_from, taken from its last earlier movement
+        The FIFO layers left at that point are the newest receipts covering the
+        quantity on hand, so they are rebuilt from those receipts.
+        """
+        self.cursor.execute("""
+            SELECT balance_quantity, average_value, fifo_value
+            FROM stock_movements
+            WHERE item_id = ? AND movement_date < ?
+            ORDER BY movement_date DESC, id DESC
+            LIMIT 1
+        """, (item_id, date_from))
+        row = self.cursor.fetchone()
+        if not row or row['balance_quantity'] <= 0:
+            return StockPosition(*(tuple(row) if row else ()))
+
+        position = StockPosition(row['balance_quantity'], row['average_value'], row['fifo_value'])
+        receipts = self.conn.execute("""
+            SELECT id, movement_date, quantity, fifo_cost
+            FROM stock_movements
+            WHERE item_id = ? AND movement_date < ? AND quantity > 0
+            ORDER BY movement_date DESC, id DESC
+        """, (item_id, date_from))
+
+        needed = position.quantity
+        value_left = position.fifo_value
+        for movement_id, movement_date, quantity, value in receipts:
+            if quantity >= needed:
+                # Oldest layer still open: whatever quantity and value is left over
+                position.layers.appendleft([needed, value_left, None, movement_id, movement_date])
+                break
+            position.layers.appendleft([quantity, value, None, movement_id, movement_date])
+            needed -= quantity
+            value_left -= value
+        receipts.close()
+        return position
+
+    def _save_layers(self, item_id, position, consumed_ids=()):
+        """Persist layer changes of one item: consumed layers, the partly used one, new ones"""
+        if consumed_ids:
+            self.cursor.executemany("DELETE FROM stock_fifo_layers WHERE id = ?",
+                                    [(layer_id,) for layer_id in consumed_ids])
+        for layer in position.layers:
+            if layer[2] is None:
+                self.cursor.execute("""
+                    INSERT INTO stock_fifo_layers (item_id, movement_id, layer_date, quantity, value)
+                    VALUES (?, ?, ?, ?, ?)
+                """, (item_id, layer[3], layer[4], layer[0], layer[1]))
+                layer[2] = self.cursor.lastrowid
+        if position.layers and position.layers[0][2] is not None:
+            self.cursor.execute("UPDATE stock_fifo_layers SET quantity = ?, value = ? WHERE id = ?",
+                                (position.layers[0][0], position.layers[0][1], position.layers[0][2]))
+
+    def _replace_layers(self, item_id, position):
+        """Rewrite all FIFO layers of an item from a recomputed position"""
+        self.cursor.execute("DELETE FROM stock_fifo_layers WHERE item_id = ?", (item_id,))
+        self.cursor.executemany("""
+            INSERT INTO stock_fifo_layers (item_id, movement_id, layer_date, quantity, value)
+            VALUES (?, ?, ?, ?, ?)
+        """, [(item_id, layer[3], layer[4], layer[0], layer[1]) for layer in position.layers])
+
+    def get_tracked_item_ids(self, item_ids):
+        """Items among item_ids that are in the stock ledger (have been received at least once)"""
+        item_ids = list(item_ids)
+        if not item_ids:
+            return set()
+        placeholders = ', '.join('?' * len(item_ids))
+        self.cursor.execute(f"SELECT item_id FROM stock_balances WHERE item_id IN ({placeholders})",
+                            item_ids)
+        return {row['item_id'] for row in self.cursor.fetchall()}
+
+    # ========================================================================
+    # POSTING
+    # ========================================================================
+
+    def stage_movements(self, movements):
+        """
+        Validate and apply stock movements inside the caller's transaction (no commit)
+        The caller rolls back when this fails part way.
+        movements: list of dicts with item_id, movement_type, quantity (units, positive;
+                   signed for 'Adjustment'), rate (rupees per unit, receipts only - an
+                   adjustment without rate comes in at the average rate), optional
+                   movement_date, document_type, document_id, narration
+        Returns (success: bool, message: str, movement_ids: list)
+        """
+        items = {}
+        movement_ids = []
+        for idx, movement in enumerate(movements, 1):
+            movement_type = movement.get('movement_type')
+            if movement_type not in MOVEMENT_TYPES:
+                return False, f"Movement {idx}: unknown movement type '{movement_type}'", []
+            try:
+                quantity = to_quantity(movement.get('quantity') or 0)
+                rate = to_paise(movement.get('rate'))
+            except (ArithmeticError, ValueError):
+                return False, f"Movement {idx}: quantity and rate must be numbers", []
+            if quantity == 0 or (quantity < 0 and movement_type != 'Adjustment'):
+                return False, f"Movement {idx}: quantity must be greater than zero", []
+            if rate < 0:
+                return False, f"Movement {idx}: rate cannot be negative", []
+            if movement_type in ISSUE_TYPES:
+                quantity = -quantity
+
+            item_id = movement.get('item_id')
+            if item_id not in items:
+                items[item_id] = self._load_position(item_id)
+            item, position = items[item_id]
+            if not item:
+                return False, f"Movement {idx}: item not found", []
+
+            movement_date = str(movement.get('movement_date') or date.today().isoformat())
+            if quantity > 0:
+                if movement_type == 'Adjustment' and movement.get('rate') is None:
+                    rate = position.average_rate()
+                average_cost = fifo_cost = position.receive(quantity, rate, None, movement_date)
+                consumed_ids = []
+            else:
+                open_ids = [layer[2] for layer in position.layers]
+                costs = position.issue(-quantity)
+                if costs is None:
+                    return False, (f"Movement {idx}: insufficient stock of '{item['item_code']}' "
+                                   f"({from_quantity(position.quantity):g} on hand)"), []
+                average_cost, fifo_cost = -costs[0], -costs[1]
+                rate = 0
+                consumed_ids = open_ids[:len(open_ids) - len(position.layers)]
+
+            self.cursor.execute("""
+                INSERT INTO stock_movements (
+                    item_id, movement_date, movement_type, document_type, document_id,
+                    quantity, rate, average_cost, fifo_cost,
+                    balance_quantity, average_value, fifo_value, narration
+                ) VALUES (
+                    ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?
+                )
+            """, (
+                item_id, movement_date, movement_type,
+                movement.get('document_type'), movement.get('document_id'),
+                quantity, rate, average_cost, fifo_cost,
+                position.quantity, position.average_value, position.fifo_value,
+                movement.get('narration', '')
+            ))
+            movement_id = self.cursor.lastrowid
+            movement_ids.append(movement_id)
+            if quantity > 0:
+                position.layers[-1][3] = movement_id
+            self._save_layers(item_id, position, consumed_ids)
+
+            # Backdated movements leave later positions stale until revalued
+            last_date = item['last_movement_date']
+            if last_date and movement_date < last_date:
+                item['revalue_from'] = min(item['revalue_from'] or movement_date, movement_date)
+            item['last_movement_date'] = max(last_date or movement_date, movement_date)
+
+            self.cursor.execute("""
+                INSERT INTO stock_balances (
+                    item_id, quantity, average_value, fifo_value, last_movement_date, revalue_from
+                ) VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(item_id) DO UPDATE SET
+                    quantity = excluded.quantity,
+                    average_value = excluded.average_value,
+                    fifo_value = excluded.fifo_value,
+                    last_movement_date = excluded.last_movement_date,
+                    revalue_from = excluded.revalue_from,
+                    updated_at = CURRENT_TIMESTAMP
+            """, (item_id, position.quantity, position.average_value, position.fifo_value,
+                  item['last_movement_date'], item['revalue_from']))
+
+        return True, f"{len(movement_ids)} stock movements posted", movement_ids
+
+    def post_movements(self, movements):
+        """
+        Post stock movements (see stage_movements) in one transaction
+        Returns (success: bool, message: str, movement_ids: list)
+        """
+        try:
+            success, message, movement_ids = self.stage_movements(movements)
+            if not success:
+                self.conn.rollback()
+                return False, message, []
+            self.conn.commit()
+
+            print(message)
+            return True, message, movement_ids
+
+        except sqlite3.Error as e:
+            print(f"Error posting stock movements: {e}")
+            self.conn.rollback()
+            return False, f"Database error: {str(e)}", []
+
+    # ========================================================================
+    # READ OPERATIONS
+    # ========================================================================
+
+    def get_stock_on_hand(self, as_of=None, include_zero=False):
+        """
+        Get quantity and value on hand of every item in the stock ledger
+        as_of=None reads the running balances; a date reads each item's last
+        movement on or before that date (one index seek per item).
+        Returns dict with items (item_id, item_code, item_name, uom_code, quantity,
+        average_value, fifo_value) and totals (average_value, fifo_value), or None.
+        """
+        if as_of is None:
+            query = """
+            SELECT i.id AS item_id, i.item_code, i.item_name, i.uom_code,
+                   sb.quantity, sb.average_value, sb.fifo_value
+            FROM items i
+            JOIN stock_balances sb ON sb.item_id = i.id
+            WHERE (:include_zero OR sb.quantity != 0)
+            ORDER BY i.item_code
+            """
+        else:
+            query = """
+            SELECT i.id AS item_id, i.item_code, i.item_name, i.uom_code,
+                   m.balance_quantity AS quantity, m.average_value, m.fifo_value
+            FROM items i
+            JOIN stock_movements m ON m.id = (
+                SELECT id FROM stock_movements
+                WHERE item_id = i.id AND movement_date <= :as_of
+                ORDER BY movement_date DESC, id DESC
+                LIMIT 1
+            )
+            WHERE (:include_zero OR m.balance_quantity != 0)
+            ORDER BY i.item_code
+            """
+
+        try:
+            self.cursor.execute(query, {'as_of': str(as_of), 'include_zero': int(include_zero)})
+            rows = self.cursor.fetchall()
+        except sqlite3.Error as e:
+            print(f"[STOCK] Error fetching stock on hand: {e}")
+            return None
+
+        items = []
+        average_total = fifo_total = 0
+        for row in rows:
+            item = dict(row)
+            average_total += item['average_value']
+            fifo_total += item['fifo_value']
+            item['quantity'] = from_quantity(item['quantity'])
+            items.append(money_fields(item, ('average_value', 'fifo_value')))
+
+        return {
+            'as_of': str(as_of) if as_of else None,
+            'items': items,
+            'totals': {'average_value': Money(average_total), 'fifo_value': Money(fifo_total)}
+        }
+
+    def get_stock_ledger(self, item_id, date_from=None, date_to=None):
+        """
+        Get the movements of an item with costs and running position
+        Returns list of dicts (quantities in units, amounts as Money)
+        """
+        try:
+            self.cursor.execute("""
+                SELECT id, movement_date, movement_type, document_type, document_id,
+                       quantity, rate, average_cost, fifo_cost,
+                       balance_quantity, average_value, fifo_value, narration
+                FROM stock_movements
+                WHERE item_id = ? AND movement_date >= ? AND movement_date <= ?
+                ORDER BY movement_date, id
+            """, (item_id, str(date_from or '0000-01-01'), str(date_to or '9999-12-31')))
+            ledger = []
+            for row in self.cursor.fetchall():
+                movement = money_fields(dict(row), MOVEMENT_MONEY_FIELDS)
+                movement['quantity'] = from_quantity(movement['quantity'])
+                movement['balance_quantity'] = from_quantity(movement['balance_quantity'])
+                ledger.append(movement)
+            return ledger
+        except sqlite3.Error as e:
+            print(f"[STOCK] Error fetching stock ledger: {e}")
+            return []
+
+    def get_revaluation_start(self):
+        """Earliest date a revaluation has to start from (None if every item is current)"""
+        try:
+            self.cursor.execute("SELECT MIN(revalue_from) FROM stock_balances")
+            return self.cursor.fetchone()[0]
+        except sqlite3.Error as e:
+            print(f"[STOCK] Error checking revaluation: {e}")
+            return None
+
+    # ========================================================================
+    # REVALUATION
+    # ========================================================================
+
+    def revalue(self, date_from, date_to=None, batch_size=REVALUE_BATCH_SIZE):
+        """
+        Recompute the costs and running positions of every movement from date_from
+        to date_to in one streaming pass (ordered by item, date and id, read in batches)
+        Each item starts from its position before date_from, so date_from must not be
+        later than the item's revalue_from flag. Updates are committed every
+        batch_size movements, at item boundaries.
+
+        Items whose movements continue after date_to stay flagged from their next
+        movement; items whose stock would go negative stay flagged and are reported.
+        Returns (success: bool, message: str, stats: dict with items, movements,
+        changed, short_items)
+        """
+        date_from = str(date_from)
+        date_to = str(date_to) if date_to else '9999-12-31'
+        stats = {'items': 0, 'movements': 0, 'changed': 0, 'short_items': []}
+        pending = []
+
+        try:
+            self.conn.commit()
+            reader = self.conn.execute("""
+                SELECT id, item_id, movement_date, quantity, rate, average_cost, fifo_cost,
+                       balance_quantity, average_value, fifo_value
+                FROM stock_movements
+                WHERE movement_date >= ? AND movement_date <= ?
+                ORDER BY item_id, movement_date, id
+            """, (date_from, date_to))
+
+            item_id = position = None
+            short = False
+            while True:
+                rows = reader.fetchmany(batch_size)
+                if not rows:
+                    break
+                for movement_id, row_item_id, movement_date, quantity, rate, *stored in rows:
+                    if row_item_id != item_id:
+                        if item_id is not None:
+                            self._finish_revaluation(item_id, position, short, date_from, date_to, pending)
+                            if len(pending) >= batch_size:
+                                self._flush_revaluation(pending)
+                        item_id, short = row_item_id, False
+                        position = self._position_before(item_id, date_from)
+                        stats['items'] += 1
+                    if short:
+                        continue
+
+                    if quantity > 0:
+                        average_cost = fifo_cost = position.receive(quantity, rate, movement_id, movement_date)
+                    else:
+                        costs = position.issue(-quantity)
+                        if costs is None:
+                            short = True
+                            stats['short_items'].append(item_id)
+                            continue
+                        average_cost, fifo_cost = -costs[0], -costs[1]
+
+                    stats['movements'] += 1
+                    values = (average_cost, fifo_cost, position.quantity,
+                              position.average_value, position.fifo_value)
+                    if values != tuple(stored):
+                        pending.append(values + (movement_id,))
+                        stats['changed'] += 1
+
+            if item_id is not None:
+                self._finish_revaluation(item_id, position, short, date_from, date_to, pending)
+            self._flush_revaluation(pending)
+
+            message = (f"Stock revalued: {stats['movements']} movements of {stats['items']} items, "
+                       f"{stats['changed']} re-costed")
+            if stats['short_items']:
+                message += f", {len(stats['short_items'])} items would go negative"
+            print(f"[STOCK] {message}")
+            return True, message, stats
+
+        except sqlite3.Error as e:
+            print(f"[STOCK] Error revaluing stock: {e}")
+            self.conn.rollback()
+            return False, f"Database error: {str(e)}", stats
+
+    def _finish_revaluation(self, item_id, position, short, date_from, date_to, pending):
+        """Store the recomputed position of an item or leave it flagged for a later pass"""
+        self.cursor.execute("SELECT revalue_from FROM stock_balances WHERE item_id = ?", (item_id,))
+        row = self.cursor.fetchone()
+        flagged_before = row and row['revalue_from'] and row['revalue_from'] < date_from
+
+        if short:
+            self.cursor.execute("""
+                UPDATE stock_balances SET revalue_from = MIN(COALESCE(revalue_from, ?), ?)
+                WHERE item_id = ?
+            """, (date_from, date_from, item_id))
+            return
+
+        self.cursor.execute("""
+            SELECT MIN(movement_date) FROM stock_movements WHERE item_id = ? AND movement_date > ?
+        """, (item_id, date_to))
+        next_date = self.cursor.fetchone()[0]
+        if next_date:
+            # Later movements now start from a different position
+            if not flagged_before:
+                self.cursor.execute("UPDATE stock_balances SET revalue_from = ? WHERE item_id = ?",
+                                    (next_date, item_id))
+            return
+
+        self.cursor.execute("""
+            UPDATE stock_balances SET
+                quantity = ?, average_value = ?, fifo_value = ?,
+                revalue_from = CASE WHEN revalue_from < ? THEN revalue_from END,
+                updated_at = CURRENT_TIMESTAMP
+            WHERE item_id = ?
+        """, (position.quantity, position.average_value, position.fifo_value, date_from, item_id))
+        self._replace_layers(item_id, position)
+
+    def _flush_revaluation(self, pending):
+        """Write re-costed movements and commit"""
+        self.cursor.executemany("""
+            UPDATE stock_movements SET
+                average_cost = ?, fifo_cost = ?,
+                balance_quantity = ?, average_value = ?, fifo_value = ?
+            WHERE id = ?
+        """, pending)
+        self.conn.commit()
+        pending.clear()
+
+    def revalue_financial_year(self, fy_id, batch_size=REVALUE_BATCH_SIZE):
+        """
+        Revalue the movements of one financial year (see revalue)
+        Returns (success: bool, message: str, stats: dict or None)
+        """
+        try:
+            self.cursor.execute("SELECT start_date, end_date FROM financial_years WHERE id = ?", (fy_id,))
+            fy = self.cursor.fetchone()
+        except sqlite3.Error as e:
+            print(f"[STOCK] Error resolving financial year: {e}")
+            return False, f"Database error: {str(e)}", None
+        if not fy:
+            return False, "Financial year not found", None
+        return self.revalue(fy['start_date'], fy['end_date'], batch_size)
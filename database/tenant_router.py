@@ -0,0 +1,346 @@
+"""
+Tenant Router - One SQLite file per company
+
+The shared database (DB_PATH) is the directory: users, companies and the
+company_databases registry. A company listed in the registry keeps all of its
+books - masters, vouchers, invoices, stock - in its own file:
+    financial_data.db                 - users, companies, company_databases
+    companies/financial_data_C1.db    - everything company C1 works with
+Companies that are not registered keep working in the shared file, so a database
+that was never split behaves exactly as before.
+
+After login the company is activated (activate_tenant()); handlers resolve their
+database with tenant_db_path(DB_PATH), which is the active company's file or
+DB_PATH when no company file is active. The directory handlers (login,
+companies) always use DB_PATH.
+
+TenantConnections keeps one open connection per recently used company file
+(MAX_WARM_TENANTS, least recently used closed first). While it is open the file's
+WAL stays in place, so handlers opening and closing their own connections do not
+checkpoint and delete it every time, and the schema and page cache of that
+connection stay warm for lookups made through it. Opening a company file also
+refreshes its copy of the companies table from the directory.
+
+split_company() copies the shared file for one company (see
+database/split_companies.py).
+"""
+
+import os
+import sqlite3
+from collections import OrderedDict
+from database.config import DB_PATH
+
+
+# Company files kept open at once
+MAX_WARM_TENANTS = 4
+
+# Seconds a connection waits for another writer
+BUSY_TIMEOUT_SECONDS = 30
+
+# Rows of the books that belong to a company, deleted from files that don't keep it,
+# children first: (table, WHERE clause over the company ids being removed ({removed})
+# and whether rows without a company are removed too (:unassigned))
+COMPANY_ROWS = (
+    ('sales_invoice_lines', "invoice_id IN (SELECT id FROM sales_invoices WHERE company_id IN ({removed}))"),
+    ('sales_invoices', "company_id IN ({removed})"),
+    ('invoice_series', "company_id IN ({removed})"),
+    ('voucher_lines', "voucher_id IN (SELECT id FROM vouchers WHERE company_id IN ({removed})"
+                      " OR (company_id IS NULL AND :unassigned))"),
+    ('vouchers', "company_id IN ({removed}) OR (company_id IS NULL AND :unassigned)"),
+    ('stock_movements', "CASE WHEN document_type = 'Sales Invoice' "
+                        "THEN document_id NOT IN (SELECT id FROM sales_invoices) ELSE :unassigned END"),
+)
+
+# Active company file of this process (None = shared file)
+_active_path = None
+
+
+def tenant_db_path(default=DB_PATH):
+    """Database file of the active company, or default when no company file is active"""
+    return _active_path or default
+
+
+def create_registry(conn):
+    """Create the company_databases registry in the shared file if it doesn't exist"""
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS company_databases (
+        company_id INTEGER PRIMARY KEY,
+        path TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (company_id) REFERENCES companies(id)
+    )
+    """)
+
+
+def _table_exists(conn, table):
+    return conn.execute("SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name = ?",
+                        (table,)).fetchone()[0] > 0
+
+
+class TenantRouter:
+    def __init__(self, directory_path=None):
+        self.directory_path = os.path.abspath(directory_path or DB_PATH)
+
+    def _connect_directory(self):
+        conn = sqlite3.connect(self.directory_path, timeout=BUSY_TIMEOUT_SECONDS)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def tenant_path(self, company_code):
+        """File of a company: companies/<stem>_<company_code>.db next to the shared file"""
+        directory, name = os.path.split(self.directory_path)
+        stem, ext = os.path.splitext(name)
+        return os.path.join(directory, 'companies', f"{stem}_{company_code}{ext or '.db'}")
+
+    def get_tenants(self):
+        """Registered company files: {company_id: absolute path}"""
+        conn = self._connect_directory()
+        try:
+            if not _table_exists(conn, 'company_databases'):
+                return {}
+            directory = os.path.dirname(self.directory_path)
+            return {row['company_id']: os.path.join(directory, row['path'])
+                    for row in conn.execute("SELECT company_id, path FROM company_databases")}
+        finally:
+            conn.close()
+
+    def db_path_for(self, company_id):
+        """Database file of a company (the shared file if it was not split)"""
+        return self.get_tenants().get(company_id, self.directory_path)
+
+    # ========================================================================
+    # SPLIT
+    # ========================================================================
+
+    def split_company(self, company_id, default_company_id):
+        """
+        Give a company its own file: a copy of the shared file keeping only the
+        company's invoices, vouchers and stock issues, with balances and stock
+        positions recomputed. Records without a company (journals, opening stock,
+        purchases, master opening balances) stay with default_company_id; the other
+        files keep the masters with zero opening balances.
+        The shared file is not changed except for the registry (see prune_company).
+        Returns (success: bool, message: str, path: str or None)
+        """
+        conn = self._connect_directory()
+        try:
+            if _table_exists(conn, 'fy_partitions') and \
+                    conn.execute("SELECT COUNT(*) FROM fy_partitions").fetchone()[0]:
+                return False, "Split companies before partitioning the database by financial year", None
+
+            company = conn.execute("SELECT id, company_code FROM companies WHERE id = ?",
+                                   (company_id,)).fetchone()
+            if not company:
+                return False, "Company not found", None
+            create_registry(conn)
+            conn.commit()
+            if conn.execute("SELECT 1 FROM company_databases WHERE company_id = ?", (company_id,)).fetchone():
+                return False, f"Company {company['company_code']} already has its own file", None
+
+            path = self.tenant_path(company['company_code'])
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            if os.path.exists(path):
+                os.remove(path)
+            conn.execute("VACUUM INTO ?", (path,))
+
+            tenant = sqlite3.connect(path)
+            try:
+                others = [row[0] for row in tenant.execute("SELECT id FROM companies WHERE id != ?",
+                                                           (company_id,))]
+                self._delete_company_rows(tenant, others, unassigned=company_id != default_company_id)
+                if company_id != default_company_id:
+                    for table in ('account_master', 'business_partners'):
+                        if _table_exists(tenant, table):
+                            tenant.execute(f"UPDATE {table} SET opening_balance = 0")
+                tenant.execute("DELETE FROM company_databases")
+                if _table_exists(tenant, 'users'):
+                    # Logins are checked against the directory only
+                    tenant.execute("DELETE FROM users")
+                tenant.commit()
+
+                expected = self._company_counts(conn, company_id, company_id == default_company_id)
+                copied = self._company_counts(tenant, company_id, company_id == default_company_id)
+                if copied != expected:
+                    raise sqlite3.DatabaseError(f"Row counts differ after the split: {copied} / {expected}")
+            finally:
+                tenant.close()
+
+            success, message = self._recompute(path)
+            if not success:
+                return False, message, None
+
+            conn.execute("INSERT INTO company_databases (company_id, path) VALUES (?, ?)",
+                         (company_id, os.path.relpath(path, os.path.dirname(self.directory_path))))
+            conn.commit()
+
+            print(f"[TENANT] Company {company['company_code']} -> {path}")
+            return True, f"Company {company['company_code']} moved to its own file ({copied})", path
+
+        except (sqlite3.Error, OSError) as e:
+            print(f"[TENANT] Error splitting company: {e}")
+            conn.rollback()
+            return False, f"Database error: {str(e)}", None
+        finally:
+            conn.close()
+
+    def prune_company(self, company_id, default_company_id):
+        """
+        Delete the books of a company that has its own file from the shared file
+        Returns (success: bool, message: str)
+        """
+        if company_id not in self.get_tenants():
+            return False, "Company has no file of its own"
+
+        conn = self._connect_directory()
+        try:
+            self._delete_company_rows(conn, [company_id], unassigned=company_id == default_company_id)
+            conn.commit()
+        except sqlite3.Error as e:
+            print(f"[TENANT] Error pruning company: {e}")
+            conn.rollback()
+            return False, f"Database error: {str(e)}"
+        finally:
+            conn.close()
+        return self._recompute(self.directory_path)
+
+    @staticmethod
+    def _delete_company_rows(conn, company_ids, unassigned):
+        """Delete the invoices, vouchers and stock issues of company_ids (no commit)"""
+        removed = ', '.join(str(int(company_id)) for company_id in company_ids) or 'NULL'
+        for table, where in COMPANY_ROWS:
+            if _table_exists(conn, table):
+                conn.execute(f"DELETE FROM {table} WHERE {where.format(removed=removed)}",
+                             {'unassigned': int(unassigned)})
+
+    @staticmethod
+    def _company_counts(conn, company_id, with_unassigned):
+        """Invoices, invoice lines and vouchers of a company in a file"""
+        counts = {}
+        if _table_exists(conn, 'sales_invoices'):
+            counts['invoices'] = conn.execute("SELECT COUNT(*) FROM sales_invoices WHERE company_id = ?",
+                                              (company_id,)).fetchone()[0]
+            counts['invoice_lines'] = conn.execute("""
+                SELECT COUNT(*) FROM sales_invoice_lines
+                WHERE invoice_id IN (SELECT id FROM sales_invoices WHERE company_id = ?)
+            """, (company_id,)).fetchone()[0]
+        if _table_exists(conn, 'vouchers'):
+            counts['vouchers'] = conn.execute("""
+                SELECT COUNT(*) FROM vouchers WHERE company_id = ? OR (company_id IS NULL AND ?)
+            """, (company_id, int(with_unassigned))).fetchone()[0]
+        return counts
+
+    @staticmethod
+    def _recompute(path):
+        """Rebuild account balances and stock positions of a file after rows were removed"""
+        # Imported here: the handlers import this module for tenant_db_path
+        from database.stock_handler import StockHandler
+        from database.voucher_handler import VoucherHandler
+
+        vouchers = VoucherHandler(path)
+        if not vouchers.connect():
+            return False, "Cannot open the company file"
+        try:
+            success, message = vouchers.rebuild_account_balances()
+        finally:
+            vouchers.disconnect()
+        if not success:
+            return False, message
+
+        stock = StockHandler(path)
+        if not stock.connect():
+            return False, "Cannot open the company file"
+        try:
+            for table in ('stock_balances', 'stock_fifo_layers'):
+                stock.conn.execute(f"DELETE FROM {table} WHERE item_id NOT IN (SELECT item_id FROM stock_movements)")
+            stock.conn.commit()
+            success, message, _stats = stock.revalue('0000-01-01')
+        finally:
+            stock.disconnect()
+        return success, message
+
+
+class TenantConnections:
+    def __init__(self, router=None, max_warm=MAX_WARM_TENANTS):
+        self.router = router or TenantRouter()
+        self.max_warm = max_warm
+        # company_id -> (path, connection), least recently used first
+        self.connections = OrderedDict()
+
+    def get_connection(self, company_id):
+        """Warm connection to a company's file, opened on first use"""
+        if company_id in self.connections:
+            self.connections.move_to_end(company_id)
+            return self.connections[company_id][1]
+
+        path = self.router.db_path_for(company_id)
+        conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT_SECONDS)
+        conn.row_factory = sqlite3.Row
+        # Only the company files are switched to WAL; the shared directory keeps the
+        # journal mode its other users (login, company management) opened it with
+        if os.path.abspath(path) != self.router.directory_path:
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            self._refresh_companies(conn)
+
+        self.connections[company_id] = (path, conn)
+        while len(self.connections) > self.max_warm:
+            _company_id, (_path, old) = self.connections.popitem(last=False)
+            self._close(old)
+        print(f"[TENANT] Opened {path} ({len(self.connections)} warm)")
+        return conn
+
+    def _refresh_companies(self, conn):
+        """Copy the directory's companies into the company file"""
+        conn.execute("ATTACH DATABASE ? AS directory", (self.router.directory_path,))
+        try:
+            columns = ', '.join(row[1] for row in conn.execute("PRAGMA main.table_info(companies)"))
+            if columns:
+                conn.execute("DELETE FROM main.companies")
+                conn.execute(f"INSERT INTO main.companies ({columns}) SELECT {columns} FROM directory.companies")
+                conn.commit()
+        finally:
+            conn.execute("DETACH DATABASE directory")
+
+    @staticmethod
+    def _close(conn):
+        try:
+            conn.execute("PRAGMA optimize")
+        finally:
+            conn.close()
+
+    def close_all(self):
+        while self.connections:
+            _company_id, (_path, conn) = self.connections.popitem(last=False)
+            self._close(conn)
+
+
+# Process wide connections, shared by activate_tenant() calls
+_CONNECTIONS = None
+
+
+def activate_tenant(company_id, directory_path=None):
+    """
+    Route the handlers of this process to a company's file (None = shared file)
+    and keep a warm connection to it. Returns the database path now in use.
+    """
+    global _active_path, _CONNECTIONS
+    if _CONNECTIONS is None:
+        _CONNECTIONS = TenantConnections(TenantRouter(directory_path))
+
+    if company_id is None:
+        _active_path = None
+        return _CONNECTIONS.router.directory_path
+
+    path = _CONNECTIONS.router.db_path_for(company_id)
+    _CONNECTIONS.get_connection(company_id)
+    _active_path = None if path == _CONNECTIONS.router.directory_path else path
+    return path
+
+
+def deactivate_tenants():
+    """Back to the shared file, closing every warm connection"""
+    global _active_path, _CONNECTIONS
+    _active_path = None
+    if _CONNECTIONS is not None:
+        _CONNECTIONS.close_all()
+        _CONNECTIONS = None
@@ -0,0 +1,336 @@
+"""
+Trial Balance Handler - Builds the Trial Balance report from the account_balances aggregate
+
+The report is computed with a single aggregating query over account_balances joined
+to account_master / business_partners, account_groups and account_types. Results are
+cached per financial year together with the data versions they were built from:
+    - no new postings            -> the cached report is returned as is
+    - new postings in the year   -> only accounts whose balance rows carry a newer
+                                    version are re-queried and patched in
+    - master data changed        -> the report is rebuilt
+Amounts are integer paise throughout (pure integer SUMs); the assembled report
+carries them as Money.
+"""
+
+import sqlite3
+from bisect import bisect_left
+from database.config import DB_PATH
+from database.money_schema import ensure_money_schema
+from database.partition_router import PartitionRouter
+from database.tenant_router import tenant_db_path
+from database.voucher_handler import MASTER_DATA_VERSION, VoucherHandler
+from utils.money import Money
+
+
+# Process wide cache: (db_path, fy_id) -> cache entry, shared by every handler instance
+# so that reopening the report screen does not recompute anything
+_TRIAL_BALANCE_CACHE = {}
+
+# Counters for how reports were served (cache hit, incremental patch, full build)
+CACHE_STATS = {'hits': 0, 'incremental': 0, 'full': 0}
+
+TOTAL_FIELDS = ('opening_balance', 'debit_total', 'credit_total', 'closing_debit', 'closing_credit')
+
+ACCOUNT_MONEY_FIELDS = TOTAL_FIELDS + ('closing_balance',)
+
+# {changed_filter} is empty for a full build, or restricts the aggregate to
+# accounts whose balance rows changed after a given version
+TRIAL_BALANCE_QUERY = """
+WITH bal AS (
+    SELECT account_kind, account_id,
+           SUM(opening_balance) AS opening_balance,
+           SUM(debit_total) AS debit_total,
+           SUM(credit_total) AS credit_total
+    FROM account_balances
+    WHERE fy_id = :fy_id {changed_filter}
+    GROUP BY account_kind, account_id
+),
+account_rows AS (
+    SELECT b.account_kind,
+           b.account_id,
+           COALESCE(am.account_code, bp.bp_code) AS code,
+           COALESCE(am.account_name, bp.bp_name, '(deleted)') AS name,
+           COALESCE(am.account_group_id, bp.account_group_id) AS account_group_id,
+           COALESCE(am.account_type_id, bp.account_type_id) AS account_type_id,
+           b.opening_balance,
+           b.debit_total,
+           b.credit_total,
+           b.opening_balance + b.debit_total - b.credit_total AS closing_balance
+    FROM bal b
+    LEFT JOIN account_master am ON b.account_kind = 'account' AND am.id = b.account_id
+    LEFT JOIN business_partners bp ON b.account_kind = 'partner' AND bp.id = b.account_id
+),
+classified AS (
+    SELECT r.*,
+           ag.name AS account_group_name,
+           ag.account_group_type,
+           at.code AS account_type_code,
+           at.name AS account_type_name,
+           at.category,
+           at.nature,
+           CASE WHEN r.closing_balance > 0 THEN r.closing_balance ELSE 0 END AS closing_debit,
+           CASE WHEN r.closing_balance < 0 THEN -r.closing_balance ELSE 0 END AS closing_credit
+    FROM account_rows r
+    LEFT JOIN account_groups ag ON ag.id = r.account_group_id
+    LEFT JOIN account_types at ON at.id = r.account_type_id
+)
+SELECT c.*,
+       SUM(opening_balance) OVER grp AS group_opening_balance,
+       SUM(debit_total) OVER grp AS group_debit_total,
+       SUM(credit_total) OVER grp AS group_credit_total,
+       SUM(closing_debit) OVER grp AS group_closing_debit,
+       SUM(closing_credit) OVER grp AS group_closing_credit,
+       SUM(opening_balance) OVER typ AS type_opening_balance,
+       SUM(debit_total) OVER typ AS type_debit_total,
+       SUM(credit_total) OVER typ AS type_credit_total,
+       SUM(closing_debit) OVER typ AS type_closing_debit,
+       SUM(closing_credit) OVER typ AS type_closing_credit
+FROM classified c
+WINDOW grp AS (PARTITION BY account_group_id),
+       typ AS (PARTITION BY account_type_id)
+"""
+
+CHANGED_ACCOUNTS_FILTER = """
+      AND (account_kind, account_id) IN (
+          SELECT account_kind, account_id FROM account_balances
+          WHERE fy_id = :fy_id AND version > :since_version
+      )
+"""
+
+
+class TrialBalanceHandler:
+    def __init__(self, db_path=None):
+        self.db_path = db_path or tenant_db_path(DB_PATH)
+        self.conn = None
+        self.cursor = None
+        self.router = None
+
+    def connect(self):
+        """Establish database connection"""
+        try:
+            self.conn = sqlite3.connect(self.db_path)
+            self.conn.row_factory = sqlite3.Row
+            self.cursor = self.conn.cursor()
+            print("Successfully connected to SQLite database")
+            ensure_money_schema(self.conn)
+
+            # account_balances and balance_versions belong to the voucher handler,
+            # which may never have opened this database
+            self.router = PartitionRouter(self.conn, self.db_path)
+            VoucherHandler(self.db_path).attach(self.conn, self.router)
+
+            # Financial year files, when the database is partitioned
+            self.router.install()
+            return True
+        except sqlite3.Error as e:
+            print(f"Error connecting to SQLite: {e}")
+            return False
+
+    def disconnect(self):
+        """Close database connection"""
+        if self.conn:
+            self.conn.close()
+            print("SQLite connection closed")
+
+    # ========================================================================
+    # VERSIONS AND CACHE
+    # ========================================================================
+
+    def _get_versions(self, fy_id):
+        """Return (fy_version, master_version) from balance_versions"""
+        self.cursor.execute("""
+            SELECT fy_id, version FROM balance_versions WHERE fy_id IN (?, ?)
+        """, (fy_id, MASTER_DATA_VERSION))
+        versions = {row['fy_id']: row['version'] for row in self.cursor.fetchall()}
+        return versions.get(fy_id, 0), versions.get(MASTER_DATA_VERSION, 0)
+
+    @staticmethod
+    def clear_cache():
+        """Drop every cached trial balance (e.g. after restoring a backup)"""
+        _TRIAL_BALANCE_CACHE.clear()
+
+    # ========================================================================
+    # REPORT
+    # ========================================================================
+
+    def get_trial_balance(self, fy_id):
+        """
+        Get the Trial Balance of a financial year
+        Returns dict with:
+            accounts      - one row per account/partner with a balance, ordered by group and code
+            groups        - totals per account group
+            account_types - totals per account type (category/nature from account_types)
+            totals        - grand totals and whether the trial balance agrees
+        The returned dict is shared with the cache and must not be modified.
+        Returns None on database errors.
+        """
+        try:
+            fy_version, master_version = self._get_versions(fy_id)
+            cache_key = (self.db_path, fy_id)
+            entry = _TRIAL_BALANCE_CACHE.get(cache_key)
+
+            if entry and entry['master_version'] == master_version:
+                if entry['fy_version'] == fy_version:
+                    CACHE_STATS['hits'] += 1
+                    return entry['report']
+
+                self.router.require([fy_id])
+                changed = self._patch_changed_accounts(entry, fy_id, fy_version)
+                CACHE_STATS['incremental'] += 1
+                print(f"[TRIAL_BALANCE] FY {fy_id}: refreshed {changed} changed accounts")
+            else:
+                self.router.require([fy_id])
+                entry = self._build_full(fy_id, fy_version, master_version)
+                _TRIAL_BALANCE_CACHE[cache_key] = entry
+                CACHE_STATS['full'] += 1
+                print(f"[TRIAL_BALANCE] FY {fy_id}: built {len(entry['accounts'])} accounts")
+
+            entry['report'] = self._assemble_report(fy_id, entry)
+            return entry['report']
+
+        except sqlite3.Error as e:
+            print(f"[TRIAL_BALANCE] Error building trial balance: {e}")
+            return None
+
+    def _build_full(self, fy_id, fy_version, master_version):
+        """Run the aggregate query for every account of the year"""
+        self.cursor.execute(TRIAL_BALANCE_QUERY.format(changed_filter=''), {'fy_id': fy_id})
+        rows = self.cursor.fetchall()
+
+        accounts = {}
+        groups = {}
+        account_types = {}
+        for row in rows:
+            account = dict(row)
+            accounts[(account['account_kind'], account['account_id'])] = self._account_fields(account)
+
+            # Group and type totals come from the window columns of the same query
+            groups.setdefault(account['account_group_id'], {
+                'account_group_id': account['account_group_id'],
+                'account_group_name': account['account_group_name'],
+                'account_group_type': account['account_group_type'],
+                **{field: account[f'group_{field}'] for field in TOTAL_FIELDS}
+            })
+            account_types.setdefault(account['account_type_id'], {
+                'account_type_id': account['account_type_id'],
+                'account_type_code': account['account_type_code'],
+                'account_type_name': account['account_type_name'],
+                'category': account['category'],
+                'nature': account['nature'],
+                **{field: account[f'type_{field}'] for field in TOTAL_FIELDS}
+            })
+
+        # Report rows in report order, already with Money amounts, and their sort keys
+        ordered = sorted(accounts.values(), key=self._account_sort_key)
+        return {
+            'fy_version': fy_version,
+            'master_version': master_version,
+            'accounts': accounts,
+            'groups': groups,
+            'account_types': account_types,
+            'account_rows': [self._with_money(a, ACCOUNT_MONEY_FIELDS) for a in ordered],
+            'sort_keys': [self._account_sort_key(a) for a in ordered]
+        }
+
+    def _patch_changed_accounts(self, entry, fy_id, fy_version):
+        """
+        Re-query only accounts whose balance rows changed since the cached version,
+        apply the difference to the cached group/type totals and move their report
+        rows to their sorted positions
+        Returns the number of accounts refreshed
+        """
+        self.cursor.execute(
+            TRIAL_BALANCE_QUERY.format(changed_filter=CHANGED_ACCOUNTS_FILTER),
+            {'fy_id': fy_id, 'since_version': entry['fy_version']}
+        )
+        rows = self.cursor.fetchall()
+
+        for row in rows:
+            account = self._account_fields(dict(row))
+            key = (account['account_kind'], account['account_id'])
+
+            old = entry['accounts'].get(key)
+            if old:
+                self._add_to_totals(entry, old, -1)
+                position = bisect_left(entry['sort_keys'], self._account_sort_key(old))
+                del entry['sort_keys'][position]
+                del entry['account_rows'][position]
+            entry['accounts'][key] = account
+            self._add_to_totals(entry, account, 1)
+            sort_key = self._account_sort_key(account)
+            position = bisect_left(entry['sort_keys'], sort_key)
+            entry['sort_keys'].insert(position, sort_key)
+            entry['account_rows'].insert(position, self._with_money(account, ACCOUNT_MONEY_FIELDS))
+
+        entry['fy_version'] = fy_version
+        return len(rows)
+
+    @staticmethod
+    def _account_sort_key(account):
+        """Report order of an account row: group, code, kind, id"""
+        return (account['account_group_name'] or '', account['code'] or '',
+                account['account_kind'], account['account_id'])
+
+    @staticmethod
+    def _account_fields(row):
+        """Strip the window total columns from an account row"""
+        return {key: value for key, value in row.items()
+                if not key.startswith('group_') and not key.startswith('type_')}
+
+    @staticmethod
+    def _add_to_totals(entry, account, sign):
+        """Add (sign=1) or remove (sign=-1) an account row from its group and type totals"""
+        group = entry['groups'].setdefault(account['account_group_id'], {
+            'account_group_id': account['account_group_id'],
+            'account_group_name': account['account_group_name'],
+            'account_group_type': account['account_group_type'],
+            **{field: 0 for field in TOTAL_FIELDS}
+        })
+        account_type = entry['account_types'].setdefault(account['account_type_id'], {
+            'account_type_id': account['account_type_id'],
+            'account_type_code': account['account_type_code'],
+            'account_type_name': account['account_type_name'],
+            'category': account['category'],
+            'nature': account['nature'],
+            **{field: 0 for field in TOTAL_FIELDS}
+        })
+        for field in TOTAL_FIELDS:
+            group[field] += sign * account[field]
+            account_type[field] += sign * account[field]
+
+    @staticmethod
+    def _with_money(row, fields):
+        """Copy of a cached row with its paise fields as Money"""
+        return {key: Money(value) if key in fields else value for key, value in row.items()}
+
+    @staticmethod
+    def _assemble_report(fy_id, entry):
+        """
+        Order the group and type totals, compute grand totals and convert amounts to
+        Money. Account rows are kept sorted and converted in the cache entry.
+        """
+        groups = sorted(
+            entry['groups'].values(),
+            key=lambda g: (g['account_group_type'] or '', g['account_group_name'] or '')
+        )
+        account_types = sorted(
+            entry['account_types'].values(),
+            key=lambda t: (t['category'] or '', t['account_type_code'] or '')
+        )
+
+        totals = {
+            field: sum(g[field] for g in groups)
+            for field in TOTAL_FIELDS
+        }
+        totals['difference'] = totals['closing_debit'] - totals['closing_credit']
+        totals['is_balanced'] = totals['difference'] == 0
+
+        with_money = TrialBalanceHandler._with_money
+        return {
+            'fy_id': fy_id,
+            'version': entry['fy_version'],
+            'accounts': list(entry['account_rows']),
+            'groups': [with_money(g, TOTAL_FIELDS) for g in groups],
+            'account_types': [with_money(t, TOTAL_FIELDS) for t in account_types],
+            'totals': with_money(totals, TOTAL_FIELDS + ('difference',))
+        }
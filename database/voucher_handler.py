@@ -0,0 +1,855 @@
+"""
+Voucher Handler - Posts double-entry vouchers and maintains account balance aggregates using SQLite
+
+Every voucher line debits or credits either an account_master entry
+(account_kind='account') or a business_partners entry (account_kind='partner').
+Posting and reversal update the account_balances aggregate in the same
+transaction, so balance lookups never have to scan voucher_lines.
+
+account_balances layout (one row per account, financial year and period):
+    period 0      -> opening balance for the financial year (signed, Debit positive)
+    period 1..n   -> debit/credit totals for the n-th month of the financial year
+
+balance_versions holds a data version per financial year (fy_id 0 is master data).
+Every write bumps the version and stamps it on the account_balances rows it
+touches, so report caches can tell exactly which accounts changed.
+
+Amounts are stored as integer paise; line amounts are taken in rupees and amounts
+are returned as Money (utils/money.py).
+
+On a database partitioned per financial year (database/partition_router.py) the
+rows are written to the year's file; reads go through the router's views.
+"""
+
+import sqlite3
+from datetime import date
+from itertools import chain
+from database.config import DB_PATH
+from database.fy_index import get_fy_index
+from database.money_schema import ensure_money_schema
+from database.partition_router import (PartitionError, PartitionRouter, registered_partitions,
+                                       write_schema)
+from database.tenant_router import tenant_db_path
+from utils.money import Money, money_fields, to_paise
+
+
+ACCOUNT_KINDS = ('account', 'partner')
+
+# Master table holding the opening balance for each account kind
+ACCOUNT_KIND_TABLES = {
+    'account': 'account_master',
+    'partner': 'business_partners'
+}
+
+# Voucher number prefixes per voucher type
+VOUCHER_TYPE_PREFIXES = {
+    'Journal': 'JV',
+    'Receipt': 'RV',
+    'Payment': 'PV',
+    'Contra': 'CV',
+    'Sales': 'SV',
+    'Reversal': 'RJ'
+}
+
+# balance_versions key used for master data (accounts, partners, groups)
+MASTER_DATA_VERSION = 0
+
+
+def fiscal_period(voucher_date, fy_start_date):
+    """
+    Return the 1-based month number of voucher_date within the financial year
+    Example: FY starting 2024-04-01 => 2024-04-15 is period 1, 2025-03-31 is period 12
+    """
+    voucher_date = str(voucher_date)
+    fy_start_date = str(fy_start_date)
+    months = (int(voucher_date[:4]) * 12 + int(voucher_date[5:7])) - \
+             (int(fy_start_date[:4]) * 12 + int(fy_start_date[5:7]))
+    return months + 1
+
+
+def signed_opening_balance(opening_balance, balance_type):
+    """Convert a master opening balance (paise) + balance_type into a signed amount (Debit positive)"""
+    amount = opening_balance or 0
+    return -amount if balance_type == 'Credit' else amount
+
+
+def bump_data_version(cursor, fy_id=MASTER_DATA_VERSION):
+    """
+    Increment the data version of a financial year (or of master data) and return it.
+    Must run inside the caller's write transaction. Returns None if the
+    version table does not exist yet.
+    """
+    cursor.execute("""
+        SELECT COUNT(*) FROM sqlite_master
+        WHERE type = 'table' AND name = 'balance_versions'
+    """)
+    if cursor.fetchone()[0] == 0:
+        return None
+
+    cursor.execute("""
+        INSERT INTO balance_versions (fy_id, version) VALUES (?, 1)
+        ON CONFLICT(fy_id) DO UPDATE SET version = version + 1
+    """, (fy_id,))
+    cursor.execute("SELECT version FROM balance_versions WHERE fy_id = ?", (fy_id,))
+    return cursor.fetchone()[0]
+
+
+def apply_opening_balance(cursor, account_kind, account_id, opening_balance, balance_type):
+    """
+    Keep the opening balance row (period 0) of the books-start financial year in
+    step with the master record (opening_balance in rupees). Called by the master handlers inside their own
+    transaction, before they commit.
+
+    Does nothing if the aggregate table or financial years do not exist yet.
+    """
+    cursor.execute("""
+        SELECT COUNT(*) FROM sqlite_master
+        WHERE type = 'table' AND name IN ('account_balances', 'financial_years')
+    """)
+    if cursor.fetchone()[0] < 2:
+        return
+
+    bump_data_version(cursor)
+
+    years = get_fy_index(cursor).years
+    if not years:
+        return
+
+    fy_id = years[0]['id']
+    opening = signed_opening_balance(to_paise(opening_balance), balance_type)
+    refusal = None
+    if years[0].get('is_locked'):
+        refusal = sqlite3.IntegrityError(f"Financial year {years[0]['fy_code']} is locked")
+    else:
+        try:
+            schema = write_schema(cursor, fy_id)
+        except PartitionError as e:
+            refusal = e
+    if refusal:
+        # A closed or locked books-start year only refuses an actual change of the opening balance
+        cursor.execute("""
+            SELECT COALESCE(SUM(opening_balance), 0) FROM account_balances
+            WHERE account_kind = ? AND account_id = ? AND fy_id = ? AND period = 0
+        """, (account_kind, account_id, fy_id))
+        if cursor.fetchone()[0] == opening:
+            return
+        raise refusal
+
+    version = bump_data_version(cursor, fy_id)
+    cursor.execute(f"""
+        INSERT INTO {schema}.account_balances (
+            account_kind, account_id, fy_id, period, opening_balance, debit_total, credit_total, version
+        ) VALUES (?, ?, ?, 0, ?, 0, 0, ?)
+        ON CONFLICT(account_kind, account_id, fy_id, period) DO UPDATE SET
+            opening_balance = excluded.opening_balance,
+            version = excluded.version,
+            updated_at = CURRENT_TIMESTAMP
+    """, (account_kind, account_id, fy_id, opening, version or 0))
+
+
+class VoucherHandler:
+    def __init__(self, db_path=None):
+        self.db_path = db_path or tenant_db_path(DB_PATH)
+        self.conn = None
+        self.cursor = None
+        self.router = None
+
+    def connect(self):
+        """Establish database connection"""
+        try:
+            self.conn = sqlite3.connect(self.db_path)
+            self.conn.row_factory = sqlite3.Row
+            self.cursor = self.conn.cursor()
+            print("Successfully connected to SQLite database")
+
+            # Create tables if they don't exist
+            self._create_tables()
+
+            # Financial year files, when the database is partitioned
+            self.router = PartitionRouter(self.conn, self.db_path)
+            self.router.install()
+
+            return True
+        except sqlite3.Error as e:
+            print(f"Error connecting to SQLite: {e}")
+            return False
+
+    def attach(self, conn, router=None):
+        """
+        Work on a connection owned by another handler, so vouchers can be staged
+        inside that handler's transaction. Creates the voucher tables if needed.
+        router is the owner's PartitionRouter, which installs it after its own tables.
+        """
+        self.conn = conn
+        self.cursor = conn.cursor()
+        self.router = router
+        self._create_tables()
+
+    def _create_tables(self):
+        """Create vouchers, voucher_lines and account_balances tables if they don't exist"""
+        try:
+            self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS vouchers (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                voucher_no TEXT NOT NULL UNIQUE,
+                voucher_type TEXT NOT NULL,
+                voucher_date DATE NOT NULL,
+                fy_id INTEGER NOT NULL,
+                company_id INTEGER,
+                narration TEXT,
+                total_amount INTEGER DEFAULT 0,
+                status TEXT DEFAULT 'Posted' CHECK(status IN ('Posted', 'Reversed')),
+                reversal_of INTEGER,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (fy_id) REFERENCES financial_years(id),
+                FOREIGN KEY (company_id) REFERENCES companies(id),
+                FOREIGN KEY (reversal_of) REFERENCES vouchers(id)
+            )
+            """)
+
+            # voucher_date, fy_id and period are copied from the header so that
+            # ledger and aggregate queries never need to join back to vouchers
+            self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS voucher_lines (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                voucher_id INTEGER NOT NULL,
+                line_no INTEGER NOT NULL,
+                account_kind TEXT NOT NULL CHECK(account_kind IN ('account', 'partner')),
+                account_id INTEGER NOT NULL,
+                fy_id INTEGER NOT NULL,
+                period INTEGER NOT NULL,
+                voucher_date DATE NOT NULL,
+                debit INTEGER DEFAULT 0,
+                credit INTEGER DEFAULT 0,
+                narration TEXT,
+                FOREIGN KEY (voucher_id) REFERENCES vouchers(id)
+            )
+            """)
+
+            self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS account_balances (
+                account_kind TEXT NOT NULL CHECK(account_kind IN ('account', 'partner')),
+                account_id INTEGER NOT NULL,
+                fy_id INTEGER NOT NULL,
+                period INTEGER NOT NULL CHECK(period >= 0),
+                opening_balance INTEGER DEFAULT 0,
+                debit_total INTEGER DEFAULT 0,
+                credit_total INTEGER DEFAULT 0,
+                version INTEGER DEFAULT 0,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (account_kind, account_id, fy_id, period)
+            ) WITHOUT ROWID
+            """)
+
+            self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS balance_versions (
+                fy_id INTEGER PRIMARY KEY,
+                version INTEGER NOT NULL DEFAULT 0
+            )
+            """)
+
+            # Databases created before versioning lack the column
+            self.cursor.execute("PRAGMA table_info(account_balances)")
+            if 'version' not in [col['name'] for col in self.cursor.fetchall()]:
+                self.cursor.execute("ALTER TABLE account_balances ADD COLUMN version INTEGER DEFAULT 0")
+
+            self.cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_voucher_lines_voucher
+            ON voucher_lines (voucher_id)
+            """)
+            # Ledger reads walk one account's lines in (voucher_date, id) order
+            self.cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_voucher_lines_account_date
+            ON voucher_lines (account_kind, account_id, voucher_date, id)
+            """)
+            self.cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_vouchers_fy_date
+            ON vouchers (fy_id, voucher_date)
+            """)
+            self.cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_account_balances_fy_version
+            ON account_balances (fy_id, version)
+            """)
+
+            self.conn.commit()
+
+            # Databases created before integer paise hold REAL rupees
+            ensure_money_schema(self.conn)
+
+            # Databases created before the aggregate hold opening balances on the masters only
+            self._seed_opening_balances()
+            self.conn.commit()
+            print("Voucher tables created/verified successfully")
+        except sqlite3.Error as e:
+            print(f"Error creating voucher tables: {e}")
+
+    def disconnect(self):
+        """Close database connection"""
+        if self.conn:
+            self.conn.close()
+            print("SQLite connection closed")
+
+    # ========================================================================
+    # HELPERS
+    # ========================================================================
+
+    def _schema(self, fy_id):
+        """Schema that rows of fy_id are written to (see partition_router.write_schema)"""
+        if self.router:
+            return self.router.write_schema(fy_id)
+        return write_schema(self.cursor, fy_id)
+
+    def _require(self, *fy_ids):
+        """Attach the year files a read needs"""
+        if self.router:
+            self.router.require(fy_ids)
+
+    def get_financial_year_for_date(self, voucher_date):
+        """Get the financial year whose period contains voucher_date (see database/fy_index.py)"""
+        try:
+            return get_fy_index(self.cursor, self.db_path).find(voucher_date)
+        except sqlite3.Error as e:
+            print(f"Error resolving financial year: {e}")
+            return None
+
+    def get_financial_years_for_dates(self, dates):
+        """
+        Resolve many dates at once (imports, bulk posting)
+        Returns {date: financial year dict or None}, {} on error
+        """
+        try:
+            return get_fy_index(self.cursor, self.db_path).find_many(dates)
+        except sqlite3.Error as e:
+            print(f"Error resolving financial years: {e}")
+            return {}
+
+    def generate_voucher_no(self, voucher_type, fy_code):
+        """
+        Generate voucher number based on:
+        - Voucher type prefix (JV, RV, PV, ...)
+        - Financial year code
+        - 5 digit serial number within type and year
+
+        Example: Type="Journal", FY="FY2425" => JV/FY2425/00001
+        """
+        prefix = f"{VOUCHER_TYPE_PREFIXES.get(voucher_type, 'VR')}/{fy_code}/"
+
+        try:
+            # Prefix range instead of LIKE so the lookup is a seek on the unique index
+            query = """
+            SELECT voucher_no FROM vouchers
+            WHERE voucher_no >= ? AND voucher_no < ?
+            ORDER BY voucher_no DESC
+            LIMIT 1
+            """
+            self.cursor.execute(query, (prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)))
+            result = self.cursor.fetchone()
+
+            if result:
+                next_serial = int(result['voucher_no'][-5:]) + 1
+            else:
+                next_serial = 1
+
+            return f"{prefix}{str(next_serial).zfill(5)}"
+
+        except sqlite3.Error as e:
+            print(f"Error generating voucher number: {e}")
+            return f"{prefix}00001"
+
+    def _validate_lines(self, lines):
+        """
+        Validate voucher lines and convert their amounts from rupees to paise
+        Returns (valid: bool, message: str, total_amount: int paise, paise_lines: list)
+        """
+        if len(lines) < 2:
+            return False, "A voucher needs at least two lines", 0, []
+
+        total_debit = 0
+        total_credit = 0
+        paise_lines = []
+        for idx, line in enumerate(lines, 1):
+            if line.get('account_kind') not in ACCOUNT_KINDS:
+                return False, f"Line {idx}: account kind must be 'account' or 'partner'", 0, []
+            if not line.get('account_id'):
+                return False, f"Line {idx}: account is required", 0, []
+
+            try:
+                debit = to_paise(line.get('debit', 0))
+                credit = to_paise(line.get('credit', 0))
+            except ValueError:
+                return False, f"Line {idx}: amounts must be numbers", 0, []
+            if debit < 0 or credit < 0:
+                return False, f"Line {idx}: amounts cannot be negative", 0, []
+            if (debit > 0) == (credit > 0):
+                return False, f"Line {idx}: enter either a debit or a credit amount", 0, []
+
+            total_debit += debit
+            total_credit += credit
+            paise_lines.append(dict(line, debit=debit, credit=credit))
+
+        if total_debit != total_credit:
+            return False, (f"Voucher is not balanced (Debit {Money(total_debit)} / "
+                           f"Credit {Money(total_credit)})"), 0, []
+
+        return True, "Valid", total_debit, paise_lines
+
+    def _insert_voucher(self, header, lines, fy, total_amount):
+        """Insert a voucher with its lines (amounts in paise) and apply the balance deltas (no commit)"""
+        period = fiscal_period(header['voucher_date'], fy['start_date'])
+        schema = self._schema(fy['id'])
+
+        self.cursor.execute(f"""
+            INSERT INTO {schema}.vouchers (
+                voucher_no, voucher_type, voucher_date, fy_id, company_id,
+                narration, total_amount, status, reversal_of
+            ) VALUES (
+                ?, ?, ?, ?, ?, ?, ?, 'Posted', ?
+            )
+        """, (
+            header['voucher_no'],
+            header['voucher_type'],
+            str(header['voucher_date']),
+            fy['id'],
+            header.get('company_id'),
+            header.get('narration', ''),
+            total_amount,
+            header.get('reversal_of')
+        ))
+        voucher_id = self.cursor.lastrowid
+
+        self.cursor.executemany(f"""
+            INSERT INTO {schema}.voucher_lines (
+                voucher_id, line_no, account_kind, account_id, fy_id, period,
+                voucher_date, debit, credit, narration
+            ) VALUES (
+                ?, ?, ?, ?, ?, ?, ?, ?, ?, ?
+            )
+        """, [
+            (
+                voucher_id,
+                idx,
+                line['account_kind'],
+                line['account_id'],
+                fy['id'],
+                period,
+                str(header['voucher_date']),
+                line['debit'],
+                line['credit'],
+                line.get('narration', '')
+            )
+            for idx, line in enumerate(lines, 1)
+        ])
+
+        self._apply_balance_deltas(fy['id'], period, lines, schema)
+        return voucher_id
+
+    def _apply_balance_deltas(self, fy_id, period, lines, schema='main'):
+        """Add the debit/credit paise of lines to their account_balances rows in schema (no commit)"""
+        version = bump_data_version(self.cursor, fy_id)
+
+        # Collapse lines hitting the same account so each row is touched once
+        deltas = {}
+        for line in lines:
+            key = (line['account_kind'], line['account_id'])
+            debit, credit = deltas.get(key, (0, 0))
+            deltas[key] = (debit + line['debit'], credit + line['credit'])
+
+        self.cursor.executemany(f"""
+            INSERT INTO {schema}.account_balances (
+                account_kind, account_id, fy_id, period, opening_balance, debit_total, credit_total, version
+            ) VALUES (?, ?, ?, ?, 0, ?, ?, ?)
+            ON CONFLICT(account_kind, account_id, fy_id, period) DO UPDATE SET
+                debit_total = debit_total + excluded.debit_total,
+                credit_total = credit_total + excluded.credit_total,
+                version = excluded.version,
+                updated_at = CURRENT_TIMESTAMP
+        """, [
+            (kind, account_id, fy_id, period, debit, credit, version)
+            for (kind, account_id), (debit, credit) in deltas.items()
+        ])
+
+    # ========================================================================
+    # POSTING
+    # ========================================================================
+
+    def stage_voucher(self, voucher_data, lines):
+        """
+        Validate and insert a voucher inside the caller's transaction (no commit)
+        Used by documents (e.g. sales invoices) that must be saved together with their voucher.
+        Returns (success: bool, message: str, voucher_id: int or None)
+        """
+        is_valid, message, total_amount, lines = self._validate_lines(lines)
+        if not is_valid:
+            return False, message, None
+
+        voucher_date = voucher_data.get('voucher_date') or date.today().isoformat()
+        fy = self.get_financial_year_for_date(voucher_date)
+        if not fy:
+            return False, f"No financial year covers the date {voucher_date}", None
+        if fy.get('is_locked'):
+            return False, f"Financial year {fy['fy_code']} is locked", None
+
+        header = dict(voucher_data)
+        header['voucher_date'] = voucher_date
+        header['voucher_type'] = voucher_data.get('voucher_type', 'Journal')
+        if not header.get('voucher_no'):
+            header['voucher_no'] = self.generate_voucher_no(header['voucher_type'], fy['fy_code'])
+
+        voucher_id = self._insert_voucher(header, lines, fy, total_amount)
+        return True, f"Voucher posted successfully (Voucher No: {header['voucher_no']})", voucher_id
+
+    def post_voucher(self, voucher_data, lines):
+        """
+        Post a new voucher
+        voucher_data: voucher_type, voucher_date, optional voucher_no, company_id, narration
+        lines: list of dicts with account_kind, account_id, debit, credit, optional narration
+        Returns (success: bool, message: str, voucher_id: int or None)
+        """
+        try:
+            success, message, voucher_id = self.stage_voucher(voucher_data, lines)
+            if not success:
+                return False, message, None
+            self.conn.commit()
+
+            print(message)
+            return True, message, voucher_id
+
+        except sqlite3.Error as e:
+            print(f"Error posting voucher: {e}")
+            self.conn.rollback()
+            return False, f"Database error: {str(e)}", None
+
+    def reverse_voucher(self, voucher_id, reversal_date=None, narration=None):
+        """
+        Reverse a posted voucher by posting a contra voucher with debits and credits swapped
+        Returns (success: bool, message: str, reversal_voucher_id: int or None)
+        """
+        try:
+            voucher = self.get_voucher_by_id(voucher_id)
+            if not voucher:
+                return False, "Voucher not found", None
+            if voucher['status'] != 'Posted':
+                return False, "Voucher is already reversed", None
+            if voucher['voucher_type'] == 'Reversal':
+                return False, "A reversal voucher cannot be reversed", None
+
+            reversal_date = reversal_date or voucher['voucher_date']
+            fy = self.get_financial_year_for_date(reversal_date)
+            if not fy:
+                return False, f"No financial year covers the date {reversal_date}", None
+            voucher_fy = self.get_financial_year_for_date(voucher['voucher_date'])
+            for year in (voucher_fy, fy):
+                if year and year.get('is_locked'):
+                    return False, f"Financial year {year['fy_code']} is locked", None
+            # Both year files are attached before the transaction starts
+            voucher_schema = self._schema(voucher['fy_id'])
+            self._schema(fy['id'])
+
+            lines = [
+                {
+                    'account_kind': line['account_kind'],
+                    'account_id': line['account_id'],
+                    'debit': line['credit'].paise,
+                    'credit': line['debit'].paise,
+                    'narration': line['narration']
+                }
+                for line in voucher['lines']
+            ]
+
+            header = {
+                'voucher_no': self.generate_voucher_no('Reversal', fy['fy_code']),
+                'voucher_type': 'Reversal',
+                'voucher_date': reversal_date,
+                'company_id': voucher['company_id'],
+                'narration': narration or f"Reversal of {voucher['voucher_no']}",
+                'reversal_of': voucher_id
+            }
+
+            reversal_id = self._insert_voucher(header, lines, fy, voucher['total_amount'].paise)
+            self.cursor.execute(f"""
+                UPDATE {voucher_schema}.vouchers SET status = 'Reversed', updated_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+            """, (voucher_id,))
+            self.conn.commit()
+
+            print(f"Voucher '{voucher['voucher_no']}' reversed by '{header['voucher_no']}'")
+            return True, f"Voucher reversed successfully (Voucher No: {header['voucher_no']})", reversal_id
+
+        except sqlite3.Error as e:
+            print(f"Error reversing voucher: {e}")
+            self.conn.rollback()
+            return False, f"Database error: {str(e)}", None
+
+    # ========================================================================
+    # READ OPERATIONS
+    # ========================================================================
+
+    def get_voucher_by_id(self, voucher_id):
+        """Get a single voucher with its lines"""
+        try:
+            query = """
+            SELECT id, voucher_no, voucher_type, voucher_date, fy_id, company_id,
+                   narration, total_amount, status, reversal_of
+            FROM vouchers
+            WHERE id = ?
+            """
+            self.cursor.execute(query, (voucher_id,))
+            row = self.cursor.fetchone()
+            if not row:
+                return None
+
+            voucher = money_fields(dict(row), ('total_amount',))
+            self.cursor.execute("""
+                SELECT id, line_no, account_kind, account_id, debit, credit, narration
+                FROM voucher_lines
+                WHERE voucher_id = ?
+                ORDER BY line_no
+            """, (voucher_id,))
+            voucher['lines'] = [money_fields(dict(line), ('debit', 'credit'))
+                                for line in self.cursor.fetchall()]
+            return voucher
+        except sqlite3.Error as e:
+            print(f"Error fetching voucher: {e}")
+            return None
+
+    def get_vouchers_by_financial_year(self, fy_id):
+        """Get all voucher headers of a financial year"""
+        try:
+            self._require(fy_id)
+            query = """
+            SELECT id, voucher_no, voucher_type, voucher_date, fy_id, company_id,
+                   narration, total_amount, status, reversal_of
+            FROM vouchers
+            WHERE fy_id = ?
+            ORDER BY voucher_date, id
+            """
+            self.cursor.execute(query, (fy_id,))
+            return [money_fields(dict(row), ('total_amount',)) for row in self.cursor.fetchall()]
+        except sqlite3.Error as e:
+            print(f"Error fetching vouchers: {e}")
+            return []
+
+    def get_account_balance(self, account_kind, account_id, fy_id, upto_period=None):
+        """
+        Get the balance of an account from the aggregate table
+        Reads at most one row per period of the year via the primary key.
+        Returns dict of Money: opening_balance, debit_total, credit_total, closing_balance
+        (closing_balance is signed, Debit positive)
+        """
+        try:
+            self._require(fy_id)
+            query = """
+            SELECT COALESCE(SUM(opening_balance), 0) AS opening_balance,
+                   COALESCE(SUM(debit_total), 0) AS debit_total,
+                   COALESCE(SUM(credit_total), 0) AS credit_total
+            FROM account_balances
+            WHERE account_kind = ? AND account_id = ? AND fy_id = ? AND period <= ?
+            """
+            self.cursor.execute(query, (account_kind, account_id, fy_id,
+                                        upto_period if upto_period is not None else 999))
+            balance = dict(self.cursor.fetchone())
+            balance['closing_balance'] = \
+                balance['opening_balance'] + balance['debit_total'] - balance['credit_total']
+            return money_fields(balance, ('opening_balance', 'debit_total', 'credit_total', 'closing_balance'))
+        except sqlite3.Error as e:
+            print(f"Error fetching account balance: {e}")
+            return None
+
+    def get_data_version(self, fy_id):
+        """Get the current data version of a financial year (0 if nothing was posted yet)"""
+        try:
+            self.cursor.execute("SELECT version FROM balance_versions WHERE fy_id = ?", (fy_id,))
+            row = self.cursor.fetchone()
+            return row['version'] if row else 0
+        except sqlite3.Error as e:
+            print(f"Error fetching data version: {e}")
+            return None
+
+    # ========================================================================
+    # OPENING BALANCES, REBUILD AND VERIFY
+    # ========================================================================
+
+    def _get_books_start_fy_id(self):
+        """The earliest financial year receives master opening balances"""
+        self.cursor.execute("SELECT id FROM financial_years ORDER BY start_date ASC LIMIT 1")
+        row = self.cursor.fetchone()
+        return row['id'] if row else None
+
+    def _sync_opening_balances(self, fy_id, schema='main'):
+        """Copy master opening balances into the period 0 rows of fy_id in schema (no commit)"""
+        for account_kind, table in ACCOUNT_KIND_TABLES.items():
+            self.cursor.execute(f"""
+                INSERT INTO {schema}.account_balances (
+                    account_kind, account_id, fy_id, period, opening_balance, debit_total, credit_total
+                )
+                SELECT ?, id, ?, 0,
+                       CASE WHEN balance_type = 'Credit' THEN -COALESCE(opening_balance, 0)
+                            ELSE COALESCE(opening_balance, 0) END,
+                       0, 0
+                FROM {table}
+                WHERE true
+                ON CONFLICT(account_kind, account_id, fy_id, period) DO UPDATE SET
+                    opening_balance = excluded.opening_balance,
+                    updated_at = CURRENT_TIMESTAMP
+            """, (account_kind, fy_id))
+
+    def _seed_opening_balances(self):
+        """
+        Fill in the books-start opening rows from the masters when account_balances
+        has none yet (no commit). Partitioned databases always have them: the rows
+        moved into the year files with the vouchers.
+        """
+        self.cursor.execute("""
+            SELECT COUNT(*) FROM sqlite_master
+            WHERE type = 'table' AND name IN ('financial_years', 'account_master', 'business_partners')
+        """)
+        if self.cursor.fetchone()[0] < 3 or registered_partitions(self.conn):
+            return
+        fy_id = self._get_books_start_fy_id()
+        if fy_id is None:
+            return
+        self.cursor.execute("""
+            SELECT 1 FROM account_balances WHERE fy_id = ? AND period = 0 LIMIT 1
+        """, (fy_id,))
+        if self.cursor.fetchone():
+            return
+
+        self._sync_opening_balances(fy_id)
+        version = bump_data_version(self.cursor, fy_id)
+        self.cursor.execute("UPDATE account_balances SET version = ? WHERE fy_id = ? AND period = 0",
+                            (version, fy_id))
+        print(f"Opening balances of financial year {fy_id} copied from the masters")
+
+    def find_balance_drift(self):
+        """
+        Compare account_balances with totals recomputed from voucher_lines and masters
+        Returns list of dicts (account_kind, account_id, fy_id, period, stored_*, expected_*)
+        """
+        try:
+            if self.router:
+                self.router.require_all()
+            self.cursor.execute("DROP TABLE IF EXISTS temp.expected_balances")
+            self.cursor.execute("""
+                CREATE TEMP TABLE expected_balances AS
+                SELECT account_kind, account_id, fy_id, period,
+                       0 AS opening_balance,
+                       SUM(debit) AS debit_total,
+                       SUM(credit) AS credit_total
+                FROM voucher_lines
+                GROUP BY account_kind, account_id, fy_id, period
+            """)
+
+            books_start_fy_id = self._get_books_start_fy_id()
+            if books_start_fy_id is not None:
+                for account_kind, table in ACCOUNT_KIND_TABLES.items():
+                    self.cursor.execute(f"""
+                        INSERT INTO temp.expected_balances
+                        SELECT ?, id, ?, 0,
+                               CASE WHEN balance_type = 'Credit' THEN -COALESCE(opening_balance, 0)
+                                    ELSE COALESCE(opening_balance, 0) END,
+                               0, 0
+                        FROM {table}
+                    """, (account_kind, books_start_fy_id))
+
+            # Opening rows of later years are written by year-end close and have
+            # no master to compare against, so only movements and the books-start
+            # opening balances are checked
+            self.cursor.execute("""
+                SELECT e.account_kind, e.account_id, e.fy_id, e.period,
+                       ab.opening_balance AS stored_opening, e.opening_balance AS expected_opening,
+                       ab.debit_total AS stored_debit, e.debit_total AS expected_debit,
+                       ab.credit_total AS stored_credit, e.credit_total AS expected_credit
+                FROM temp.expected_balances e
+                LEFT JOIN account_balances ab
+                    ON ab.account_kind = e.account_kind AND ab.account_id = e.account_id
+                   AND ab.fy_id = e.fy_id AND ab.period = e.period
+                WHERE COALESCE(ab.opening_balance, 0) != e.opening_balance
+                   OR COALESCE(ab.debit_total, 0) != e.debit_total
+                   OR COALESCE(ab.credit_total, 0) != e.credit_total
+                UNION ALL
+                SELECT ab.account_kind, ab.account_id, ab.fy_id, ab.period,
+                       ab.opening_balance, NULL, ab.debit_total, 0, ab.credit_total, 0
+                FROM account_balances ab
+                LEFT JOIN temp.expected_balances e
+                    ON e.account_kind = ab.account_kind AND e.account_id = ab.account_id
+                   AND e.fy_id = ab.fy_id AND e.period = ab.period
+                WHERE e.account_id IS NULL
+                  AND (ab.period > 0 OR ab.fy_id = ?)
+                  AND (ab.debit_total != 0 OR ab.credit_total != 0
+                       OR (ab.period = 0 AND ab.opening_balance != 0))
+                ORDER BY 1, 2, 3, 4
+            """, (books_start_fy_id,))
+            drift = [
+                money_fields(dict(row), ('stored_opening', 'expected_opening', 'stored_debit',
+                                         'expected_debit', 'stored_credit', 'expected_credit'))
+                for row in self.cursor.fetchall()
+            ]
+
+            self.cursor.execute("DROP TABLE IF EXISTS temp.expected_balances")
+            return drift
+        except sqlite3.Error as e:
+            print(f"Error checking balance drift: {e}")
+            return None
+
+    def _rebuild_schema(self, schema, books_start_fy_id=None):
+        """Recompute the account_balances rows of one schema from its voucher_lines (no commit)"""
+        self.cursor.execute(f"DELETE FROM {schema}.account_balances WHERE period > 0")
+        self.cursor.execute(f"""
+            UPDATE {schema}.account_balances SET debit_total = 0, credit_total = 0
+            WHERE period = 0
+        """)
+        self.cursor.execute(f"""
+            INSERT INTO {schema}.account_balances (
+                account_kind, account_id, fy_id, period, opening_balance, debit_total, credit_total
+            )
+            SELECT account_kind, account_id, fy_id, period, 0, SUM(debit), SUM(credit)
+            FROM {schema}.voucher_lines
+            GROUP BY account_kind, account_id, fy_id, period
+        """)
+
+        if books_start_fy_id is not None:
+            self._sync_opening_balances(books_start_fy_id, schema)
+
+        # Every cached report is stale after a rebuild
+        self.cursor.execute(f"SELECT DISTINCT fy_id FROM {schema}.account_balances")
+        for row in self.cursor.fetchall():
+            version = bump_data_version(self.cursor, row['fy_id'])
+            self.cursor.execute(f"UPDATE {schema}.account_balances SET version = ? WHERE fy_id = ?",
+                                (version, row['fy_id']))
+
+    def rebuild_account_balances(self):
+        """
+        Recompute all movement rows of account_balances from voucher_lines and
+        refresh books-start opening balances from the masters, in one transaction
+        (one per year file on a partitioned database; closed years are left as they are).
+        Opening rows of later financial years (carried forward at year-end) are kept.
+        Returns (success: bool, message: str)
+        """
+        try:
+            books_start_fy_id = self._get_books_start_fy_id()
+            opening_schema = None
+            if books_start_fy_id is not None:
+                try:
+                    opening_schema = self._schema(books_start_fy_id)
+                except PartitionError:
+                    # A closed books-start year keeps its opening rows
+                    pass
+
+            bump_data_version(self.cursor)
+            schemas = ['main']
+            if self.router and self.router.enabled:
+                schemas = chain(schemas, self.router.open_schemas())
+            for schema in schemas:
+                self._rebuild_schema(schema, books_start_fy_id if schema == opening_schema else None)
+                self.conn.commit()
+
+            self.cursor.execute("SELECT COUNT(*) FROM account_balances")
+            row_count = self.cursor.fetchone()[0]
+            print(f"Account balances rebuilt ({row_count} rows)")
+            return True, f"Account balances rebuilt successfully ({row_count} rows)"
+
+        except sqlite3.Error as e:
+            print(f"Error rebuilding account balances: {e}")
+            self.conn.rollback()
+            return False, f"Database error: {str(e)}"
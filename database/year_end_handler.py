@@ -0,0 +1,312 @@
+"""
+Year End Handler - Closes a financial year and carries its balances forward using SQLite
+
+Closing a year runs in two set-based steps, each one transaction, recorded in
+year_end_closings so an interrupted close resumes where it stopped:
+
+    Snapshot  - the closing balance of every account and partner of the year is
+                computed from account_balances into year_end_balances, with the
+                P&L transfer entries next to it: Trading and P&L accounts are
+                transferred out (transfer_amount = -closing balance) and the net
+                profit or loss into the chosen transfer account (capital /
+                reserves). The year is locked in the same transaction, so no
+                voucher can change the snapshot afterwards.
+    Completed - closing balance + transfer of every row becomes the opening
+                balance (period 0) of the next financial year. Opening rows are
+                written with absolute values, so repeating the step after an
+                interruption gives the same result.
+
+The transfer entries are not posted as a voucher of the closed year: its Trading
+and P&L statements keep showing the year's figures, and the next year opens with
+the profit already in the transfer account.
+
+Amounts are integer paise, signed Debit positive as in account_balances.
+"""
+
+import sqlite3
+from datetime import date, timedelta
+from database.config import DB_PATH
+from database.financial_statement_handler import STATEMENT_CASE
+from database.financial_year_handler import ensure_fy_lock_column
+from database.fy_index import FY_DATA_VERSION, get_fy_index
+from database.partition_router import PartitionRouter
+from database.tenant_router import tenant_db_path
+from database.voucher_handler import VoucherHandler, bump_data_version
+from utils.money import Money
+
+
+# Closing balances of one financial year with their P&L transfer entries
+SNAPSHOT_QUERY = f"""
+INSERT INTO year_end_balances (fy_id, account_kind, account_id, closing_balance, transfer_amount)
+SELECT :fy_id, b.account_kind, b.account_id, b.closing_balance,
+       CASE WHEN {STATEMENT_CASE} = 'balance_sheet' THEN 0 ELSE -b.closing_balance END
+FROM (
+    SELECT account_kind, account_id,
+           SUM(opening_balance + debit_total - credit_total) AS closing_balance
+    FROM account_balances
+    WHERE fy_id = :fy_id
+    GROUP BY account_kind, account_id
+) b
+LEFT JOIN account_master am ON b.account_kind = 'account' AND am.id = b.account_id
+LEFT JOIN business_partners bp ON b.account_kind = 'partner' AND bp.id = b.account_id
+LEFT JOIN account_groups ag ON ag.id = COALESCE(am.account_group_id, bp.account_group_id)
+LEFT JOIN account_types at ON at.id = COALESCE(am.account_type_id, bp.account_type_id)
+"""
+
+
+def _shift_date(value, days):
+    return (date.fromisoformat(str(value)) + timedelta(days=days)).isoformat()
+
+
+class YearEndHandler:
+    def __init__(self, db_path=None):
+        self.db_path = db_path or tenant_db_path(DB_PATH)
+        self.conn = None
+        self.cursor = None
+        self.voucher_handler = None
+        self.router = None
+
+    def connect(self):
+        """Establish database connection"""
+        try:
+            self.conn = sqlite3.connect(self.db_path, timeout=30)
+            self.conn.row_factory = sqlite3.Row
+            self.cursor = self.conn.cursor()
+            print("Successfully connected to SQLite database")
+
+            # Opening rows are written through the voucher handler's year files
+            self.router = PartitionRouter(self.conn, self.db_path)
+            self.voucher_handler = VoucherHandler(self.db_path)
+            self.voucher_handler.attach(self.conn, self.router)
+
+            # Create tables if they don't exist
+            self._create_tables()
+
+            # Financial year files, when the database is partitioned
+            self.router.install()
+            return True
+        except sqlite3.Error as e:
+            print(f"Error connecting to SQLite: {e}")
+            return False
+
+    def _create_tables(self):
+        """Create year_end_closings and year_end_balances tables if they don't exist"""
+        self.cursor.execute("""
+        CREATE TABLE IF NOT EXISTS year_end_closings (
+            fy_id INTEGER PRIMARY KEY,
+            next_fy_id INTEGER NOT NULL,
+            transfer_account_id INTEGER NOT NULL,
+            step TEXT NOT NULL CHECK(step IN ('Snapshot', 'Completed')),
+            accounts INTEGER DEFAULT 0,
+            net_profit INTEGER DEFAULT 0,
+            started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            completed_at TIMESTAMP,
+            FOREIGN KEY (fy_id) REFERENCES financial_years(id),
+            FOREIGN KEY (next_fy_id) REFERENCES financial_years(id),
+            FOREIGN KEY (transfer_account_id) REFERENCES account_master(id)
+        )
+        """)
+
+        self.cursor.execute("""
+        CREATE TABLE IF NOT EXISTS year_end_balances (
+            fy_id INTEGER NOT NULL,
+            account_kind TEXT NOT NULL CHECK(account_kind IN ('account', 'partner')),
+            account_id INTEGER NOT NULL,
+            closing_balance INTEGER NOT NULL DEFAULT 0,
+            transfer_amount INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (fy_id, account_kind, account_id)
+        ) WITHOUT ROWID
+        """)
+
+        ensure_fy_lock_column(self.cursor)
+        self.conn.commit()
+        print("Year-end tables created/verified successfully")
+
+    def disconnect(self):
+        """Close database connection"""
+        if self.conn:
+            self.conn.close()
+            print("SQLite connection closed")
+
+    # ========================================================================
+    # CLOSE
+    # ========================================================================
+
+    def get_closing(self, fy_id):
+        """Get the year_end_closings row of a financial year (amounts as Money), or None"""
+        try:
+            self.cursor.execute("SELECT * FROM year_end_closings WHERE fy_id = ?", (fy_id,))
+            row = self.cursor.fetchone()
+            if not row:
+                return None
+            closing = dict(row)
+            closing['net_profit'] = Money.from_paise(closing['net_profit'])
+            return closing
+        except sqlite3.Error as e:
+            print(f"Error fetching year-end closing: {e}")
+            return None
+
+    def _check_close(self, fy, transfer_account_id):
+        """
+        Validate a new close of fy
+        Returns (error message or None, next financial year)
+        """
+        index = get_fy_index(self.cursor, self.db_path)
+        previous_fy = index.find(_shift_date(fy['start_date'], -1))
+        if previous_fy:
+            previous_closing = self.get_closing(previous_fy['id'])
+            if not previous_closing or previous_closing['step'] != 'Completed':
+                return f"Close {previous_fy['fy_code']} first", None
+        next_fy = index.find(_shift_date(fy['end_date'], 1))
+        if not next_fy:
+            return f"Create the financial year following {fy['fy_code']} first", None
+        if next_fy.get('is_locked'):
+            return f"Financial year {next_fy['fy_code']} is locked", None
+
+        self.cursor.execute(f"""
+            SELECT {STATEMENT_CASE} AS statement
+            FROM account_master am
+            LEFT JOIN account_groups ag ON ag.id = am.account_group_id
+            LEFT JOIN account_types at ON at.id = am.account_type_id
+            WHERE am.id = ?
+        """, (transfer_account_id,))
+        row = self.cursor.fetchone()
+        if not row:
+            return "Transfer account not found", None
+        if row['statement'] != 'balance_sheet':
+            return "Transfer account must be a Balance Sheet account", None
+        return None, next_fy
+
+    def _snapshot(self, fy, next_fy, transfer_account_id):
+        """Step 1: closing balances, P&L transfer entries and the lock, in one transaction"""
+        self.router.require([fy['id']])
+        self.conn.commit()
+        self.cursor.execute("BEGIN IMMEDIATE")
+        self.cursor.execute("DELETE FROM year_end_balances WHERE fy_id = ?", (fy['id'],))
+        self.cursor.execute(SNAPSHOT_QUERY, {'fy_id': fy['id']})
+        accounts = self.cursor.rowcount
+
+        # Net of the Trading and P&L accounts into the transfer account
+        self.cursor.execute("""
+            INSERT INTO year_end_balances (fy_id, account_kind, account_id, closing_balance, transfer_amount)
+            SELECT ?, 'account', ?, 0, -COALESCE(SUM(transfer_amount), 0)
+            FROM year_end_balances WHERE fy_id = ?
+            ON CONFLICT(fy_id, account_kind, account_id) DO UPDATE SET
+                transfer_amount = transfer_amount + excluded.transfer_amount
+        """, (fy['id'], transfer_account_id, fy['id']))
+        self.cursor.execute("""
+            SELECT transfer_amount FROM year_end_balances
+            WHERE fy_id = ? AND account_kind = 'account' AND account_id = ?
+        """, (fy['id'], transfer_account_id))
+        net_profit = -self.cursor.fetchone()[0]
+
+        self.cursor.execute("UPDATE financial_years SET is_locked = 1 WHERE id = ?", (fy['id'],))
+        bump_data_version(self.cursor, FY_DATA_VERSION)
+        self.cursor.execute("""
+            INSERT INTO year_end_closings (fy_id, next_fy_id, transfer_account_id, step, accounts, net_profit)
+            VALUES (?, ?, ?, 'Snapshot', ?, ?)
+        """, (fy['id'], next_fy['id'], transfer_account_id, accounts, net_profit))
+        self.conn.commit()
+        print(f"[YEAR_END] {fy['fy_code']}: {accounts} closing balances, net profit {Money.from_paise(net_profit)}")
+
+    def _carry_forward(self, closing):
+        """Step 2: write closing balance + transfer as the opening balances of the next year"""
+        next_fy_id = closing['next_fy_id']
+        schema = self.voucher_handler._schema(next_fy_id)
+        self.conn.commit()
+        self.cursor.execute("BEGIN IMMEDIATE")
+        version = bump_data_version(self.cursor, next_fy_id)
+
+        # Openings carried by an earlier close of the year are replaced, not added to
+        self.cursor.execute(f"""
+            UPDATE {schema}.account_balances
+            SET opening_balance = 0, version = ?, updated_at = CURRENT_TIMESTAMP
+            WHERE fy_id = ? AND period = 0 AND opening_balance != 0
+        """, (version, next_fy_id))
+        self.cursor.execute(f"""
+            INSERT INTO {schema}.account_balances (
+                account_kind, account_id, fy_id, period, opening_balance, debit_total, credit_total, version
+            )
+            SELECT account_kind, account_id, ?, 0, closing_balance + transfer_amount, 0, 0, ?
+            FROM main.year_end_balances
+            WHERE fy_id = ? AND closing_balance + transfer_amount != 0
+            ON CONFLICT(account_kind, account_id, fy_id, period) DO UPDATE SET
+                opening_balance = excluded.opening_balance,
+                version = excluded.version,
+                updated_at = CURRENT_TIMESTAMP
+        """, (next_fy_id, version, closing['fy_id']))
+
+        self.cursor.execute("""
+            UPDATE year_end_closings SET step = 'Completed', completed_at = CURRENT_TIMESTAMP
+            WHERE fy_id = ?
+        """, (closing['fy_id'],))
+        self.conn.commit()
+
+    def close_year(self, fy_id, transfer_account_id=None):
+        """
+        Close a financial year: snapshot closing balances, transfer the net profit
+        into transfer_account_id (an account_master id), carry the balances into
+        the next financial year and lock the year.
+        An interrupted close is resumed by calling close_year again (transfer_account_id
+        may then be omitted).
+        Returns (success: bool, message: str)
+        """
+        try:
+            self.cursor.execute("SELECT * FROM financial_years WHERE id = ?", (fy_id,))
+            row = self.cursor.fetchone()
+            if not row:
+                return False, "Financial Year not found"
+            fy = dict(row)
+
+            closing = self.get_closing(fy_id)
+            if closing and closing['step'] == 'Completed':
+                return False, f"Financial year {fy['fy_code']} is already closed"
+            if not closing:
+                if not transfer_account_id:
+                    return False, "Transfer account is required"
+                error, next_fy = self._check_close(fy, transfer_account_id)
+                if error:
+                    return False, error
+                self._snapshot(fy, next_fy, transfer_account_id)
+                closing = self.get_closing(fy_id)
+
+            self._carry_forward(closing)
+            message = (f"Financial year {fy['fy_code']} closed: {closing['accounts']} balances carried forward, "
+                       f"net profit {closing['net_profit']}")
+            print(f"[YEAR_END] {message}")
+            return True, message
+
+        except sqlite3.Error as e:
+            print(f"Error closing financial year: {e}")
+            self.conn.rollback()
+            return False, f"Database error: {str(e)}"
+
+    def reopen_year(self, fy_id):
+        """
+        Unlock a closed financial year so it can be corrected. The next year keeps the
+        carried opening balances until the year is closed again, which replaces them.
+        Returns (success: bool, message: str)
+        """
+        try:
+            closing = self.get_closing(fy_id)
+            if not closing:
+                return False, "Financial year is not closed"
+            self.cursor.execute("SELECT fy_code, is_locked FROM financial_years WHERE id = ?",
+                                (closing['next_fy_id'],))
+            next_fy = self.cursor.fetchone()
+            if next_fy and next_fy['is_locked']:
+                return False, f"Reopen {next_fy['fy_code']} first"
+
+            self.conn.commit()
+            self.cursor.execute("BEGIN IMMEDIATE")
+            self.cursor.execute("DELETE FROM year_end_balances WHERE fy_id = ?", (fy_id,))
+            self.cursor.execute("DELETE FROM year_end_closings WHERE fy_id = ?", (fy_id,))
+            self.cursor.execute("UPDATE financial_years SET is_locked = 0 WHERE id = ?", (fy_id,))
+            bump_data_version(self.cursor, FY_DATA_VERSION)
+            self.conn.commit()
+            return True, "Financial year reopened"
+
+        except sqlite3.Error as e:
+            print(f"Error reopening financial year: {e}")
+            self.conn.rollback()
+            return False, f"Database error: {str(e)}"
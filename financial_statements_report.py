@@ -0,0 +1,150 @@
+"""
+Financial Statements Screen - Trading Account, Profit & Loss and Balance Sheet
+"""
+
+import tkinter as tk
+from tkinter import ttk, messagebox
+from database.financial_year_handler import FinancialYearHandler
+from database.financial_statement_handler import FinancialStatementHandler
+from ui_config import COLORS, FONTS, SPACING
+
+
+class FinancialStatementsReport(tk.Frame):
+    STATEMENT_TABS = [
+        ('trading', "Trading Account", "Purchases / Expenses", "Sales / Income"),
+        ('profit_loss', "Profit & Loss", "Expenses", "Income"),
+        ('balance_sheet', "Balance Sheet", "Assets", "Liabilities"),
+    ]
+
+    def __init__(self, parent, colors):
+        super().__init__(parent, bg=COLORS['background'])
+        self.colors = colors
+        self.statement_handler = FinancialStatementHandler()
+        self.fy_handler = FinancialYearHandler()
+
+        # Connect to database
+        if not self.statement_handler.connect() or not self.fy_handler.connect():
+            messagebox.showerror("Database Error",
+                               "Failed to connect to database.")
+            return
+
+        # Financial year dropdown data: display_name -> id
+        self.financial_years = {
+            fy['display_name']: fy['id']
+            for fy in self.fy_handler.get_all_financial_years()
+        }
+        self.fy_handler.disconnect()
+
+        self.trees = {}
+
+        # Create UI
+        self.create_widgets()
+
+        if self.financial_years:
+            self.fy_var.set(next(iter(self.financial_years)))
+            self.load_statements()
+
+    def create_widgets(self):
+        """Create the statements UI"""
+        # Header
+        header_frame = tk.Frame(self, bg=self.colors['background'])
+        header_frame.pack(fill=tk.X, padx=SPACING['xl'], pady=(SPACING['lg'], SPACING['md']))
+
+        title_label = tk.Label(header_frame,
+                               text="Financial Statements",
+                               font=FONTS['h1'],
+                               bg=self.colors['background'],
+                               fg=self.colors['text_primary'])
+        title_label.pack(side=tk.LEFT)
+
+        # Compare-with selection (optional second year)
+        self.compare_var = tk.StringVar(value="None")
+        compare_combo = ttk.Combobox(header_frame,
+                                     textvariable=self.compare_var,
+                                     values=["None"] + list(self.financial_years.keys()),
+                                     state='readonly',
+                                     font=FONTS['body'],
+                                     width=26)
+        compare_combo.pack(side=tk.RIGHT, padx=(SPACING['sm'], 0))
+        compare_combo.bind('<<ComboboxSelected>>', lambda _e: self.load_statements())
+
+        tk.Label(header_frame, text="Compare with:", font=FONTS['body'],
+                 bg=self.colors['background'], fg=self.colors['text_secondary']).pack(side=tk.RIGHT)
+
+        # Financial year selection
+        self.fy_var = tk.StringVar()
+        fy_combo = ttk.Combobox(header_frame,
+                                textvariable=self.fy_var,
+                                values=list(self.financial_years.keys()),
+                                state='readonly',
+                                font=FONTS['body'],
+                                width=26)
+        fy_combo.pack(side=tk.RIGHT, padx=SPACING['sm'])
+        fy_combo.bind('<<ComboboxSelected>>', lambda _e: self.load_statements())
+
+        tk.Label(header_frame, text="Financial Year:", font=FONTS['body'],
+                 bg=self.colors['background'], fg=self.colors['text_secondary']).pack(side=tk.RIGHT)
+
+        # One tab per statement
+        notebook = ttk.Notebook(self)
+        notebook.pack(fill=tk.BOTH, expand=True, padx=SPACING['xl'], pady=SPACING['md'])
+
+        for key, title, _debit_title, _credit_title in self.STATEMENT_TABS:
+            tab = tk.Frame(notebook, bg=self.colors['background'])
+            notebook.add(tab, text=title)
+
+            tree = ttk.Treeview(tab, columns=('fy_0', 'fy_1'), show='tree headings')
+            tree.heading('#0', text="Particulars")
+            tree.column('#0', width=360)
+            scrollbar = ttk.Scrollbar(tab, orient="vertical", command=tree.yview)
+            tree.configure(yscrollcommand=scrollbar.set)
+            tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+            scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+            self.trees[key] = tree
+
+        # Summary footer
+        self.summary_label = tk.Label(self,
+                                      text="",
+                                      font=FONTS['body_bold'],
+                                      bg=self.colors['background'],
+                                      fg=self.colors['text_primary'],
+                                      anchor='e',
+                                      justify=tk.RIGHT)
+        self.summary_label.pack(fill=tk.X, padx=SPACING['xl'], pady=(0, SPACING['lg']))
+
+    def load_statements(self):
+        """Load statements of the selected year (and the comparison year, if any)"""
+        fy_names = [self.fy_var.get()]
+        if self.compare_var.get() in self.financial_years and self.compare_var.get() != fy_names[0]:
+            fy_names.append(self.compare_var.get())
+        fy_ids = [self.financial_years[name] for name in fy_names if name in self.financial_years]
+        if not fy_ids:
+            return
+
+        statements = self.statement_handler.get_statements(fy_ids)
+        if statements is None:
+            messagebox.showerror("Error", "Could not build the financial statements.")
+            return
+
+        for key, _title, debit_title, credit_title in self.STATEMENT_TABS:
+            tree = self.trees[key]
+            tree.delete(*tree.get_children())
+            tree.configure(displaycolumns=[f'fy_{idx}' for idx in range(len(fy_ids))])
+            for idx, name in enumerate(fy_names):
+                tree.heading(f'fy_{idx}', text=name)
+                tree.column(f'fy_{idx}', width=180, anchor='e')
+
+            statement = statements[key]
+            for side, side_title in (('debit', debit_title), ('credit', credit_title)):
+                side_node = tree.insert('', tk.END, text=side_title, open=True,
+                                        values=[f"{total:,.2f}" for total in statement[f'{side}_total']])
+                for line in statement[side]:
+                    tree.insert(side_node, tk.END, text=line['account_group_name'],
+                                values=[f"{amount:,.2f}" for amount in line['amounts']])
+
+        self.summary_label.config(text="\n".join(
+            f"{name}:  Gross Profit {summary['gross_profit']:,.2f}    "
+            f"Net Profit {summary['net_profit']:,.2f}    "
+            f"Assets {summary['total_assets']:,.2f}    Liabilities {summary['total_liabilities']:,.2f}"
+            for name, summary in zip(fy_names, statements['summary'])
+        ))
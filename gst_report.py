@@ -0,0 +1,197 @@
+"""
+GST Report Screen - HSN-wise summary of a month's sales and GSTR-1 JSON export
+"""
+
+import calendar
+import tkinter as tk
+from datetime import date
+from tkinter import ttk, messagebox, filedialog
+from database.company_handler import CompanyHandler
+from database.gst_report_handler import GstReportHandler
+from ui_config import COLORS, FONTS, SPACING
+
+
+class GstReport(tk.Frame):
+    def __init__(self, parent, colors):
+        super().__init__(parent, bg=COLORS['background'])
+        self.colors = colors
+        self.gst_handler = GstReportHandler()
+        company_handler = CompanyHandler()
+
+        # Connect to database
+        if not self.gst_handler.connect() or not company_handler.connect():
+            messagebox.showerror("Database Error",
+                               "Failed to connect to database.")
+            return
+
+        # Company dropdown data: display name -> id
+        self.companies = {
+            f"{c['company_code']} - {c['company_name']}": c['id']
+            for c in company_handler.get_all_companies() if c.get('status') == 'Active'
+        }
+        company_handler.disconnect()
+
+        # Create UI
+        self.create_widgets()
+
+        if self.companies:
+            self.company_var.set(next(iter(self.companies)))
+            self.load_report()
+
+    def create_widgets(self):
+        """Create the report UI"""
+        # Header
+        header_frame = tk.Frame(self, bg=self.colors['background'])
+        header_frame.pack(fill=tk.X, padx=SPACING['xl'], pady=(SPACING['lg'], SPACING['md']))
+
+        title_label = tk.Label(header_frame,
+                               text="GST Returns",
+                               font=FONTS['h1'],
+                               bg=self.colors['background'],
+                               fg=self.colors['text_primary'])
+        title_label.pack(side=tk.LEFT)
+
+        for text, command in (("Export GSTR-1", self.export_gstr1), ("Show", self.load_report)):
+            button = tk.Button(header_frame, text=text)
+            button.config(
+                font=FONTS['button'],
+                bg=self.colors['primary'],
+                fg='white',
+                activebackground=self.colors['primary_hover'],
+                activeforeground='white',
+                cursor='hand2',
+                relief=tk.FLAT,
+                padx=SPACING['lg'],
+                pady=SPACING['md'],
+                command=command
+            )
+            button.pack(side=tk.RIGHT, padx=(SPACING['md'], 0))
+
+        # Return period: month and year
+        today = date.today()
+        self.year_var = tk.StringVar(value=str(today.year))
+        tk.Spinbox(header_frame, from_=2017, to=today.year + 1, textvariable=self.year_var,
+                   font=FONTS['body'], width=6).pack(side=tk.RIGHT, padx=SPACING['md'])
+
+        self.month_var = tk.StringVar(value=calendar.month_name[today.month])
+        ttk.Combobox(header_frame,
+                     textvariable=self.month_var,
+                     values=list(calendar.month_name)[1:],
+                     state='readonly',
+                     font=FONTS['body'],
+                     width=11).pack(side=tk.RIGHT)
+
+        tk.Label(header_frame, text="Period:", font=FONTS['body'],
+                 bg=self.colors['background'], fg=self.colors['text_secondary']).pack(side=tk.RIGHT,
+                                                                                     padx=(SPACING['md'], 0))
+
+        # Company selection
+        self.company_var = tk.StringVar()
+        company_combo = ttk.Combobox(header_frame,
+                                     textvariable=self.company_var,
+                                     values=list(self.companies.keys()),
+                                     state='readonly',
+                                     font=FONTS['body'],
+                                     width=28)
+        company_combo.pack(side=tk.RIGHT, padx=SPACING['md'])
+
+        tk.Label(header_frame, text="Company:", font=FONTS['body'],
+                 bg=self.colors['background'], fg=self.colors['text_secondary']).pack(side=tk.RIGHT)
+
+        # HSN summary grid
+        table_frame = tk.Frame(self, bg=self.colors['border'], relief=tk.SOLID, bd=2)
+        table_frame.pack(fill=tk.BOTH, expand=True, padx=SPACING['xl'], pady=SPACING['md'])
+
+        columns = ('hsn', 'description', 'uqc', 'rate', 'quantity', 'value', 'taxable', 'igst', 'cgst', 'sgst')
+        headings = ("HSN", "Description", "UQC", "GST %", "Quantity", "Total Value", "Taxable",
+                    "IGST", "CGST", "SGST")
+        self.tree = ttk.Treeview(table_frame, columns=columns, show='headings')
+        for column, text in zip(columns, headings):
+            self.tree.heading(column, text=text)
+            self.tree.column(column, width=220 if column == 'description' else 95,
+                             anchor='w' if column in ('hsn', 'description', 'uqc') else 'e')
+
+        scrollbar = ttk.Scrollbar(table_frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        # Totals footer
+        self.totals_label = tk.Label(self,
+                                     text="",
+                                     font=FONTS['body_bold'],
+                                     bg=self.colors['background'],
+                                     fg=self.colors['text_primary'],
+                                     anchor='e')
+        self.totals_label.pack(fill=tk.X, padx=SPACING['xl'], pady=(0, SPACING['lg']))
+
+    def get_period(self):
+        """Selected (company_id, year, month) or None"""
+        company_id = self.companies.get(self.company_var.get())
+        try:
+            year = int(self.year_var.get())
+        except ValueError:
+            messagebox.showerror("Error", "Enter a valid year.")
+            return None
+        month = list(calendar.month_name).index(self.month_var.get())
+        if company_id is None:
+            return None
+        return company_id, year, month
+
+    def load_report(self):
+        """Load the HSN summary of the selected month"""
+        period = self.get_period()
+        if not period:
+            return
+        company_id, year, month = period
+
+        summary = self.gst_handler.get_hsn_summary(
+            company_id, date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1]))
+        self.tree.delete(*self.tree.get_children())
+        if summary is None:
+            self.totals_label.config(text="No financial year covers this month.", fg=self.colors['error'])
+            return
+
+        for row in summary['rows']:
+            self.tree.insert('', tk.END, values=(
+                row['hsn_code'],
+                row['description'] or '',
+                row['uqc'],
+                f"{row['gst_percentage']:g}",
+                f"{row['quantity']:,.3f}",
+                f"{row['total_value']:,.2f}",
+                f"{row['taxable_amount']:,.2f}",
+                f"{row['igst_amount']:,.2f}",
+                f"{row['cgst_amount']:,.2f}",
+                f"{row['sgst_amount']:,.2f}"
+            ))
+
+        totals = summary['totals']
+        self.totals_label.config(
+            text=f"Taxable: {totals['taxable_amount']:,.2f}    IGST: {totals['igst_amount']:,.2f}    "
+                 f"CGST: {totals['cgst_amount']:,.2f}    SGST: {totals['sgst_amount']:,.2f}    "
+                 f"Total: {totals['total_value']:,.2f}",
+            fg=self.colors['text_primary']
+        )
+
+    def export_gstr1(self):
+        """Save the GSTR-1 JSON of the selected month"""
+        period = self.get_period()
+        if not period:
+            return
+        company_id, year, month = period
+
+        path = filedialog.asksaveasfilename(
+            title="Export GSTR-1",
+            defaultextension=".json",
+            initialfile=f"GSTR1_{month:02d}{year}.json",
+            filetypes=[("JSON files", "*.json"), ("All files", "*.*")]
+        )
+        if not path:
+            return
+
+        success, message, _counts = self.gst_handler.export_gstr1(path, company_id, year, month)
+        if success:
+            messagebox.showinfo("GSTR-1", f"{message}\n\nSaved to {path}")
+        else:
+            messagebox.showerror("Error", message)
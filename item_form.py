@@ -10,6 +10,7 @@ from database.uom_handler import UoMHandler
 from database.item_company_handler import ItemCompanyHandler
 from database.account_master_handler import AccountMasterHandler
 from ui_config import COLORS, FONTS, SPACING
+from utils.money import Money
 
 
 class ItemForm(tk.Frame):
@@ -481,12 +482,12 @@ class ItemForm(tk.Frame):
             'item_type_code': item_type_code,
             'uom_code': uom_code,
             'company_name': self.company_var.get(),
-            'purchase_rate': float(self.purchase_rate_var.get() or 0),
-            'mrp': float(self.mrp_var.get() or 0),
+            'purchase_rate': Money.of(self.purchase_rate_var.get()),
+            'mrp': Money.of(self.mrp_var.get()),
             'gst_percentage': float(self.gst_var.get() or 0),
             'hsn_code': self.hsn_code_var.get(),
-            'sale_rate_wh1': float(self.sale_rate_wh1_var.get() or 0),
-            'sale_rate_wh2': float(self.sale_rate_wh2_var.get() or 0),
+            'sale_rate_wh1': Money.of(self.sale_rate_wh1_var.get()),
+            'sale_rate_wh2': Money.of(self.sale_rate_wh2_var.get()),
             'discount_wh1': float(self.discount_wh1_var.get() or 0),
             'discount_wh2': float(self.discount_wh2_var.get() or 0),
             'sales_account_code': sales_account_code,
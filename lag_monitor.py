@@ -0,0 +1,193 @@
+"""
+Lag Monitor - Tk event-loop responsiveness watchdog for the dashboard
+
+A tick is scheduled with after() every TICK_INTERVAL_MS; the difference between the
+time it was due and the time it fires is the event-loop lag, i.e. how long the UI was
+frozen. A watchdog thread checks the main thread while a tick is overdue: once the
+lag passes SLOW_THRESHOLD_MS it samples the main thread's stack and remembers
+
+    action    the Tk callback that was running (button command, menu click, after job)
+    running   the innermost application frame at that moment (handler method, widget
+              loop, ...)
+
+so every slow tick is attributed to the operation that froze the UI. Slow ticks are
+written to a rolling log (logs/ui_lag.log, rotated at MAX_LOG_BYTES) and the footer
+indicator shows the worst lag of the last INDICATOR_WINDOW_SECONDS.
+"""
+
+import os
+import statistics
+import sys
+import threading
+import time
+import tkinter
+from collections import deque
+from datetime import datetime
+
+from ui_config import COLORS
+
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_LOG_PATH = os.path.join(APP_DIR, 'logs', 'ui_lag.log')
+
+TICK_INTERVAL_MS = 250
+
+# Lag above this is logged and attributed
+SLOW_THRESHOLD_MS = 200
+
+# Lag above this turns the indicator red (amber above SLOW_THRESHOLD_MS)
+FROZEN_THRESHOLD_MS = 1000
+
+# Ticks kept for the statistics (one minute at the default interval)
+HISTORY_TICKS = 240
+
+# Slow events kept in memory
+SLOW_EVENTS = 100
+
+INDICATOR_WINDOW_SECONDS = 5
+
+# The log is renamed to ui_lag.log.1 when it grows past this
+MAX_LOG_BYTES = 1024 * 1024
+
+
+def _frame_name(frame):
+    code = frame.f_code
+    return f"{os.path.splitext(os.path.basename(code.co_filename))[0]}.{code.co_name}:{frame.f_lineno}"
+
+
+def _is_app_frame(frame):
+    filename = frame.f_code.co_filename
+    return filename.startswith(APP_DIR) and 'site-packages' not in filename
+
+
+def attribute(frame):
+    """
+    Attribute a main-thread stack to (action, running)
+    action: first application frame called by tkinter's CallWrapper (the innermost callback)
+    running: innermost application frame
+    """
+    stack = []
+    while frame is not None:
+        stack.append(frame)
+        frame = frame.f_back
+    stack.reverse()
+
+    action = None
+    for index, frame in enumerate(stack):
+        code = frame.f_code
+        if code.co_name == '__call__' and code.co_filename == tkinter.__file__:
+            action = next((_frame_name(f) for f in stack[index + 1:] if _is_app_frame(f)), action)
+    running = next((_frame_name(f) for f in reversed(stack) if _is_app_frame(f)), None)
+    return action or running, running
+
+
+class LagMonitor:
+    def __init__(self, root, indicator=None, interval_ms=TICK_INTERVAL_MS, threshold_ms=SLOW_THRESHOLD_MS,
+                 log_path=DEFAULT_LOG_PATH):
+        self.root = root
+        self.indicator = indicator
+        self.interval = interval_ms / 1000
+        self.threshold = threshold_ms / 1000
+        self.log_path = log_path
+        self.main_thread_id = threading.get_ident()
+        self.lags = deque(maxlen=HISTORY_TICKS)
+        self.slow_events = deque(maxlen=SLOW_EVENTS)
+        self.slow_total = 0
+        # Running totals since start (for the metrics summary)
+        self.ticks_total = 0
+        self.lag_seconds_total = 0.0
+        self.due = None
+        self.culprit = None
+        self.after_id = None
+        self.stopped = threading.Event()
+        self.watchdog = None
+
+    def start(self):
+        """Schedule the first tick and start the watchdog thread"""
+        self.stopped.clear()
+        self.due = time.monotonic() + self.interval
+        self.after_id = self.root.after(int(self.interval * 1000), self.tick)
+        self.watchdog = threading.Thread(target=self.watch, daemon=True)
+        self.watchdog.start()
+
+    def stop(self):
+        self.stopped.set()
+        if self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
+
+    def watch(self):
+        """Watchdog thread: sample the main thread once per overdue tick"""
+        while not self.stopped.wait(self.threshold / 4):
+            due = self.due
+            if due is None or self.culprit is not None or time.monotonic() - due < self.threshold:
+                continue
+            frame = sys._current_frames().get(self.main_thread_id)
+            if frame is not None:
+                self.culprit = attribute(frame)
+
+    def tick(self):
+        now = time.monotonic()
+        lag = max(now - self.due, 0.0)
+        culprit, self.culprit = self.culprit, None
+        self.record(lag, culprit)
+        self.due = now + self.interval
+        if not self.stopped.is_set():
+            self.after_id = self.root.after(int(self.interval * 1000), self.tick)
+
+    def record(self, lag, culprit=None):
+        """Add one tick's lag; slow ticks are kept, logged and shown"""
+        self.lags.append((time.monotonic(), lag))
+        self.ticks_total += 1
+        self.lag_seconds_total += lag
+        if lag >= self.threshold:
+            action, running = culprit or (None, None)
+            event = {'at': datetime.now().isoformat(timespec='milliseconds'), 'lag_ms': lag * 1000,
+                     'action': action or 'unknown', 'running': running or 'unknown'}
+            self.slow_events.append(event)
+            self.slow_total += 1
+            self.write_log(event)
+        self.update_indicator()
+
+    def write_log(self, event):
+        line = f"{event['at']} lag={event['lag_ms']:.0f}ms action={event['action']} running={event['running']}\n"
+        try:
+            os.makedirs(os.path.dirname(self.log_path), exist_ok=True)
+            if os.path.exists(self.log_path) and os.path.getsize(self.log_path) > MAX_LOG_BYTES:
+                os.replace(self.log_path, self.log_path + '.1')
+            with open(self.log_path, 'a') as f:
+                f.write(line)
+        except OSError as e:
+            print(f"[LAG] Could not write {self.log_path}: {e}")
+
+    def worst_recent(self, seconds=INDICATOR_WINDOW_SECONDS):
+        since = time.monotonic() - seconds
+        return max((lag for at, lag in self.lags if at >= since), default=0.0)
+
+    def stats(self):
+        """Lag statistics over the kept ticks in seconds: count, p50, p95, max, slow"""
+        lags = sorted(lag for _, lag in self.lags)
+        if not lags:
+            return {'count': 0, 'p50': 0.0, 'p95': 0.0, 'max': 0.0, 'slow': 0}
+        return {
+            'count': len(lags),
+            'p50': statistics.median(lags),
+            'p95': lags[min(len(lags) - 1, int(len(lags) * 0.95))],
+            'max': lags[-1],
+            'slow': sum(1 for lag in lags if lag >= self.threshold),
+        }
+
+    def update_indicator(self):
+        if self.indicator is None:
+            return
+        worst = self.worst_recent()
+        if worst * 1000 >= FROZEN_THRESHOLD_MS:
+            color = COLORS['error']
+        elif worst >= self.threshold:
+            color = COLORS['warning']
+        else:
+            color = COLORS['success']
+        text = f"● UI {worst * 1000:.0f} ms"
+        if self.indicator.cget('text') != text:
+            self.indicator.config(text=text, fg=color)
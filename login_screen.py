@@ -6,6 +6,7 @@ Run this file to start the login application
 import tkinter as tk
 from tkinter import ttk, messagebox
 from database.auth_handler import AuthHandler
+from database.tenant_router import activate_tenant, deactivate_tenants
 from ui_config import COLORS, FONTS, SPACING, LAYOUT
 
 
@@ -232,10 +233,14 @@ class LoginScreen(tk.Tk):
             # Destroy login window
             self.destroy()
 
+            # Work in the company's own database file when it has one
+            activate_tenant(user_data.get('company_id'))
+
             # Open dashboard
             from dashboard import Dashboard
             dashboard = Dashboard(user_data)
             dashboard.mainloop()
+            deactivate_tenants()
 
         except Exception as e:
             messagebox.showerror("Error", f"Could not open dashboard: {e}")
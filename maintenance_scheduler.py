@@ -0,0 +1,97 @@
+"""
+Maintenance Scheduler - Runs database maintenance while the dashboard is idle
+
+Keyboard and mouse events anywhere in the window mark the user as active. They are
+bound on the window's own bindtag, which every widget of the window carries, rather
+than on "all": screens replace their "all" <MouseWheel> binding with bind_all() and
+drop it with unbind_all(), which would silently remove ours. Once the
+window has been idle for IDLE_SECONDS, and the last run is at least
+MIN_INTERVAL_SECONDS old, MaintenanceHandler.run() is started on a worker thread
+with a time budget. The next key press or click sets its stop event, so the run
+ends after the step in progress instead of competing with the user for the database.
+"""
+
+import threading
+import time
+from database.maintenance_handler import DEFAULT_TIME_BUDGET_SECONDS, MaintenanceHandler
+
+
+# Seconds without keyboard or mouse input before maintenance may start
+IDLE_SECONDS = 120
+
+# Seconds between maintenance runs
+MIN_INTERVAL_SECONDS = 6 * 60 * 60
+
+# Milliseconds between idle checks
+CHECK_INTERVAL_MS = 15000
+
+ACTIVITY_EVENTS = ('<KeyPress>', '<ButtonPress>', '<MouseWheel>')
+
+
+class MaintenanceScheduler:
+    def __init__(self, root, handler=None, idle_seconds=IDLE_SECONDS,
+                 min_interval=MIN_INTERVAL_SECONDS, time_budget=DEFAULT_TIME_BUDGET_SECONDS):
+        self.root = root
+        self.handler = handler or MaintenanceHandler()
+        self.idle_seconds = idle_seconds
+        self.min_interval = min_interval
+        self.time_budget = time_budget
+        self.last_activity = time.monotonic()
+        self.stop_event = threading.Event()
+        self.worker = None
+        self.after_id = None
+        self.last_run = None
+
+    def start(self):
+        """Watch for activity and begin the idle checks"""
+        for sequence in ACTIVITY_EVENTS:
+            self.root.bind(sequence, self.on_activity, add='+')
+        try:
+            self.last_run = self.handler.last_run_at()
+        except Exception as e:
+            print(f"[MAINTENANCE] Could not read the last run: {e}")
+        self.after_id = self.root.after(CHECK_INTERVAL_MS, self.check_idle)
+
+    def stop(self):
+        """Stop the idle checks and ask a running maintenance to finish"""
+        self.stop_event.set()
+        if self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
+
+    def on_activity(self, event=None):
+        self.last_activity = time.monotonic()
+        self.stop_event.set()
+
+    def is_running(self):
+        return self.worker is not None and self.worker.is_alive()
+
+    def is_due(self, now=None):
+        """True when the user is idle, no run is active and the last run is old enough"""
+        if self.is_running():
+            return False
+        if time.monotonic() - self.last_activity < self.idle_seconds:
+            return False
+        now = now if now is not None else time.time()
+        return self.last_run is None or now - self.last_run >= self.min_interval
+
+    def check_idle(self):
+        self.after_id = None
+        if self.is_due():
+            self.run_now()
+        if self.root.winfo_exists():
+            self.after_id = self.root.after(CHECK_INTERVAL_MS, self.check_idle)
+
+    def run_now(self):
+        """Start a maintenance run on a worker thread"""
+        self.stop_event.clear()
+        self.last_run = time.time()
+
+        def target():
+            try:
+                self.handler.run(self.time_budget, self.stop_event)
+            except Exception as e:
+                print(f"[MAINTENANCE] Run failed: {e}")
+
+        self.worker = threading.Thread(target=target, daemon=True)
+        self.worker.start()
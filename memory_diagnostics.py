@@ -0,0 +1,168 @@
+"""
+Memory Diagnostics - Per-screen memory accounting and leak detection for the dashboard
+
+When enabled, every navigation (submenu click) is measured: a tracemalloc snapshot
+is taken before the old screen is cleared and another once the new screen is built,
+and the following counters are read after a full garbage collection:
+
+    traced_kb     Python memory allocated by the application (tracemalloc)
+    widgets       Tk widgets alive under the dashboard window
+    tcl_commands  Tcl commands registered for Python callbacks; bind_all() callbacks
+                  are never released, so this grows when a screen re-binds on every build
+    connections   open sqlite3 connections (handlers that were never disconnected)
+    objects       objects tracked by the garbage collector
+    retained      screens that were destroyed but are still referenced from Python
+
+Each navigation is logged with the largest allocation differences. A screen is
+flagged when a counter grew on each of its last GROWTH_CYCLES visits, which means
+repeated open/close cycles keep leaking.
+
+Enable with APP_MEMORY_DIAGNOSTICS=1 or from Utilities > Profiling.
+"""
+
+import gc
+import os
+import sqlite3
+import tracemalloc
+import weakref
+
+
+DIAGNOSTICS_ENV = 'APP_MEMORY_DIAGNOSTICS'
+
+# Visits of the same screen that must each show growth before it is flagged
+GROWTH_CYCLES = 3
+
+# Frames kept by tracemalloc per allocation
+TRACE_FRAMES = 5
+
+# Allocation differences logged per navigation
+TOP_ALLOCATIONS = 5
+
+# Growth between two visits treated as noise, per counter (default 0)
+GROWTH_NOISE = {'traced_kb': 64, 'objects': 500}
+
+# Allocations of the diagnostics themselves are left out of the differences
+SNAPSHOT_FILTERS = (tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__))
+
+COUNTERS = ('traced_kb', 'widgets', 'tcl_commands', 'connections', 'objects', 'retained')
+
+
+def count_widgets(widget):
+    """Number of widgets below widget"""
+    return sum(1 + count_widgets(child) for child in widget.winfo_children())
+
+
+def open_connections():
+    """Number of sqlite3 connections alive and not closed"""
+    count = 0
+    for obj in gc.get_objects():
+        if isinstance(obj, sqlite3.Connection):
+            try:
+                obj.total_changes
+                count += 1
+            except sqlite3.ProgrammingError:
+                pass
+    return count
+
+
+def find_growth(samples, cycles=GROWTH_CYCLES):
+    """
+    Counters that grew on each of the last `cycles` samples of a screen
+    samples: list of {counter: value} in visit order
+    Returns {counter: (first value, last value)}
+    """
+    if len(samples) < cycles + 1:
+        return {}
+    recent = samples[-(cycles + 1):]
+    growth = {}
+    for counter in COUNTERS:
+        values = [sample[counter] for sample in recent]
+        noise = GROWTH_NOISE.get(counter, 0)
+        if all(later - earlier > noise for earlier, later in zip(values, values[1:])):
+            growth[counter] = (values[0], values[-1])
+    return growth
+
+
+class MemoryDiagnostics:
+    def __init__(self, root, content_frame=None):
+        self.root = root
+        self.content_frame = content_frame
+        self.enabled = False
+        self.history = {}
+        self.flagged = {}
+        self.before = None
+        self.destroyed = []
+
+    def enable(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(TRACE_FRAMES)
+        self.enabled = True
+        print("[MEMORY] Memory diagnostics enabled")
+
+    def disable(self):
+        self.enabled = False
+        self.before = None
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        print("[MEMORY] Memory diagnostics disabled")
+
+    def enable_from_environment(self):
+        if os.environ.get(DIAGNOSTICS_ENV, '').strip().lower() in ('1', 'true', 'on', 'yes'):
+            self.enable()
+
+    def counters(self):
+        gc.collect()
+        self.destroyed = [ref for ref in self.destroyed if ref() is not None]
+        return {
+            'traced_kb': tracemalloc.get_traced_memory()[0] / 1024 if tracemalloc.is_tracing() else 0,
+            'widgets': count_widgets(self.root),
+            'tcl_commands': len(self.root.tk.call('info', 'commands')),
+            'connections': open_connections(),
+            'objects': len(gc.get_objects()),
+            'retained': len(self.destroyed),
+        }
+
+    def before_navigation(self):
+        """Call before the current screen is cleared"""
+        if not self.enabled:
+            return
+        if self.content_frame is not None:
+            self.destroyed.extend(weakref.ref(child) for child in self.content_frame.winfo_children())
+        gc.collect()
+        self.before = tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
+
+    def after_navigation(self, screen):
+        """Call once the new screen is built, returns this visit's counters (None when disabled)"""
+        if not self.enabled or self.before is None:
+            return None
+        self.root.update_idletasks()
+        sample = self.counters()
+        after = tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
+        differences = after.compare_to(self.before, 'lineno')[:TOP_ALLOCATIONS]
+        self.before = None
+
+        samples = self.history.setdefault(screen, [])
+        samples.append(sample)
+        print(f"[MEMORY] {screen}: " + ', '.join(f"{name}={sample[name]:,.0f}" for name in COUNTERS))
+        for difference in differences:
+            frame = difference.traceback[0]
+            print(f"[MEMORY]   {difference.size_diff / 1024:+10.1f} KB  {difference.count_diff:+7d} blocks  "
+                  f"{os.path.basename(frame.filename)}:{frame.lineno}")
+
+        growth = find_growth(samples)
+        if growth:
+            self.flagged[screen] = growth
+            print(f"[MEMORY] {screen} keeps growing over {GROWTH_CYCLES} visits: " +
+                  ', '.join(f"{name} {first:,.0f} -> {last:,.0f}" for name, (first, last) in growth.items()))
+        return sample
+
+    def report(self):
+        """Text summary of every screen visited: last counters and growth flags"""
+        lines = []
+        for screen, samples in self.history.items():
+            last = samples[-1]
+            lines.append(f"{screen} ({len(samples)} visits): " +
+                         ', '.join(f"{name}={last[name]:,.0f}" for name in COUNTERS))
+            if screen in self.flagged:
+                lines.append("    growing: " + ', '.join(self.flagged[screen]))
+        return '\n'.join(lines) or "No screens visited yet."
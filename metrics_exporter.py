@@ -0,0 +1,222 @@
+"""
+Metrics Exporter - Prometheus text file of the application's performance counters
+
+Every EXPORT_INTERVAL_MS the dashboard writes a metrics file in the Prometheus text
+format for node_exporter's textfile collector. The file is written to a temporary
+name and renamed, so the collector never reads half a file.
+
+    handler calls and latency   histogram per handler class and method
+                                (database/instrumentation.py)
+    SQLITE_BUSY                 statements that failed with database is busy / locked
+    MySQL pool                  checkouts, waits, exhausted retries, health checks,
+                                reconnects, connections in use (database/mysql_pool.py)
+    caches                      trial balance (hit / incremental / full) and financial
+                                year index (hit / miss) requests and hit ratio
+    database files              size of the main file, its WAL and the open
+                                financial-year files
+    UI event-loop lag           p50 / p95 / max of the last minute and slow ticks
+                                (lag_monitor.py)
+
+Enable it by pointing APP_METRICS_FILE at a file in the collector's directory, e.g.
+APP_METRICS_FILE=/var/lib/node_exporter/textfile_collector/business_app.prom
+"""
+
+import os
+import sys
+import time
+
+from database import fy_index, instrumentation
+from database import trial_balance_handler
+
+
+METRICS_FILE_ENV = 'APP_METRICS_FILE'
+
+EXPORT_INTERVAL_MS = 15000
+
+METRIC_PREFIX = 'business_app_'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _number(value):
+    """Exact sample value: ints as ints, floats with full precision"""
+    if isinstance(value, bool):
+        return str(int(value))
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value))
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + '}'
+
+
+class MetricsText:
+    """
+    Builds a Prometheus text exposition
+    Samples are grouped per metric family under one HELP/TYPE header, whatever order
+    they are added in, so every family is one contiguous block.
+    """
+
+    def __init__(self):
+        # family name -> list of lines, in the order families were first seen
+        self.families = {}
+
+    def family(self, name, kind, help_text):
+        name = METRIC_PREFIX + name
+        if name not in self.families:
+            self.families[name] = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+        return name
+
+    def sample(self, name, value, labels=None, kind='gauge', help_text=''):
+        name = self.family(name, kind, help_text)
+        self.families[name].append(f"{name}{_labels(labels)} {_number(value)}")
+
+    def histogram(self, name, histogram, labels, help_text):
+        name = self.family(name, 'histogram', help_text)
+        lines = self.families[name]
+        for bound, count in histogram.cumulative():
+            lines.append(f"{name}_bucket{_labels(dict(labels, le=bound))} {count}")
+        lines.append(f"{name}_sum{_labels(labels)} {_number(histogram.sum)}")
+        lines.append(f"{name}_count{_labels(labels)} {histogram.count}")
+
+    def summary(self, name, quantiles, total, count, help_text):
+        """quantiles: {quantile: value}; total and count are the running sum and count"""
+        name = self.family(name, 'summary', help_text)
+        lines = self.families[name]
+        for quantile, value in quantiles.items():
+            lines.append(f"{name}{_labels({'quantile': quantile})} {_number(value)}")
+        lines.append(f"{name}_sum {_number(total)}")
+        lines.append(f"{name}_count {count}")
+
+    def text(self):
+        return '\n'.join(line for lines in self.families.values() for line in lines) + '\n'
+
+
+def collect_handlers(metrics):
+    for (handler, method), histogram in sorted(instrumentation.HANDLER_LATENCY.items()):
+        if histogram.count:
+            metrics.histogram('handler_call_seconds', histogram, {'handler': handler, 'method': method},
+                              "Handler method calls and their latency")
+    metrics.sample('sqlite_busy_errors_total', instrumentation.SQLITE_BUSY['errors'], kind='counter',
+                   help_text="SQLite statements that failed because the database was busy or locked")
+
+
+def collect_pools(metrics):
+    # Only when a MySQL handler has loaded the pool module (mysql.connector is optional)
+    mysql_pool = sys.modules.get('database.mysql_pool')
+    if mysql_pool is None:
+        return
+    for pool in list(mysql_pool._pools.values()):
+        labels = {'pool': pool.pool.pool_name}
+        stats = dict(pool.stats)
+        metrics.sample('mysql_pool_size', pool.pool.pool_size, labels,
+                       help_text="Connections in the MySQL pool")
+        metrics.sample('mysql_pool_in_use', stats['in_use'], labels,
+                       help_text="MySQL connections checked out")
+        for key, help_text in (('checkouts', "MySQL connections checked out since start"),
+                               ('checkout_wait_seconds', "Seconds spent waiting for a MySQL connection"),
+                               ('exhausted', "Checkout attempts that found the pool empty"),
+                               ('health_checks', "Idle MySQL connections pinged on checkout"),
+                               ('reconnects', "Idle MySQL connections replaced on checkout")):
+            metrics.sample(f"mysql_pool_{key}_total", stats[key], labels, 'counter', help_text)
+
+
+def collect_caches(metrics):
+    caches = {
+        'trial_balance': (trial_balance_handler.CACHE_STATS, ('hits',)),
+        'fy_index': (fy_index.CACHE_STATS, ('hits',)),
+    }
+    snapshots = {cache: (dict(stats), hit_keys) for cache, (stats, hit_keys) in caches.items()}
+    for cache, (stats, _) in snapshots.items():
+        for result, count in stats.items():
+            metrics.sample('cache_requests_total', count, {'cache': cache, 'result': result}, 'counter',
+                           "Cache lookups by result")
+    for cache, (stats, hit_keys) in snapshots.items():
+        total = sum(stats.values())
+        metrics.sample('cache_hit_ratio', sum(stats[key] for key in hit_keys) / total if total else 0.0,
+                       {'cache': cache}, help_text="Share of cache lookups served without recomputing")
+
+
+def collect_files(metrics, db_files):
+    for path in db_files:
+        for kind, file_path in (('db', path), ('wal', path + '-wal')):
+            if os.path.exists(file_path):
+                metrics.sample('database_file_bytes', os.path.getsize(file_path),
+                               {'file': os.path.basename(path), 'kind': kind},
+                               help_text="Size of the SQLite database files")
+
+
+def collect_lag(metrics, lag_monitor):
+    stats = lag_monitor.stats()
+    metrics.summary('ui_event_loop_lag_seconds',
+                    {quantile: stats[key] for quantile, key in (('0.5', 'p50'), ('0.95', 'p95'), ('1', 'max'))},
+                    lag_monitor.lag_seconds_total, lag_monitor.ticks_total,
+                    "Tk event-loop lag (quantiles over the last minute)")
+    metrics.sample('ui_slow_ticks_total', lag_monitor.slow_total, kind='counter',
+                   help_text="Event-loop ticks later than the slow threshold")
+
+
+def format_metrics(db_files=(), lag_monitor=None):
+    """The Prometheus text for the current counters"""
+    metrics = MetricsText()
+    collect_handlers(metrics)
+    collect_pools(metrics)
+    collect_caches(metrics)
+    collect_files(metrics, db_files)
+    if lag_monitor is not None:
+        collect_lag(metrics, lag_monitor)
+    metrics.sample('metrics_export_timestamp_seconds', time.time(),
+                   help_text="Unix time the metrics file was written")
+    return metrics.text()
+
+
+def write_metrics(path, text):
+    """Replace the metrics file atomically"""
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'w') as f:
+        f.write(text)
+    os.replace(temp_path, path)
+
+
+class MetricsExporter:
+    def __init__(self, root, path, lag_monitor=None, db_path=None, interval_ms=EXPORT_INTERVAL_MS):
+        self.root = root
+        self.path = path
+        self.lag_monitor = lag_monitor
+        self.db_path = db_path
+        self.interval_ms = interval_ms
+        self.after_id = None
+
+    def database_files(self):
+        from database.maintenance_handler import MaintenanceHandler
+        handler = MaintenanceHandler(self.db_path)
+        try:
+            return handler.database_files()
+        except Exception as e:
+            print(f"[METRICS] Could not list the database files: {e}")
+            return [handler.db_path]
+
+    def start(self):
+        """Instrument the database layer and begin the periodic exports"""
+        instrumentation.install()
+        print(f"[METRICS] Writing metrics to {self.path} every {self.interval_ms // 1000} s")
+        self.after_id = self.root.after(self.interval_ms, self.export)
+
+    def stop(self):
+        if self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
+        self.export(reschedule=False)
+
+    def export(self, reschedule=True):
+        try:
+            write_metrics(self.path, format_metrics(self.database_files(), self.lag_monitor))
+        except OSError as e:
+            print(f"[METRICS] Could not write {self.path}: {e}")
+        if reschedule:
+            self.after_id = self.root.after(self.interval_ms, self.export)
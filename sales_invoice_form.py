@@ -0,0 +1,287 @@
+"""
+Sales Invoice Screen - Create Sales Invoices over business partners and items
+"""
+
+import tkinter as tk
+from tkinter import ttk, messagebox
+from tkcalendar import DateEntry
+from database.account_master_handler import AccountMasterHandler
+from database.business_partner_handler import BusinessPartnerHandler
+from database.company_handler import CompanyHandler
+from database.item_handler import ItemHandler
+from database.sales_invoice_handler import SalesInvoiceHandler, PRICE_LISTS
+from ui_config import COLORS, FONTS, SPACING
+from utils.money import Money
+
+
+class SalesInvoiceForm(tk.Frame):
+    LINE_COLUMNS = (
+        ('item_code', "Item Code", 100, 'w'),
+        ('item_name', "Item", 220, 'w'),
+        ('hsn_code', "HSN", 80, 'w'),
+        ('quantity', "Qty", 70, 'e'),
+        ('rate', "Rate", 90, 'e'),
+        ('discount_percentage', "Disc %", 70, 'e'),
+        ('gst_percentage', "GST %", 70, 'e'),
+        ('taxable_amount', "Taxable", 110, 'e'),
+        ('cgst_amount', "CGST", 90, 'e'),
+        ('sgst_amount', "SGST", 90, 'e'),
+        ('igst_amount', "IGST", 90, 'e'),
+        ('line_total', "Total", 110, 'e'),
+    )
+
+    def __init__(self, parent, colors):
+        super().__init__(parent, bg=COLORS['background'])
+        self.colors = colors
+        self.invoice_handler = SalesInvoiceHandler()
+
+        # Connect to database
+        if not self.invoice_handler.connect():
+            messagebox.showerror("Database Error",
+                               "Failed to connect to database.")
+            return
+
+        self.load_master_data()
+
+        # Lines entered so far: item_id, quantity, rate override
+        self.lines = []
+
+        # Create UI
+        self.create_widgets()
+
+    def load_master_data(self):
+        """Load dropdown data: display text -> id"""
+        company_handler = CompanyHandler()
+        partner_handler = BusinessPartnerHandler()
+        item_handler = ItemHandler()
+        account_handler = AccountMasterHandler()
+
+        company_handler.connect()
+        self.companies = {
+            f"{c['company_code']} - {c['company_name']}": c['id']
+            for c in company_handler.get_all_companies() if c.get('status') == 'Active'
+        }
+        company_handler.disconnect()
+
+        partner_handler.connect()
+        self.partners = {
+            f"{p['bp_code']} - {p['bp_name']}": p['id']
+            for p in partner_handler.get_active_business_partners()
+        }
+        partner_handler.disconnect()
+
+        item_handler.connect()
+        self.items = {
+            f"{i['item_code']} - {i['item_name']}": i
+            for i in item_handler.get_active_items()
+        }
+        item_handler.disconnect()
+
+        account_handler.connect()
+        self.accounts = {
+            f"{a['account_code']} - {a['account_name']}": a['id']
+            for a in account_handler.get_active_accounts()
+        }
+        account_handler.disconnect()
+
+    def create_widgets(self):
+        """Create the invoice UI"""
+        # Header
+        header_frame = tk.Frame(self, bg=self.colors['background'])
+        header_frame.pack(fill=tk.X, padx=SPACING['xl'], pady=(SPACING['lg'], SPACING['md']))
+
+        title_label = tk.Label(header_frame,
+                               text="Sales Invoice",
+                               font=FONTS['h1'],
+                               bg=self.colors['background'],
+                               fg=self.colors['text_primary'])
+        title_label.pack(side=tk.LEFT)
+
+        save_btn = tk.Button(header_frame, text="Save Invoice")
+        save_btn.config(
+            font=FONTS['button'],
+            bg=self.colors['primary'],
+            fg='white',
+            activebackground=self.colors['primary_hover'],
+            activeforeground='white',
+            cursor='hand2',
+            relief=tk.FLAT,
+            padx=SPACING['lg'],
+            pady=SPACING['md'],
+            command=self.save_invoice
+        )
+        save_btn.pack(side=tk.RIGHT)
+
+        # Invoice header fields
+        fields_frame = tk.Frame(self, bg=self.colors['background'])
+        fields_frame.pack(fill=tk.X, padx=SPACING['xl'], pady=SPACING['sm'])
+
+        self.company_var = self.create_dropdown(fields_frame, "Company", self.companies, 0, 0)
+        self.partner_var = self.create_dropdown(fields_frame, "Customer", self.partners, 0, 1)
+        self.price_list_var = self.create_dropdown(fields_frame, "Price List", PRICE_LISTS, 0, 2)
+        self.price_list_var.set(next(iter(PRICE_LISTS)))
+        self.sales_account_var = self.create_dropdown(fields_frame, "Default Sales Account", self.accounts, 2, 0)
+        self.tax_account_var = self.create_dropdown(fields_frame, "Output Tax Account", self.accounts, 2, 1)
+
+        tk.Label(fields_frame, text="Invoice Date", font=FONTS['body_bold'],
+                 bg=self.colors['background'], fg=self.colors['text_primary']).grid(
+            row=2, column=2, sticky='w', padx=(0, SPACING['lg']))
+        self.date_entry = DateEntry(fields_frame, font=FONTS['body'], date_pattern='yyyy-mm-dd',
+                                    showweeknumbers=False, width=14)
+        self.date_entry.grid(row=3, column=2, sticky='w', padx=(0, SPACING['lg']), pady=(0, SPACING['md']))
+
+        tk.Label(fields_frame, text="Narration", font=FONTS['body_bold'],
+                 bg=self.colors['background'], fg=self.colors['text_primary']).grid(
+            row=4, column=0, sticky='w')
+        self.narration_var = tk.StringVar()
+        tk.Entry(fields_frame, textvariable=self.narration_var, font=FONTS['body']).grid(
+            row=5, column=0, columnspan=3, sticky='ew', pady=(0, SPACING['md']))
+
+        # Line entry
+        line_frame = tk.Frame(self, bg=self.colors['background'])
+        line_frame.pack(fill=tk.X, padx=SPACING['xl'], pady=SPACING['sm'])
+
+        self.item_var = self.create_dropdown(line_frame, "Item", self.items, 0, 0, width=36)
+        self.quantity_var = self.create_entry(line_frame, "Quantity", 0, 1)
+        self.rate_var = self.create_entry(line_frame, "Rate (blank = price list)", 0, 2)
+
+        add_btn = tk.Button(line_frame, text="Add Line", command=self.add_line,
+                            font=FONTS['button'], relief=tk.FLAT, cursor='hand2',
+                            bg=self.colors['primary'], fg='white',
+                            activebackground=self.colors['primary_hover'], activeforeground='white')
+        add_btn.grid(row=1, column=3, sticky='w', padx=(0, SPACING['sm']), pady=(0, SPACING['md']))
+
+        remove_btn = tk.Button(line_frame, text="Remove Line", command=self.remove_line,
+                               font=FONTS['button'], relief=tk.FLAT, cursor='hand2')
+        remove_btn.grid(row=1, column=4, sticky='w', pady=(0, SPACING['md']))
+
+        # Lines grid
+        table_frame = tk.Frame(self, bg=self.colors['border'], relief=tk.SOLID, bd=2)
+        table_frame.pack(fill=tk.BOTH, expand=True, padx=SPACING['xl'], pady=SPACING['md'])
+
+        self.tree = ttk.Treeview(table_frame, columns=[c[0] for c in self.LINE_COLUMNS], show='headings')
+        for column, text, width, anchor in self.LINE_COLUMNS:
+            self.tree.heading(column, text=text)
+            self.tree.column(column, width=width, anchor=anchor)
+
+        scrollbar = ttk.Scrollbar(table_frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        # Totals footer
+        self.totals_label = tk.Label(self,
+                                     text="",
+                                     font=FONTS['body_bold'],
+                                     bg=self.colors['background'],
+                                     fg=self.colors['text_primary'],
+                                     anchor='e')
+        self.totals_label.pack(fill=tk.X, padx=SPACING['xl'], pady=(0, SPACING['lg']))
+
+    def create_dropdown(self, parent, label_text, options, row, column, width=28):
+        """Create a labelled read-only combobox, return its variable"""
+        tk.Label(parent, text=label_text, font=FONTS['body_bold'],
+                 bg=self.colors['background'], fg=self.colors['text_primary']).grid(
+            row=row, column=column, sticky='w', padx=(0, SPACING['lg']))
+        var = tk.StringVar()
+        ttk.Combobox(parent, textvariable=var, values=list(options.keys()), state='readonly',
+                     font=FONTS['body'], width=width).grid(
+            row=row + 1, column=column, sticky='w', padx=(0, SPACING['lg']), pady=(0, SPACING['md']))
+        return var
+
+    def create_entry(self, parent, label_text, row, column):
+        """Create a labelled entry, return its variable"""
+        tk.Label(parent, text=label_text, font=FONTS['body_bold'],
+                 bg=self.colors['background'], fg=self.colors['text_primary']).grid(
+            row=row, column=column, sticky='w', padx=(0, SPACING['lg']))
+        var = tk.StringVar()
+        tk.Entry(parent, textvariable=var, font=FONTS['body'], width=14).grid(
+            row=row + 1, column=column, sticky='w', padx=(0, SPACING['lg']), pady=(0, SPACING['md']))
+        return var
+
+    def add_line(self):
+        """Add the selected item to the invoice"""
+        item = self.items.get(self.item_var.get())
+        if not item:
+            messagebox.showwarning("Validation", "Please select an item.")
+            return
+        try:
+            quantity = float(self.quantity_var.get())
+            rate = float(self.rate_var.get()) if self.rate_var.get().strip() else None
+        except ValueError:
+            messagebox.showwarning("Validation", "Quantity and rate must be numbers.")
+            return
+
+        self.lines.append({'item_id': item['id'], 'quantity': quantity, 'rate': rate})
+        if not self.refresh_lines():
+            self.lines.pop()
+            self.refresh_lines()
+            return
+
+        self.item_var.set('')
+        self.quantity_var.set('')
+        self.rate_var.set('')
+
+    def remove_line(self):
+        """Remove the selected line"""
+        selection = self.tree.selection()
+        if not selection:
+            return
+        del self.lines[self.tree.index(selection[0])]
+        self.refresh_lines()
+
+    def refresh_lines(self):
+        """Price the lines from the item master and redraw the grid; False if pricing failed"""
+        self.tree.delete(*self.tree.get_children())
+        if not self.lines:
+            self.totals_label.config(text="")
+            return True
+
+        company_id = self.companies.get(self.company_var.get())
+        partner_id = self.partners.get(self.partner_var.get())
+        inter_state = bool(company_id and partner_id and
+                           self.invoice_handler.is_inter_state(company_id, partner_id))
+
+        success, message, priced_lines = self.invoice_handler.price_lines(
+            self.lines, self.price_list_var.get(), self.accounts.get(self.sales_account_var.get()),
+            inter_state)
+        if not success:
+            messagebox.showwarning("Validation", message)
+            return False
+
+        for line in priced_lines:
+            self.tree.insert('', tk.END, values=[
+                f"{line[column]:,.2f}" if isinstance(line[column], (float, Money)) else (line[column] or '')
+                for column, _text, _width, _anchor in self.LINE_COLUMNS
+            ])
+
+        taxable = sum(line['taxable_amount'] for line in priced_lines)
+        tax = sum(line['tax_amount'] for line in priced_lines)
+        self.totals_label.config(
+            text=f"Taxable: {taxable:,.2f}    Tax: {tax:,.2f}    Invoice Total: {taxable + tax:,.2f}")
+        return True
+
+    def save_invoice(self):
+        """Save the invoice and post its voucher"""
+        if not self.lines:
+            messagebox.showwarning("Validation", "Please add at least one line.")
+            return
+
+        success, message, _invoice_id = self.invoice_handler.create_invoice({
+            'company_id': self.companies.get(self.company_var.get()),
+            'partner_id': self.partners.get(self.partner_var.get()),
+            'invoice_date': self.date_entry.get_date().isoformat(),
+            'price_list': self.price_list_var.get(),
+            'sales_account_id': self.accounts.get(self.sales_account_var.get()),
+            'tax_account_id': self.accounts.get(self.tax_account_var.get()),
+            'narration': self.narration_var.get().strip()
+        }, self.lines)
+
+        if not success:
+            messagebox.showerror("Error", message)
+            return
+
+        messagebox.showinfo("Success", message)
+        self.lines = []
+        self.narration_var.set('')
+        self.refresh_lines()
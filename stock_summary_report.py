@@ -0,0 +1,158 @@
+"""
+Stock Summary Report Screen - Quantity and value on hand of every stocked item
+"""
+
+import tkinter as tk
+from datetime import date
+from tkinter import ttk, messagebox
+from tkcalendar import DateEntry
+from database.stock_handler import StockHandler
+from ui_config import COLORS, FONTS, SPACING
+
+
+# Valuation dropdown: display name -> value column of the stock report
+VALUATIONS = {
+    'Weighted Average': 'average_value',
+    'FIFO': 'fifo_value'
+}
+
+
+class StockSummaryReport(tk.Frame):
+    def __init__(self, parent, colors):
+        super().__init__(parent, bg=COLORS['background'])
+        self.colors = colors
+        self.stock_handler = StockHandler()
+
+        # Connect to database
+        if not self.stock_handler.connect():
+            messagebox.showerror("Database Error",
+                               "Failed to connect to database.")
+            return
+
+        # Create UI
+        self.create_widgets()
+        self.load_report()
+
+    def create_widgets(self):
+        """Create the report UI"""
+        # Header
+        header_frame = tk.Frame(self, bg=self.colors['background'])
+        header_frame.pack(fill=tk.X, padx=SPACING['xl'], pady=(SPACING['lg'], SPACING['md']))
+
+        title_label = tk.Label(header_frame,
+                               text="Stock Summary",
+                               font=FONTS['h1'],
+                               bg=self.colors['background'],
+                               fg=self.colors['text_primary'])
+        title_label.pack(side=tk.LEFT)
+
+        for text, command in (("Revalue", self.revalue_stock), ("Show", self.load_report)):
+            button = tk.Button(header_frame, text=text)
+            button.config(
+                font=FONTS['button'],
+                bg=self.colors['primary'],
+                fg='white',
+                activebackground=self.colors['primary_hover'],
+                activeforeground='white',
+                cursor='hand2',
+                relief=tk.FLAT,
+                padx=SPACING['lg'],
+                pady=SPACING['md'],
+                command=command
+            )
+            button.pack(side=tk.RIGHT, padx=(SPACING['md'], 0))
+
+        # Valuation method
+        self.valuation_var = tk.StringVar(value=next(iter(VALUATIONS)))
+        valuation_combo = ttk.Combobox(header_frame,
+                                       textvariable=self.valuation_var,
+                                       values=list(VALUATIONS.keys()),
+                                       state='readonly',
+                                       font=FONTS['body'],
+                                       width=18)
+        valuation_combo.pack(side=tk.RIGHT, padx=SPACING['md'])
+        valuation_combo.bind('<<ComboboxSelected>>', lambda _e: self.load_report())
+
+        tk.Label(header_frame, text="Valuation:", font=FONTS['body'],
+                 bg=self.colors['background'], fg=self.colors['text_secondary']).pack(side=tk.RIGHT)
+
+        # As-of date
+        self.as_of_entry = DateEntry(header_frame, font=FONTS['body'], date_pattern='yyyy-mm-dd',
+                                     showweeknumbers=False, width=12)
+        self.as_of_entry.pack(side=tk.RIGHT, padx=SPACING['md'])
+        tk.Label(header_frame, text="As on:", font=FONTS['body'],
+                 bg=self.colors['background'], fg=self.colors['text_secondary']).pack(side=tk.RIGHT)
+
+        # Stock grid
+        table_frame = tk.Frame(self, bg=self.colors['border'], relief=tk.SOLID, bd=2)
+        table_frame.pack(fill=tk.BOTH, expand=True, padx=SPACING['xl'], pady=SPACING['md'])
+
+        columns = ('code', 'name', 'uom', 'quantity', 'rate', 'value')
+        self.tree = ttk.Treeview(table_frame, columns=columns, show='headings')
+        for column, text, width in zip(columns,
+                                       ("Code", "Item", "UoM", "Quantity", "Rate", "Value"),
+                                       (110, 300, 70, 110, 110, 130)):
+            self.tree.heading(column, text=text)
+            self.tree.column(column, width=width,
+                             anchor='e' if column in ('quantity', 'rate', 'value') else 'w')
+
+        scrollbar = ttk.Scrollbar(table_frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        # Totals footer
+        self.totals_label = tk.Label(self,
+                                     text="",
+                                     font=FONTS['body_bold'],
+                                     bg=self.colors['background'],
+                                     fg=self.colors['text_primary'],
+                                     anchor='e')
+        self.totals_label.pack(fill=tk.X, padx=SPACING['xl'], pady=(0, SPACING['lg']))
+
+    def load_report(self):
+        """Load stock on hand as on the selected date"""
+        as_of = self.as_of_entry.get_date()
+        # Today or later reads the running balances instead of the movements
+        report = self.stock_handler.get_stock_on_hand(as_of if as_of < date.today() else None)
+        if report is None:
+            messagebox.showerror("Error", "Could not build the stock summary.")
+            return
+
+        value_column = VALUATIONS[self.valuation_var.get()]
+        self.tree.delete(*self.tree.get_children())
+        for item in report['items']:
+            value = item[value_column]
+            rate = float(value) / item['quantity'] if item['quantity'] else 0
+            self.tree.insert('', tk.END, values=(
+                item['item_code'],
+                item['item_name'],
+                item['uom_code'] or '',
+                f"{item['quantity']:,.3f}",
+                f"{rate:,.2f}",
+                f"{value:,.2f}"
+            ))
+
+        pending = self.stock_handler.get_revaluation_start()
+        status = f"    Revaluation pending from {pending}" if pending else ""
+        self.totals_label.config(
+            text=f"Items: {len(report['items'])}    "
+                 f"Stock Value: {report['totals'][value_column]:,.2f}{status}",
+            fg=self.colors['error'] if pending else self.colors['text_primary']
+        )
+
+    def revalue_stock(self):
+        """Re-cost movements of items with backdated entries"""
+        date_from = self.stock_handler.get_revaluation_start()
+        if not date_from:
+            messagebox.showinfo("Revalue", "Stock valuation is up to date.")
+            return
+
+        success, message, stats = self.stock_handler.revalue(date_from)
+        if not success:
+            messagebox.showerror("Error", message)
+        elif stats['short_items']:
+            messagebox.showwarning("Revalue", f"{message}.\nCheck the stock ledger of those items.")
+        else:
+            messagebox.showinfo("Revalue", message)
+        self.load_report()
@@ -0,0 +1,209 @@
+"""
+Test script for online backup and restore
+Runs against a temporary SQLite database, the real financial_data.db is not touched.
+"""
+
+import os
+import sqlite3
+import stat
+import sys
+import traceback
+
+import database.backup_handler as backup_module
+from database.backup_handler import BackupHandler, online_copy
+from database.partition_financial_years import partition_financial_years
+from database.partition_router import partition_path
+from database.trial_balance_handler import TrialBalanceHandler
+from database.voucher_handler import VoucherHandler
+from test_partitions import count_rows, setup_partition_database
+from test_voucher_balances import setup_database
+
+
+def post_cash_sale(db_path, cash_id, sales_id, amount):
+    vouchers = VoucherHandler(db_path)
+    vouchers.connect()
+    success, message, _ = vouchers.post_voucher(
+        {'voucher_type': 'Receipt', 'voucher_date': '2024-07-01'},
+        [{'account_kind': 'account', 'account_id': cash_id, 'debit': amount},
+         {'account_kind': 'account', 'account_id': sales_id, 'credit': amount}])
+    vouchers.disconnect()
+    assert success, message
+
+
+def count_vouchers(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM vouchers").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def sales_credit(report, sales_id):
+    return next(row['closing_credit'] for row in report['accounts']
+                if row['account_kind'] == 'account' and row['account_id'] == sales_id)
+
+
+def test_backup_and_restore():
+    print("\n" + "=" * 70)
+    print("Testing backup, retention and restore")
+    print("=" * 70 + "\n")
+
+    db_path, cash_id, sales_id, _partner_id = setup_database()
+    post_cash_sale(db_path, cash_id, sales_id, 500)
+    handler = BackupHandler(db_path)
+
+    print("1. Backing up with compaction and gzip...")
+    phases = []
+    success, message, backup_path = handler.create_backup(
+        compact=True, progress=lambda phase, done, total: phases.append((phase, done, total)))
+    assert success, message
+    assert backup_path.endswith('.db.gz') and os.path.dirname(backup_path).endswith('backups')
+    assert {'backup', 'compact', 'compress', 'checksum'} <= {phase for phase, _, _ in phases}
+    _, copied, total = [step for step in phases if step[0] == 'backup'][-1]
+    assert copied == total
+    assert handler.verify_backup(backup_path) == (True, "Checksum verified")
+    print(f"   ✓ {message}\n")
+
+    print("2. Keeping the newest backups...")
+    success, _, plain_path = handler.create_backup(compression=None, keep=2)
+    assert success
+    success, message, _ = handler.create_backup(keep=2)
+    assert success and '1 old backup(s) removed' in message, message
+    backups = handler.list_backups()
+    assert len(backups) == 2 and backups[1]['path'] == plain_path and backups[1]['compression'] is None
+    assert not os.path.exists(backup_path + '.sha256')
+    print(f"   ✓ {message}\n")
+
+    print("3. Restoring...")
+    trial_balance = TrialBalanceHandler(db_path)
+    assert trial_balance.connect()
+    fy_id = 1
+    sales_before = sales_credit(trial_balance.get_trial_balance(fy_id), sales_id)
+    post_cash_sale(db_path, cash_id, sales_id, 70)
+    assert count_vouchers(db_path) == 2
+    assert sales_credit(trial_balance.get_trial_balance(fy_id), sales_id) == sales_before + 70
+    live = sqlite3.connect(db_path)
+    success, message = handler.restore_backup(plain_path)
+    assert success, message
+    assert live.execute("SELECT COUNT(*) FROM vouchers").fetchone()[0] == 1
+    live.close()
+    assert sales_credit(trial_balance.get_trial_balance(fy_id), sales_id) == sales_before
+    trial_balance.disconnect()
+    safety = [b for b in handler.list_backups() if '_pre_restore' in b['name']]
+    assert len(safety) == 1 and handler.verify_backup(safety[0]['path'])[0]
+    print(f"   ✓ {message}, open connections see the restored data\n")
+
+    print("4. Refusing a damaged backup...")
+    with open(plain_path, 'r+b') as f:
+        f.seek(200)
+        f.write(b'\x00damaged')
+    success, message = handler.restore_backup(plain_path)
+    assert not success and 'mismatch' in message
+    assert count_vouchers(db_path) == 1
+    print(f"   ✓ {message}\n")
+
+
+def test_backup_with_concurrent_writer():
+    print("\n" + "=" * 70)
+    print("Testing a backup while another connection writes")
+    print("=" * 70 + "\n")
+
+    db_path, cash_id, sales_id, _partner_id = setup_database()
+    for amount in range(1, 40):
+        post_cash_sale(db_path, cash_id, sales_id, amount)
+
+    writer = sqlite3.connect(db_path)
+    steps = []
+
+    def write_between_steps(phase, done, total):
+        steps.append(done)
+        writer.execute("UPDATE vouchers SET narration = ? WHERE id = 1", (f"step {len(steps)}",))
+        writer.commit()
+
+    original_pages = backup_module.BACKUP_PAGES
+    backup_module.BACKUP_PAGES = 1
+    try:
+        source = sqlite3.connect(db_path)
+        target = sqlite3.connect(':memory:')
+        online_copy(source, target, write_between_steps)
+    finally:
+        backup_module.BACKUP_PAGES = original_pages
+    assert steps[-1] == 1
+    assert target.execute("SELECT COUNT(*) FROM vouchers").fetchone()[0] == 39
+    assert target.execute("PRAGMA quick_check").fetchone()[0] == 'ok'
+    for conn in (writer, source, target):
+        conn.close()
+    print(f"   ✓ Copy finished in one step after {len(steps) - 1} restarted paged steps\n")
+
+
+def test_partitioned_backup():
+    print("\n" + "=" * 70)
+    print("Testing backup and restore of a database partitioned by financial year")
+    print("=" * 70 + "\n")
+
+    db_path, partner_id, sales_id, _tax_account_id, _pen_id, _voucher_id = setup_partition_database()
+    assert partition_financial_years(db_path)
+    year_files = [partition_path(db_path, code) for code in ('FY2425', 'FY2526')]
+    vouchers = VoucherHandler(db_path)
+    vouchers.connect()
+    assert vouchers.router.close_year(1)[0]
+    vouchers.disconnect()
+    handler = BackupHandler(db_path)
+
+    print("1. Backing up the main and year files...")
+    success, message, backup_path = handler.create_backup()
+    assert success and 'with 2 financial year file(s)' in message, message
+    with open(backup_path + '.sha256') as f:
+        names = [line.split()[1] for line in f]
+    assert len(names) == 3 and names[0] == os.path.basename(backup_path)
+    assert all(name.endswith('.db.gz') and '.years' + os.sep in name for name in names[1:])
+    assert handler.verify_backup(backup_path) == (True, "Checksums verified (3 files)")
+    print(f"   ✓ {message}\n")
+
+    print("2. Restoring after a new voucher...")
+    vouchers.connect()
+    success, message, _ = vouchers.post_voucher(
+        {'voucher_type': 'Journal', 'voucher_date': '2025-09-01'},
+        [{'account_kind': 'partner', 'account_id': partner_id, 'debit': 5},
+         {'account_kind': 'account', 'account_id': sales_id, 'credit': 5}])
+    vouchers.disconnect()
+    assert success, message
+    assert count_rows(year_files[1], 'vouchers') == 3
+    success, message = handler.restore_backup(backup_path)
+    assert success, message
+    assert [count_rows(path, 'vouchers') for path in year_files] == [2, 2]
+    assert not os.stat(year_files[0]).st_mode & stat.S_IWUSR
+    vouchers.connect()
+    assert vouchers.find_balance_drift() == []
+    vouchers.disconnect()
+    print(f"   ✓ {message}, both year files back to two vouchers\n")
+
+    print("3. Refusing a damaged year copy...")
+    year_copy = os.path.join(handler.backup_dir, names[2])
+    with open(year_copy, 'r+b') as f:
+        f.seek(100)
+        f.write(b'\x00damaged')
+    success, message = handler.verify_backup(backup_path)
+    assert not success and os.path.basename(year_copy) in message
+    assert handler.apply_retention(keep=1) == 1
+    assert not os.path.exists(os.path.dirname(year_copy))
+    print(f"   ✓ {message}\n")
+
+
+if __name__ == "__main__":
+    try:
+        test_backup_and_restore()
+        test_backup_with_concurrent_writer()
+        test_partitioned_backup()
+
+        print("\n" + "=" * 70)
+        print("ALL TESTS COMPLETED SUCCESSFULLY!")
+        print("=" * 70 + "\n")
+
+    except Exception as e:
+        print("\n" + "=" * 70)
+        print("ERROR OCCURRED DURING TESTING")
+        print("=" * 70)
+        print(f"\nError: {e}")
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,62 @@
+"""
+Test script for the handler benchmark suite and its baseline comparison
+Generates a tiny temporary database, the real financial_data.db is not touched.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import traceback
+
+from benchmarks.bench_handlers import compare_results, run
+
+
+TINY = {'account_groups': 10, 'accounts': 20, 'partners': 30, 'items': 40, 'cities': 5, 'item_groups': 5,
+        'item_companies': 5, 'voucher_lines': 500, 'years': 1}
+
+
+def test_suite_and_baseline():
+    print("\n" + "=" * 70)
+    print("Testing the handler benchmark suite")
+    print("=" * 70 + "\n")
+
+    work_dir = tempfile.mkdtemp()
+    baseline_path = os.path.join(work_dir, 'baseline.json')
+    results_dir = os.path.join(work_dir, 'results')
+
+    print("1. Running the suite and saving a baseline...")
+    document, regressions = run(['tiny'], baseline_path=baseline_path, save_baseline=True,
+                                size_counts={'tiny': TINY}, results_dir=results_dir)
+    timings = document['results']['tiny']
+    for name in ('business_partners.list', 'items.lookup', 'account_master.code', 'items.bulk',
+                 'reports.trial_balance', 'reports.ledger_page'):
+        assert timings[name] > 0, name
+    assert regressions == [] and len(os.listdir(results_dir)) == 1
+    with open(baseline_path) as f:
+        assert json.load(f)['results'] == document['results']
+    print(f"   ✓ {len(timings)} timings saved\n")
+
+    print("2. Flagging regressions...")
+    baseline = {'tiny': {'fast': 0.010, 'noise': 0.0001, 'same': 0.5}}
+    current = {'tiny': {'fast': 0.020, 'noise': 0.0009, 'same': 0.55, 'new': 1.0}}
+    regressions = compare_results(current, baseline, threshold=0.25)
+    assert [(r['name'], round(r['ratio'], 1)) for r in regressions] == [('fast', 2.0)]
+    print("   ✓ Only slowdowns above the threshold and the noise floor are flagged\n")
+
+
+if __name__ == "__main__":
+    try:
+        test_suite_and_baseline()
+
+        print("\n" + "=" * 70)
+        print("ALL TESTS COMPLETED SUCCESSFULLY!")
+        print("=" * 70 + "\n")
+
+    except Exception as e:
+        print("\n" + "=" * 70)
+        print("ERROR OCCURRED DURING TESTING")
+        print("=" * 70)
+        print(f"\nError: {e}")
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,77 @@
+"""
+Test script for Trading / Profit & Loss / Balance Sheet statements
+Runs against a temporary SQLite database, the real financial_data.db is not touched.
+"""
+
+import sys
+import traceback
+
+from database.financial_statement_handler import FinancialStatementHandler
+from database.voucher_handler import VoucherHandler
+from test_voucher_balances import setup_database
+
+
+def test_financial_statements():
+    print("\n" + "=" * 70)
+    print("Testing financial statements")
+    print("=" * 70 + "\n")
+
+    db_path, cash_id, sales_id, partner_id = setup_database()
+    voucher_handler = VoucherHandler(db_path)
+    voucher_handler.connect()
+    fy1 = voucher_handler.get_financial_year_for_date('2024-04-01')['id']
+    fy2 = voucher_handler.get_financial_year_for_date('2025-04-01')['id']
+
+    voucher_handler.post_voucher(
+        {'voucher_date': '2024-05-10'},
+        [{'account_kind': 'account', 'account_id': cash_id, 'debit': 500},
+         {'account_kind': 'account', 'account_id': sales_id, 'credit': 500}])
+    voucher_handler.post_voucher(
+        {'voucher_date': '2025-05-10'},
+        [{'account_kind': 'account', 'account_id': cash_id, 'debit': 300},
+         {'account_kind': 'account', 'account_id': sales_id, 'credit': 300}])
+    voucher_handler.disconnect()
+
+    handler = FinancialStatementHandler(db_path)
+    handler.connect()
+
+    # Test 1: Single year
+    print("1. Building statements for one year...")
+    statements = handler.get_statements(fy1)
+    trading = statements['trading']
+    assert trading['credit'][0]['account_group_name'] == 'Sales'
+    assert trading['credit_total'] == [500]
+    summary = statements['summary'][0]
+    assert summary['gross_profit'] == 500
+    assert summary['net_profit'] == 500
+    assert summary['total_assets'] == 1500
+    # Liabilities: partner opening 250 Cr + net profit 500
+    assert summary['total_liabilities'] == 750
+    print(f"   ✓ Gross profit {summary['gross_profit']}, assets {summary['total_assets']}\n")
+
+    # Test 2: Two years side by side from one query
+    print("2. Comparing two years...")
+    statements = handler.get_statements([fy2, fy1])
+    assert statements['fy_ids'] == [fy2, fy1]
+    assert statements['trading']['credit_total'] == [300, 500]
+    assert [s['gross_profit'] for s in statements['summary']] == [300, 500]
+    print("   ✓ Year columns in requested order\n")
+
+    handler.disconnect()
+
+
+if __name__ == "__main__":
+    try:
+        test_financial_statements()
+
+        print("\n" + "=" * 70)
+        print("ALL TESTS COMPLETED SUCCESSFULLY!")
+        print("=" * 70 + "\n")
+
+    except Exception as e:
+        print("\n" + "=" * 70)
+        print("ERROR OCCURRED DURING TESTING")
+        print("=" * 70)
+        print(f"\nError: {e}")
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,129 @@
+"""
+Test script for the financial year interval index
+Runs against a temporary SQLite database, the real financial_data.db is not touched.
+"""
+
+import sqlite3
+import sys
+import traceback
+from datetime import date, timedelta
+
+from database.financial_year_handler import FinancialYearHandler
+from database.fy_index import FinancialYearIndex
+from database.voucher_handler import VoucherHandler
+from test_voucher_balances import setup_database
+
+
+def test_date_lookup():
+    print("\n" + "=" * 70)
+    print("Testing date to financial year lookups")
+    print("=" * 70 + "\n")
+
+    db_path = setup_database()[0]
+    handler = VoucherHandler(db_path)
+    assert handler.connect()
+
+    print("1. Resolving single dates...")
+    assert handler.get_financial_year_for_date('2024-04-01')['fy_code'] == 'FY2425'
+    assert handler.get_financial_year_for_date(date(2025, 3, 31))['fy_code'] == 'FY2425'
+    assert handler.get_financial_year_for_date('2025-04-01')['fy_code'] == 'FY2526'
+    assert handler.get_financial_year_for_date('2024-03-31') is None
+    assert handler.get_financial_year_for_date('2026-04-01') is None
+    print("   ✓ Year boundaries and dates outside every year\n")
+
+    print("2. Resolving a batch of dates...")
+    dates = [str(date(2024, 1, 1) + timedelta(days=n)) for n in range(1000)] * 3
+    found = handler.get_financial_years_for_dates(dates)
+    assert len(found) == 1000
+    conn = sqlite3.connect(db_path)
+    for on_date, fy in found.items():
+        row = conn.execute("""
+            SELECT fy_code FROM financial_years WHERE start_date <= ? AND end_date >= ?
+        """, (on_date, on_date)).fetchone()
+        assert (fy['fy_code'] if fy else None) == (row[0] if row else None), on_date
+    conn.close()
+    assert found['2024-06-01'] is found['2024-12-01']
+    print(f"   ✓ {len(dates)} dates resolved, same answers as the range query\n")
+
+    print("3. Picking up financial year changes...")
+    fy_handler = FinancialYearHandler()
+    fy_handler.connect()
+    success, message, fy_id = fy_handler.create_financial_year({
+        'fy_code': 'FY2627', 'display_name': 'FY 2026-27',
+        'start_date': '2026-04-01', 'end_date': '2027-03-31'})
+    assert success, message
+    assert handler.get_financial_year_for_date('2026-04-01')['id'] == fy_id
+    success, message = fy_handler.update_financial_year(fy_id, {
+        'fy_code': 'FY2627', 'display_name': 'FY 2026-27',
+        'start_date': '2026-05-01', 'end_date': '2027-03-31'})
+    assert success, message
+    assert handler.get_financial_year_for_date('2026-04-15') is None
+    success, message = fy_handler.delete_financial_year(fy_id)
+    assert success, message
+    assert handler.get_financial_year_for_date('2026-06-01') is None
+    fy_handler.disconnect()
+    handler.disconnect()
+    print("   ✓ Create, update and delete refresh the cached index\n")
+
+
+def test_overlap_check():
+    print("\n" + "=" * 70)
+    print("Testing financial year overlap checks")
+    print("=" * 70 + "\n")
+
+    setup_database()
+    fy_handler = FinancialYearHandler()
+    fy_handler.connect()
+
+    print("1. Checking overlapping periods...")
+    assert fy_handler.check_date_overlap('2025-01-01', '2025-12-31')['fy_code'] == 'FY2526'
+    assert fy_handler.check_date_overlap('2023-01-01', '2027-12-31')['fy_code'] == 'FY2526'
+    assert fy_handler.check_date_overlap('2024-06-01', '2024-07-01')['fy_code'] == 'FY2425'
+    assert fy_handler.check_date_overlap('2023-04-01', '2024-03-31') is None
+    fy_id = fy_handler.get_financial_year_by_code('FY2425')['id']
+    assert fy_handler.check_date_overlap('2024-04-01', '2025-03-31', exclude_id=fy_id) is None
+    success, message, _ = fy_handler.create_financial_year({
+        'fy_code': 'FY2526B', 'display_name': 'Overlap',
+        'start_date': '2026-03-01', 'end_date': '2027-02-28'})
+    assert not success and 'FY2526' in message
+    print(f"   ✓ {message}\n")
+
+    print("2. Checking the query plan...")
+    fy_handler.cursor.execute("""
+        EXPLAIN QUERY PLAN
+        SELECT id, fy_code, display_name FROM financial_years
+        WHERE start_date <= ? AND end_date >= ? AND id IS NOT ?
+        ORDER BY start_date DESC LIMIT 1
+    """, ('2025-12-31', '2025-01-01', None))
+    plan = " ".join(row['detail'] for row in fy_handler.cursor.fetchall())
+    assert 'idx_financial_years_dates' in plan, plan
+    fy_handler.disconnect()
+    print(f"   ✓ {plan}\n")
+
+    print("3. Checking the in-memory index...")
+    index = FinancialYearIndex([
+        {'id': 1, 'start_date': '2024-04-01', 'end_date': '2025-03-31'},
+        {'id': 2, 'start_date': '2025-04-01', 'end_date': '2026-03-31'}])
+    assert index.overlapping('2026-01-01', '2026-12-31')['id'] == 2
+    assert index.overlapping('2024-01-01', '2025-06-30', exclude_id=2)['id'] == 1
+    assert index.overlapping('2026-04-01', '2026-12-31') is None
+    assert index.overlapping('2023-01-01', '2024-03-31') is None
+    print("   ✓ Same answers from the bisect\n")
+
+
+if __name__ == "__main__":
+    try:
+        test_date_lookup()
+        test_overlap_check()
+
+        print("\n" + "=" * 70)
+        print("ALL TESTS COMPLETED SUCCESSFULLY!")
+        print("=" * 70 + "\n")
+
+    except Exception as e:
+        print("\n" + "=" * 70)
+        print("ERROR OCCURRED DURING TESTING")
+        print("=" * 70)
+        print(f"\nError: {e}")
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,162 @@
+"""
+Test script for the HSN-wise GST summary and the GSTR-1 export
+Runs against a temporary SQLite database, the real financial_data.db is not touched.
+"""
+
+import io
+import json
+import sqlite3
+import sys
+import traceback
+
+import database.business_partner_handler as business_partner_module
+from database.business_partner_handler import BusinessPartnerHandler
+from database.gst_report_handler import GstReportHandler
+from database.sales_invoice_handler import SalesInvoiceHandler
+from test_sales_invoice import setup_invoice_database
+
+
+def setup_gst_database():
+    """
+    Invoice test database plus a registered customer in Maharashtra and an
+    unregistered one in Gujarat, with June 2024 invoices of every GSTR-1 kind
+    Returns (db_path, registered_id, gujarat_id)
+    """
+    db_path, partner_id, sales_id, tax_account_id, pen_id, book_id = setup_invoice_database()
+    business_partner_module.DB_PATH = db_path
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("INSERT INTO states (state_code, state_name) VALUES ('GJ', 'Gujarat')")
+    gujarat_state_id = conn.execute("SELECT id FROM states WHERE state_code = 'GJ'").fetchone()[0]
+    conn.execute("UPDATE companies SET gst_number = '27AAACA1234A1Z5' WHERE id = 1")
+    conn.commit()
+    conn.row_factory = sqlite3.Row
+    template = conn.execute("SELECT * FROM business_partners WHERE id = ?", (partner_id,)).fetchone()
+    conn.close()
+
+    bp_handler = BusinessPartnerHandler()
+    bp_handler.connect()
+    partner_ids = []
+    for name, state_id, gst_number in (('Reg Retail', template['state_id'], ' 27bbbcb5678b1z2 '),
+                                       ('Gujarat Cash', gujarat_state_id, '')):
+        _, _, new_id = bp_handler.create_business_partner({
+            'bp_name': name, 'account_group_id': template['account_group_id'],
+            'book_code_id': template['book_code_id'], 'account_type_id': template['account_type_id'],
+            'state_id': state_id, 'gst_number': gst_number})
+        partner_ids.append(new_id)
+    bp_handler.disconnect()
+    registered_id, gujarat_id = partner_ids
+
+    invoices = SalesInvoiceHandler(db_path)
+    invoices.connect()
+    header = {'company_id': 1, 'invoice_date': '2024-06-10', 'tax_account_id': tax_account_id,
+              'sales_account_id': sales_id}
+    for customer, lines in (
+            (partner_id, [{'item_id': pen_id, 'quantity': 10}, {'item_id': book_id, 'quantity': 2}]),
+            (registered_id, [{'item_id': pen_id, 'quantity': 5}]),
+            (gujarat_id, [{'item_id': pen_id, 'quantity': 30000}]),
+            (gujarat_id, [{'item_id': pen_id, 'quantity': 1}])):
+        success, message, _ = invoices.create_invoice(dict(header, partner_id=customer), lines)
+        assert success, message
+    success, message, _ = invoices.create_invoice(
+        dict(header, partner_id=partner_id, invoice_date='2024-07-01'), [{'item_id': pen_id, 'quantity': 1}])
+    assert success, message
+    invoices.disconnect()
+
+    return db_path, registered_id, gujarat_id
+
+
+def test_hsn_summary():
+    print("\n" + "=" * 70)
+    print("Testing HSN-wise summary")
+    print("=" * 70 + "\n")
+
+    db_path, _registered_id, _gujarat_id = setup_gst_database()
+    handler = GstReportHandler(db_path)
+    assert handler.connect()
+
+    print("1. Summarising June 2024...")
+    summary = handler.get_hsn_summary(1, '2024-06-01', '2024-06-30')
+    rows = {row['hsn_code']: row for row in summary['rows']}
+    assert list(rows) == ['4901', '9608']
+    pen = rows['9608']
+    # 10 + 5 + 30000 + 1 pens at 10 less 10%
+    assert pen['quantity'] == 30016 and pen['taxable_amount'] == 270144
+    assert pen['cgst_amount'] == pen['sgst_amount'] == 12.15  # 8.10 + 4.05
+    assert pen['igst_amount'] == 48601.62
+    assert rows['4901']['total_value'] == 200 and rows['4901']['gst_percentage'] == 0
+    assert summary['totals']['taxable_amount'] == 270344
+    print(f"   ✓ {len(rows)} HSN codes, taxable {summary['totals']['taxable_amount']:,.2f}\n")
+
+    print("2. Rejecting a range across financial years...")
+    assert handler.get_hsn_summary(1, '2025-03-01', '2025-04-30') is None
+    print("   ✓ No summary across FY2425 / FY2526\n")
+
+    handler.disconnect()
+
+
+def test_gstr1_export():
+    print("\n" + "=" * 70)
+    print("Testing GSTR-1 export")
+    print("=" * 70 + "\n")
+
+    db_path, _registered_id, _gujarat_id = setup_gst_database()
+    handler = GstReportHandler(db_path)
+    assert handler.connect()
+
+    print("1. Exporting June 2024...")
+    out = io.StringIO()
+    success, message, counts = handler.write_gstr1(out, 1, 2024, 6)
+    assert success, message
+    gstr1 = json.loads(out.getvalue())
+    assert (gstr1['gstin'], gstr1['fp']) == ('27AAACA1234A1Z5', '062024')
+    assert counts == {'b2b': 1, 'b2cl': 1, 'b2cs': 2, 'nil': 1, 'hsn': 2, 'doc_issue': 1}
+    print(f"   ✓ {message}\n")
+
+    print("2. Checking sections...")
+    b2b = gstr1['b2b'][0]
+    assert b2b['ctin'] == '27BBBCB5678B1Z2'
+    invoice = b2b['inv'][0]
+    assert (invoice['inum'], invoice['idt'], invoice['pos']) == ('SI/FY2425/00002', '10-06-2024', '27')
+    assert invoice['itms'][0]['itm_det'] == {'txval': 45.0, 'rt': 18.0, 'iamt': 0.0, 'camt': 4.05,
+                                             'samt': 4.05, 'csamt': 0}
+
+    b2cl = gstr1['b2cl'][0]
+    assert b2cl['pos'] == '24' and b2cl['inv'][0]['val'] == 318600
+    assert 'camt' not in b2cl['inv'][0]['itms'][0]['itm_det']
+
+    b2cs = {(row['sply_ty'], row['pos']): row for row in gstr1['b2cs']}
+    assert b2cs[('INTRA', '27')]['txval'] == 90 and b2cs[('INTER', '24')]['iamt'] == 1.62
+    assert gstr1['nil']['inv'] == [{'sply_ty': 'INTRAB2C', 'nil_amt': 200.0, 'expt_amt': 0, 'ngsup_amt': 0}]
+    assert [row['hsn_sc'] for row in gstr1['hsn']['data']] == ['4901', '9608']
+    assert gstr1['doc_issue']['doc_det'][0]['docs'] == [{
+        'num': 1, 'from': 'SI/FY2425/00001', 'to': 'SI/FY2425/00004',
+        'totnum': 4, 'cancel': 0, 'net_issue': 4}]
+    print("   ✓ B2B, B2CL (Gujarat), B2CS, nil-rated, HSN and documents as expected\n")
+
+    print("3. Exporting an empty month...")
+    out = io.StringIO()
+    success, _, counts = handler.write_gstr1(out, 1, 2024, 9)
+    assert success and not any(counts.values())
+    assert json.loads(out.getvalue())['b2b'] == []
+    print("   ✓ Valid JSON with empty sections\n")
+
+    handler.disconnect()
+
+
+if __name__ == "__main__":
+    try:
+        test_hsn_summary()
+        test_gstr1_export()
+
+        print("\n" + "=" * 70)
+        print("ALL TESTS COMPLETED SUCCESSFULLY!")
+        print("=" * 70 + "\n")
+
+    except Exception as e:
+        print("\n" + "=" * 70)
+        print("ERROR OCCURRED DURING TESTING")
+        print("=" * 70)
+        print(f"\nError: {e}")
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,110 @@
+"""
+Test script for the account ledger with running balance and keyset paging
+Runs against a temporary SQLite database, the real financial_data.db is not touched.
+"""
+
+import sys
+import traceback
+
+from database.ledger_handler import LedgerHandler
+from database.voucher_handler import VoucherHandler
+from test_voucher_balances import setup_database
+
+
+def test_ledger():
+    print("\n" + "=" * 70)
+    print("Testing account ledger")
+    print("=" * 70 + "\n")
+
+    db_path, cash_id, sales_id, partner_id = setup_database()
+    voucher_handler = VoucherHandler(db_path)
+    voucher_handler.connect()
+
+    # Ten cash sales of 100 each: two in April, eight in May
+    for day in ('2024-04-10', '2024-04-20') + tuple(f'2024-05-{d:02d}' for d in range(1, 9)):
+        voucher_handler.post_voucher(
+            {'voucher_date': day},
+            [{'account_kind': 'account', 'account_id': cash_id, 'debit': 100},
+             {'account_kind': 'account', 'account_id': sales_id, 'credit': 100}])
+    voucher_handler.disconnect()
+
+    handler = LedgerHandler(db_path)
+    handler.connect()
+
+    # Test 1: Opening balance at the range start comes from the aggregate + partial month
+    print("1. Checking opening balance at range start...")
+    assert handler.get_balance_at('account', cash_id, '2024-04-01') == 1000
+    assert handler.get_balance_at('account', cash_id, '2024-05-04') == 1500
+    assert handler.get_balance_at('account', cash_id, '2024-05-04', inclusive=True) == 1600
+    print("   ✓ Opening balance 1000, 1500 before 2024-05-04\n")
+
+    # Test 2: Summary over a range
+    print("2. Checking range summary...")
+    summary = handler.get_ledger_summary('account', cash_id, '2024-04-15', '2024-05-05')
+    assert summary['opening_balance'] == 1100
+    assert summary['debit_total'] == 600
+    assert summary['credit_total'] == 0
+    assert summary['closing_balance'] == 1700
+    print("   ✓ Opening 1100, debits 600, closing 1700\n")
+
+    # Test 3: Keyset paging forwards carries the running balance
+    print("3. Paging forwards...")
+    page = handler.get_ledger_page('account', cash_id, '2024-04-01', '2025-03-31', page_size=4)
+    assert [row['balance'] for row in page['rows']] == [1100, 1200, 1300, 1400]
+    assert page['previous_cursor'] is None
+    balances = [row['balance'] for row in page['rows']]
+    while page['next_cursor']:
+        page = handler.get_ledger_page('account', cash_id, '2024-04-01', '2025-03-31',
+                                       cursor=page['next_cursor'], page_size=4)
+        balances += [row['balance'] for row in page['rows']]
+    assert balances == [1000 + 100 * n for n in range(1, 11)]
+    print(f"   ✓ {len(balances)} lines, closing running balance {balances[-1]}\n")
+
+    # Test 4: Paging backwards from the last page gives the same balances
+    print("4. Paging backwards...")
+    previous = handler.get_ledger_page('account', cash_id, '2024-04-01', '2025-03-31',
+                                       cursor=page['previous_cursor'], direction='previous',
+                                       page_size=4)
+    assert [row['balance'] for row in previous['rows']] == [1500, 1600, 1700, 1800]
+    assert previous['previous_cursor'] is not None
+    first = handler.get_ledger_page('account', cash_id, '2024-04-01', '2025-03-31',
+                                    cursor=previous['previous_cursor'], direction='previous',
+                                    page_size=4)
+    assert [row['balance'] for row in first['rows']] == [1100, 1200, 1300, 1400]
+    assert first['previous_cursor'] is None
+    print("   ✓ Backward pages match forward pages\n")
+
+    # Test 5: Range is clamped to the financial year, index is used
+    print("5. Checking range clamp and index...")
+    page = handler.get_ledger_page('account', sales_id, '2024-05-01', '2026-01-01')
+    assert page['date_to'] == '2025-03-31'
+    assert page['rows'][-1]['balance'] == -1000
+    handler.cursor.execute("""
+        EXPLAIN QUERY PLAN
+        SELECT id FROM voucher_lines
+        WHERE account_kind = 'account' AND account_id = 1
+          AND (voucher_date, id) > ('2024-05-01', 0)
+        ORDER BY voucher_date, id
+    """)
+    plan = " ".join(row['detail'] for row in handler.cursor.fetchall())
+    assert 'idx_voucher_lines_account_date' in plan
+    print("   ✓ Clamped to 2025-03-31, ledger index in use\n")
+
+    handler.disconnect()
+
+
+if __name__ == "__main__":
+    try:
+        test_ledger()
+
+        print("\n" + "=" * 70)
+        print("ALL TESTS COMPLETED SUCCESSFULLY!")
+        print("=" * 70 + "\n")
+
+    except Exception as e:
+        print("\n" + "=" * 70)
+        print("ERROR OCCURRED DURING TESTING")
+        print("=" * 70)
+        print(f"\nError: {e}")
+        traceback.print_exc()
+        sys.exit(1)
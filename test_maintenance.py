@@ -0,0 +1,161 @@
+"""
+Test script for idle-time database maintenance
+Runs against a temporary SQLite database, the real financial_data.db is not touched.
+"""
+
+import json
+import sqlite3
+import sys
+import threading
+import time
+import traceback
+
+from database.maintenance_handler import (MaintenanceHandler, enable_incremental_vacuum, stale_tables,
+                                           table_marks)
+from maintenance_scheduler import ACTIVITY_EVENTS, MaintenanceScheduler
+from test_voucher_balances import setup_database
+
+
+def setup_maintenance_database():
+    """
+    Voucher test database converted to incremental vacuum, with a 2000 row table
+    that was never analyzed and free pages left by a dropped table
+    """
+    db_path, _cash_id, _sales_id, _partner_id = setup_database()
+    assert enable_incremental_vacuum(db_path)
+    assert not enable_incremental_vacuum(db_path)
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE scratch_notes (id INTEGER PRIMARY KEY, note TEXT)")
+    conn.execute("CREATE INDEX idx_scratch_notes ON scratch_notes(note)")
+    conn.execute("""
+        WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 2000)
+        INSERT INTO scratch_notes (note) SELECT 'note ' || i FROM n
+    """)
+    conn.execute("CREATE TABLE scratch_blobs (data BLOB)")
+    conn.execute("""
+        WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 1000)
+        INSERT INTO scratch_blobs SELECT randomblob(2000) FROM n
+    """)
+    conn.commit()
+    conn.execute("DROP TABLE scratch_blobs")
+    conn.commit()
+    assert conn.execute("PRAGMA freelist_count").fetchone()[0] > 500
+    conn.close()
+    return db_path
+
+
+class ActivityRoot:
+    """Stand-in for the dashboard window: records bindings, refuses bind_all"""
+
+    def __init__(self):
+        self.bindings = {}
+
+    def bind(self, sequence, func, add=None):
+        self.bindings[sequence] = func
+
+    def bind_all(self, sequence, func, add=None):
+        raise AssertionError("activity must not be bound on the 'all' bindtag")
+
+    def after(self, ms, func):
+        return 'after#1'
+
+    def after_cancel(self, after_id):
+        pass
+
+
+def test_maintenance_run():
+    print("\n" + "=" * 70)
+    print("Testing a maintenance run")
+    print("=" * 70 + "\n")
+
+    db_path = setup_maintenance_database()
+    handler = MaintenanceHandler(db_path)
+
+    print("1. Running with enough time...")
+    success, message, reports = handler.run(time_budget=60)
+    assert success, message
+    report = reports[0]
+    assert report['completed'] and 'completed' in message
+    assert report['before']['freelist_count'] > 500 and report['after']['freelist_count'] == 0
+    assert report['after']['page_count'] < report['before']['page_count']
+    assert report['analyzed'][0] == 'scratch_notes'
+    assert set(report['steps']) == {'checkpoint', 'analyze', 'optimize', 'incremental_vacuum'}
+    print(f"   ✓ {message}\n")
+
+    print("2. Checking statistics and the run log...")
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT COUNT(*) FROM sqlite_stat1 WHERE tbl = 'scratch_notes'").fetchone()[0]
+    assert table_marks(conn)['scratch_notes'] == 2000
+    assert stale_tables(conn) == []
+    row = conn.execute("SELECT freelist_after, completed, steps FROM maintenance_runs").fetchone()
+    assert row[0] == 0 and row[1] == 1
+    assert 'scratch_notes' in json.loads(row[2])['analyzed']
+    conn.execute("DELETE FROM scratch_notes WHERE id > 500")
+    conn.commit()
+    assert [table for table, _, _ in stale_tables(conn)] == ['scratch_notes']
+    conn.close()
+    assert handler.last_run_at() is not None
+    print("   ✓ Only tables that changed since the last ANALYZE are stale\n")
+
+
+def test_maintenance_stops_early():
+    print("\n" + "=" * 70)
+    print("Testing the time budget and the stop event")
+    print("=" * 70 + "\n")
+
+    db_path = setup_maintenance_database()
+    handler = MaintenanceHandler(db_path)
+
+    print("1. Stopping before the first step...")
+    stop_event = threading.Event()
+    stop_event.set()
+    success, message, reports = handler.run(time_budget=60, stop_event=stop_event)
+    assert success and 'stopped early' in message
+    assert reports[0]['steps'] == {} and reports[0]['after']['freelist_count'] > 500
+    success, message, reports = handler.run(time_budget=0)
+    assert success and not reports[0]['completed']
+    print(f"   ✓ {message}\n")
+
+    print("2. Checking when the scheduler starts a run...")
+    scheduler = MaintenanceScheduler(None, handler, idle_seconds=60, min_interval=3600)
+    assert not scheduler.is_due()
+    scheduler.last_activity = time.monotonic() - 61
+    assert scheduler.is_due()
+    scheduler.last_run = time.time() - 60
+    assert not scheduler.is_due()
+    scheduler.last_run = time.time() - 3601
+    scheduler.run_now()
+    scheduler.on_activity()
+    scheduler.worker.join()
+    assert scheduler.stop_event.is_set() and not scheduler.is_due()
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT COUNT(*) FROM maintenance_runs").fetchone()[0] == 3
+    conn.close()
+    print("   ✓ Runs only after the idle time and interval, activity stops it\n")
+
+    print("3. Watching activity on the window's bindtag...")
+    root = ActivityRoot()
+    scheduler = MaintenanceScheduler(root, handler)
+    scheduler.start()
+    assert sorted(root.bindings) == sorted(ACTIVITY_EVENTS)
+    scheduler.stop()
+    print("   ✓ Screens' bind_all()/unbind_all() cannot drop the activity bindings\n")
+
+
+if __name__ == "__main__":
+    try:
+        test_maintenance_run()
+        test_maintenance_stops_early()
+
+        print("\n" + "=" * 70)
+        print("ALL TESTS COMPLETED SUCCESSFULLY!")
+        print("=" * 70 + "\n")
+
+    except Exception as e:
+        print("\n" + "=" * 70)
+        print("ERROR OCCURRED DURING TESTING")
+        print("=" * 70)
+        print(f"\nError: {e}")
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,93 @@
+"""
+Test script for the per-screen memory diagnostics
+Uses a minimal stand-in for the Tk window, no display is needed.
+"""
+
+import sqlite3
+import sys
+import traceback
+
+from memory_diagnostics import MemoryDiagnostics, find_growth, open_connections
+
+
+class Widget:
+    """Just enough of a Tk widget for MemoryDiagnostics"""
+
+    def __init__(self):
+        self.children = []
+        self.commands = ['set', 'info']
+        self.tk = self
+
+    def winfo_children(self):
+        return list(self.children)
+
+    def call(self, *args):
+        return tuple(self.commands)
+
+    def update_idletasks(self):
+        pass
+
+
+def test_memory_diagnostics():
+    print("\n" + "=" * 70)
+    print("Testing the memory diagnostics")
+    print("=" * 70 + "\n")
+
+    print("1. Counting open sqlite connections...")
+    before = open_connections()
+    connection = sqlite3.connect(':memory:')
+    assert open_connections() == before + 1
+    connection.close()
+    assert open_connections() == before
+    print("   ✓ Closed connections are not counted\n")
+
+    print("2. Flagging growth over repeated visits...")
+    steady = {'traced_kb': 1000, 'widgets': 50, 'tcl_commands': 10, 'connections': 1, 'objects': 100,
+              'retained': 0}
+    samples = [dict(steady, tcl_commands=10 + i, traced_kb=1000 + i) for i in range(4)]
+    assert find_growth(samples) == {'tcl_commands': (10, 13)}
+    assert find_growth(samples[:3]) == {}
+    assert find_growth([steady] * 4) == {}
+    print("   ✓ Only counters growing on every visit are flagged\n")
+
+    print("3. Leaking screen across open/close cycles...")
+    root = Widget()
+    content = Widget()
+    root.children.append(content)
+    diagnostics = MemoryDiagnostics(root, content)
+    diagnostics.enable()
+    leaked = []
+    try:
+        for visit in range(4):
+            diagnostics.before_navigation()
+            content.children.clear()
+            screen = Widget()
+            content.children.append(screen)
+            root.commands.append(f"callback{visit}")
+            leaked.append(sqlite3.connect(':memory:'))
+            diagnostics.after_navigation('Master Data > Item Master')
+    finally:
+        diagnostics.disable()
+        for connection in leaked:
+            connection.close()
+    growth = diagnostics.flagged['Master Data > Item Master']
+    assert set(growth) >= {'tcl_commands', 'connections'}
+    assert 'Item Master (4 visits)' in diagnostics.report()
+    print(f"   ✓ Flagged: {', '.join(growth)}\n")
+
+
+if __name__ == "__main__":
+    try:
+        test_memory_diagnostics()
+
+        print("\n" + "=" * 70)
+        print("ALL TESTS COMPLETED SUCCESSFULLY!")
+        print("=" * 70 + "\n")
+
+    except Exception as e:
+        print("\n" + "=" * 70)
+        print("ERROR OCCURRED DURING TESTING")
+        print("=" * 70)
+        print(f"\nError: {e}")
+        traceback.print_exc()
+        sys.exit(1)
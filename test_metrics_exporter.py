@@ -0,0 +1,129 @@
+"""
+Test script for the Prometheus metrics exporter and the database instrumentation
+Uses a temporary database, the real financial_data.db is not touched.
+"""
+
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+import traceback
+
+from database import instrumentation
+from database.trial_balance_handler import TrialBalanceHandler
+from lag_monitor import LagMonitor
+from metrics_exporter import MetricsText, format_metrics, write_metrics
+from test_lag_monitor import Root
+from test_voucher_balances import setup_database
+
+
+SAMPLE_LINE = re.compile(r'^[a-z_]+(\{[a-z_]+="[^"]*"(,[a-z_]+="[^"]*")*\})? [-0-9.e+]+$')
+
+
+def metric_value(text, line_start):
+    line = next(line for line in text.splitlines() if line.startswith(line_start))
+    return float(line.rsplit(' ', 1)[1])
+
+
+def test_metrics_file():
+    print("\n" + "=" * 70)
+    print("Testing the metrics exporter")
+    print("=" * 70 + "\n")
+
+    db_path, _, _, _ = setup_database()
+    instrumentation.install()
+    try:
+        print("1. Handler calls, cache hits and busy errors...")
+        handler = TrialBalanceHandler(db_path)
+        handler.connect()
+        TrialBalanceHandler.clear_cache()
+        handler.get_trial_balance(1)
+        handler.get_trial_balance(1)
+        handler.disconnect()
+
+        writer = sqlite3.connect(db_path)
+        assert isinstance(writer, instrumentation.InstrumentedConnection)
+        writer.execute("BEGIN IMMEDIATE")
+        blocked = sqlite3.connect(db_path, timeout=0)
+        busy_before = instrumentation.SQLITE_BUSY['errors']
+        try:
+            blocked.execute("BEGIN IMMEDIATE")
+            raise AssertionError("the second writer should have been refused")
+        except sqlite3.OperationalError:
+            pass
+        assert instrumentation.SQLITE_BUSY['errors'] == busy_before + 1
+        writer.rollback()
+        writer.close()
+        blocked.close()
+        print("   ✓ Busy error counted\n")
+
+        print("2. Formatting the metrics...")
+        monitor = LagMonitor(Root(), threshold_ms=100, log_path=os.path.join(tempfile.mkdtemp(), 'lag.log'))
+        for lag in (0.01, 0.02, 0.5):
+            monitor.record(lag)
+        text = format_metrics([db_path], monitor)
+        samples = [line for line in text.splitlines() if not line.startswith('#')]
+        assert samples and all(SAMPLE_LINE.match(line) for line in samples), \
+            [line for line in samples if not SAMPLE_LINE.match(line)]
+
+        calls = 'business_app_handler_call_seconds_count{handler="TrialBalanceHandler",method="get_trial_balance"}'
+        assert metric_value(text, calls) >= 2
+        assert metric_value(text, 'business_app_handler_call_seconds_bucket{handler="TrialBalanceHandler",'
+                                  'method="get_trial_balance",le="+Inf"}') == metric_value(text, calls)
+        assert metric_value(text, 'business_app_cache_requests_total{cache="trial_balance",result="hits"}') >= 1
+        assert metric_value(text, 'business_app_sqlite_busy_errors_total') >= 1
+        assert metric_value(text, 'business_app_database_file_bytes{file="' + os.path.basename(db_path) +
+                            '",kind="db"}') > 0
+        assert metric_value(text, 'business_app_ui_event_loop_lag_seconds{quantile="1"}') == 0.5
+        assert metric_value(text, 'business_app_ui_slow_ticks_total') == 1
+        assert text.count('# TYPE business_app_handler_call_seconds histogram') == 1
+        assert '# TYPE business_app_ui_event_loop_lag_seconds summary' in text
+        assert metric_value(text, 'business_app_ui_event_loop_lag_seconds_count') == 3
+        assert abs(metric_value(text, 'business_app_ui_event_loop_lag_seconds_sum') - 0.53) < 1e-9
+
+        # Every family is one contiguous block after its HELP/TYPE header
+        families = [line.split()[2] for line in text.splitlines() if line.startswith('# TYPE')]
+        order = []
+        for line in samples:
+            family = next(f for f in sorted(families, key=len, reverse=True) if line.startswith(f))
+            if not order or order[-1] != family:
+                order.append(family)
+        assert len(order) == len(set(order)) == len(families), order
+        print(f"   ✓ {len(samples)} samples in the text format\n")
+
+        print("3. Exact values...")
+        metrics = MetricsText()
+        metrics.sample('big_total', 1234567, kind='counter', help_text="big")
+        metrics.sample('timestamp_seconds', 1792380000.123456, help_text="time")
+        exact = metrics.text()
+        assert 'business_app_big_total 1234567\n' in exact
+        assert 'business_app_timestamp_seconds 1792380000.123456\n' in exact
+        print("   ✓ Counters and timestamps are not rounded\n")
+
+        print("4. Writing the file...")
+        path = os.path.join(tempfile.mkdtemp(), 'business_app.prom')
+        write_metrics(path, text)
+        with open(path) as f:
+            assert f.read() == text
+        assert os.listdir(os.path.dirname(path)) == ['business_app.prom']
+        print("   ✓ Written without leftovers\n")
+    finally:
+        instrumentation.uninstall()
+
+
+if __name__ == "__main__":
+    try:
+        test_metrics_file()
+
+        print("\n" + "=" * 70)
+        print("ALL TESTS COMPLETED SUCCESSFULLY!")
+        print("=" * 70 + "\n")
+
+    except Exception as e:
+        print("\n" + "=" * 70)
+        print("ERROR OCCURRED DURING TESTING")
+        print("=" * 70)
+        print(f"\nError: {e}")
+        traceback.print_exc()
+        sys.exit(1)
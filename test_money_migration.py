@@ -0,0 +1,221 @@
+"""
+Test script for integer paise money and the REAL -> INTEGER migration
+Builds a database with the old REAL rupee schema, migrates it and reads it back
+through the handlers.
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+import traceback
+from decimal import Decimal
+
+from database.money_schema import ensure_money_schema, tables_to_migrate
+from database.voucher_handler import VoucherHandler
+from utils.money import Money, to_paise
+
+
+# Tables as they were created before amounts were stored in paise
+LEGACY_SCHEMA = """
+CREATE TABLE financial_years (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    fy_code TEXT NOT NULL UNIQUE,
+    start_date DATE NOT NULL,
+    end_date DATE NOT NULL,
+    status TEXT DEFAULT 'Active'
+);
+CREATE TABLE items (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    item_code TEXT NOT NULL UNIQUE,
+    item_name TEXT NOT NULL,
+    purchase_rate REAL DEFAULT 0.0,
+    mrp REAL DEFAULT 0.0,
+    gst_percentage REAL DEFAULT 0.0,
+    sale_rate_wh1 REAL DEFAULT 0.0,
+    sale_rate_wh2 REAL DEFAULT 0.0,
+    discount_wh1 REAL DEFAULT 0.0
+);
+CREATE TABLE vouchers (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    voucher_no TEXT NOT NULL UNIQUE,
+    voucher_type TEXT NOT NULL,
+    voucher_date DATE NOT NULL,
+    fy_id INTEGER NOT NULL,
+    company_id INTEGER,
+    narration TEXT,
+    total_amount REAL DEFAULT 0,
+    status TEXT DEFAULT 'Posted' CHECK(status IN ('Posted', 'Reversed')),
+    reversal_of INTEGER,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE voucher_lines (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    voucher_id INTEGER NOT NULL,
+    line_no INTEGER NOT NULL,
+    account_kind TEXT NOT NULL CHECK(account_kind IN ('account', 'partner')),
+    account_id INTEGER NOT NULL,
+    fy_id INTEGER NOT NULL,
+    period INTEGER NOT NULL,
+    voucher_date DATE NOT NULL,
+    debit REAL DEFAULT 0,
+    credit REAL DEFAULT 0,
+    narration TEXT
+);
+CREATE INDEX idx_voucher_lines_voucher ON voucher_lines (voucher_id);
+CREATE TABLE account_balances (
+    account_kind TEXT NOT NULL CHECK(account_kind IN ('account', 'partner')),
+    account_id INTEGER NOT NULL,
+    fy_id INTEGER NOT NULL,
+    period INTEGER NOT NULL CHECK(period >= 0),
+    opening_balance REAL DEFAULT 0,
+    debit_total REAL DEFAULT 0,
+    credit_total REAL DEFAULT 0,
+    version INTEGER DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (account_kind, account_id, fy_id, period)
+) WITHOUT ROWID;
+CREATE TABLE balance_versions (
+    fy_id INTEGER PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+def setup_legacy_database():
+    """Database with REAL rupee columns and a posted voucher, returns its path"""
+    fd, db_path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+
+    conn = sqlite3.connect(db_path)
+    conn.executescript(LEGACY_SCHEMA)
+    conn.execute("INSERT INTO financial_years (fy_code, start_date, end_date) "
+                 "VALUES ('FY2425', '2024-04-01', '2025-03-31')")
+    conn.executemany("INSERT INTO items (item_code, item_name, purchase_rate, mrp, gst_percentage, "
+                     "sale_rate_wh1, sale_rate_wh2, discount_wh1) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", [
+                         ('BOOK', 'Book', 16.2, 29.99, 5, 0.285, 1e6 / 3, 2.5),
+                         ('PEN', 'Pen', 0.1 + 0.2, 10, 12, 7.5, 7.49, 0),
+                     ])
+    conn.execute("INSERT INTO vouchers (voucher_no, voucher_type, voucher_date, fy_id, total_amount) "
+                 "VALUES ('JV/FY2425/00001', 'Journal', '2024-04-10', 1, 1234.56)")
+    conn.executemany("INSERT INTO voucher_lines (voucher_id, line_no, account_kind, account_id, fy_id, "
+                     "period, voucher_date, debit, credit) VALUES (1, ?, 'account', ?, 1, 1, '2024-04-10', ?, ?)",
+                     [(1, 1, 1234.56, 0), (2, 2, 0, 1234.56)])
+    conn.executemany("INSERT INTO account_balances (account_kind, account_id, fy_id, period, "
+                     "opening_balance, debit_total, credit_total, version) VALUES ('account', ?, 1, ?, ?, ?, ?, 1)",
+                     [(1, 0, 1000.1, 0, 0), (1, 1, 0, 1234.56, 0), (2, 1, 0, 0, 1234.56)])
+    conn.execute("INSERT INTO balance_versions (fy_id, version) VALUES (1, 1)")
+    conn.commit()
+    conn.close()
+    return db_path
+
+
+def test_money_type():
+    print("\n" + "=" * 70)
+    print("Testing Money type")
+    print("=" * 70 + "\n")
+
+    print("1. Converting rupees to paise...")
+    assert to_paise(16.2) == 1620
+    assert to_paise('0.285') == 29
+    assert to_paise('-0.285') == -29
+    assert to_paise('1,234.565') == 123457
+    assert to_paise(None) == 0 and to_paise('') == 0
+    try:
+        to_paise('abc')
+        assert False, "Text was accepted as an amount"
+    except ValueError:
+        pass
+    print("   ✓ Rounded half away from zero, bad text rejected\n")
+
+    print("2. Arithmetic, comparison and display...")
+    amount = Money.of('0.1') + 0.2
+    assert amount.paise == 30 and amount == 0.3 and amount == Money(30)
+    assert 10 - Money(250) == Money.of('7.50')
+    assert abs(Money(-5)) > 0 and not Money(0)
+    assert f"{Money(123456789):,.2f}" == "1,234,567.89"
+    assert str(Money(-5)) == "-0.05"
+    assert Money(1620) == 16.2 and Money(1620) == '16.20' and Money(1620) == Decimal('16.2')
+    assert Money(1620) != 16.199 and Money(1620) > 16.199 and Money(1620) < 16.201
+    assert hash(Money(1620)) == hash(Decimal('16.2')) and hash(Money(500)) == hash(5)
+    assert len({Money(500), Money.of(5), 5}) == 1
+    print("   ✓ Money behaves like an exact rupee amount\n")
+
+
+def test_migration():
+    print("\n" + "=" * 70)
+    print("Testing REAL -> INTEGER paise migration")
+    print("=" * 70 + "\n")
+
+    db_path = setup_legacy_database()
+    try:
+        conn = sqlite3.connect(db_path)
+
+        # Test 1: Legacy tables are detected and migrated
+        print("1. Migrating legacy tables...")
+        assert tables_to_migrate(conn) == ['items', 'vouchers', 'voucher_lines', 'account_balances']
+        migrated = dict(ensure_money_schema(conn))
+        assert migrated == {'items': 2, 'vouchers': 1, 'voucher_lines': 2, 'account_balances': 3}
+        assert tables_to_migrate(conn) == []
+        assert ensure_money_schema(conn) == []
+        print("   ✓ Four tables migrated, second run does nothing\n")
+
+        # Test 2: Values are exact paise, declared types are INTEGER
+        print("2. Checking values and schema...")
+        rows = conn.execute("SELECT purchase_rate, mrp, sale_rate_wh1, sale_rate_wh2, "
+                            "gst_percentage, discount_wh1 FROM items ORDER BY id").fetchall()
+        assert rows == [(1620, 2999, 29, 33333333, 5.0, 2.5), (30, 1000, 750, 749, 12.0, 0.0)], rows
+        assert conn.execute("SELECT typeof(debit), SUM(debit), SUM(credit) FROM voucher_lines").fetchone() \
+            == ('integer', 123456, 123456)
+        types = {row[1]: row[2] for row in conn.execute("PRAGMA table_info(account_balances)")}
+        assert types['opening_balance'] == types['debit_total'] == 'INTEGER'
+        print("   ✓ Money columns hold integer paise, percentages untouched\n")
+
+        # Test 3: Indexes, WITHOUT ROWID and AUTOINCREMENT survive the rewrite
+        print("3. Checking indexes and sequences...")
+        indexes = [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")]
+        assert 'idx_voucher_lines_voucher' in indexes
+        assert 'WITHOUT ROWID' in conn.execute(
+            "SELECT sql FROM sqlite_master WHERE name = 'account_balances'").fetchone()[0]
+        conn.execute("DELETE FROM items WHERE id = 2")
+        conn.execute("INSERT INTO items (item_code, item_name) VALUES ('INK', 'Ink')")
+        assert conn.execute("SELECT id FROM items WHERE item_code = 'INK'").fetchone()[0] == 3
+        assert conn.execute("SELECT version FROM balance_versions WHERE fy_id = 1").fetchone()[0] > 1
+        assert conn.execute("PRAGMA integrity_check").fetchone()[0] == 'ok'
+        conn.rollback()
+        conn.close()
+        print("   ✓ Index, WITHOUT ROWID, AUTOINCREMENT and versions kept\n")
+
+        # Test 4: Handlers read the migrated data as Money
+        print("4. Reading through the voucher engine...")
+        handler = VoucherHandler(db_path)
+        assert handler.connect()
+        balance = handler.get_account_balance('account', 1, 1)
+        assert isinstance(balance['closing_balance'], Money)
+        assert balance['opening_balance'] == 1000.1
+        assert balance['closing_balance'] == Money.of('2234.66')
+        voucher = handler.get_voucher_by_id(1)
+        assert voucher['total_amount'] == 1234.56 and voucher['lines'][0]['debit'] == Money(123456)
+        handler.disconnect()
+        print("   ✓ Balances and vouchers come back as exact Money\n")
+    finally:
+        os.remove(db_path)
+
+
+if __name__ == "__main__":
+    try:
+        test_money_type()
+        test_migration()
+
+        print("\n" + "=" * 70)
+        print("ALL TESTS COMPLETED SUCCESSFULLY!")
+        print("=" * 70 + "\n")
+
+    except Exception as e:
+        print("\n" + "=" * 70)
+        print("ERROR OCCURRED DURING TESTING")
+        print("=" * 70)
+        print(f"\nError: {e}")
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,218 @@
+"""
+Test script for the bulk, resumable MySQL -> SQLite migration
+A SQLite fixture file with the MySQL column layout stands in for the MySQL server.
+Runs against temporary SQLite databases, the real financial_data.db is not touched.
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+import traceback
+
+import database.auth_handler as auth_module
+from database.auth_handler import AuthHandler
+from database.migration_handler import MigrationHandler, SQLiteSource
+from database.voucher_handler import VoucherHandler
+from test_voucher_balances import setup_database
+
+
+USER_COUNT = 2500
+
+
+def create_fixture_dump():
+    """
+    SQLite file with the MySQL tables: 3 companies (one with NULL address fields),
+    USER_COUNT users, three financial years and three accounts with rupee openings
+    """
+    path = os.path.join(tempfile.mkdtemp(), "mysql_fixture.db")
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE companies (
+            id INTEGER PRIMARY KEY, company_code TEXT, company_name TEXT, name TEXT,
+            description TEXT, bill_to_address TEXT, ship_to_address TEXT, state TEXT, city TEXT,
+            gst_number TEXT, pan_number TEXT, landline_number TEXT, mobile_number TEXT,
+            email_address TEXT, website TEXT, logo_path TEXT, status TEXT, created_at TIMESTAMP
+        );
+        CREATE TABLE users (
+            id INTEGER PRIMARY KEY, username TEXT, password TEXT, email TEXT, full_name TEXT,
+            company_id INTEGER, created_at TIMESTAMP, last_login TIMESTAMP
+        );
+        CREATE TABLE financial_years (
+            id INTEGER PRIMARY KEY, fy_code TEXT, display_name TEXT, start_date DATE,
+            end_date DATE, status TEXT, created_at TIMESTAMP
+        );
+        CREATE TABLE account_master (
+            id INTEGER PRIMARY KEY, account_name TEXT, account_group_id INTEGER, book_code_id INTEGER,
+            account_type_id INTEGER, opening_balance DECIMAL(15, 2), balance_type TEXT, status TEXT,
+            account_code TEXT, created_at TIMESTAMP
+        );
+    """)
+    conn.executemany("INSERT INTO companies (id, company_code, company_name, state, city, gst_number, "
+                     "pan_number, logo_path, status, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", [
+                         (1, 'ACME-001', 'Acme Corporation', 'Maharashtra', 'Mumbai', '27AABCT1332L1Z5',
+                          'AABCT1332L', '', 'Active', '2024-01-05 10:00:00'),
+                         (2, 'GLBX-002', 'Globex Inc.', 'Karnataka', 'Bangalore', '29AABCG1234M1Z6',
+                          'AABCG1234M', '', 'Active', '2024-01-06 10:00:00'),
+                         (4, 'WAYNE-004', 'Wayne Enterprises', None, None, None, None, None, None,
+                          '2024-01-07 10:00:00')])
+    conn.executemany("INSERT INTO users VALUES (?, ?, ?, ?, ?, ?, ?, ?)", [
+        (i, f"user{i}", 'x' * 64, f"user{i}@example.com", f"User {i}", None if i % 10 == 0 else i % 2 + 1,
+         '2024-02-01 09:00:00', None)
+        for i in range(1, USER_COUNT + 1)])
+    conn.executemany("INSERT INTO financial_years VALUES (?, ?, ?, ?, ?, ?, ?)", [
+        (1, 'FY2425', 'FY 2024-25', '2024-04-01', '2025-03-31', 'Active', '2024-03-01 00:00:00'),
+        (2, 'FY2526', 'FY 2025-26', '2025-04-01', '2026-03-31', 'Active', '2024-03-01 00:00:00'),
+        (3, 'FY2627', 'FY 2026-27', '2026-04-01', '2027-03-31', 'Inactive', '2024-03-01 00:00:00')])
+    conn.commit()
+    conn.close()
+    return path
+
+
+def setup_migration_target(fixture_path):
+    """Voucher test database with users/companies tables; its accounts are added to the fixture"""
+    db_path, cash_id, sales_id, partner_id = setup_database()
+    auth_module.DB_PATH = db_path
+    auth = AuthHandler()
+    auth.connect()
+    auth.disconnect()
+
+    target = sqlite3.connect(db_path)
+    accounts = target.execute("""
+        SELECT id, account_name, account_group_id, book_code_id, account_type_id, balance_type,
+               status, account_code
+        FROM account_master ORDER BY id
+    """).fetchall()
+    target.close()
+    fixture = sqlite3.connect(fixture_path)
+    for account in accounts:
+        opening = 1234.56 if account[0] == cash_id else 0
+        fixture.execute("INSERT INTO account_master VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, NULL)",
+                        account[:5] + (opening,) + account[5:])
+    fixture.execute("INSERT INTO account_master VALUES (?, 'Bank', ?, 1, ?, 99.99, 'Debit', 'Active', "
+                    "'BANK01', NULL)", (cash_id + 100,) + accounts[0][2:3] + accounts[0][4:5])
+    fixture.commit()
+    fixture.close()
+    return db_path, cash_id
+
+
+class InterruptedSource(SQLiteSource):
+    """Fixture source that fails after handing out `chunks` chunks of a stream"""
+
+    def __init__(self, path, chunks):
+        super().__init__(path)
+        self.chunks = chunks
+        self.stream_starts = []
+
+    def stream(self, table, columns, key, after=None, chunk_size=1000):
+        self.stream_starts.append((table, after))
+        for number, rows in enumerate(super().stream(table, columns, key, after, chunk_size)):
+            if number == self.chunks:
+                raise sqlite3.OperationalError("Lost connection to MySQL server during query")
+            yield rows
+
+
+def test_migrate_all_tables():
+    print("\n" + "=" * 70)
+    print("Testing the migration of all tables")
+    print("=" * 70 + "\n")
+
+    fixture_path = create_fixture_dump()
+    db_path, cash_id = setup_migration_target(fixture_path)
+
+    print("1. Migrating...")
+    handler = MigrationHandler(SQLiteSource(fixture_path), db_path, chunk_size=1000)
+    assert handler.connect()
+    success, message, results = handler.migrate()
+    assert success, message
+    by_table = {result['table']: result for result in results}
+    assert by_table['users']['status'] == 'Verified' and by_table['users']['rows_copied'] == USER_COUNT
+    assert by_table['states']['status'] == 'Skipped'
+    print(f"   ✓ {message}\n")
+
+    print("2. Checking the copied rows...")
+    target = sqlite3.connect(db_path)
+    assert target.execute("SELECT COUNT(*) FROM users").fetchone()[0] == USER_COUNT
+    company = target.execute("SELECT bill_to_address, state, status FROM companies WHERE id = 4").fetchone()
+    assert company == ('', '', None)
+    assert target.execute("SELECT fy_code FROM financial_years WHERE id = 3").fetchone()[0] == 'FY2627'
+    openings = target.execute("SELECT id, opening_balance FROM account_master ORDER BY id").fetchall()
+    assert (cash_id, 123456) in openings and (cash_id + 100, 9999) in openings
+    target.close()
+
+    vouchers = VoucherHandler(db_path)
+    vouchers.connect()
+    assert vouchers.get_account_balance('account', cash_id, 1)['opening_balance'] == 1234.56
+    assert vouchers.get_financial_year_for_date('2026-05-01')['fy_code'] == 'FY2627'
+    assert vouchers.find_balance_drift() == []
+    vouchers.disconnect()
+    print("   ✓ Money in paise, NULLs filled with defaults, balances rebuilt\n")
+
+    print("3. Running again...")
+    success, message, results = handler.migrate()
+    assert success and all(r['status'] in ('Verified', 'Skipped') for r in results)
+    assert {r['message'] for r in results if r['table'] == 'users'} == {"already migrated"}
+
+    fixture = sqlite3.connect(fixture_path)
+    fixture.execute("UPDATE users SET full_name = 'Renamed' WHERE id = 7")
+    fixture.commit()
+    fixture.close()
+    target = sqlite3.connect(db_path)
+    target.execute("UPDATE users SET email = 'changed@example.com' WHERE id = 8")
+    target.commit()
+    target.close()
+    assert handler.verify_table('users') == (False, "checksum mismatch")
+    success, message, _ = handler.migrate(['users'], restart=True)
+    assert success, message
+    handler.disconnect()
+    print("   ✓ Verified tables are skipped, changes are detected and re-copied\n")
+
+
+def test_resume_interrupted_migration():
+    print("\n" + "=" * 70)
+    print("Testing an interrupted migration")
+    print("=" * 70 + "\n")
+
+    fixture_path = create_fixture_dump()
+    db_path, _cash_id = setup_migration_target(fixture_path)
+
+    print("1. Losing the source after two chunks...")
+    source = InterruptedSource(fixture_path, chunks=2)
+    handler = MigrationHandler(source, db_path, chunk_size=1000)
+    handler.connect()
+    success, message, _ = handler.migrate(['companies', 'users'])
+    assert not success and 'Lost connection' in message
+    checkpoint = handler.get_checkpoint('users')
+    assert checkpoint['status'] == 'Copying' and checkpoint['last_key'] == 2000
+    assert checkpoint['rows_copied'] == 2000
+    handler.disconnect()
+    print(f"   ✓ {message}\n")
+
+    print("2. Resuming...")
+    source = InterruptedSource(fixture_path, chunks=None)
+    handler = MigrationHandler(source, db_path, chunk_size=1000)
+    handler.connect()
+    success, message, results = handler.migrate(['companies', 'users'])
+    assert success, message
+    assert ('users', 2000) in source.stream_starts and ('companies', None) not in source.stream_starts
+    assert results[1]['rows_copied'] == USER_COUNT
+    handler.disconnect()
+    print(f"   ✓ {message}, copy continued after key 2000\n")
+
+
+if __name__ == "__main__":
+    try:
+        test_migrate_all_tables()
+        test_resume_interrupted_migration()
+
+        print("\n" + "=" * 70)
+        print("ALL TESTS COMPLETED SUCCESSFULLY!")
+        print("=" * 70 + "\n")
+
+    except Exception as e:
+        print("\n" + "=" * 70)
+        print("ERROR OCCURRED DURING TESTING")
+        print("=" * 70)
+        print(f"\nError: {e}")
+        traceback.print_exc()
+        sys.exit(1)
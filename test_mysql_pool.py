@@ -0,0 +1,303 @@
+"""
+Test script for the MySQL connection pool and the batched EntityHandler calls
+A fake mysql.connector is injected through sys.modules, no MySQL server is needed.
+"""
+
+import importlib
+import sys
+import traceback
+import types
+from unittest import mock
+
+
+class Error(Exception):
+    pass
+
+
+class PoolError(Error):
+    pass
+
+
+class InternalError(Error):
+    pass
+
+
+class Server:
+    """The fake server's state: table rows and every statement received"""
+
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+        self.statements = []
+
+
+class Cursor:
+    def __init__(self, connection, dictionary=False, buffered=None):
+        self.connection = connection
+        self.dictionary = dictionary
+        self.buffered = buffered
+        self.pending = []
+        self.lastrowid = None
+        self.rowcount = -1
+
+    def execute(self, query, params=()):
+        if self.connection.unread_result:
+            raise InternalError("Unread result found")
+        self.connection.server.statements.append((query, params))
+        if query.lstrip().upper().startswith('SELECT'):
+            self.pending = list(self.connection.server.rows)
+            self.connection.unread_result = not self.buffered and bool(self.pending)
+        else:
+            self.connection.in_transaction = True
+            self.rowcount = 1
+
+    def executemany(self, query, seq_params):
+        seq_params = list(seq_params)
+        self.connection.server.statements.append((query, seq_params))
+        self.connection.in_transaction = True
+        self.rowcount = len(seq_params)
+
+    def fetchmany(self, size=1):
+        rows, self.pending = self.pending[:size], self.pending[size:]
+        if not self.pending:
+            self.connection.unread_result = False
+        return rows
+
+    def fetchall(self):
+        return self.fetchmany(len(self.pending))
+
+    def close(self):
+        if self.connection.unread_result:
+            raise InternalError("Unread result found")
+
+
+class Connection:
+    """A server session"""
+
+    def __init__(self, server):
+        self.server = server
+        self.in_transaction = False
+        self.unread_result = False
+        self.pings = 0
+        self.reconnects = 0
+        self.rollbacks = 0
+
+    def cursor(self, dictionary=False, buffered=None):
+        return Cursor(self, dictionary, buffered)
+
+    def commit(self):
+        self.in_transaction = False
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.in_transaction = False
+
+    def consume_results(self):
+        self.unread_result = False
+
+    def ping(self, reconnect=False, attempts=1, delay=0):
+        self.pings += 1
+
+    def reconnect(self, attempts=1, delay=0):
+        self.reconnects += 1
+
+
+class PooledConnection:
+    """mysql.connector.pooling.PooledMySQLConnection: close() returns the session to the pool"""
+
+    def __init__(self, pool, cnx):
+        self._pool = pool
+        self._cnx = cnx
+
+    def __getattr__(self, name):
+        return getattr(self._cnx, name)
+
+    def close(self):
+        if self._cnx.unread_result:
+            raise InternalError("Unread result found")
+        self._pool.available.append(self._cnx)
+
+
+class MySQLConnectionPool:
+    server = None
+
+    def __init__(self, pool_name, pool_size, pool_reset_session=True, **config):
+        self.pool_name = pool_name
+        self.pool_size = pool_size
+        self.available = [Connection(self.server) for _ in range(pool_size)]
+
+    def get_connection(self):
+        if not self.available:
+            raise PoolError("Failed getting connection; pool exhausted")
+        return PooledConnection(self, self.available.pop())
+
+
+def broken_rollback():
+    raise Error("Lost connection to MySQL server during query")
+
+
+def fake_mysql_modules():
+    connector = types.ModuleType('mysql.connector')
+    pooling = types.ModuleType('mysql.connector.pooling')
+    pooling.MySQLConnectionPool = MySQLConnectionPool
+    connector.pooling = pooling
+    connector.Error = Error
+    connector.PoolError = PoolError
+    connector.InternalError = InternalError
+    mysql = types.ModuleType('mysql')
+    mysql.connector = connector
+    return {'mysql': mysql, 'mysql.connector': connector, 'mysql.connector.pooling': pooling}
+
+
+def import_with_fake_mysql(server):
+    """Fresh database.mysql_pool and database.entity_handler on top of the fake connector"""
+    MySQLConnectionPool.server = server
+    for name in ('database.mysql_pool', 'database.entity_handler'):
+        sys.modules.pop(name, None)
+    return (importlib.import_module('database.mysql_pool'),
+            importlib.import_module('database.entity_handler'))
+
+
+def test_pool_checkout():
+    print("\n" + "=" * 70)
+    print("Testing the MySQL pool")
+    print("=" * 70 + "\n")
+
+    with mock.patch.dict(sys.modules, fake_mysql_modules()):
+        mysql_pool, _ = import_with_fake_mysql(Server())
+        pool = mysql_pool.MySQLPool(config={'host': 'fake'}, pool_size=2, name='test_pool')
+
+        print("1. Checkout and return...")
+        with pool.connection() as first:
+            with pool.connection():
+                assert pool.stats['in_use'] == 2 and not pool.pool.available
+            assert pool.stats['in_use'] == 1
+        assert pool.stats['in_use'] == 0 and pool.stats['checkouts'] == 2
+        assert len(pool.pool.available) == 2 and len(pool.idle_since) == 2
+        print("   ✓ Connections go back to the pool\n")
+
+        print("2. Idle connections are pinged, long-idle ones reconnected...")
+        session = first._cnx
+        pool.pool.available.remove(session)
+        pool.pool.available.append(session)
+        pool.idle_since[id(session)] -= mysql_pool.HEALTH_CHECK_SECONDS + 1
+        with pool.connection() as connection:
+            assert connection._cnx is session
+        assert session.pings == 1 and session.reconnects == 0 and pool.stats['health_checks'] == 1
+
+        pool.idle_since[id(session)] -= mysql_pool.MAX_IDLE_SECONDS + 1
+        with pool.connection() as connection:
+            assert connection._cnx is session
+        assert session.pings == 1 and session.reconnects == 1 and pool.stats['reconnects'] == 1
+
+        with pool.connection():
+            pass
+        assert session.pings == 1 and session.reconnects == 1
+        print("   ✓ Health check after HEALTH_CHECK_SECONDS, reconnect after MAX_IDLE_SECONDS\n")
+
+        print("3. Open transactions are rolled back on return...")
+        try:
+            with pool.connection() as connection:
+                connection.cursor().execute("UPDATE items SET mrp = %s WHERE id = %s", (1, 1))
+                raise Error("lost the server halfway")
+        except Error:
+            pass
+        assert connection._cnx.rollbacks == 1 and not connection._cnx.in_transaction
+        assert pool.stats['in_use'] == 0 and len(pool.pool.available) == 2
+        print("   ✓ Uncommitted work does not leak into the next checkout\n")
+
+        print("4. Rollback failing because the server went away...")
+        for session in pool.pool.available:
+            session.rollback = broken_rollback
+        for attempt in range(2):
+            try:
+                with pool.connection() as connection:
+                    connection.cursor().execute("UPDATE items SET mrp = %s WHERE id = %s", (2, attempt))
+                    raise Error("server closed the connection")
+            except Error as e:
+                assert str(e) == "server closed the connection", e
+        assert pool.stats['in_use'] == 0 and len(pool.pool.available) == 2
+        with pool.connection():
+            pass
+        print("   ✓ Connections still returned, the original error is raised\n")
+
+        print("5. Waiting on an exhausted pool...")
+        with mock.patch.object(mysql_pool, 'CHECKOUT_TIMEOUT_SECONDS', 0.1):
+            with pool.connection(), pool.connection():
+                try:
+                    with pool.connection():
+                        raise AssertionError("the pool has only two connections")
+                except PoolError:
+                    pass
+        assert pool.stats['exhausted'] >= 1 and pool.stats['in_use'] == 0
+        print(f"   ✓ Gave up after the timeout ({pool.stats['exhausted']} empty attempts)\n")
+
+
+def test_entity_batches():
+    print("\n" + "=" * 70)
+    print("Testing the batched EntityHandler calls")
+    print("=" * 70 + "\n")
+
+    server = Server(rows=[{'id': n, 'name': f"Item {n}"} for n in range(1, 26)])
+    with mock.patch.dict(sys.modules, fake_mysql_modules()):
+        _, entity_handler = import_with_fake_mysql(server)
+        handler = entity_handler.EntityHandler({'host': 'fake', 'database': 'batches'})
+        assert handler.connect()
+
+        print("1. create_many in batches...")
+        records = [{'name': f"Item {n}", 'mrp': n * 100} for n in range(1, 12)]
+        success, message, count = handler.create_many('items', records, batch_size=5)
+        assert success and count == 11, message
+        batches = [params for query, params in server.statements if query.startswith('INSERT')]
+        assert [len(batch) for batch in batches] == [5, 5, 1]
+        assert batches[0][0] == ('Item 1', 100) and batches[2][0] == ('Item 11', 1100)
+        assert handler.create_many('items', []) == (True, "No records to create", 0)
+        success, message, count = handler.create_many('items', [{'name': 'A'}, {'mrp': 1}])
+        assert not success and count == 0
+        print(f"   ✓ {message}\n")
+
+        print("2. update_many grouped by changed columns...")
+        server.statements.clear()
+        updates = [(1, {'mrp': 150}), (2, {'name': 'Renamed', 'mrp': 90}), (3, {'mrp': 175})]
+        success, message, count = handler.update_many('items', updates)
+        assert success and count == 3, message
+        assert server.statements == [
+            ("UPDATE items SET mrp = %s WHERE id = %s", [(150, 1), (175, 3)]),
+            ("UPDATE items SET name = %s, mrp = %s WHERE id = %s", [('Renamed', 90, 2)]),
+        ]
+        print(f"   ✓ {message}\n")
+
+        print("3. iter_all streams in fetch_size chunks...")
+        assert [row['id'] for row in handler.iter_all('items', fetch_size=10)] == list(range(1, 26))
+        print("   ✓ All 25 rows streamed\n")
+
+        print("4. Stopping iter_all early...")
+        rows = handler.iter_all('items', fetch_size=10)
+        assert next(rows)['id'] == 1
+        rows.close()
+        pool = handler.pool
+        assert pool.stats['in_use'] == 0 and len(pool.pool.available) == pool.pool.pool_size
+        assert not any(session.unread_result for session in pool.pool.available)
+        for row in handler.iter_all('items', fetch_size=10):
+            if row['id'] == 12:
+                break
+        assert handler.get_all('items')[0]['id'] == 1
+        print("   ✓ Unread rows drained, the connection is reusable\n")
+        handler.disconnect()
+
+
+if __name__ == "__main__":
+    try:
+        test_pool_checkout()
+        test_entity_batches()
+
+        print("\n" + "=" * 70)
+        print("ALL TESTS COMPLETED SUCCESSFULLY!")
+        print("=" * 70 + "\n")
+
+    except Exception as e:
+        print("\n" + "=" * 70)
+        print("ERROR OCCURRED DURING TESTING")
+        print("=" * 70)
+        print(f"\nError: {e}")
+        traceback.print_exc()
+        sys.exit(1)
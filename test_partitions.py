@@ -0,0 +1,175 @@
+"""
+Test script for per-financial-year partition files
+Runs against a temporary SQLite database, the real financial_data.db is not touched.
+"""
+
+import os
+import sqlite3
+import sys
+import traceback
+
+from database.account_master_handler import AccountMasterHandler
+from database.partition_financial_years import partition_financial_years
+from database.partition_router import ID_BLOCK, PARTITIONED_TABLES, partition_path
+from database.sales_invoice_handler import SalesInvoiceHandler
+from database.trial_balance_handler import TrialBalanceHandler
+from database.voucher_handler import VoucherHandler
+from test_sales_invoice import setup_invoice_database
+
+
+def count_rows(path, table):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def setup_partition_database():
+    """
+    Invoice test database with an invoice and a journal voucher in each of
+    FY2425 and FY2526, before partitioning
+    Returns (db_path, partner_id, sales_id, tax_account_id, pen_id, first_voucher_id)
+    """
+    db_path, partner_id, sales_id, tax_account_id, pen_id, _book_id = setup_invoice_database()
+
+    invoices = SalesInvoiceHandler(db_path)
+    invoices.connect()
+    for invoice_date in ('2024-06-10', '2025-05-02'):
+        success, message, _ = invoices.create_invoice({
+            'company_id': 1, 'partner_id': partner_id, 'invoice_date': invoice_date,
+            'tax_account_id': tax_account_id, 'sales_account_id': sales_id}, [{'item_id': pen_id, 'quantity': 10}])
+        assert success, message
+    first_voucher_id = None
+    for voucher_date in ('2024-08-01', '2025-08-01'):
+        success, message, voucher_id = invoices.voucher_handler.post_voucher(
+            {'voucher_type': 'Journal', 'voucher_date': voucher_date},
+            [{'account_kind': 'partner', 'account_id': partner_id, 'debit': 40},
+             {'account_kind': 'account', 'account_id': sales_id, 'credit': 40}])
+        assert success, message
+        first_voucher_id = first_voucher_id or voucher_id
+    invoices.disconnect()
+
+    return db_path, partner_id, sales_id, tax_account_id, pen_id, first_voucher_id
+
+
+def test_partition_migration():
+    print("\n" + "=" * 70)
+    print("Testing the move of each financial year into its own file")
+    print("=" * 70 + "\n")
+
+    db_path, partner_id, _sales_id, _tax_account_id, _pen_id, voucher_id = setup_partition_database()
+
+    handler = TrialBalanceHandler(db_path)
+    handler.connect()
+    before = {fy_id: handler.get_trial_balance(fy_id)['totals'] for fy_id in (1, 2)}
+    handler.disconnect()
+
+    print("1. Partitioning...")
+    assert partition_financial_years(db_path)
+    for table in PARTITIONED_TABLES:
+        assert count_rows(db_path, table) == 0, table
+    year_files = [partition_path(db_path, code) for code in ('FY2425', 'FY2526')]
+    assert [count_rows(path, 'sales_invoices') for path in year_files] == [1, 1]
+    assert [count_rows(path, 'vouchers') for path in year_files] == [2, 2]
+    assert count_rows(year_files[0], 'sales_invoice_lines') == 1
+    print("   ✓ Main file emptied, one invoice and two vouchers per year file\n")
+
+    print("2. Reading through the router...")
+    TrialBalanceHandler.clear_cache()
+    handler = TrialBalanceHandler(db_path)
+    handler.connect()
+    assert {fy_id: handler.get_trial_balance(fy_id)['totals'] for fy_id in (1, 2)} == before
+    handler.disconnect()
+
+    vouchers = VoucherHandler(db_path)
+    vouchers.connect()
+    assert vouchers.get_voucher_by_id(voucher_id)['voucher_date'] == '2024-08-01'
+    assert len(vouchers.get_vouchers_by_financial_year(2)) == 2
+    assert vouchers.find_balance_drift() == []
+    assert vouchers.rebuild_account_balances()[0] and vouchers.find_balance_drift() == []
+    print("   ✓ Trial balances unchanged, lookups and drift check across files\n")
+
+    print("3. Writing into the year file...")
+    success, message, new_id = vouchers.post_voucher(
+        {'voucher_type': 'Journal', 'voucher_date': '2025-09-01'},
+        [{'account_kind': 'partner', 'account_id': partner_id, 'debit': 5},
+         {'account_kind': 'account', 'account_id': 1, 'credit': 5}])
+    assert success, message
+    assert new_id > 2 * ID_BLOCK and count_rows(year_files[1], 'vouchers') == 3
+    assert vouchers.get_account_balance('partner', partner_id, 2)['debit_total'] > 0
+    vouchers.disconnect()
+    print(f"   ✓ New FY2526 voucher {new_id} stored in its year file\n")
+
+
+def test_closed_year():
+    print("\n" + "=" * 70)
+    print("Testing closed and compacted financial years")
+    print("=" * 70 + "\n")
+
+    db_path, partner_id, sales_id, tax_account_id, pen_id, _voucher_id = setup_partition_database()
+    assert partition_financial_years(db_path)
+    year_file = partition_path(db_path, 'FY2425')
+
+    vouchers = VoucherHandler(db_path)
+    vouchers.connect()
+    lines = [{'account_kind': 'partner', 'account_id': partner_id, 'debit': 5},
+             {'account_kind': 'account', 'account_id': sales_id, 'credit': 5}]
+
+    print("1. Closing FY2425...")
+    success, message = vouchers.router.close_year(1)
+    assert success, message
+    assert not os.access(year_file, os.W_OK) or os.geteuid() == 0
+    success, message, _ = vouchers.post_voucher({'voucher_type': 'Journal', 'voucher_date': '2024-09-01'}, lines)
+    assert not success and 'closed' in message
+    assert len(vouchers.get_vouchers_by_financial_year(1)) == 2
+
+    invoices = SalesInvoiceHandler(db_path)
+    invoices.connect()
+    success, message, _ = invoices.create_invoice({
+        'company_id': 1, 'partner_id': partner_id, 'invoice_date': '2024-09-01',
+        'tax_account_id': tax_account_id, 'sales_account_id': sales_id}, [{'item_id': pen_id, 'quantity': 1}])
+    assert not success and 'closed' in message
+    invoices.disconnect()
+    print(f"   ✓ {message}\n")
+
+    print("2. Editing masters of a closed books-start year...")
+    accounts = AccountMasterHandler()
+    accounts.connect()
+    account = dict(accounts.get_account_by_id(sales_id))
+    success, message = accounts.update_account(sales_id, dict(account, account_name='Sales A/c'))
+    assert success, message
+    success, message = accounts.update_account(sales_id, dict(account, opening_balance=99))
+    assert not success and 'closed' in message
+    accounts.disconnect()
+    print("   ✓ Renaming allowed, changing the opening balance refused\n")
+
+    print("3. Compacting and reopening...")
+    success, message = vouchers.router.compact_year(1)
+    assert success, message
+    assert vouchers.get_account_balance('account', sales_id, 1)['credit_total'] > 0
+    success, message = vouchers.router.reopen_year(1)
+    assert success, message
+    success, message, _ = vouchers.post_voucher({'voucher_type': 'Journal', 'voucher_date': '2024-09-01'}, lines)
+    assert success, message
+    assert count_rows(year_file, 'vouchers') == 3
+    vouchers.disconnect()
+    print("   ✓ Compacted while closed, writable again after reopening\n")
+
+
+if __name__ == "__main__":
+    try:
+        test_partition_migration()
+        test_closed_year()
+
+        print("\n" + "=" * 70)
+        print("ALL TESTS COMPLETED SUCCESSFULLY!")
+        print("=" * 70 + "\n")
+
+    except Exception as e:
+        print("\n" + "=" * 70)
+        print("ERROR OCCURRED DURING TESTING")
+        print("=" * 70)
+        print(f"\nError: {e}")
+        traceback.print_exc()
+        sys.exit(1)
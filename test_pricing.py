@@ -0,0 +1,79 @@
+"""
+Test script for the vectorized pricing and GST engine
+Checks known amounts and compares the engine with the Decimal reference implementation.
+"""
+
+import sys
+import traceback
+
+import numpy as np
+
+from benchmarks.pricing_dataset import random_lines
+from utils.pricing import (AMOUNT_FIELDS, invoice_totals, price_line_reference,
+                           price_lines, price_lines_reference)
+
+
+def test_known_amounts():
+    print("\n" + "=" * 70)
+    print("Testing pricing engine")
+    print("=" * 70 + "\n")
+
+    # Test 1: Intra-state, tax on top of the rate
+    print("1. Intra-state line...")
+    amounts = price_lines([3], [33.33], [10], [18])
+    assert amounts['gross'][0] == 9999
+    assert amounts['discount'][0] == 1000
+    assert amounts['taxable'][0] == 8999
+    assert amounts['cgst'][0] == amounts['sgst'][0] == 810
+    assert amounts['total'][0] == 10619
+    print("   ✓ 3 x 33.33 less 10% = 89.99 + CGST 8.10 + SGST 8.10\n")
+
+    # Test 2: Inter-state and tax-inclusive (MRP) lines
+    print("2. Inter-state and tax-inclusive lines...")
+    amounts = price_lines([1, 1], [118, 100.01], 0, [18, 5],
+                          inter_state=[True, False], tax_inclusive=[True, True])
+    assert amounts['taxable'].tolist() == [10000, 9525]
+    assert amounts['igst'].tolist() == [1800, 0]
+    assert amounts['cgst'].tolist() == [0, 238]
+    assert amounts['sgst'].tolist() == [0, 238]
+    assert amounts['total'].tolist() == [11800, 10001]
+    print("   ✓ Inclusive totals equal the price, odd paisa kept\n")
+
+    # Test 3: Half-paisa amounts round away from zero, also for returns
+    print("3. Rounding...")
+    assert price_line_reference(1, 0.05, 10)['discount'] == 1
+    assert price_lines([1, -1], [0.05, 0.05], 10)['discount'].tolist() == [1, -1]
+    print("   ✓ 0.5 paise rounds to 1 / -1\n")
+
+
+def test_matches_reference():
+    print("4. Comparing with the Decimal reference on 20,000 lines...")
+    lines = random_lines(20000)
+    amounts = price_lines(*lines)
+    reference = price_lines_reference(*lines)
+    for field in AMOUNT_FIELDS:
+        assert amounts[field].tolist() == reference[field], field
+
+    invoice_index = np.arange(20000) // 50
+    totals = invoice_totals(amounts, invoice_index)
+    assert totals['total'].sum() == sum(reference['total'])
+    assert totals['total'][0] == sum(reference['total'][:50])
+    print("   ✓ Every amount identical, invoice totals exact\n")
+
+
+if __name__ == "__main__":
+    try:
+        test_known_amounts()
+        test_matches_reference()
+
+        print("\n" + "=" * 70)
+        print("ALL TESTS COMPLETED SUCCESSFULLY!")
+        print("=" * 70 + "\n")
+
+    except Exception as e:
+        print("\n" + "=" * 70)
+        print("ERROR OCCURRED DURING TESTING")
+        print("=" * 70)
+        print(f"\nError: {e}")
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,210 @@
+"""
+Test script for sales invoices, invoice numbering and voucher posting
+Runs against a temporary SQLite database, the real financial_data.db is not touched.
+"""
+
+import sqlite3
+import sys
+import threading
+import traceback
+
+import database.company_handler as company_module
+import database.item_handler as item_module
+import database.state_handler as state_module
+from database.account_master_handler import AccountMasterHandler
+from database.company_handler import CompanyHandler
+from database.item_handler import ItemHandler
+from database.sales_invoice_handler import SalesInvoiceHandler
+from database.state_handler import StateHandler
+from database.voucher_handler import VoucherHandler
+from test_voucher_balances import setup_database
+
+
+def setup_invoice_database():
+    """
+    Voucher test database plus an Output GST account, two items and two companies
+    (1 in Maharashtra like the partner, 2 in Gujarat)
+    Returns (db_path, partner_id, sales_id, tax_account_id, taxable_item_id, exempt_item_id)
+    """
+    db_path, cash_id, sales_id, partner_id = setup_database()
+    for module in (company_module, item_module, state_module):
+        module.DB_PATH = db_path
+
+    company_handler = CompanyHandler()
+    company_handler.connect()
+    for code, state in (('C1', 'Maharashtra'), ('C2', 'Gujarat')):
+        company_handler.create_company({
+            'company_code': code, 'company_name': f'Company {code}', 'bill_to_address': '-',
+            'ship_to_address': '-', 'state': state, 'city': '-', 'gst_number': '-',
+            'pan_number': '-', 'logo_path': '-'})
+    company_handler.disconnect()
+
+    state_handler = StateHandler()
+    state_handler.connect()
+    _, _, state_id = state_handler.create_state({'state_code': 'MH', 'state_name': 'Maharashtra'})
+    state_handler.disconnect()
+
+    conn = sqlite3.connect(db_path)
+    sales_code, group_id, type_id = conn.execute(
+        "SELECT account_code, account_group_id, account_type_id FROM account_master WHERE id = ?",
+        (sales_id,)).fetchone()
+    conn.execute("UPDATE business_partners SET state_id = ? WHERE id = ?", (state_id, partner_id))
+    conn.commit()
+    conn.close()
+
+    am_handler = AccountMasterHandler()
+    am_handler.connect()
+    _, _, tax_account_id = am_handler.create_account({
+        'account_name': 'Output GST', 'account_group_id': group_id, 'book_code_id': 4,
+        'account_type_id': type_id, 'opening_balance': 0, 'balance_type': 'Credit'})
+    am_handler.disconnect()
+
+    item_handler = ItemHandler()
+    item_handler.connect()
+    _, _, taxable_item_id = item_handler.create_item({
+        'item_code': 'PEN01', 'item_name': 'Pen', 'gst_percentage': 18, 'hsn_code': '9608',
+        'sale_rate_wh1': 10, 'sale_rate_wh2': 9, 'discount_wh1': 10,
+        'sales_account_code': sales_code})
+    _, _, exempt_item_id = item_handler.create_item({
+        'item_code': 'BOOK01', 'item_name': 'Book', 'gst_percentage': 0, 'hsn_code': '4901',
+        'sale_rate_wh1': 100, 'sale_rate_wh2': 95})
+    item_handler.disconnect()
+
+    return db_path, partner_id, sales_id, tax_account_id, taxable_item_id, exempt_item_id
+
+
+def test_sales_invoice():
+    print("\n" + "=" * 70)
+    print("Testing sales invoices")
+    print("=" * 70 + "\n")
+
+    db_path, partner_id, sales_id, tax_account_id, pen_id, book_id = setup_invoice_database()
+    handler = SalesInvoiceHandler(db_path)
+    assert handler.connect()
+
+    # Test 1: Rates, discount, GST% and HSN come from the item master
+    print("1. Saving an invoice...")
+    success, message, invoice_id = handler.create_invoice(
+        {'company_id': 1, 'partner_id': partner_id, 'invoice_date': '2024-06-15',
+         'tax_account_id': tax_account_id, 'sales_account_id': sales_id},
+        [{'item_id': pen_id, 'quantity': 10},
+         {'item_id': book_id, 'quantity': 2}])
+    assert success, message
+    invoice = handler.get_invoice_by_id(invoice_id)
+    assert invoice['invoice_no'] == 'SI/FY2425/00001'
+    pen = invoice['lines'][0]
+    assert (pen['rate'], pen['discount_percentage'], pen['hsn_code']) == (10, 10, '9608')
+    assert pen['taxable_amount'] == 90 and pen['tax_amount'] == 16.2
+    assert pen['cgst_amount'] == pen['sgst_amount'] == 8.1 and pen['igst_amount'] == 0
+    assert invoice['taxable_amount'] == 290
+    assert invoice['total_amount'] == 306.2
+    print(f"   ✓ {message}\n")
+
+    # Test 2: The voucher is posted with the invoice
+    print("2. Checking the posted voucher...")
+    voucher_handler = VoucherHandler(db_path)
+    voucher_handler.connect()
+    voucher = voucher_handler.get_voucher_by_id(invoice['voucher_id'])
+    assert voucher['voucher_type'] == 'Sales'
+    fy_id = invoice['fy_id']
+    assert voucher_handler.get_account_balance('partner', partner_id, fy_id)['debit_total'] == 306.2
+    assert voucher_handler.get_account_balance('account', sales_id, fy_id)['credit_total'] == 290
+    assert voucher_handler.get_account_balance('account', tax_account_id, fy_id)['credit_total'] == 16.2
+    voucher_handler.disconnect()
+    print(f"   ✓ Voucher {voucher['voucher_no']} posted\n")
+
+    # Test 3: Failed saves roll back and do not use up a number
+    print("3. Saving an invalid invoice...")
+    success, message, _ = handler.create_invoice(
+        {'company_id': 1, 'partner_id': partner_id, 'invoice_date': '2024-06-15'},
+        [{'item_id': pen_id, 'quantity': 1}])
+    assert not success
+    success, _, invoice_id = handler.create_invoice(
+        {'company_id': 1, 'partner_id': partner_id, 'invoice_date': '2024-06-16',
+         'sales_account_id': sales_id},
+        [{'item_id': book_id, 'quantity': 1, 'rate': 50}])
+    assert success
+    assert handler.get_invoice_by_id(invoice_id)['invoice_no'] == 'SI/FY2425/00002'
+    print(f"   ✓ Rejected ({message}), next number still 00002\n")
+
+    # Test 4: Series are per company and financial year
+    print("4. Checking numbering series...")
+    _, _, other_company = handler.create_invoice(
+        {'company_id': 2, 'partner_id': partner_id, 'invoice_date': '2024-06-16',
+         'sales_account_id': sales_id},
+        [{'item_id': book_id, 'quantity': 1}])
+    _, _, next_year = handler.create_invoice(
+        {'company_id': 1, 'partner_id': partner_id, 'invoice_date': '2025-04-02',
+         'sales_account_id': sales_id},
+        [{'item_id': book_id, 'quantity': 1}])
+    assert handler.get_invoice_by_id(other_company)['invoice_no'] == 'SI/FY2425/00001'
+    assert handler.get_invoice_by_id(next_year)['invoice_no'] == 'SI/FY2526/00001'
+    print("   ✓ Company 2 and FY2526 start at 00001\n")
+
+    # Test 5: Company 2 (Gujarat) selling to a Maharashtra customer charges IGST
+    print("5. Saving an inter-state invoice...")
+    assert not handler.is_inter_state(1, partner_id)
+    _, _, invoice_id = handler.create_invoice(
+        {'company_id': 2, 'partner_id': partner_id, 'invoice_date': '2024-06-20',
+         'tax_account_id': tax_account_id},
+        [{'item_id': pen_id, 'quantity': 3}])
+    line = handler.get_invoice_by_id(invoice_id)['lines'][0]
+    assert (line['cgst_amount'], line['sgst_amount'], line['igst_amount']) == (0, 0, 4.86)
+    print("   ✓ IGST 4.86 on taxable 27.00\n")
+
+    handler.disconnect()
+
+
+def test_concurrent_counters():
+    print("\n" + "=" * 70)
+    print("Testing concurrent invoice counters")
+    print("=" * 70 + "\n")
+
+    db_path, partner_id, _sales_id, tax_account_id, pen_id, _book_id = setup_invoice_database()
+    counters, invoices_per_counter = 4, 25
+    failures = []
+
+    def run_counter():
+        handler = SalesInvoiceHandler(db_path)
+        handler.connect()
+        for _ in range(invoices_per_counter):
+            success, message, _ = handler.create_invoice(
+                {'company_id': 1, 'partner_id': partner_id, 'invoice_date': '2024-07-01',
+                 'tax_account_id': tax_account_id},
+                [{'item_id': pen_id, 'quantity': 1}])
+            if not success:
+                failures.append(message)
+        handler.disconnect()
+
+    threads = [threading.Thread(target=run_counter) for _ in range(counters)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not failures, failures
+    conn = sqlite3.connect(db_path)
+    serials = [row[0] for row in conn.execute("SELECT serial_no FROM sales_invoices ORDER BY serial_no")]
+    voucher_count = conn.execute("SELECT COUNT(*) FROM vouchers WHERE voucher_type = 'Sales'").fetchone()[0]
+    conn.close()
+    assert serials == list(range(1, counters * invoices_per_counter + 1))
+    assert voucher_count == counters * invoices_per_counter
+    print(f"   ✓ {len(serials)} invoices from {counters} counters, numbers gapless\n")
+
+
+if __name__ == "__main__":
+    try:
+        test_sales_invoice()
+        test_concurrent_counters()
+
+        print("\n" + "=" * 70)
+        print("ALL TESTS COMPLETED SUCCESSFULLY!")
+        print("=" * 70 + "\n")
+
+    except Exception as e:
+        print("\n" + "=" * 70)
+        print("ERROR OCCURRED DURING TESTING")
+        print("=" * 70)
+        print(f"\nError: {e}")
+        traceback.print_exc()
+        sys.exit(1)
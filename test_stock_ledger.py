@@ -0,0 +1,219 @@
+"""
+Test script for the stock ledger and weighted-average / FIFO valuation
+Runs against a temporary SQLite database, the real financial_data.db is not touched.
+"""
+
+import random
+import sqlite3
+import sys
+import traceback
+from datetime import date, timedelta
+
+from database.sales_invoice_handler import SalesInvoiceHandler
+from database.stock_handler import StockHandler
+from test_sales_invoice import setup_invoice_database
+from utils.money import Money
+
+
+def check_ledger_totals(db_path):
+    """Every running balance equals the sum of its movements, FIFO value the sum of its layers"""
+    conn = sqlite3.connect(db_path)
+    mismatches = conn.execute("""
+        SELECT sb.item_id
+        FROM stock_balances sb
+        JOIN (SELECT item_id, SUM(quantity) AS quantity, SUM(average_cost) AS average_value,
+                     SUM(fifo_cost) AS fifo_value
+              FROM stock_movements GROUP BY item_id) m ON m.item_id = sb.item_id
+        LEFT JOIN (SELECT item_id, SUM(quantity) AS quantity, SUM(value) AS value
+                   FROM stock_fifo_layers GROUP BY item_id) l ON l.item_id = sb.item_id
+        WHERE sb.quantity != m.quantity OR sb.average_value != m.average_value
+           OR sb.fifo_value != m.fifo_value
+           OR COALESCE(l.quantity, 0) != sb.quantity OR COALESCE(l.value, 0) != sb.fifo_value
+    """).fetchall()
+    conn.close()
+    assert not mismatches, mismatches
+
+
+def test_stock_valuation():
+    print("\n" + "=" * 70)
+    print("Testing stock ledger and valuation")
+    print("=" * 70 + "\n")
+
+    db_path, partner_id, sales_id, tax_account_id, pen_id, book_id = setup_invoice_database()
+    stock = StockHandler(db_path)
+    assert stock.connect()
+
+    # Test 1: Receipts build quantity and value under both methods
+    print("1. Posting opening stock and a purchase...")
+    success, message, _ = stock.post_movements([
+        {'item_id': pen_id, 'movement_type': 'Opening', 'movement_date': '2024-04-01',
+         'quantity': 10, 'rate': 5},
+        {'item_id': pen_id, 'movement_type': 'Purchase', 'movement_date': '2024-05-01',
+         'quantity': 10, 'rate': 8, 'document_type': 'Purchase Bill', 'document_id': 1}])
+    assert success, message
+    pen = stock.get_stock_on_hand()['items'][0]
+    assert (pen['quantity'], pen['average_value'], pen['fifo_value']) == (20, 130, 130)
+    print(f"   ✓ {message}: 20 on hand worth 130.00\n")
+
+    # Test 2: A sales invoice issues tracked items only
+    print("2. Selling through a sales invoice...")
+    invoices = SalesInvoiceHandler(db_path)
+    assert invoices.connect()
+    success, message, invoice_id = invoices.create_invoice(
+        {'company_id': 1, 'partner_id': partner_id, 'invoice_date': '2024-06-15',
+         'tax_account_id': tax_account_id, 'sales_account_id': sales_id},
+        [{'item_id': pen_id, 'quantity': 15}, {'item_id': book_id, 'quantity': 2}])
+    assert success, message
+    ledger = stock.get_stock_ledger(pen_id)
+    sale = ledger[-1]
+    assert (sale['movement_type'], sale['document_type'], sale['document_id']) == ('Sale', 'Sales Invoice', invoice_id)
+    assert sale['quantity'] == -15
+    assert sale['average_cost'] == Money.of('-97.50') and sale['fifo_cost'] == -90
+    assert (sale['balance_quantity'], sale['average_value'], sale['fifo_value']) == (5, 32.5, 40)
+    assert stock.get_stock_ledger(book_id) == []
+    print("   ✓ Cost of 15 pens: 97.50 weighted average, 90.00 FIFO; book not stocked\n")
+
+    # Test 3: Stock cannot go negative, the invoice is rolled back
+    print("3. Selling more than is on hand...")
+    success, message, _ = invoices.create_invoice(
+        {'company_id': 1, 'partner_id': partner_id, 'invoice_date': '2024-06-20',
+         'tax_account_id': tax_account_id},
+        [{'item_id': pen_id, 'quantity': 6}])
+    assert not success and 'insufficient stock' in message
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT COUNT(*) FROM sales_invoices").fetchone()[0] == 1
+    conn.close()
+    invoices.disconnect()
+    print(f"   ✓ Rejected ({message})\n")
+
+    # Test 4: A backdated purchase is applied at once and flags the item
+    print("4. Posting a backdated purchase...")
+    success, _, _ = stock.post_movements([
+        {'item_id': pen_id, 'movement_type': 'Purchase', 'movement_date': '2024-06-01',
+         'quantity': 5, 'rate': 10}])
+    assert success
+    assert stock.get_revaluation_start() == '2024-06-01'
+    pen = stock.get_stock_on_hand()['items'][0]
+    assert (pen['quantity'], pen['average_value'], pen['fifo_value']) == (10, 82.5, 90)
+    print("   ✓ 10 on hand, revaluation pending from 2024-06-01\n")
+
+    # Test 5: Revaluation re-costs the sale as if the purchase came first
+    print("5. Revaluing the financial year...")
+    success, message, stats = stock.revalue_financial_year(1)
+    assert success, message
+    assert stats['changed'] == 2 and not stats['short_items']
+    assert stock.get_revaluation_start() is None
+    sale = stock.get_stock_ledger(pen_id, date_from='2024-06-15')[0]
+    assert (sale['average_cost'], sale['fifo_cost']) == (-108, -90)
+    pen = stock.get_stock_on_hand()['items'][0]
+    assert (pen['quantity'], pen['average_value'], pen['fifo_value']) == (10, 72, 90)
+    check_ledger_totals(db_path)
+    print(f"   ✓ {message}\n")
+
+    # Test 6: Adjustments and as-of positions
+    print("6. Adjusting stock and reading past positions...")
+    success, _, _ = stock.post_movements([
+        {'item_id': pen_id, 'movement_type': 'Adjustment', 'movement_date': '2024-07-01', 'quantity': 2},
+        {'item_id': pen_id, 'movement_type': 'Adjustment', 'movement_date': '2024-07-02', 'quantity': -1}])
+    assert success
+    adjustment = stock.get_stock_ledger(pen_id, date_from='2024-07-01')[0]
+    assert adjustment['rate'] == Money.of('7.20') and adjustment['average_cost'] == Money.of('14.40')
+    past = stock.get_stock_on_hand(as_of='2024-05-31')
+    assert past['items'][0]['quantity'] == 20 and past['totals']['average_value'] == 130
+    assert stock.get_stock_on_hand(as_of='2024-03-31')['items'] == []
+    success, message, _ = stock.post_movements([
+        {'item_id': pen_id, 'movement_type': 'Sale', 'quantity': 0}])
+    assert not success
+    check_ledger_totals(db_path)
+    print("   ✓ Gain comes in at the average rate, 20 pens on hand at 2024-05-31\n")
+
+    stock.disconnect()
+
+
+def test_bulk_revaluation():
+    print("\n" + "=" * 70)
+    print("Testing bulk revaluation")
+    print("=" * 70 + "\n")
+
+    db_path = setup_invoice_database()[0]
+    conn = sqlite3.connect(db_path)
+    conn.executemany("INSERT INTO items (item_code, item_name) VALUES (?, ?)",
+                     [(f"BLK{n:03d}", f"Bulk item {n}") for n in range(40)])
+    item_ids = [row[0] for row in conn.execute("SELECT id FROM items WHERE item_code LIKE 'BLK%'")]
+    conn.commit()
+    conn.close()
+
+    stock = StockHandler(db_path)
+    assert stock.connect()
+
+    # Random receipts and issues, posted in shuffled date order
+    print("1. Posting movements out of date order...")
+    rng = random.Random(33)
+    on_hand = dict.fromkeys(item_ids, 0)
+    movements = []
+    for day in range(200):
+        movement_date = (date(2024, 4, 1) + timedelta(days=day)).isoformat()
+        for item_id in rng.sample(item_ids, 5):
+            if on_hand[item_id] > 3 and rng.random() < 0.6:
+                quantity = rng.randint(1, on_hand[item_id] // 2)
+                movements.append({'item_id': item_id, 'movement_type': 'Sale',
+                                  'movement_date': movement_date, 'quantity': quantity})
+                on_hand[item_id] -= quantity
+            else:
+                quantity = rng.randint(5, 50)
+                movements.append({'item_id': item_id, 'movement_type': 'Purchase', 'movement_date': movement_date,
+                                  'quantity': quantity, 'rate': round(rng.uniform(1, 99), 2)})
+                on_hand[item_id] += quantity
+    # Move some purchases earlier in the posting order: still never short, but
+    # everything posted after them up to their date is backdated
+    posting_order = list(movements)
+    for idx in rng.sample(range(len(posting_order)), 40):
+        if posting_order[idx]['movement_type'] == 'Purchase':
+            posting_order.insert(max(0, idx - rng.randint(1, 30)), posting_order.pop(idx))
+    success, message, _ = stock.post_movements(posting_order)
+    assert success, message
+    assert stock.get_revaluation_start() is not None
+    print(f"   ✓ {message}\n")
+
+    # Test 2: Streaming revaluation in small batches gives in-order results
+    print("2. Revaluing in batches of 7...")
+    success, message, stats = stock.revalue('2024-04-01', batch_size=7)
+    assert success, message
+    assert stats['movements'] == len(movements) and not stats['short_items']
+    assert stock.get_revaluation_start() is None
+    check_ledger_totals(db_path)
+    revalued = {row['item_id']: row for row in stock.get_stock_on_hand()['items']}
+
+    expected_db = setup_invoice_database()[0]
+    conn = sqlite3.connect(expected_db)
+    conn.executemany("INSERT INTO items (item_code, item_name) VALUES (?, ?)",
+                     [(f"BLK{n:03d}", f"Bulk item {n}") for n in range(40)])
+    conn.commit()
+    conn.close()
+    expected = StockHandler(expected_db)
+    expected.connect()
+    assert expected.post_movements(movements)[0]
+    for row in expected.get_stock_on_hand()['items']:
+        assert revalued[row['item_id']] == row, (revalued[row['item_id']], row)
+    expected.disconnect()
+    print(f"   ✓ {message}, matches posting in date order\n")
+
+    stock.disconnect()
+
+
+if __name__ == "__main__":
+    try:
+        test_stock_valuation()
+        test_bulk_revaluation()
+
+        print("\n" + "=" * 70)
+        print("ALL TESTS COMPLETED SUCCESSFULLY!")
+        print("=" * 70 + "\n")
+
+    except Exception as e:
+        print("\n" + "=" * 70)
+        print("ERROR OCCURRED DURING TESTING")
+        print("=" * 70)
+        print(f"\nError: {e}")
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,81 @@
+"""
+Test script for the synthetic dataset generator
+Generates small temporary databases, the real financial_data.db is not touched.
+"""
+
+import hashlib
+import sqlite3
+import sys
+import traceback
+
+from benchmarks.synthetic_data import generate_dataset, gstin_check_digit
+from database.voucher_handler import VoucherHandler
+
+
+COUNTS = {'account_groups': 20, 'accounts': 50, 'partners': 200, 'items': 300, 'cities': 30,
+          'item_groups': 10, 'item_companies': 10, 'voucher_lines': 3000, 'years': 2}
+
+
+def table_digest(db_path, *tables):
+    conn = sqlite3.connect(db_path)
+    digest = hashlib.sha256()
+    for table in tables:
+        for row in conn.execute(f"SELECT * FROM {table} ORDER BY 1, 2"):
+            digest.update(repr(row).encode())
+    conn.close()
+    return digest.hexdigest()
+
+
+def test_generated_dataset():
+    print("\n" + "=" * 70)
+    print("Testing the synthetic dataset generator")
+    print("=" * 70 + "\n")
+
+    print("1. Generating the same seed twice...")
+    first = generate_dataset(seed=7, **COUNTS)
+    second = generate_dataset(seed=7, **COUNTS)
+    other = generate_dataset(seed=8, **COUNTS)
+    tables = ('business_partners', 'items', 'vouchers', 'voucher_lines')
+    assert table_digest(first['db_path'], *tables) == table_digest(second['db_path'], *tables)
+    assert table_digest(first['db_path'], *tables) != table_digest(other['db_path'], *tables)
+    assert first['counts']['business_partners'] == 200 and first['counts']['items'] == 300
+    assert first['counts']['voucher_lines'] >= 3000
+    print("   ✓ Identical rows for the same seed\n")
+
+    print("2. Checking the generated rows...")
+    conn = sqlite3.connect(first['db_path'])
+    assert conn.execute("PRAGMA foreign_key_check").fetchall() == []
+    assert conn.execute("""
+        SELECT COUNT(*) FROM (
+            SELECT voucher_id FROM voucher_lines GROUP BY voucher_id HAVING SUM(debit) != SUM(credit)
+        )
+    """).fetchone()[0] == 0
+    gstins = [row[0] for row in conn.execute(
+        "SELECT gst_number FROM business_partners WHERE gst_number IS NOT NULL")]
+    assert gstins and all(len(g) == 15 and gstin_check_digit(g[:14]) == g[14] for g in gstins)
+    assert conn.execute("SELECT COUNT(*) FROM sqlite_master WHERE name = 'idx_voucher_lines_voucher'"
+                        ).fetchone()[0] == 1
+    conn.close()
+
+    vouchers = VoucherHandler(first['db_path'])
+    vouchers.connect()
+    assert vouchers.find_balance_drift() == []
+    vouchers.disconnect()
+    print("   ✓ Balanced vouchers, valid GSTINs, indexes rebuilt, balances consistent\n")
+
+
+if __name__ == "__main__":
+    try:
+        test_generated_dataset()
+
+        print("\n" + "=" * 70)
+        print("ALL TESTS COMPLETED SUCCESSFULLY!")
+        print("=" * 70 + "\n")
+
+    except Exception as e:
+        print("\n" + "=" * 70)
+        print("ERROR OCCURRED DURING TESTING")
+        print("=" * 70)
+        print(f"\nError: {e}")
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,162 @@
+"""
+Test script for per-company database files
+Runs against a temporary SQLite database, the real financial_data.db is not touched.
+"""
+
+import os
+import sqlite3
+import sys
+import traceback
+
+from database.sales_invoice_handler import SalesInvoiceHandler
+from database.split_companies import split_companies
+from database.tenant_router import (TenantConnections, TenantRouter, activate_tenant,
+                                    deactivate_tenants, tenant_db_path)
+from database.trial_balance_handler import TrialBalanceHandler
+from test_sales_invoice import setup_invoice_database
+
+
+def fetch_one(path, query, params=()):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute(query, params).fetchone()
+    finally:
+        conn.close()
+
+
+def trial_balance_debit(path):
+    handler = TrialBalanceHandler(path)
+    handler.connect()
+    try:
+        return handler.get_trial_balance(1)['totals']['debit_total']
+    finally:
+        handler.disconnect()
+
+
+def setup_tenant_database():
+    """
+    Invoice test database with an invoice for each of the two companies and a
+    journal voucher without a company
+    Returns (db_path, partner_id, sales_id, tax_account_id, pen_id)
+    """
+    db_path, partner_id, sales_id, tax_account_id, pen_id, _book_id = setup_invoice_database()
+
+    invoices = SalesInvoiceHandler(db_path)
+    invoices.connect()
+    for company_id, quantity in ((1, 10), (2, 3)):
+        success, message, _ = invoices.create_invoice({
+            'company_id': company_id, 'partner_id': partner_id, 'invoice_date': '2024-06-10',
+            'tax_account_id': tax_account_id, 'sales_account_id': sales_id},
+            [{'item_id': pen_id, 'quantity': quantity}])
+        assert success, message
+    success, message, _ = invoices.voucher_handler.post_voucher(
+        {'voucher_type': 'Journal', 'voucher_date': '2024-08-01'},
+        [{'account_kind': 'partner', 'account_id': partner_id, 'debit': 40},
+         {'account_kind': 'account', 'account_id': sales_id, 'credit': 40}])
+    assert success, message
+    invoices.disconnect()
+
+    return db_path, partner_id, sales_id, tax_account_id, pen_id
+
+
+def test_split_companies():
+    print("\n" + "=" * 70)
+    print("Testing the split of the shared file by company")
+    print("=" * 70 + "\n")
+
+    db_path, partner_id, sales_id, tax_account_id, pen_id = setup_tenant_database()
+    TrialBalanceHandler.clear_cache()
+    shared_debit = trial_balance_debit(db_path)
+
+    print("1. Splitting...")
+    assert split_companies(db_path)
+    tenants = TenantRouter(db_path).get_tenants()
+    c1_path, c2_path = tenants[1], tenants[2]
+    assert os.path.basename(c2_path) == 'test_vouchers_C2.db'
+    assert fetch_one(db_path, "SELECT COUNT(*) FROM vouchers")[0] == 0
+    assert fetch_one(db_path, "SELECT COUNT(*) FROM sales_invoices")[0] == 0
+    # C1 is the default company and keeps the journal without a company
+    assert fetch_one(c1_path, "SELECT COUNT(*) FROM vouchers")[0] == 2
+    assert fetch_one(c2_path, "SELECT company_id, COUNT(*) FROM sales_invoices")[:] == (2, 1)
+    assert fetch_one(c2_path, "SELECT COUNT(*) FROM vouchers")[0] == 1
+    print("   ✓ Each company file holds its own invoices and vouchers, the shared file none\n")
+
+    print("2. Checking balances...")
+    TrialBalanceHandler.clear_cache()
+    c2_debit = trial_balance_debit(c2_path)
+    assert c2_debit == fetch_one(c2_path, "SELECT total_amount FROM sales_invoices")[0] / 100
+    assert trial_balance_debit(c1_path) + c2_debit == shared_debit
+    print(f"   ✓ Trial balances add up to the shared file's {shared_debit}\n")
+
+    print("3. Working in a company file after login...")
+    try:
+        assert activate_tenant(2, directory_path=db_path) == c2_path
+        assert tenant_db_path() == c2_path
+        invoices = SalesInvoiceHandler()
+        assert invoices.db_path == c2_path and invoices.connect()
+        success, message, _ = invoices.create_invoice({
+            'company_id': 2, 'partner_id': partner_id, 'invoice_date': '2024-06-11',
+            'tax_account_id': tax_account_id, 'sales_account_id': sales_id},
+            [{'item_id': pen_id, 'quantity': 1}])
+        invoices.disconnect()
+        assert success and message.endswith('SI/FY2425/00002)'), message
+        assert fetch_one(c2_path, "SELECT COUNT(*) FROM sales_invoices")[0] == 2
+        assert fetch_one(c1_path, "SELECT COUNT(*) FROM sales_invoices")[0] == 1
+    finally:
+        deactivate_tenants()
+    assert tenant_db_path() != c2_path
+    print(f"   ✓ {message}\n")
+
+
+def test_warm_connections():
+    print("\n" + "=" * 70)
+    print("Testing warm company connections")
+    print("=" * 70 + "\n")
+
+    db_path = setup_tenant_database()[0]
+    assert split_companies(db_path)
+
+    print("1. Keeping the most recently used company...")
+    connections = TenantConnections(TenantRouter(db_path), max_warm=1)
+    first = connections.get_connection(1)
+    assert connections.get_connection(1) is first
+    connections.get_connection(2)
+    assert list(connections.connections) == [2]
+    print("   ✓ Company 1 closed when company 2 was opened\n")
+
+    print("2. Refreshing the company directory...")
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE companies SET company_name = 'Renamed' WHERE id = 1")
+    conn.commit()
+    conn.close()
+    conn = connections.get_connection(1)
+    assert conn.execute("SELECT company_name FROM companies WHERE id = 1").fetchone()[0] == 'Renamed'
+    print("   ✓ Company file sees the renamed company\n")
+
+    print("3. Journal modes...")
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("PRAGMA journal_mode = DELETE").fetchone()[0] == 'delete'
+    conn.close()
+    assert connections.get_connection(1).execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+    assert connections.get_connection(99).execute("PRAGMA journal_mode").fetchone()[0] == 'delete'
+    connections.close_all()
+    assert not connections.connections
+    print("   ✓ Company files in WAL, the shared directory keeps its journal mode\n")
+
+
+if __name__ == "__main__":
+    try:
+        test_split_companies()
+        test_warm_connections()
+
+        print("\n" + "=" * 70)
+        print("ALL TESTS COMPLETED SUCCESSFULLY!")
+        print("=" * 70 + "\n")
+
+    except Exception as e:
+        print("\n" + "=" * 70)
+        print("ERROR OCCURRED DURING TESTING")
+        print("=" * 70)
+        print(f"\nError: {e}")
+        traceback.print_exc()
+        sys.exit(1)
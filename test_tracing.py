@@ -0,0 +1,81 @@
+"""
+Test script for the UI action -> handler -> SQL trace spans
+Uses a temporary database and calls the Tk callback wrapper directly, no display is needed.
+"""
+
+import json
+import sys
+import tempfile
+import time
+import traceback
+
+from database import instrumentation
+from database.trial_balance_handler import TrialBalanceHandler
+from test_voucher_balances import setup_database
+from ui_profiler import ProfilingCallWrapper
+from utils import tracing
+
+
+def test_action_trace():
+    print("\n" + "=" * 70)
+    print("Testing the trace spans")
+    print("=" * 70 + "\n")
+
+    db_path, _, _, _ = setup_database()
+    output_dir = tempfile.mkdtemp()
+    tracer = tracing.enable(output_dir, min_seconds=0)
+    try:
+        handler = TrialBalanceHandler(db_path)
+        handler.connect()
+
+        print("1. Tracing one UI action...")
+
+        def open_report():
+            TrialBalanceHandler.clear_cache()
+            handler.get_trial_balance(1)
+            time.sleep(0.02)  # widgets
+
+        ProfilingCallWrapper(open_report, None, None)()
+        assert len(tracer.written) == 1
+        with open(tracer.written[0]) as f:
+            events = json.load(f)['traceEvents']
+
+        action = events[0]
+        assert action['cat'] == 'ui' and action['name'].endswith('open_report') and action['ph'] == 'X'
+        assert action['dur'] >= 20000
+        children = events[1:]
+        assert all(action['ts'] <= e['ts'] and e['ts'] + e['dur'] <= action['ts'] + action['dur'] + 1
+                   for e in children)
+        categories = {e['cat'] for e in children}
+        assert categories >= {'handler', 'sql', 'fetch'}, categories
+        assert any(e['name'] == 'TrialBalanceHandler.get_trial_balance' for e in children)
+        statements = [e for e in children if e['cat'] == 'sql']
+        assert all(e['args']['sql'] for e in statements)
+        assert any(e['args'].get('rows', 0) > 0 for e in children if e['cat'] == 'fetch')
+        print(f"   ✓ {len(children)} spans under {action['name']} ({action['dur'] / 1000:.1f} ms)\n")
+
+        print("2. Nothing recorded outside UI actions...")
+        handler.get_trial_balance(1)
+        assert len(tracer.written) == 1
+        handler.disconnect()
+        print("   ✓ No trace written\n")
+    finally:
+        tracing.disable()
+        instrumentation.uninstall()
+
+
+if __name__ == "__main__":
+    try:
+        test_action_trace()
+
+        print("\n" + "=" * 70)
+        print("ALL TESTS COMPLETED SUCCESSFULLY!")
+        print("=" * 70 + "\n")
+
+    except Exception as e:
+        print("\n" + "=" * 70)
+        print("ERROR OCCURRED DURING TESTING")
+        print("=" * 70)
+        print(f"\nError: {e}")
+        traceback.print_exc()
+        sys.exit(1)
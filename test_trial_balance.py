@@ -0,0 +1,148 @@
+"""
+Test script for the Trial Balance report and its per-financial-year cache
+Runs against a temporary SQLite database, the real financial_data.db is not touched.
+"""
+
+import sqlite3
+import sys
+import traceback
+
+from database.account_master_handler import AccountMasterHandler
+from database.trial_balance_handler import TrialBalanceHandler, CACHE_STATS
+from database.voucher_handler import VoucherHandler
+from test_voucher_balances import setup_database
+
+
+def test_trial_balance():
+    print("\n" + "=" * 70)
+    print("Testing Trial Balance report")
+    print("=" * 70 + "\n")
+
+    db_path, cash_id, sales_id, partner_id = setup_database()
+    voucher_handler = VoucherHandler(db_path)
+    voucher_handler.connect()
+    fy_id = voucher_handler.get_financial_year_for_date('2024-04-01')['id']
+
+    voucher_handler.post_voucher(
+        {'voucher_date': '2024-05-10'},
+        [{'account_kind': 'account', 'account_id': cash_id, 'debit': 500},
+         {'account_kind': 'account', 'account_id': sales_id, 'credit': 500}])
+
+    handler = TrialBalanceHandler(db_path)
+    handler.connect()
+
+    # Test 1: Full build
+    print("1. Building trial balance...")
+    report = handler.get_trial_balance(fy_id)
+    rows = {(a['account_kind'], a['account_id']): a for a in report['accounts']}
+    assert rows[('account', cash_id)]['closing_debit'] == 1500
+    assert rows[('account', sales_id)]['closing_credit'] == 500
+    assert rows[('partner', partner_id)]['closing_credit'] == 250
+    assert rows[('account', cash_id)]['category'] == 'balance_sheet'
+    assert rows[('account', sales_id)]['nature'] == 'credit'
+    groups = {g['account_group_name']: g for g in report['groups']}
+    assert groups['Cash in Hand']['closing_debit'] == 1500
+    assert groups['Cash in Hand']['closing_credit'] == 250
+    # Opening balances (1000 Dr / 250 Cr) do not agree, so neither does the TB
+    assert report['totals']['difference'] == 750
+    print(f"   ✓ {len(report['accounts'])} accounts, difference {report['totals']['difference']}\n")
+
+    # Test 2: Reopening without postings is served from the cache
+    print("2. Reopening without postings...")
+    hits = CACHE_STATS['hits']
+    again = TrialBalanceHandler(db_path)
+    again.connect()
+    assert again.get_trial_balance(fy_id) is report
+    assert CACHE_STATS['hits'] == hits + 1
+    print("   ✓ Served from cache\n")
+
+    # Test 3: A posting only refreshes the accounts it touched
+    print("3. Posting and refreshing...")
+    voucher_handler.post_voucher(
+        {'voucher_date': '2024-06-01'},
+        [{'account_kind': 'partner', 'account_id': partner_id, 'debit': 100},
+         {'account_kind': 'account', 'account_id': cash_id, 'credit': 100}])
+    incremental = CACHE_STATS['incremental']
+    previous = report
+    report = handler.get_trial_balance(fy_id)
+    assert CACHE_STATS['incremental'] == incremental + 1
+    rows = {(a['account_kind'], a['account_id']): a for a in report['accounts']}
+    assert rows[('account', cash_id)]['closing_debit'] == 1400
+    assert rows[('partner', partner_id)]['closing_credit'] == 150
+    # Unchanged rows are reused, the report returned earlier is left as it was
+    previous_rows = {(a['account_kind'], a['account_id']): a for a in previous['accounts']}
+    assert rows[('account', sales_id)] is previous_rows[('account', sales_id)]
+    assert previous_rows[('account', cash_id)]['closing_debit'] == 1500
+    groups = {g['account_group_name']: g for g in report['groups']}
+    assert groups['Cash in Hand']['debit_total'] == 600
+    assert groups['Cash in Hand']['credit_total'] == 100
+    print("   ✓ Changed accounts patched, group totals updated\n")
+
+    # Test 4: Incremental result equals a fresh build
+    print("4. Comparing with a full rebuild...")
+    TrialBalanceHandler.clear_cache()
+    fresh = handler.get_trial_balance(fy_id)
+    assert fresh['accounts'] == report['accounts']
+    assert fresh['groups'] == report['groups']
+    assert fresh['totals'] == report['totals']
+    print("   ✓ Identical\n")
+
+    # Test 5: Master data changes invalidate the cache
+    print("5. Changing an opening balance...")
+    am_handler = AccountMasterHandler()
+    am_handler.connect()
+    cash = am_handler.get_account_by_id(cash_id)
+    cash['opening_balance'] = 250
+    am_handler.update_account(cash_id, cash)
+    am_handler.disconnect()
+    full = CACHE_STATS['full']
+    report = handler.get_trial_balance(fy_id)
+    assert CACHE_STATS['full'] == full + 1
+    assert report['totals']['is_balanced'], report['totals']
+    print("   ✓ Rebuilt, trial balance now agrees\n")
+
+    handler.disconnect()
+    again.disconnect()
+    voucher_handler.disconnect()
+
+
+def test_without_voucher_tables():
+    print("\n" + "=" * 70)
+    print("Testing Trial Balance on a database without voucher tables")
+    print("=" * 70 + "\n")
+
+    db_path, cash_id, _, partner_id = setup_database()
+    conn = sqlite3.connect(db_path)
+    for table in ('voucher_lines', 'vouchers', 'account_balances', 'balance_versions'):
+        conn.execute(f"DROP TABLE {table}")
+    conn.commit()
+    conn.close()
+
+    print("1. Opening the report before any voucher was posted...")
+    handler = TrialBalanceHandler(db_path)
+    assert handler.connect()
+    report = handler.get_trial_balance(1)
+    assert report is not None
+    rows = {(a['account_kind'], a['account_id']): a for a in report['accounts']}
+    assert rows[('account', cash_id)]['closing_debit'] == 1000
+    assert rows[('partner', partner_id)]['closing_credit'] == 250
+    print(f"   ✓ {len(report['accounts'])} opening balances\n")
+    handler.disconnect()
+
+
+if __name__ == "__main__":
+    try:
+        test_trial_balance()
+        test_without_voucher_tables()
+
+        print("\n" + "=" * 70)
+        print("ALL TESTS COMPLETED SUCCESSFULLY!")
+        print("=" * 70 + "\n")
+
+    except Exception as e:
+        print("\n" + "=" * 70)
+        print("ERROR OCCURRED DURING TESTING")
+        print("=" * 70)
+        print(f"\nError: {e}")
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,87 @@
+"""
+Test script for the per-action UI profiler
+Calls the Tk callback wrapper directly, no display is needed.
+"""
+
+import os
+import pstats
+import sys
+import tempfile
+import time
+import traceback
+
+import ui_profiler
+from ui_profiler import ProfilingCallWrapper
+
+
+def slow_action():
+    deadline = time.perf_counter() + 0.1
+    while time.perf_counter() < deadline:
+        pass
+    return 'done'
+
+
+def test_profiling_modes():
+    print("\n" + "=" * 70)
+    print("Testing the UI profiler")
+    print("=" * 70 + "\n")
+
+    output_dir = tempfile.mkdtemp()
+    try:
+        print("1. Profiling off...")
+        ui_profiler.disable()
+        assert ProfilingCallWrapper(slow_action, None, None)() == 'done'
+        assert os.listdir(output_dir) == []
+        print("   ✓ Callback runs, nothing written\n")
+
+        print("2. cProfile mode...")
+        profiler = ui_profiler.enable('cprofile', output_dir, min_seconds=0.05)
+        nested = ProfilingCallWrapper(slow_action, None, None)
+        assert ProfilingCallWrapper(lambda: nested(), None, None)() == 'done'
+        assert ProfilingCallWrapper(lambda: 'fast', None, None)() == 'fast'
+        assert len(profiler.written) == 1 and profiler.written[0].endswith('ms.pstats')
+        stats = pstats.Stats(profiler.written[0])
+        assert any(name == 'slow_action' for (_, _, name) in stats.stats)
+        print(f"   ✓ One profile for the outer action: {os.path.basename(profiler.written[0])}\n")
+
+        print("3. Sampling mode...")
+        profiler = ui_profiler.enable('sample', output_dir, min_seconds=0.05)
+        ProfilingCallWrapper(slow_action, None, None)()
+        written = ui_profiler.disable()
+        assert len(written) == 1 and written[0].endswith('ms.folded')
+        with open(written[0]) as f:
+            lines = f.read().splitlines()
+        assert lines and all(line.rsplit(' ', 1)[1].isdigit() for line in lines)
+        assert any('slow_action (test_ui_profiler.py' in line for line in lines)
+        assert ui_profiler.active_profiler() is None
+        print("   ✓ Collapsed stacks written\n")
+
+        print("4. Environment variable...")
+        os.environ[ui_profiler.PROFILE_ENV] = 'sample'
+        os.environ[ui_profiler.PROFILE_DIR_ENV] = output_dir
+        assert ui_profiler.enable_from_environment().mode == 'sample'
+        os.environ[ui_profiler.PROFILE_ENV] = 'off'
+        ui_profiler.disable()
+        assert ui_profiler.enable_from_environment() is None
+        print("   ✓ APP_PROFILE switches profiling on\n")
+    finally:
+        ui_profiler.disable()
+        os.environ.pop(ui_profiler.PROFILE_ENV, None)
+        os.environ.pop(ui_profiler.PROFILE_DIR_ENV, None)
+
+
+if __name__ == "__main__":
+    try:
+        test_profiling_modes()
+
+        print("\n" + "=" * 70)
+        print("ALL TESTS COMPLETED SUCCESSFULLY!")
+        print("=" * 70 + "\n")
+
+    except Exception as e:
+        print("\n" + "=" * 70)
+        print("ERROR OCCURRED DURING TESTING")
+        print("=" * 70)
+        print(f"\nError: {e}")
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,194 @@
+"""
+Test script for voucher posting and the account_balances aggregate
+Runs against a temporary SQLite database, the real financial_data.db is not touched.
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+import traceback
+
+import database.account_group_handler as account_group_module
+import database.account_master_handler as account_master_module
+import database.business_partner_handler as business_partner_module
+import database.financial_year_handler as financial_year_module
+import database.static_data_handler as static_data_module
+from database.account_group_handler import AccountGroupHandler
+from database.account_master_handler import AccountMasterHandler
+from database.business_partner_handler import BusinessPartnerHandler
+from database.financial_year_handler import FinancialYearHandler
+from database.static_data_handler import StaticDataHandler
+from database.voucher_handler import VoucherHandler
+
+
+def setup_database():
+    """
+    Create a temporary database with two financial years, two account groups,
+    two accounts (Cash, Sales) and one partner
+    Returns (db_path, cash_id, sales_id, partner_id)
+    """
+    db_path = os.path.join(tempfile.mkdtemp(), "test_vouchers.db")
+    for module in (account_group_module, account_master_module, business_partner_module,
+                   financial_year_module, static_data_module):
+        module.DB_PATH = db_path
+
+    fy_handler = FinancialYearHandler()
+    fy_handler.connect()
+    fy_handler.create_financial_year({'fy_code': 'FY2425', 'display_name': 'FY 2024-25',
+                                      'start_date': '2024-04-01', 'end_date': '2025-03-31'})
+    fy_handler.create_financial_year({'fy_code': 'FY2526', 'display_name': 'FY 2025-26',
+                                      'start_date': '2025-04-01', 'end_date': '2026-03-31'})
+    fy_handler.disconnect()
+
+    # Seeds book codes and account types (A=Assets ... S=Sale)
+    static_handler = StaticDataHandler()
+    static_handler.connect()
+    assets_id = static_handler.get_account_type_by_code('A')['id']
+    creditors_id = static_handler.get_account_type_by_code('C')['id']
+    sale_id = static_handler.get_account_type_by_code('S')['id']
+    static_handler.disconnect()
+
+    ag_handler = AccountGroupHandler()
+    ag_handler.connect()
+    _, _, cash_group_id = ag_handler.create_account_group(
+        {'name': 'Cash in Hand', 'account_group_type': 'Balance Sheet', 'ag_code': 'CA'})
+    _, _, sales_group_id = ag_handler.create_account_group(
+        {'name': 'Sales', 'account_group_type': 'Trading A/C', 'ag_code': 'SA'})
+    ag_handler.disconnect()
+
+    # Aggregate tables must exist before masters so opening rows are written
+    voucher_handler = VoucherHandler(db_path)
+    voucher_handler.connect()
+    voucher_handler.disconnect()
+
+    am_handler = AccountMasterHandler()
+    am_handler.connect()
+    _, _, cash_id = am_handler.create_account({
+        'account_name': 'Cash', 'account_group_id': cash_group_id, 'book_code_id': 1,
+        'account_type_id': assets_id, 'opening_balance': 1000, 'balance_type': 'Debit'})
+    _, _, sales_id = am_handler.create_account({
+        'account_name': 'Sales', 'account_group_id': sales_group_id, 'book_code_id': 4,
+        'account_type_id': sale_id, 'opening_balance': 0, 'balance_type': 'Credit'})
+    am_handler.disconnect()
+
+    bp_handler = BusinessPartnerHandler()
+    bp_handler.connect()
+    _, _, partner_id = bp_handler.create_business_partner({
+        'bp_name': 'ABC Traders', 'account_group_id': cash_group_id, 'book_code_id': 3,
+        'account_type_id': creditors_id, 'opening_balance': 250, 'balance_type': 'Credit'})
+    bp_handler.disconnect()
+
+    return db_path, cash_id, sales_id, partner_id
+
+
+def test_post_and_reverse():
+    print("\n" + "=" * 70)
+    print("Testing voucher posting and balance aggregates")
+    print("=" * 70 + "\n")
+
+    db_path, cash_id, sales_id, partner_id = setup_database()
+    handler = VoucherHandler(db_path)
+    assert handler.connect()
+
+    # Test 1: Opening balances are seeded from the masters
+    print("1. Checking opening balances...")
+    fy_id = handler.get_financial_year_for_date('2024-04-01')['id']
+    cash = handler.get_account_balance('account', cash_id, fy_id)
+    partner = handler.get_account_balance('partner', partner_id, fy_id)
+    assert cash['closing_balance'] == 1000, cash
+    assert partner['closing_balance'] == -250, partner
+    print("   ✓ Cash opening 1000 Dr, partner opening 250 Cr\n")
+
+    # Test 2: Unbalanced vouchers are rejected
+    print("2. Posting an unbalanced voucher...")
+    success, message, _ = handler.post_voucher(
+        {'voucher_date': '2024-05-10'},
+        [{'account_kind': 'account', 'account_id': cash_id, 'debit': 100},
+         {'account_kind': 'account', 'account_id': sales_id, 'credit': 90}])
+    assert not success
+    print(f"   ✓ Rejected: {message}\n")
+
+    # Test 3: Post vouchers in two different months
+    print("3. Posting vouchers...")
+    success, message, voucher_id = handler.post_voucher(
+        {'voucher_date': '2024-05-10', 'narration': 'Cash sale'},
+        [{'account_kind': 'account', 'account_id': cash_id, 'debit': 500},
+         {'account_kind': 'account', 'account_id': sales_id, 'credit': 500}])
+    assert success, message
+    success, message, _ = handler.post_voucher(
+        {'voucher_date': '2024-07-01', 'narration': 'Paid supplier'},
+        [{'account_kind': 'partner', 'account_id': partner_id, 'debit': 200},
+         {'account_kind': 'account', 'account_id': cash_id, 'credit': 200}])
+    assert success, message
+
+    assert handler.get_account_balance('account', cash_id, fy_id)['closing_balance'] == 1300
+    assert handler.get_account_balance('account', cash_id, fy_id, upto_period=2)['closing_balance'] == 1500
+    assert handler.get_account_balance('partner', partner_id, fy_id)['closing_balance'] == -50
+    print("   ✓ Balances updated per period\n")
+
+    # Test 4: Reversal restores the balance
+    print("4. Reversing the cash sale...")
+    success, message, _ = handler.reverse_voucher(voucher_id)
+    assert success, message
+    assert handler.get_account_balance('account', cash_id, fy_id)['closing_balance'] == 800
+    assert handler.get_account_balance('account', sales_id, fy_id)['closing_balance'] == 0
+    success, _, _ = handler.reverse_voucher(voucher_id)
+    assert not success
+    print("   ✓ Reversal posted, second reversal rejected\n")
+
+    # Test 5: Aggregate matches voucher_lines, tampering is detected and repaired
+    print("5. Verifying and rebuilding the aggregate...")
+    assert handler.find_balance_drift() == []
+    handler.conn.execute("UPDATE account_balances SET debit_total = debit_total + 1 WHERE period > 0")
+    handler.conn.commit()
+    drift = handler.find_balance_drift()
+    assert drift, "Drift was not detected"
+    print(f"   ✓ Detected {len(drift)} drifted rows")
+    success, message = handler.rebuild_account_balances()
+    assert success, message
+    assert handler.find_balance_drift() == []
+    assert handler.get_account_balance('account', cash_id, fy_id)['closing_balance'] == 800
+    print("   ✓ Rebuild removed the drift\n")
+
+    handler.disconnect()
+
+
+def test_existing_database_openings():
+    print("\n" + "=" * 70)
+    print("Testing opening balances of a database created before the aggregate")
+    print("=" * 70 + "\n")
+
+    db_path, cash_id, _sales_id, partner_id = setup_database()
+    conn = sqlite3.connect(db_path)
+    conn.execute("DROP TABLE account_balances")
+    conn.commit()
+    conn.close()
+
+    print("1. Connecting to the database...")
+    handler = VoucherHandler(db_path)
+    assert handler.connect()
+    fy_id = handler.get_financial_year_for_date('2024-04-01')['id']
+    assert handler.get_account_balance('account', cash_id, fy_id)['closing_balance'] == 1000
+    assert handler.get_account_balance('partner', partner_id, fy_id)['closing_balance'] == -250
+    assert handler.find_balance_drift() == []
+    handler.disconnect()
+    print("   ✓ Master opening balances copied into account_balances\n")
+
+
+if __name__ == "__main__":
+    try:
+        test_post_and_reverse()
+        test_existing_database_openings()
+
+        print("\n" + "=" * 70)
+        print("ALL TESTS COMPLETED SUCCESSFULLY!")
+        print("=" * 70 + "\n")
+
+    except Exception as e:
+        print("\n" + "=" * 70)
+        print("ERROR OCCURRED DURING TESTING")
+        print("=" * 70)
+        print(f"\nError: {e}")
+        traceback.print_exc()
+        sys.exit(1)
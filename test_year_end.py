@@ -0,0 +1,166 @@
+"""
+Test script for the financial year close and carry-forward
+Runs against a temporary SQLite database, the real financial_data.db is not touched.
+"""
+
+import sys
+import traceback
+
+from database.account_master_handler import AccountMasterHandler
+from database.financial_statement_handler import FinancialStatementHandler
+from database.financial_year_handler import FinancialYearHandler
+from database.voucher_handler import VoucherHandler
+from database.year_end_handler import YearEndHandler
+from test_voucher_balances import setup_database
+
+
+def setup_year_end_database():
+    """
+    Voucher test database with a Capital account and a cash sale of 500 in FY2425
+    Returns (db_path, cash_id, sales_id, partner_id, capital_id)
+    """
+    db_path, cash_id, sales_id, partner_id = setup_database()
+
+    accounts = AccountMasterHandler()
+    accounts.connect()
+    cash = accounts.get_account_by_id(cash_id)
+    _, _, capital_id = accounts.create_account({
+        'account_name': 'Capital', 'account_group_id': cash['account_group_id'], 'book_code_id': 1,
+        'account_type_id': cash['account_type_id'], 'opening_balance': 0, 'balance_type': 'Credit'})
+    accounts.disconnect()
+
+    vouchers = VoucherHandler(db_path)
+    vouchers.connect()
+    success, message, _ = vouchers.post_voucher(
+        {'voucher_type': 'Receipt', 'voucher_date': '2024-07-01'},
+        [{'account_kind': 'account', 'account_id': cash_id, 'debit': 500},
+         {'account_kind': 'account', 'account_id': sales_id, 'credit': 500}])
+    assert success, message
+    vouchers.disconnect()
+
+    return db_path, cash_id, sales_id, partner_id, capital_id
+
+
+def closing_balances(db_path, fy_id, *accounts):
+    vouchers = VoucherHandler(db_path)
+    vouchers.connect()
+    try:
+        return [vouchers.get_account_balance(kind, account_id, fy_id)['closing_balance']
+                for kind, account_id in accounts]
+    finally:
+        vouchers.disconnect()
+
+
+def test_close_year():
+    print("\n" + "=" * 70)
+    print("Testing the financial year close")
+    print("=" * 70 + "\n")
+
+    db_path, cash_id, sales_id, partner_id, capital_id = setup_year_end_database()
+    accounts = [('account', cash_id), ('account', sales_id), ('partner', partner_id),
+                ('account', capital_id)]
+
+    handler = YearEndHandler(db_path)
+    assert handler.connect()
+
+    print("1. Checking the order of closes...")
+    success, message = handler.close_year(2, capital_id)
+    assert not success and message == "Close FY2425 first", message
+    success, message = handler.close_year(1, sales_id)
+    assert not success and 'Balance Sheet' in message, message
+    print(f"   ✓ {message}\n")
+
+    print("2. Closing FY2425...")
+    success, message = handler.close_year(1, capital_id)
+    assert success, message
+    closing = handler.get_closing(1)
+    assert closing['step'] == 'Completed' and closing['net_profit'] == 500
+    assert closing_balances(db_path, 2, *accounts) == [1500, 0, -250, -500]
+    print(f"   ✓ {message}\n")
+
+    print("3. Checking the locked year...")
+    vouchers = VoucherHandler(db_path)
+    vouchers.connect()
+    success, message, _ = vouchers.post_voucher(
+        {'voucher_type': 'Journal', 'voucher_date': '2024-09-01'},
+        [{'account_kind': 'account', 'account_id': cash_id, 'debit': 1},
+         {'account_kind': 'account', 'account_id': sales_id, 'credit': 1}])
+    assert not success and message == "Financial year FY2425 is locked", message
+    assert vouchers.find_balance_drift() == []
+    vouchers.disconnect()
+
+    fy_handler = FinancialYearHandler()
+    fy_handler.connect()
+    fy = fy_handler.get_financial_year_by_id(1)
+    success, message = fy_handler.update_financial_year(1, dict(fy, end_date='2025-02-28'))
+    assert not success and 'locked' in message
+    fy_handler.disconnect()
+
+    statements = FinancialStatementHandler(db_path)
+    statements.connect()
+    assert statements.get_statements([1, 2])['summary'][0]['net_profit'] == 500
+    statements.disconnect()
+    assert handler.close_year(1, capital_id) == (False, "Financial year FY2425 is already closed")
+    print(f"   ✓ {message}, FY2425 statements unchanged\n")
+    handler.disconnect()
+
+
+def test_resume_and_reclose():
+    print("\n" + "=" * 70)
+    print("Testing an interrupted close and a close after reopening")
+    print("=" * 70 + "\n")
+
+    db_path, cash_id, sales_id, partner_id, capital_id = setup_year_end_database()
+    accounts = [('account', cash_id), ('account', sales_id), ('account', capital_id)]
+
+    print("1. Resuming after the snapshot...")
+    handler = YearEndHandler(db_path)
+    handler.connect()
+    fy = handler.voucher_handler.get_financial_year_for_date('2024-04-01')
+    error, next_fy = handler._check_close(fy, capital_id)
+    assert error is None
+    handler._snapshot(fy, next_fy, capital_id)
+    handler.disconnect()
+
+    handler = YearEndHandler(db_path)
+    handler.connect()
+    assert handler.get_closing(1)['step'] == 'Snapshot'
+    success, message = handler.close_year(1)
+    assert success, message
+    assert closing_balances(db_path, 2, *accounts) == [1500, 0, -500]
+    print(f"   ✓ {message}\n")
+
+    print("2. Reopening, correcting and closing again...")
+    success, message = handler.reopen_year(1)
+    assert success, message
+    vouchers = VoucherHandler(db_path)
+    vouchers.connect()
+    success, message, _ = vouchers.post_voucher(
+        {'voucher_type': 'Receipt', 'voucher_date': '2025-03-31'},
+        [{'account_kind': 'account', 'account_id': cash_id, 'debit': 100},
+         {'account_kind': 'account', 'account_id': sales_id, 'credit': 100}])
+    assert success, message
+    vouchers.disconnect()
+    success, message = handler.close_year(1, capital_id)
+    assert success, message
+    assert closing_balances(db_path, 2, *accounts) == [1600, 0, -600]
+    handler.disconnect()
+    print("   ✓ Carried openings replaced by the second close\n")
+
+
+if __name__ == "__main__":
+    try:
+        test_close_year()
+        test_resume_and_reclose()
+
+        print("\n" + "=" * 70)
+        print("ALL TESTS COMPLETED SUCCESSFULLY!")
+        print("=" * 70 + "\n")
+
+    except Exception as e:
+        print("\n" + "=" * 70)
+        print("ERROR OCCURRED DURING TESTING")
+        print("=" * 70)
+        print(f"\nError: {e}")
+        traceback.print_exc()
+        sys.exit(1)
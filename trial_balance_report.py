@@ -0,0 +1,157 @@
+"""
+Trial Balance Report Screen - Account balances grouped by Account Group
+"""
+
+import tkinter as tk
+from tkinter import ttk, messagebox
+from database.financial_year_handler import FinancialYearHandler
+from database.trial_balance_handler import TrialBalanceHandler
+from ui_config import COLORS, FONTS, SPACING
+
+
+class TrialBalanceReport(tk.Frame):
+    def __init__(self, parent, colors):
+        super().__init__(parent, bg=COLORS['background'])
+        self.colors = colors
+        self.trial_balance_handler = TrialBalanceHandler()
+        self.fy_handler = FinancialYearHandler()
+
+        # Connect to database
+        if not self.trial_balance_handler.connect() or not self.fy_handler.connect():
+            messagebox.showerror("Database Error",
+                               "Failed to connect to database.")
+            return
+
+        # Financial year dropdown data: display_name -> id
+        self.financial_years = {
+            fy['display_name']: fy['id']
+            for fy in self.fy_handler.get_all_financial_years()
+        }
+        self.fy_handler.disconnect()
+
+        # Create UI
+        self.create_widgets()
+
+        if self.financial_years:
+            self.fy_var.set(next(iter(self.financial_years)))
+            self.load_report()
+
+    def create_widgets(self):
+        """Create the report UI"""
+        # Header
+        header_frame = tk.Frame(self, bg=self.colors['background'])
+        header_frame.pack(fill=tk.X, padx=SPACING['xl'], pady=(SPACING['lg'], SPACING['md']))
+
+        title_label = tk.Label(header_frame,
+                               text="Trial Balance",
+                               font=FONTS['h1'],
+                               bg=self.colors['background'],
+                               fg=self.colors['text_primary'])
+        title_label.pack(side=tk.LEFT)
+
+        refresh_btn = tk.Button(header_frame, text="Refresh")
+        refresh_btn.config(
+            font=FONTS['button'],
+            bg=self.colors['primary'],
+            fg='white',
+            activebackground=self.colors['primary_hover'],
+            activeforeground='white',
+            cursor='hand2',
+            relief=tk.FLAT,
+            padx=SPACING['lg'],
+            pady=SPACING['md'],
+            command=self.load_report
+        )
+        refresh_btn.pack(side=tk.RIGHT)
+
+        # Financial year selection
+        self.fy_var = tk.StringVar()
+        fy_combo = ttk.Combobox(header_frame,
+                                textvariable=self.fy_var,
+                                values=list(self.financial_years.keys()),
+                                state='readonly',
+                                font=FONTS['body'],
+                                width=30)
+        fy_combo.pack(side=tk.RIGHT, padx=SPACING['md'])
+        fy_combo.bind('<<ComboboxSelected>>', lambda _e: self.load_report())
+
+        fy_label = tk.Label(header_frame,
+                            text="Financial Year:",
+                            font=FONTS['body'],
+                            bg=self.colors['background'],
+                            fg=self.colors['text_secondary'])
+        fy_label.pack(side=tk.RIGHT)
+
+        # Report tree: account groups with their accounts underneath
+        table_frame = tk.Frame(self, bg=self.colors['border'], relief=tk.SOLID, bd=2)
+        table_frame.pack(fill=tk.BOTH, expand=True, padx=SPACING['xl'], pady=SPACING['md'])
+
+        columns = ('code', 'opening', 'debit', 'credit', 'closing_dr', 'closing_cr')
+        self.tree = ttk.Treeview(table_frame, columns=columns, show='tree headings')
+        self.tree.heading('#0', text="Account")
+        self.tree.column('#0', width=320)
+        for column, text in zip(columns, ("Code", "Opening", "Debit", "Credit", "Closing Dr", "Closing Cr")):
+            self.tree.heading(column, text=text)
+            self.tree.column(column, width=120, anchor='e' if column != 'code' else 'w')
+
+        scrollbar = ttk.Scrollbar(table_frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        # Totals footer
+        self.totals_label = tk.Label(self,
+                                     text="",
+                                     font=FONTS['body_bold'],
+                                     bg=self.colors['background'],
+                                     fg=self.colors['text_primary'],
+                                     anchor='e')
+        self.totals_label.pack(fill=tk.X, padx=SPACING['xl'], pady=(0, SPACING['lg']))
+
+    def load_report(self):
+        """Load the trial balance of the selected financial year"""
+        fy_id = self.financial_years.get(self.fy_var.get())
+        if fy_id is None:
+            return
+
+        report = self.trial_balance_handler.get_trial_balance(fy_id)
+        if report is None:
+            messagebox.showerror("Error", "Could not build the trial balance.")
+            return
+
+        self.tree.delete(*self.tree.get_children())
+
+        group_nodes = {}
+        for group in report['groups']:
+            group_nodes[group['account_group_id']] = self.tree.insert(
+                '', tk.END,
+                text=f"{group['account_group_name'] or 'Ungrouped'} ({group['account_group_type'] or '-'})",
+                values=('', *self.format_amounts(group)),
+                open=True
+            )
+
+        for account in report['accounts']:
+            self.tree.insert(
+                group_nodes.get(account['account_group_id'], ''), tk.END,
+                text=account['name'],
+                values=(account['code'] or '', *self.format_amounts(account))
+            )
+
+        totals = report['totals']
+        status = "Balanced" if totals['is_balanced'] else f"Difference: {totals['difference']:,.2f}"
+        self.totals_label.config(
+            text=f"Total Dr: {totals['closing_debit']:,.2f}    "
+                 f"Total Cr: {totals['closing_credit']:,.2f}    {status}",
+            fg=self.colors['text_primary'] if totals['is_balanced'] else self.colors['error']
+        )
+
+    @staticmethod
+    def format_amounts(row):
+        """Format the amount columns of a group or account row"""
+        return (
+            f"{row['opening_balance']:,.2f}",
+            f"{row['debit_total']:,.2f}",
+            f"{row['credit_total']:,.2f}",
+            f"{row['closing_debit']:,.2f}" if row['closing_debit'] else '',
+            f"{row['closing_credit']:,.2f}" if row['closing_credit'] else ''
+        )
@@ -0,0 +1,192 @@
+"""
+UI Profiler - Per-action profiles of the dashboard's Tk callbacks
+
+Every Tk callback (button command, menu click, key binding, after() job) runs through
+tkinter.CallWrapper. install() replaces it with ProfilingCallWrapper, which does two
+global lookups when profiling and tracing (utils/tracing.py) are off. When profiling
+is on, each outermost callback is profiled and, when it took at least
+MIN_ACTION_SECONDS, written to the profile directory as one file per action:
+
+    cprofile   <time>_<seq>_<action>_<ms>ms.pstats   (python -m pstats, snakeviz)
+    sample     <time>_<seq>_<action>_<ms>ms.folded   (collapsed stacks for flamegraph.pl,
+                                                      speedscope)
+
+Profiling is switched on from Utilities > Profiling, or at start-up with the
+environment variable APP_PROFILE=cprofile|sample (APP_PROFILE_DIR overrides the
+output directory).
+"""
+
+import cProfile
+import functools
+import os
+import re
+import sys
+import threading
+import time
+import tkinter
+from datetime import datetime
+from utils import tracing
+
+
+PROFILE_ENV = 'APP_PROFILE'
+PROFILE_DIR_ENV = 'APP_PROFILE_DIR'
+
+MODES = ('cprofile', 'sample')
+
+DEFAULT_PROFILE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'profiles')
+
+# Actions faster than this are not written (hover effects, scroll region updates...)
+MIN_ACTION_SECONDS = 0.05
+
+# Seconds between stack samples in sample mode
+SAMPLE_INTERVAL_SECONDS = 0.005
+
+_original_call_wrapper = tkinter.CallWrapper
+_active = None
+
+
+def action_name(func):
+    """Readable name of a callback, e.g. Dashboard.create_submenu_item.<locals>.select_submenu"""
+    func = getattr(func, '__func__', func)
+    name = getattr(func, '__qualname__', None) or type(func).__name__
+    module = getattr(func, '__module__', None)
+    return f"{module}.{name}" if module and module != '__main__' else name
+
+
+class StackSampler(threading.Thread):
+    """Samples the stack of one thread until stopped, counting collapsed stacks"""
+
+    def __init__(self, thread_id, interval=SAMPLE_INTERVAL_SECONDS):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = {}
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                key = ';'.join(reversed(stack))
+                self.stacks[key] = self.stacks.get(key, 0) + 1
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+    def collapsed(self):
+        return ''.join(f"{stack} {count}\n" for stack, count in sorted(self.stacks.items()))
+
+
+class UIProfiler:
+    def __init__(self, mode='cprofile', output_dir=None, min_seconds=MIN_ACTION_SECONDS):
+        if mode not in MODES:
+            raise ValueError(f"Unknown profiling mode {mode!r}, expected one of {', '.join(MODES)}")
+        self.mode = mode
+        self.output_dir = output_dir or DEFAULT_PROFILE_DIR
+        self.min_seconds = min_seconds
+        self.depth = 0
+        self.sequence = 0
+        self.written = []
+
+    def run(self, func, call):
+        """Run call() for callback func, profiling it when it is not nested in another action"""
+        if self.depth:
+            return call()
+        self.depth += 1
+        profile = sampler = None
+        started = time.perf_counter()
+        try:
+            if self.mode == 'cprofile':
+                profile = cProfile.Profile()
+                profile.enable()
+            else:
+                sampler = StackSampler(threading.get_ident())
+                sampler.start()
+            return call()
+        finally:
+            if profile is not None:
+                profile.disable()
+            if sampler is not None:
+                sampler.stop()
+            self.depth -= 1
+            elapsed = time.perf_counter() - started
+            if elapsed >= self.min_seconds:
+                self.write(action_name(func), elapsed, profile, sampler)
+
+    def write(self, name, elapsed, profile=None, sampler=None):
+        """Write one action's profile, returns the file path (None on error)"""
+        self.sequence += 1
+        safe_name = re.sub(r'[^A-Za-z0-9_.-]+', '_', name).strip('_')[:80]
+        file_name = (f"{datetime.now():%Y%m%d_%H%M%S}_{self.sequence:04d}_{safe_name}_"
+                     f"{elapsed * 1000:.0f}ms.{'pstats' if profile is not None else 'folded'}")
+        path = os.path.join(self.output_dir, file_name)
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            if profile is not None:
+                profile.dump_stats(path)
+            else:
+                with open(path, 'w') as f:
+                    f.write(sampler.collapsed())
+        except OSError as e:
+            print(f"[PROFILE] Could not write {path}: {e}")
+            return None
+        self.written.append(path)
+        print(f"[PROFILE] {name}: {elapsed * 1000:.0f} ms -> {path}")
+        return path
+
+
+class ProfilingCallWrapper(_original_call_wrapper):
+    """tkinter.CallWrapper that hands the callback to the active profiler and tracer"""
+
+    def __call__(self, *args):
+        profiler = _active
+        tracer = tracing.active_tracer()
+        if profiler is None and tracer is None:
+            return _original_call_wrapper.__call__(self, *args)
+        call = functools.partial(_original_call_wrapper.__call__, self, *args)
+        if tracer is not None:
+            call = functools.partial(tracer.run_action, action_name(self.func), call)
+        if profiler is None:
+            return call()
+        return profiler.run(self.func, call)
+
+
+def install():
+    """Route Tk callbacks through ProfilingCallWrapper; call before the widgets are created"""
+    tkinter.CallWrapper = ProfilingCallWrapper
+
+
+def enable(mode='cprofile', output_dir=None, min_seconds=MIN_ACTION_SECONDS):
+    """Start profiling UI actions, returns the active UIProfiler"""
+    global _active
+    _active = UIProfiler(mode, output_dir, min_seconds)
+    print(f"[PROFILE] Profiling UI actions ({mode}) into {_active.output_dir}")
+    return _active
+
+
+def disable():
+    """Stop profiling, returns the list of files written"""
+    global _active
+    profiler, _active = _active, None
+    return profiler.written if profiler else []
+
+
+def active_profiler():
+    return _active
+
+
+def enable_from_environment():
+    """Enable profiling when APP_PROFILE is set, returns the UIProfiler or None"""
+    mode = os.environ.get(PROFILE_ENV, '').strip().lower()
+    if not mode or mode in ('0', 'off', 'false'):
+        return None
+    if mode not in MODES:
+        print(f"[PROFILE] Unknown {PROFILE_ENV}={mode!r}, using cprofile")
+        mode = 'cprofile'
+    return enable(mode, os.environ.get(PROFILE_DIR_ENV) or None)
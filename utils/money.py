@@ -0,0 +1,138 @@
+"""
+Money - Exact rupee amounts stored as integer paise
+
+Every monetary column is an INTEGER number of paise. Handlers convert at the edges:
+    - values coming in (forms, callers) are rupees of any numeric type or text and
+      are converted with to_paise() (rounded half away from zero to the paisa)
+    - values going out are Money objects, which print, format and compare like
+      rupee amounts: f"{amount:,.2f}", amount == 16.2, abs(amount), amount >= 0
+Money objects passed as query parameters are stored as their paise (adapter below),
+so SQL aggregates over money are plain integer SUMs.
+"""
+
+import sqlite3
+from decimal import Decimal, ROUND_HALF_UP
+
+
+PAISE_PER_RUPEE = 100
+
+
+def to_paise(value):
+    """
+    Convert rupees (int, float, str, Decimal, Money or None) to integer paise
+    Raises ValueError for text that is not an amount, like float() does.
+    """
+    if value is None or value == '':
+        return 0
+    if isinstance(value, Money):
+        return value.paise
+    try:
+        amount = value if isinstance(value, Decimal) else Decimal(str(value).replace(',', '').strip())
+        return int((amount * PAISE_PER_RUPEE).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+    except ArithmeticError:
+        raise ValueError(f"Not an amount: {value!r}") from None
+
+
+def _exact_paise(value):
+    """Rupees as an unrounded Decimal number of paise, for comparisons"""
+    if isinstance(value, Money):
+        return Decimal(value.paise)
+    amount = value if isinstance(value, Decimal) else Decimal(str(value).replace(',', '').strip())
+    return amount * PAISE_PER_RUPEE
+
+
+class Money:
+    """An exact rupee amount; Money.from_paise(150) and Money.of('1.50') are the same"""
+
+    __slots__ = ('paise',)
+
+    def __init__(self, paise=0):
+        self.paise = int(paise)
+
+    @classmethod
+    def from_paise(cls, paise):
+        """Money from integer paise (None stays None)"""
+        return None if paise is None else cls(paise)
+
+    @classmethod
+    def of(cls, value):
+        """Money from a rupee amount"""
+        return cls(to_paise(value))
+
+    @property
+    def rupees(self):
+        """Exact Decimal rupee value"""
+        return Decimal(self.paise).scaleb(-2)
+
+    # Arithmetic: other operands are Money or rupee amounts
+    def __add__(self, other):
+        return Money(self.paise + to_paise(other))
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        return Money(self.paise - to_paise(other))
+
+    def __rsub__(self, other):
+        return Money(to_paise(other) - self.paise)
+
+    def __neg__(self):
+        return Money(-self.paise)
+
+    def __abs__(self):
+        return Money(abs(self.paise))
+
+    # Comparisons against Money or rupee amounts, exact: nothing is rounded to the paisa,
+    # so Money(1620) == 16.2 but Money(1620) != 16.199. Equal amounts hash alike
+    # (Money(1620), Decimal('16.2'), and 5 and Money(500)); as with Decimal, a float
+    # that is not exactly its decimal value (16.2) compares equal without sharing the hash.
+    def __eq__(self, other):
+        if other is None:
+            return False
+        try:
+            return self.paise == _exact_paise(other)
+        except (ArithmeticError, ValueError, TypeError):
+            return NotImplemented
+
+    def __lt__(self, other):
+        return self.paise < _exact_paise(other)
+
+    def __le__(self, other):
+        return self.paise <= _exact_paise(other)
+
+    def __gt__(self, other):
+        return self.paise > _exact_paise(other)
+
+    def __ge__(self, other):
+        return self.paise >= _exact_paise(other)
+
+    def __hash__(self):
+        return hash(self.rupees)
+
+    def __bool__(self):
+        return self.paise != 0
+
+    # Conversions and display
+    def __float__(self):
+        return self.paise / PAISE_PER_RUPEE
+
+    def __format__(self, format_spec):
+        return format(self.rupees, format_spec or '.2f')
+
+    def __str__(self):
+        return f"{self.rupees:.2f}"
+
+    def __repr__(self):
+        return f"Money('{self}')"
+
+
+def money_fields(row, fields):
+    """Turn the paise columns `fields` of a row dict into Money (in place), return the row"""
+    for field in fields:
+        if field in row:
+            row[field] = Money.from_paise(row[field])
+    return row
+
+
+# Money query parameters are stored as paise
+sqlite3.register_adapter(Money, lambda amount: amount.paise)
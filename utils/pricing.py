@@ -0,0 +1,183 @@
+"""
+Pricing Engine - Line amounts, discounts and GST for whole batches of invoice lines
+
+All money is computed in integer paise (int64 arrays), so results are exact and
+never depend on float rounding:
+    quantity        -> thousandths of a unit
+    rate            -> paise
+    discount / GST% -> basis points (hundredths of a percent)
+Every division rounds half away from zero, the way amounts are rounded on a
+printed invoice.
+
+Per line:
+    gross     = quantity x rate
+    discount  = gross x discount%
+    taxable   = gross - discount            (rate excluding tax)
+              = net x 100 / (100 + GST%)    (tax_inclusive, e.g. MRP)
+    intra-state: CGST = SGST = taxable x GST% / 2
+    inter-state: IGST = taxable x GST%
+    total     = taxable + CGST + SGST + IGST
+
+price_lines_reference() computes the same with Decimal one line at a time; it is
+the specification the vectorized engine is tested and benchmarked against.
+"""
+
+from decimal import Decimal, ROUND_HALF_UP
+
+import numpy as np
+
+
+AMOUNT_FIELDS = ('gross', 'discount', 'taxable', 'cgst', 'sgst', 'igst', 'total')
+
+QUANTITY_SCALE = 1000
+PAISE_SCALE = 100
+BASIS_POINTS = 10000
+
+
+def to_fixed(values, scale):
+    """Convert decimal numbers (floats / array) to integers of 1/scale, rounding half away from zero"""
+    values = np.asarray(values, dtype=np.float64) * scale
+    # Snap float noise first (0.285 * 100 = 28.499999999999996 is meant as 28.5)
+    values = np.round(values, 6)
+    return (np.sign(values) * np.floor(np.abs(values) + 0.5)).astype(np.int64)
+
+
+def to_paise(amounts):
+    """Convert rupee amounts to integer paise"""
+    return to_fixed(amounts, PAISE_SCALE)
+
+
+def from_paise(paise):
+    """Convert integer paise back to rupees (float64, exact to two decimals)"""
+    return np.asarray(paise, dtype=np.int64) / PAISE_SCALE
+
+
+def divide_round(numerator, denominator):
+    """Integer division of int64 arrays rounding half away from zero"""
+    numerator = np.asarray(numerator, dtype=np.int64)
+    denominator = np.asarray(denominator, dtype=np.int64)
+    quotient = (2 * np.abs(numerator) + denominator) // (2 * denominator)
+    return np.sign(numerator) * quotient
+
+
+def price_lines(quantity, rate, discount_percentage=0, gst_percentage=0,
+                inter_state=False, tax_inclusive=False, rate_in_paise=False):
+    """
+    Price a batch of lines
+    Every argument is a scalar or an array with one value per line (rupees for
+    rate, percent for discount / GST, booleans for inter_state / tax_inclusive).
+    rate_in_paise: rate is already integer paise (as stored in the database)
+    Returns dict of int64 paise arrays: gross, discount, taxable, cgst, sgst, igst, total
+    """
+    quantity_milli = to_fixed(quantity, QUANTITY_SCALE)
+    rate_paise = np.asarray(rate, dtype=np.int64) if rate_in_paise else to_paise(rate)
+    quantity_milli, rate_paise = np.broadcast_arrays(quantity_milli, rate_paise)
+    line_count = quantity_milli.shape
+
+    discount_bp = np.broadcast_to(to_fixed(discount_percentage, 100), line_count)
+    gst_bp = np.broadcast_to(to_fixed(gst_percentage, 100), line_count)
+    inter_state = np.broadcast_to(np.asarray(inter_state, dtype=bool), line_count)
+    tax_inclusive = np.broadcast_to(np.asarray(tax_inclusive, dtype=bool), line_count)
+
+    gross = divide_round(quantity_milli * rate_paise, QUANTITY_SCALE)
+    discount = divide_round(gross * discount_bp, BASIS_POINTS)
+    net = gross - discount
+
+    # Tax-inclusive lines carry the tax inside the net amount
+    taxable = np.where(tax_inclusive,
+                       divide_round(net * BASIS_POINTS, BASIS_POINTS + gst_bp),
+                       net)
+    full_tax = np.where(tax_inclusive, net - taxable, divide_round(taxable * gst_bp, BASIS_POINTS))
+    half_tax = np.where(tax_inclusive, divide_round(full_tax, 2),
+                        divide_round(taxable * gst_bp, 2 * BASIS_POINTS))
+
+    igst = np.where(inter_state, full_tax, 0)
+    cgst = np.where(inter_state, 0, half_tax)
+    # SGST takes the odd paisa of an inclusive split so CGST + SGST == tax inside the price
+    sgst = np.where(inter_state, 0, np.where(tax_inclusive, full_tax - half_tax, half_tax))
+
+    return {
+        'gross': gross,
+        'discount': discount,
+        'taxable': taxable,
+        'cgst': cgst,
+        'sgst': sgst,
+        'igst': igst,
+        'total': taxable + cgst + sgst + igst
+    }
+
+
+def invoice_totals(amounts, invoice_index, invoice_count=None):
+    """
+    Sum line amounts per invoice
+    invoice_index: for every line, the 0-based position of its invoice
+    Returns dict of int64 paise arrays with one entry per invoice
+    """
+    invoice_index = np.asarray(invoice_index, dtype=np.int64)
+    if invoice_count is None:
+        invoice_count = int(invoice_index.max()) + 1 if invoice_index.size else 0
+
+    totals = {}
+    for field in AMOUNT_FIELDS:
+        total = np.zeros(invoice_count, dtype=np.int64)
+        np.add.at(total, invoice_index, amounts[field])
+        totals[field] = total
+    return totals
+
+
+# ============================================================================
+# REFERENCE IMPLEMENTATION
+# ============================================================================
+
+def _decimal(value, places):
+    """Decimal of a number rounded half up to `places` decimals"""
+    return Decimal(str(value)).quantize(Decimal(1).scaleb(-places), rounding=ROUND_HALF_UP)
+
+
+def _round_paise(amount):
+    """Round a rupee Decimal to whole paise, returned as int"""
+    return int((amount * PAISE_SCALE).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def price_line_reference(quantity, rate, discount_percentage=0, gst_percentage=0,
+                         inter_state=False, tax_inclusive=False):
+    """Price one line with Decimal arithmetic, returns dict of paise ints (see price_lines)"""
+    quantity = _decimal(quantity, 3)
+    rate = _decimal(rate, 2)
+    discount_percentage = _decimal(discount_percentage, 2)
+    gst_percentage = _decimal(gst_percentage, 2)
+
+    gross = _round_paise(quantity * rate)
+    discount = _round_paise(Decimal(gross) * discount_percentage / 100 / PAISE_SCALE)
+    net = gross - discount
+
+    if tax_inclusive:
+        taxable = _round_paise(Decimal(net) * 100 / (100 + gst_percentage) / PAISE_SCALE)
+        full_tax = net - taxable
+        half_tax = _round_paise(Decimal(full_tax) / 2 / PAISE_SCALE)
+        other_half = full_tax - half_tax
+    else:
+        taxable = net
+        full_tax = _round_paise(Decimal(taxable) * gst_percentage / 100 / PAISE_SCALE)
+        half_tax = other_half = _round_paise(Decimal(taxable) * gst_percentage / 200 / PAISE_SCALE)
+
+    cgst, sgst, igst = (0, 0, full_tax) if inter_state else (half_tax, other_half, 0)
+    return {
+        'gross': gross,
+        'discount': discount,
+        'taxable': taxable,
+        'cgst': cgst,
+        'sgst': sgst,
+        'igst': igst,
+        'total': taxable + cgst + sgst + igst
+    }
+
+
+def price_lines_reference(quantity, rate, discount_percentage, gst_percentage,
+                          inter_state, tax_inclusive):
+    """Price lists of line values one by one, returns dict of lists of paise ints"""
+    results = [
+        price_line_reference(*line)
+        for line in zip(quantity, rate, discount_percentage, gst_percentage, inter_state, tax_inclusive)
+    ]
+    return {field: [result[field] for result in results] for field in AMOUNT_FIELDS}
@@ -0,0 +1,160 @@
+"""
+Tracing - Spans from a UI action down to its SQL statements, in Chrome trace format
+
+While tracing is enabled every outermost Tk callback (button command, menu click,
+form save) opens an action span, and everything it calls on the same thread becomes a
+child span:
+
+    ui        the action itself (ui_profiler's Tk callback hook)
+    handler   each handler method (database/instrumentation.py)
+    sql       each execute / executemany with the statement and the rows it changed
+    fetch     each fetchone / fetchmany / fetchall with the rows it returned
+
+Time inside an action that is not covered by a handler span went to building widgets;
+time inside a handler not covered by sql / fetch spans went to Python (row to dict
+conversion, money formatting...).
+
+Every action of at least MIN_ACTION_SECONDS is written as one JSON file in the Trace
+Event Format, opened with chrome://tracing, Perfetto (ui.perfetto.dev) or speedscope.
+
+Enable with APP_TRACE=1 (APP_TRACE_DIR overrides the output directory) or from
+Utilities > Profiling. Nothing is recorded outside UI actions (maintenance threads...).
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+
+TRACE_ENV = 'APP_TRACE'
+TRACE_DIR_ENV = 'APP_TRACE_DIR'
+
+DEFAULT_TRACE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'traces')
+
+# Actions faster than this are not written
+MIN_ACTION_SECONDS = 0.05
+
+# Characters of SQL kept in a span
+MAX_SQL_LENGTH = 500
+
+# Spans kept per action; the rest are counted in the action span's args
+MAX_SPANS_PER_ACTION = 20000
+
+_active = None
+
+
+class Tracer:
+    def __init__(self, output_dir=None, min_seconds=MIN_ACTION_SECONDS):
+        self.output_dir = output_dir or DEFAULT_TRACE_DIR
+        self.min_seconds = min_seconds
+        self.local = threading.local()
+        self.origin = time.perf_counter()
+        self.sequence = 0
+        self.written = []
+
+    def _timestamp(self, seconds):
+        return round((seconds - self.origin) * 1_000_000, 3)
+
+    def in_action(self):
+        return getattr(self.local, 'events', None) is not None
+
+    def run_action(self, name, call):
+        """Run call() as a UI action span; nested actions become ordinary child spans"""
+        if self.in_action():
+            with self.span(name, 'ui'):
+                return call()
+        self.local.events = []
+        self.local.dropped = 0
+        started = time.perf_counter()
+        try:
+            return call()
+        finally:
+            finished = time.perf_counter()
+            events, dropped = self.local.events, self.local.dropped
+            self.local.events = None
+            self.add_event(events, name, 'ui', started, finished, {'dropped_spans': dropped} if dropped else None)
+            if finished - started >= self.min_seconds:
+                self.write(name, finished - started, events)
+
+    def add_event(self, events, name, category, started, finished, args=None):
+        event = {'name': name, 'cat': category, 'ph': 'X', 'ts': self._timestamp(started),
+                 'dur': round((finished - started) * 1_000_000, 3), 'pid': os.getpid(),
+                 'tid': threading.get_ident()}
+        if args:
+            event['args'] = args
+        events.append(event)
+
+    @contextmanager
+    def span(self, name, category, args=None):
+        """Record a child span of the current action; yields the args dict to fill in"""
+        args = {} if args is None else args
+        events = getattr(self.local, 'events', None)
+        if events is None:
+            yield args
+            return
+        started = time.perf_counter()
+        try:
+            yield args
+        finally:
+            if len(events) < MAX_SPANS_PER_ACTION:
+                self.add_event(events, name, category, started, time.perf_counter(), args)
+            else:
+                self.local.dropped += 1
+
+    def write(self, name, elapsed, events):
+        """Write one action's spans as a Chrome trace file, returns the path (None on error)"""
+        self.sequence += 1
+        safe_name = re.sub(r'[^A-Za-z0-9_.-]+', '_', name).strip('_')[:80]
+        path = os.path.join(self.output_dir, f"{datetime.now():%Y%m%d_%H%M%S}_{self.sequence:04d}_"
+                                             f"{safe_name}_{elapsed * 1000:.0f}ms.json")
+        document = {'traceEvents': sorted(events, key=lambda event: (event['ts'], -event['dur'])),
+                    'displayTimeUnit': 'ms', 'otherData': {'action': name}}
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            with open(path, 'w') as f:
+                json.dump(document, f)
+        except OSError as e:
+            print(f"[TRACE] Could not write {path}: {e}")
+            return None
+        self.written.append(path)
+        print(f"[TRACE] {name}: {elapsed * 1000:.0f} ms, {len(events)} spans -> {path}")
+        return path
+
+
+def sql_text(sql):
+    """Statement shortened for a span name / args"""
+    sql = ' '.join(str(sql).split())
+    return sql if len(sql) <= MAX_SQL_LENGTH else sql[:MAX_SQL_LENGTH] + '...'
+
+
+def enable(output_dir=None, min_seconds=MIN_ACTION_SECONDS):
+    """Start tracing UI actions, returns the active Tracer"""
+    global _active
+    # Handler and SQL spans come from the database instrumentation
+    from database import instrumentation
+    instrumentation.install()
+    _active = Tracer(output_dir, min_seconds)
+    print(f"[TRACE] Tracing UI actions into {_active.output_dir}")
+    return _active
+
+
+def disable():
+    """Stop tracing, returns the list of files written"""
+    global _active
+    tracer, _active = _active, None
+    return tracer.written if tracer else []
+
+
+def active_tracer():
+    return _active
+
+
+def enable_from_environment():
+    """Enable tracing when APP_TRACE is set, returns the Tracer or None"""
+    if os.environ.get(TRACE_ENV, '').strip().lower() not in ('1', 'true', 'on', 'yes'):
+        return None
+    return enable(os.environ.get(TRACE_DIR_ENV) or None)
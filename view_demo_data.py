@@ -6,6 +6,7 @@ import sqlite3
 import sys
 sys.path.insert(0, '.')
 from database.config import DB_PATH
+from utils.money import Money
 
 
 def view_business_partners():
@@ -30,7 +31,7 @@ def view_business_partners():
     print("-"*90)
 
     for p in partners:
-        balance_str = f"Rs.{p['opening_balance']:,.2f} {p['balance_type'][:2]}"
+        balance_str = f"Rs.{Money(p['opening_balance']):,.2f} {p['balance_type'][:2]}"
         type_label = "Customer" if p['account_type_id'] == 3 else "Supplier"
         print(f"{p['bp_code']:<10} {p['bp_name']:<30} {p['mobile']:<15} {balance_str:<15} {type_label:<8} {p['status']:<8}")
 
@@ -59,7 +60,7 @@ def view_account_master():
     print("-"*110)
 
     for a in accounts:
-        balance_str = f"Rs.{a['opening_balance']:,.2f} {a['balance_type'][:2]}"
+        balance_str = f"Rs.{Money(a['opening_balance']):,.2f} {a['balance_type'][:2]}"
         print(f"{a['account_code']:<10} {a['account_name']:<35} {a['book_code_id']:<8} {a['account_type_id']:<8} {balance_str:<18} {a['status']:<8}")
 
     conn.close()
@@ -85,7 +86,7 @@ def view_summary():
     print("\nBusiness Partners:")
     for type_id, count, total in bp_summary:
         type_label = "Customers (Debtors)" if type_id == 3 else "Suppliers (Creditors)"
-        print(f"  {type_label}: {count} records, Total: Rs.{total:,.2f}")
+        print(f"  {type_label}: {count} records, Total: Rs.{Money(total or 0):,.2f}")
 
     print("\nChart of Accounts:")
     account_type_names = {
@@ -100,7 +101,7 @@ def view_summary():
     }
     for type_id, count, total in acc_summary:
         type_label = account_type_names.get(type_id, f"Type {type_id}")
-        print(f"  {type_label}: {count} records, Total: Rs.{total:,.2f}")
+        print(f"  {type_label}: {count} records, Total: Rs.{Money(total or 0):,.2f}")
 
     conn.close()
 